@@ -0,0 +1,126 @@
+"""
+MARKET CALENDAR
+NSE session calendar and bar-close arithmetic (IST)
+
+- Sessions run 09:15-15:30 IST, Monday to Friday
+- Exchange holidays are read from data/nse_holidays.txt (one YYYY-MM-DD per line,
+  '#' comments allowed) so the list can be updated without a code change; a
+  missing file is an error, and a list that does not cover the current year
+  is logged, since either would make holidays look like trading days
+- Bars are anchored to the session open: 5-minute bars close at 09:20, 09:25, ... 15:30
+"""
+
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Iterable, Optional, Set
+
+import pytz
+from loguru import logger
+
+from config.trading_config import TradingConfig
+
+
+IST = pytz.timezone('Asia/Kolkata')
+
+SESSION_OPEN = time(TradingConfig.MARKET_START_HOUR, TradingConfig.MARKET_START_MINUTE)
+SESSION_CLOSE = time(TradingConfig.MARKET_END_HOUR, TradingConfig.MARKET_END_MINUTE)
+
+HOLIDAYS_FILE = Path(__file__).parent.parent / "data" / "nse_holidays.txt"
+
+
+def load_holidays(path: Path = HOLIDAYS_FILE) -> Set[date]:
+    """Read exchange holidays (raises FileNotFoundError if the file is missing)"""
+    if not path.exists():
+        raise FileNotFoundError(
+            f"NSE holiday list not found: {path} (pass holidays= explicitly to use weekends only)")
+    holidays = set()
+    for line in path.read_text().splitlines():
+        line = line.split('#', 1)[0].strip()
+        if line:
+            holidays.add(date.fromisoformat(line))
+    year = date.today().year
+    if not any(day.year == year for day in holidays):
+        logger.warning(f"NSE holiday list {path} has no entries for {year}; update it from the exchange circular")
+    return holidays
+
+
+class NSECalendar:
+    """Trading days, session bounds and bar boundaries"""
+
+    def __init__(self, holidays: Optional[Iterable[date]] = None):
+        self.holidays = set(holidays) if holidays is not None else load_holidays()
+
+    @staticmethod
+    def now() -> datetime:
+        return datetime.now(IST)
+
+    def is_trading_day(self, day: date) -> bool:
+        return day.weekday() < 5 and day not in self.holidays
+
+    def session_bounds(self, day: date):
+        """(open, close) as IST-aware datetimes"""
+        return (
+            IST.localize(datetime.combine(day, SESSION_OPEN)),
+            IST.localize(datetime.combine(day, SESSION_CLOSE)),
+        )
+
+    def is_open(self, when: Optional[datetime] = None) -> bool:
+        when = when or self.now()
+        if not self.is_trading_day(when.date()):
+            return False
+        open_, close = self.session_bounds(when.date())
+        return open_ <= when <= close
+
+    def next_trading_day(self, day: date) -> date:
+        day += timedelta(days=1)
+        while not self.is_trading_day(day):
+            day += timedelta(days=1)
+        return day
+
+    def previous_trading_day(self, day: date) -> date:
+        day -= timedelta(days=1)
+        while not self.is_trading_day(day):
+            day -= timedelta(days=1)
+        return day
+
+    def next_session_open(self, when: Optional[datetime] = None) -> datetime:
+        """Open of the current session if it has not started yet, else of the next one"""
+        when = when or self.now()
+        day = when.date()
+        if self.is_trading_day(day):
+            open_, _ = self.session_bounds(day)
+            if when < open_:
+                return open_
+        return self.session_bounds(self.next_trading_day(day))[0]
+
+    def last_bar_close(self, interval_minutes: int, when: Optional[datetime] = None) -> Optional[datetime]:
+        """Most recent bar close at or before ``when`` (None before the first close of the day)"""
+        when = when or self.now()
+        day = when.date()
+        if not self.is_trading_day(day):
+            return None
+        open_, close = self.session_bounds(day)
+        if when < open_ + timedelta(minutes=interval_minutes):
+            return None
+        when = min(when, close)
+        bars = int((when - open_).total_seconds() // (interval_minutes * 60))
+        return open_ + timedelta(minutes=bars * interval_minutes)
+
+    def next_bar_close(self, interval_minutes: int, when: Optional[datetime] = None) -> datetime:
+        """
+        First bar close strictly after ``when``, skipping nights, weekends and holidays.
+
+        The last bar of a session closes at the session close even if the
+        session length is not a multiple of the interval.
+        """
+        when = when or self.now()
+        day = when.date()
+        if self.is_trading_day(day):
+            open_, close = self.session_bounds(day)
+            if when < close:
+                if when < open_:
+                    return open_ + timedelta(minutes=interval_minutes)
+                bars = int((when - open_).total_seconds() // (interval_minutes * 60)) + 1
+                return min(open_ + timedelta(minutes=bars * interval_minutes), close)
+        open_, close = self.session_bounds(self.next_trading_day(day))
+        return min(open_ + timedelta(minutes=interval_minutes), close)
@@ -1,23 +1,53 @@
 """
 Integration modules for external APIs and data providers
+
+Submodules are imported on first attribute access, so importing one of them
+(e.g. integrations.telemetry) does not pull in pandas, requests and the rest.
 """
 
-from .dhan_client import DhanAPIClient, DhanConfig, NIFTY_INSTRUMENTS
-from .dhan_data_manager import DhanDataManager, OptionStrike
-from .dhan_websocket import DhanWebSocket, ExchangeSegment, InstrumentType, TickData, MarketDepth
-from .market_depth_analyzer import MarketDepthAnalyzer, DepthAnalysis
-
-__all__ = [
-    'DhanAPIClient',
-    'DhanConfig',
-    'DhanDataManager',
-    'OptionStrike',
-    'NIFTY_INSTRUMENTS',
-    'DhanWebSocket',
-    'ExchangeSegment',
-    'InstrumentType',
-    'TickData',
-    'MarketDepth',
-    'MarketDepthAnalyzer',
-    'DepthAnalysis'
-]
+import importlib
+
+_EXPORTS = {
+    'DhanAPIClient': 'dhan_client',
+    'DhanConfig': 'dhan_client',
+    'NIFTY_INSTRUMENTS': 'dhan_client',
+    'DhanDataManager': 'dhan_data_manager',
+    'OptionStrike': 'dhan_data_manager',
+    'DhanWebSocket': 'dhan_websocket',
+    'ExchangeSegment': 'dhan_websocket',
+    'InstrumentType': 'dhan_websocket',
+    'TickData': 'dhan_websocket',
+    'MarketDepth': 'dhan_websocket',
+    'MarketDepthAnalyzer': 'market_depth_analyzer',
+    'DepthAnalysis': 'market_depth_analyzer',
+    'OrderBook': 'order_book',
+    'OrderBookManager': 'order_book',
+    'TickJournalWriter': 'tick_journal',
+    'TickJournalReader': 'tick_journal',
+    'ReplayEngine': 'tick_journal',
+    'ReplayClock': 'tick_journal',
+    'WallClock': 'tick_journal',
+    'FeedGateway': 'feed_gateway',
+    'FeedClient': 'feed_gateway',
+    'GatewayFeed': 'feed_gateway',
+    'GatewayRestClient': 'feed_gateway',
+    'create_feed': 'feed_gateway',
+    'create_rest_client': 'feed_gateway',
+    'MetricsRegistry': 'telemetry',
+    'REGISTRY': 'telemetry',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
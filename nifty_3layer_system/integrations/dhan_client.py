@@ -9,9 +9,8 @@ import os
 import time
 import requests
 import json
-import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from functools import wraps
 from dataclasses import dataclass, asdict
 from pathlib import Path
@@ -20,9 +19,17 @@ from loguru import logger
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from .telemetry import DHAN_REST_LATENCY, RATE_LIMIT_WAIT, record_cache
+
+if TYPE_CHECKING:
+    import pandas as pd  # imported on first candle fetch (keeps process startup light)
+
 # Load environment variables
 load_dotenv()
 
+EXPIRY_LIST_TTL = 12 * 3600  # seconds; a pre-open fetch is still valid through the session
+CANDLE_CACHE_TTL = 300  # seconds; pre-market fetches pass a longer TTL that lasts to the open
+
 
 @dataclass
 class DhanConfig:
@@ -113,7 +120,8 @@ class DhanConfig:
 class RateLimiter:
     """Token bucket rate limiter for API calls"""
     
-    def __init__(self, calls_per_second: float = 1.0):
+    def __init__(self, calls_per_second: float = 1.0, name: str = "default"):
+        self.name = name
         self.calls_per_second = calls_per_second
         self.min_interval = 1.0 / calls_per_second
         self.last_call = 0
@@ -125,6 +133,9 @@ class RateLimiter:
             sleep_time = self.min_interval - elapsed
             logger.debug(f"Rate limit: sleeping {sleep_time:.3f}s")
             time.sleep(sleep_time)
+        else:
+            sleep_time = 0.0
+        RATE_LIMIT_WAIT.observe(sleep_time, limiter=self.name)
         self.last_call = time.time()
 
 
@@ -156,10 +167,10 @@ class DhanAPIClient:
         self._session = self._create_session()
         
         # Rate limiters (3 sec for option chain, 1 sec default)
-        self.option_chain_limiter = RateLimiter(calls_per_second=1/3)
-        self.default_limiter = RateLimiter(calls_per_second=2)
+        self.option_chain_limiter = RateLimiter(calls_per_second=1/3, name="option_chain")
+        self.default_limiter = RateLimiter(calls_per_second=2, name="default")
         
-        # Cache
+        # Cache (_cache_ttl holds each entry's expiry time)
         self._cache = {}
         self._cache_ttl = {}
         
@@ -214,19 +225,22 @@ class DhanAPIClient:
 
     def _get_cache(self, key: str) -> Optional[Dict]:
         """Get cached response if not expired"""
+        cache = key.split('_', 1)[0]  # candles / daily / optionchain / expirylist
         if key in self._cache:
-            if time.time() - self._cache_ttl[key] < 300:  # 5 min TTL
+            if time.time() < self._cache_ttl[key]:
                 logger.debug(f"Cache hit: {key}")
+                record_cache(f"dhan_{cache}", True)
                 return self._cache[key]
             else:
                 del self._cache[key]
                 del self._cache_ttl[key]
+        record_cache(f"dhan_{cache}", False)
         return None
     
-    def _set_cache(self, key: str, value: Dict):
-        """Set cache with TTL"""
+    def _set_cache(self, key: str, value: Dict, ttl: float = 300):
+        """Set cache with TTL (default 5 min)"""
         self._cache[key] = value
-        self._cache_ttl[key] = time.time()
+        self._cache_ttl[key] = time.time() + ttl
         logger.debug(f"Cache set: {key}")
     
     def get_historical_candles(
@@ -235,8 +249,9 @@ class DhanAPIClient:
         exchange_segment: str,
         instrument: str,
         interval: int = 5,
-        days: int = 5
-    ) -> pd.DataFrame:
+        days: int = 5,
+        cache_ttl: float = CANDLE_CACHE_TTL
+    ) -> "pd.DataFrame":
         """
         Fetch intraday candles (1m, 5m, 15m, 25m, 60m)
         
@@ -246,10 +261,13 @@ class DhanAPIClient:
             instrument: e.g., 'EQUITY', 'OPTIDX'
             interval: 1, 5, 15, 25, 60 (minutes)
             days: Historical lookback (max 90)
+            cache_ttl: Seconds a fetched result is served from the cache
         
         Returns:
             pd.DataFrame with OHLCV + timestamp
         """
+        import pandas as pd
+
         if interval not in [1, 5, 15, 25, 60]:
             raise ValueError(f"Invalid interval: {interval}. Must be one of [1, 5, 15, 25, 60]")
         
@@ -269,7 +287,7 @@ class DhanAPIClient:
         cache_key = f"candles_{security_id}_{interval}_{days}"
         cached = self._get_cache(cache_key)
         if cached:
-            return pd.DataFrame(cached)
+            return pd.DataFrame(cached).set_index('timestamp')
         
         logger.info(f"Fetching {interval}m candles | {security_id} | {days}d")
         
@@ -277,12 +295,13 @@ class DhanAPIClient:
         max_retries = 2
         for attempt in range(max_retries):
             try:
-                response = self._session.post(
-                    f"{self.config.base_url}/charts/intraday",
-                    headers=self._headers(),
-                    json=payload,
-                    timeout=10
-                )
+                with DHAN_REST_LATENCY.time(endpoint="charts/intraday"):
+                    response = self._session.post(
+                        f"{self.config.base_url}/charts/intraday",
+                        headers=self._headers(),
+                        json=payload,
+                        timeout=10
+                    )
                 data = self._validate_response(response)
                 
                 # Convert to DataFrame
@@ -299,7 +318,8 @@ class DhanAPIClient:
                 df.set_index('timestamp', inplace=True)
                 df.sort_index(inplace=True)
                 
-                self._set_cache(cache_key, df.to_dict(orient='list'))
+                # Keep the timestamps: a cache hit must rebuild the same DatetimeIndex
+                self._set_cache(cache_key, df.reset_index().to_dict(orient='list'), ttl=cache_ttl)
                 logger.info(f"✓ Fetched {len(df)} candles")
                 
                 return df
@@ -320,7 +340,7 @@ class DhanAPIClient:
         exchange_segment: str,
         instrument: str,
         days: int = 365
-    ) -> pd.DataFrame:
+    ) -> "pd.DataFrame":
         """
         Fetch daily candles (back to inception)
         
@@ -333,6 +353,8 @@ class DhanAPIClient:
         Returns:
             pd.DataFrame with daily OHLCV
         """
+        import pandas as pd
+
         to_date = datetime.now()
         from_date = to_date - timedelta(days=days)
         
@@ -349,17 +371,18 @@ class DhanAPIClient:
         cache_key = f"daily_candles_{security_id}_{days}"
         cached = self._get_cache(cache_key)
         if cached:
-            return pd.DataFrame(cached)
+            return pd.DataFrame(cached).set_index('timestamp')
         
         logger.info(f"Fetching daily candles | {security_id} | {days}d")
         
         try:
-            response = self._session.post(
-                f"{self.config.base_url}/charts/historical",
-                headers=self._headers(),
-                json=payload,
-                timeout=10
-            )
+            with DHAN_REST_LATENCY.time(endpoint="charts/historical"):
+                response = self._session.post(
+                    f"{self.config.base_url}/charts/historical",
+                    headers=self._headers(),
+                    json=payload,
+                    timeout=10
+                )
             data = self._validate_response(response)
             
             # Convert to DataFrame
@@ -375,7 +398,7 @@ class DhanAPIClient:
             df.set_index('timestamp', inplace=True)
             df.sort_index(inplace=True)
             
-            self._set_cache(cache_key, df.to_dict(orient='list'))
+            self._set_cache(cache_key, df.reset_index().to_dict(orient='list'))
             logger.info(f"✓ Fetched {len(df)} daily candles")
             
             return df
@@ -420,12 +443,13 @@ class DhanAPIClient:
             try:
                 self.option_chain_limiter.wait()  # Rate limit: 1 req per 3 sec
 
-                response = self._session.post(
-                    f"{self.config.base_url}/optionchain",
-                    headers=self._headers(),
-                    json=payload,
-                    timeout=10
-                )
+                with DHAN_REST_LATENCY.time(endpoint="optionchain"):
+                    response = self._session.post(
+                        f"{self.config.base_url}/optionchain",
+                        headers=self._headers(),
+                        json=payload,
+                        timeout=10
+                    )
                 data = self._validate_response(response)
 
                 self._set_cache(cache_key, data)
@@ -468,16 +492,18 @@ class DhanAPIClient:
         logger.info(f"Fetching expiry list | {underlying_scrip}")
         
         try:
-            response = self._session.post(
-                f"{self.config.base_url}/optionchain/expirylist",
-                headers=self._headers(),
-                json=payload,
-                timeout=10
-            )
+            with DHAN_REST_LATENCY.time(endpoint="optionchain/expirylist"):
+                response = self._session.post(
+                    f"{self.config.base_url}/optionchain/expirylist",
+                    headers=self._headers(),
+                    json=payload,
+                    timeout=10
+                )
             data = self._validate_response(response)
             
             expiries = data.get('data', [])
-            self._set_cache(cache_key, expiries)
+            # Expiries only roll after a session closes: keep them for the day
+            self._set_cache(cache_key, expiries, ttl=EXPIRY_LIST_TTL)
             logger.info(f"✓ Fetched {len(expiries)} expiries")
             
             return expiries
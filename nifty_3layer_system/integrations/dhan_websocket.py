@@ -8,6 +8,7 @@ Protocol: Dhan Feed API v2
 
 import json
 import asyncio
+import time
 import websockets
 from typing import Dict, List, Callable, Optional
 from dataclasses import dataclass
@@ -15,6 +16,9 @@ from datetime import datetime
 from loguru import logger
 from enum import Enum
 
+from .order_book import OrderBook, OrderBookManager, DEPTH_BID_CODE, DEPTH_ASK_CODE
+from .telemetry import WS_DECODE_TIME, WS_MESSAGES_DECODED
+
 
 class InstrumentType(Enum):
     """Dhan instrument types for WebSocket"""
@@ -52,6 +56,7 @@ class TickData:
     oi: Optional[int]  # Open Interest
     oi_change: Optional[int]
     timestamp: datetime
+    received_at: float = 0.0  # time.perf_counter() when the frame arrived (0: replayed, no latency)
 
 
 @dataclass
@@ -88,11 +93,19 @@ class DhanWebSocket:
         self.websocket = None
         self.is_connected = False
         self.subscriptions = {}
+        self._received_at = 0.0  # perf_counter() of the frame being decoded
         
         # Callbacks
         self.on_tick_callback: Optional[Callable[[TickData], None]] = None
         self.on_depth_callback: Optional[Callable[[MarketDepth], None]] = None
         self.on_error_callback: Optional[Callable[[str], None]] = None
+        self.on_book_callback: Optional[Callable[[OrderBook], None]] = None
+        
+        # Streaming 20-level books (set via attach_order_books)
+        self.order_books: Optional[OrderBookManager] = None
+        
+        # Append-only tick journal (set via attach_journal)
+        self.journal = None
         
         logger.info("Dhan WebSocket client initialized")
     
@@ -331,18 +344,22 @@ class DhanWebSocket:
         """Receive and process WebSocket messages"""
         try:
             async for message in self.websocket:
+                self._received_at = time.perf_counter()
                 try:
                     # Check if binary data
                     if isinstance(message, bytes):
                         await self._process_binary_message(message)
+                        WS_MESSAGES_DECODED.inc(kind="binary")
                     else:
                         # JSON message
                         data = json.loads(message)
                         await self._process_message(data)
+                        WS_MESSAGES_DECODED.inc(kind="json")
                 except json.JSONDecodeError:
                     await self._process_binary_message(message.encode() if isinstance(message, str) else message)
                 except Exception as e:
                     logger.error(f"Error processing message: {e}")
+                WS_DECODE_TIME.observe_since(self._received_at)
         
         except websockets.exceptions.ConnectionClosed as e:
             logger.warning(f"WebSocket connection closed: {e.rcvd_then_sent}")
@@ -361,19 +378,28 @@ class DhanWebSocket:
             # Ticker/Quote data
             if 'type' in data and data['type'] == 'Ticker':
                 tick = self._parse_tick_data(data)
+                if self.journal is not None:
+                    self.journal.write_tick(tick)
                 if self.on_tick_callback:
                     self.on_tick_callback(tick)
             
             elif 'type' in data and data['type'] == 'Quote':
                 tick = self._parse_quote_data(data)
+                if self.journal is not None:
+                    self.journal.write_tick(tick)
                 if self.on_tick_callback:
                     self.on_tick_callback(tick)
             
             # Market depth data
             elif 'type' in data and data['type'] == 'MarketDepth':
-                depth = self._parse_depth_data(data)
-                if self.on_depth_callback:
-                    self.on_depth_callback(depth)
+                if self.order_books is not None:
+                    self._apply_depth_to_book(data)
+                if self.on_depth_callback or self.journal is not None:
+                    depth = self._parse_depth_data(data)
+                    if self.journal is not None:
+                        self.journal.write_depth(depth)
+                    if self.on_depth_callback:
+                        self.on_depth_callback(depth)
             
             else:
                 logger.debug(f"Unknown message type: {data}")
@@ -410,9 +436,12 @@ class DhanWebSocket:
                     ask=None,
                     oi=None,
                     oi_change=None,
-                    timestamp=datetime.now()
+                    timestamp=datetime.now(),
+                    received_at=self._received_at,
                 )
                 
+                if self.journal is not None:
+                    self.journal.write_tick(tick)
                 if self.on_tick_callback:
                     self.on_tick_callback(tick)
             
@@ -420,6 +449,14 @@ class DhanWebSocket:
                 # More fields available in quote
                 pass
             
+            elif self.order_books is not None and data[2] in (DEPTH_BID_CODE, DEPTH_ASK_CODE):
+                # 20-level depth packets (code in byte 2) go straight into the array-backed books
+                for book in self.order_books.apply_stream(data):
+                    if self.journal is not None:
+                        self.journal.write_book(book)
+                    if self.on_book_callback:
+                        self.on_book_callback(book)
+            
             elif msg_type == 50:  # Server disconnection
                 logger.warning("Server disconnection message received")
                 
@@ -439,7 +476,8 @@ class DhanWebSocket:
             ask=data.get('bestAskPrice'),
             oi=data.get('openInterest'),
             oi_change=data.get('OIChange'),
-            timestamp=datetime.now()
+            timestamp=datetime.now(),
+            received_at=self._received_at,
         )
     
     def _parse_quote_data(self, data: Dict) -> TickData:
@@ -455,7 +493,8 @@ class DhanWebSocket:
             ask=float(data.get('bestAskPrice', 0.0)),
             oi=data.get('openInterest'),
             oi_change=data.get('OIChange'),
-            timestamp=datetime.now()
+            timestamp=datetime.now(),
+            received_at=self._received_at,
         )
     
     def _parse_depth_data(self, data: Dict) -> MarketDepth:
@@ -489,6 +528,35 @@ class DhanWebSocket:
             timestamp=datetime.now()
         )
     
+    def _apply_depth_to_book(self, data: Dict):
+        """Write JSON depth levels into the order book without building level dicts"""
+        book = self.order_books.get(data.get('security_id', ''))
+        for key, is_bid in (('bids', True), ('asks', False)):
+            levels = data.get(key)
+            if not levels:
+                continue
+            book.apply_side(
+                is_bid,
+                [float(lvl.get('price', 0.0)) for lvl in levels],
+                [int(lvl.get('quantity', 0)) for lvl in levels],
+                [int(lvl.get('orders', 0)) for lvl in levels],
+            )
+        if self.on_book_callback:
+            self.on_book_callback(book)
+    
+    def attach_order_books(self, manager: Optional[OrderBookManager] = None) -> OrderBookManager:
+        """Maintain streaming OrderBooks from depth messages (returns the manager)"""
+        self.order_books = manager or OrderBookManager()
+        return self.order_books
+    
+    def attach_journal(self, journal):
+        """Record every tick/depth update to a TickJournalWriter before callbacks run"""
+        self.journal = journal
+    
+    def on_book(self, callback: Callable[[OrderBook], None]):
+        """Register callback fired after an OrderBook is updated"""
+        self.on_book_callback = callback
+    
     def on_tick(self, callback: Callable[[TickData], None]):
         """Register callback for tick data"""
         self.on_tick_callback = callback
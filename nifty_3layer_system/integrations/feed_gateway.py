@@ -0,0 +1,817 @@
+"""
+FEED GATEWAY: One process owns the upstream Dhan connections, many processes read
+- Single DhanWebSocket + single DhanAPIClient (one rate limiter, one cache)
+- Publishes ticks, 1-minute bars and option-chain snapshots to local subscribers
+- Transport: newline-delimited JSON over a Unix socket (TCP loopback on Windows)
+- Snapshot-on-subscribe: a new subscriber immediately gets the latest state per topic
+  (the session's bars are assembled only then, not on every tick)
+- Shared REST: subscribers call whitelisted DhanAPIClient methods through the gateway;
+  GatewayRestClient is a blocking stand-in for DhanAPIClient (create_rest_client)
+- GatewayFeed mirrors the DhanWebSocket API so existing scripts can switch over
+  (create_feed probes for a running gateway without blocking the event loop)
+
+Topics:
+    tick:<security_id>    every decoded tick
+    bar:<security_id>     current 1-minute bar on every tick (closed=True when it rolls)
+    chain:<security_id>   option chain for the nearest expiry, polled every chain_interval
+
+Run the daemon (from nifty_3layer_system/):
+    python -m integrations.feed_gateway
+"""
+
+import asyncio
+import inspect
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set
+
+from loguru import logger
+
+from .dhan_websocket import DhanWebSocket, ExchangeSegment, InstrumentType, MarketDepth, TickData
+from .telemetry import QUEUE_DEPTH, WS_MESSAGES_DECODED
+
+
+def _default_address() -> str:
+    if hasattr(socket, "AF_UNIX") and sys.platform != "win32":
+        return "unix:/tmp/nifty_feed_gateway.sock"
+    return "tcp:127.0.0.1:8765"
+
+
+DEFAULT_ADDRESS = os.getenv("FEED_GATEWAY_ADDRESS", _default_address())
+
+# DhanAPIClient methods subscribers may call through the gateway
+REST_METHODS = {"get_historical_candles", "get_daily_candles", "get_option_chain", "get_expiry_list"}
+
+MAX_LINE_BYTES = 1 << 20
+
+
+# ═════════════════════════════════════════════════════════════════════════════════
+# WIRE FORMAT
+# ═════════════════════════════════════════════════════════════════════════════════
+
+def _json_default(obj):
+    if isinstance(obj, datetime):  # includes pd.Timestamp
+        return obj.isoformat()
+    if hasattr(obj, "item"):  # numpy scalars
+        return obj.item()
+    raise TypeError(f"Not JSON serializable: {type(obj).__name__}")
+
+
+def encode(message: Dict) -> bytes:
+    return json.dumps(message, default=_json_default, separators=(",", ":")).encode() + b"\n"
+
+
+def tick_to_dict(tick: TickData) -> Dict:
+    return {
+        "security_id": str(tick.security_id),
+        "exchange_segment": tick.exchange_segment,
+        "ltp": tick.ltp,
+        "ltt": tick.ltt,
+        "ltq": tick.ltq,
+        "volume": tick.volume,
+        "bid": tick.bid,
+        "ask": tick.ask,
+        "oi": tick.oi,
+        "oi_change": tick.oi_change,
+        "timestamp": tick.timestamp,
+    }
+
+
+def tick_from_dict(data: Dict) -> TickData:
+    return TickData(
+        security_id=data["security_id"],
+        exchange_segment=data["exchange_segment"],
+        ltp=data["ltp"],
+        ltt=datetime.fromisoformat(data["ltt"]) if data.get("ltt") else None,
+        ltq=data.get("ltq"),
+        volume=data.get("volume"),
+        bid=data.get("bid"),
+        ask=data.get("ask"),
+        oi=data.get("oi"),
+        oi_change=data.get("oi_change"),
+        timestamp=datetime.fromisoformat(data["timestamp"]),
+        received_at=time.perf_counter(),
+    )
+
+
+def depth_to_dict(depth: MarketDepth) -> Dict:
+    return {
+        "security_id": str(depth.security_id),
+        "exchange_segment": depth.exchange_segment,
+        "bids": depth.bids,
+        "asks": depth.asks,
+        "timestamp": depth.timestamp,
+    }
+
+
+def depth_from_dict(data: Dict) -> MarketDepth:
+    return MarketDepth(
+        security_id=data["security_id"],
+        exchange_segment=data["exchange_segment"],
+        bids=data["bids"],
+        asks=data["asks"],
+        timestamp=datetime.fromisoformat(data["timestamp"]),
+    )
+
+
+def _to_wire(result: Any) -> Any:
+    """REST results → JSON-friendly (DataFrames become column lists plus their index)"""
+    pd = sys.modules.get("pandas")  # a DataFrame result means pandas is already loaded
+    if pd is not None and isinstance(result, pd.DataFrame):
+        if isinstance(result.index, pd.RangeIndex):
+            return {"__frame__": result.to_dict(orient="list"), "index": None}
+        index = result.index.name or "index"
+        return {"__frame__": result.reset_index(names=index).to_dict(orient="list"), "index": index}
+    return result
+
+
+def _from_wire(data: Any) -> Any:
+    """Inverse of _to_wire (DataFrames come back with a DatetimeIndex when they had one)"""
+    if isinstance(data, dict) and "__frame__" in data:
+        import pandas as pd
+
+        df = pd.DataFrame(data["__frame__"])
+        index = data["index"]
+        if index is not None:
+            if pd.api.types.is_string_dtype(df[index]):  # timestamps travel as ISO strings
+                df[index] = pd.to_datetime(df[index])
+            df = df.set_index(index)
+        return df
+    return data
+
+
+def _parse_address(address: str):
+    kind, _, rest = address.partition(":")
+    if kind == "unix":
+        return "unix", rest
+    if kind == "tcp":
+        host, _, port = rest.rpartition(":")
+        return "tcp", (host or "127.0.0.1", int(port))
+    raise ValueError(f"Unsupported gateway address: {address} (use unix:/path or tcp:host:port)")
+
+
+# ═════════════════════════════════════════════════════════════════════════════════
+# BARS
+# ═════════════════════════════════════════════════════════════════════════════════
+
+class BarBuilder:
+    """1-minute OHLC bars from LTP ticks, per security"""
+
+    def __init__(self, history: int = 375):
+        """
+        Args:
+            history: Closed bars kept per security (375 = one NSE session)
+        """
+        self.current: Dict[str, Dict] = {}
+        self.closed: Dict[str, Deque[Dict]] = {}
+        self.history = history
+
+    def update(self, security_id: str, price: float, ts: datetime) -> List[Dict]:
+        """
+        Apply a tick.
+
+        Returns:
+            Bars to publish: the bar that just closed (if any), then the live bar
+        """
+        minute = ts.replace(second=0, microsecond=0)
+        bar = self.current.get(security_id)
+        out = []
+        if bar is not None and bar["time"] != minute:
+            bar["closed"] = True
+            self.closed.setdefault(security_id, deque(maxlen=self.history)).append(bar)
+            out.append(bar)
+            bar = None
+        if bar is None:
+            bar = {"security_id": security_id, "time": minute, "open": price, "high": price,
+                   "low": price, "close": price, "ticks": 0, "closed": False}
+            self.current[security_id] = bar
+        bar["high"] = max(bar["high"], price)
+        bar["low"] = min(bar["low"], price)
+        bar["close"] = price
+        bar["ticks"] += 1
+        out.append(dict(bar))
+        return out
+
+    def snapshot(self, security_id: str) -> Dict:
+        return {
+            "security_id": security_id,
+            "bars": list(self.closed.get(security_id, ())),
+            "current": self.current.get(security_id),
+        }
+
+
+# ═════════════════════════════════════════════════════════════════════════════════
+# GATEWAY
+# ═════════════════════════════════════════════════════════════════════════════════
+
+class _Subscriber:
+    """One connected process: its topics and a bounded outbound queue"""
+
+    def __init__(self, writer: asyncio.StreamWriter, queue_size: int):
+        self.writer = writer
+        self.topics: Set[str] = set()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.sent = 0
+        self.task: Optional[asyncio.Task] = None
+
+    def push(self, line: bytes):
+        # A slow reader loses its oldest messages rather than stalling the feed
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(line)
+
+    async def pump(self):
+        try:
+            while True:
+                line = await self.queue.get()
+                self.writer.write(line)
+                # Coalesce whatever else is queued into the same drain
+                while not self.queue.empty():
+                    self.writer.write(self.queue.get_nowait())
+                    self.sent += 1
+                self.sent += 1
+                await self.writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+
+
+class FeedGateway:
+    """
+    Upstream owner and local fan-out.
+
+    Usage:
+        gateway = FeedGateway()
+        await gateway.start()
+        await gateway.serve_forever()
+    """
+
+    def __init__(
+        self,
+        address: str = DEFAULT_ADDRESS,
+        instruments: Iterable[str] = ("NIFTY", "SENSEX"),
+        chain_interval: float = 60.0,
+        queue_size: int = 10_000,
+        journal_dir: Optional[str] = None,
+    ):
+        """
+        Args:
+            address: unix:/path/to.sock or tcp:host:port
+            instruments: InstrumentManager keys subscribed upstream at start
+            chain_interval: Seconds between option-chain polls (0 disables)
+            queue_size: Per-subscriber outbound queue (oldest dropped when full)
+            journal_dir: Record the upstream feed to a tick journal here
+        """
+        self.address = address
+        self.instruments = list(instruments)
+        self.chain_interval = chain_interval
+        self.queue_size = queue_size
+        self.journal_dir = journal_dir
+
+        self.ws: Optional[DhanWebSocket] = None
+        self.client = None
+        self.journal = None
+        self.bars = BarBuilder()
+
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._subscribers: Set[_Subscriber] = set()
+        self._latest: Dict[str, tuple] = {}  # topic -> (kind, data) last published
+        self._upstream: Set[str] = set()
+        self._tasks: List[asyncio.Task] = []
+
+        self.published = 0
+        self.rest_calls = 0
+        self.started_at: Optional[float] = None
+
+        QUEUE_DEPTH.set_function(
+            lambda: max((sub.queue.qsize() for sub in self._subscribers), default=0),
+            queue="gateway_subscriber_max",
+        )
+
+    # ------------------------------------------------------------------ lifecycle
+
+    async def start(self, connect_upstream: bool = True):
+        """Listen locally, then connect and subscribe upstream"""
+        kind, target = _parse_address(self.address)
+        if kind == "unix":
+            if os.path.exists(target):
+                os.unlink(target)
+            self._server = await asyncio.start_unix_server(self._handle_client, path=target, limit=MAX_LINE_BYTES)
+        else:
+            self._server = await asyncio.start_server(self._handle_client, *target, limit=MAX_LINE_BYTES)
+        self.started_at = time.time()
+        logger.info(f"✓ Feed gateway listening on {self.address}")
+
+        if connect_upstream:
+            await self._connect_upstream()
+
+    async def _connect_upstream(self):
+        from .dhan_client import DhanAPIClient, DhanConfig
+
+        config = DhanConfig.from_env()
+        self.client = DhanAPIClient(config)
+        self.ws = DhanWebSocket(access_token=config.access_token, client_id=config.client_id)
+        if self.journal_dir:
+            from .tick_journal import TickJournalWriter
+            self.journal = TickJournalWriter(self.journal_dir)
+            self.ws.attach_journal(self.journal)
+        self.ws.on_tick(self.on_tick)
+        self.ws.on_depth(self.on_depth)
+        await self.ws.connect()
+
+        for key in self.instruments:
+            await self._subscribe_upstream(key)
+        if self.chain_interval:
+            self._tasks.append(asyncio.create_task(self._poll_chains()))
+
+    async def _subscribe_upstream(self, key: str, segment: str = "IDX_I", instrument_type: str = "INDEX"):
+        from config.instrument_config import InstrumentManager
+
+        inst = InstrumentManager.get_instrument(key)
+        security_id = inst.security_id if inst else key
+        if security_id in self._upstream or self.ws is None:
+            return
+        await self.ws.subscribe_ticker(
+            security_id=security_id,
+            exchange_segment=ExchangeSegment[segment],
+            instrument_type=InstrumentType[instrument_type],
+        )
+        self._upstream.add(security_id)
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for sub in list(self._subscribers):
+            sub.task.cancel()
+            sub.writer.close()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self.ws is not None:
+            await self.ws.disconnect()
+        if self.journal is not None:
+            self.journal.close()
+        kind, target = _parse_address(self.address)
+        if kind == "unix" and os.path.exists(target):
+            os.unlink(target)
+        logger.info("✓ Feed gateway stopped")
+
+    # ------------------------------------------------------------------ publish
+
+    def publish(self, topic: str, kind: str, data: Any):
+        """
+        Send to every subscriber of ``topic`` and remember it for snapshots.
+
+        The line is encoded once and shared by all subscribers.
+        """
+        self._latest[topic] = (kind, data)
+        subscribers = [sub for sub in self._subscribers if topic in sub.topics]
+        if not subscribers:
+            return
+        line = encode({"t": kind, "topic": topic, "d": data})
+        for sub in subscribers:
+            sub.push(line)
+        self.published += 1
+
+    def on_tick(self, tick: TickData):
+        security_id = str(tick.security_id)
+        self.publish(f"tick:{security_id}", "tick", tick_to_dict(tick))
+        for bar in self.bars.update(security_id, tick.ltp, tick.timestamp):
+            self.publish(f"bar:{security_id}", "bar", bar)
+
+    def on_depth(self, depth: MarketDepth):
+        self.publish(f"depth:{depth.security_id}", "depth", depth_to_dict(depth))
+
+    async def _poll_chains(self):
+        """Option chain for each instrument's nearest expiry, on the shared rate limiter"""
+        from config.instrument_config import InstrumentManager
+
+        loop = asyncio.get_running_loop()
+        while True:
+            for key in self.instruments:
+                inst = InstrumentManager.get_instrument(key)
+                if inst is None:
+                    continue
+                try:
+                    expiries = await loop.run_in_executor(
+                        None, self.client.get_expiry_list, int(inst.security_id), inst.exchange_segment
+                    )
+                    if not expiries:
+                        continue
+                    chain = await loop.run_in_executor(
+                        None, self.client.get_option_chain, int(inst.security_id), inst.exchange_segment, expiries[0]
+                    )
+                    self.publish(f"chain:{inst.security_id}", "chain",
+                                 {"security_id": inst.security_id, "expiry": expiries[0],
+                                  "fetched_at": datetime.now(), "chain": chain})
+                except Exception as e:
+                    logger.warning(f"Chain poll failed for {key}: {e}")
+            await asyncio.sleep(self.chain_interval)
+
+    def snapshot(self, topic: str) -> Optional[Dict]:
+        """Message a new subscriber of ``topic`` starts from (None before the first publish)"""
+        latest = self._latest.get(topic)
+        if latest is None:
+            return None
+        kind, data = latest
+        if kind == "bar":
+            # The session so far rather than the last bar, built on demand
+            data = self.bars.snapshot(topic.partition(":")[2])
+        return {"t": kind, "topic": topic, "d": data, "snapshot": True}
+
+    # ------------------------------------------------------------------ clients
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        sub = _Subscriber(writer, self.queue_size)
+        sub.task = asyncio.create_task(sub.pump())
+        self._subscribers.add(sub)
+        logger.info(f"Subscriber connected ({len(self._subscribers)} total)")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError:
+                    sub.push(encode({"t": "error", "error": "invalid json"}))
+                    continue
+                await self._handle_request(sub, request)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self._subscribers.discard(sub)
+            sub.task.cancel()
+            writer.close()
+            logger.info(f"Subscriber disconnected ({len(self._subscribers)} left, {sub.dropped} dropped)")
+
+    async def _handle_request(self, sub: _Subscriber, request: Dict):
+        op = request.get("op")
+        if op == "subscribe":
+            for topic in request.get("topics", []):
+                sub.topics.add(topic)
+                kind, _, security_id = topic.partition(":")
+                if kind == "tick" and request.get("segment"):
+                    await self._subscribe_upstream(security_id, request["segment"],
+                                                   request.get("instrument_type", "INDEX"))
+                snapshot = self.snapshot(topic)
+                if snapshot is not None:
+                    sub.push(encode(snapshot))
+        elif op == "unsubscribe":
+            sub.topics.difference_update(request.get("topics", []))
+        elif op == "rest":
+            asyncio.create_task(self._rest(sub, request))
+        elif op == "stats":
+            sub.push(encode({"t": "reply", "id": request.get("id"), "ok": True, "d": self.stats()}))
+        else:
+            sub.push(encode({"t": "error", "error": f"unknown op {op!r}"}))
+
+    async def _rest(self, sub: _Subscriber, request: Dict):
+        """Run a DhanAPIClient call on the gateway's session (shared cache + rate limiter)"""
+        method = request.get("method")
+        reply = {"t": "reply", "id": request.get("id")}
+        if method not in REST_METHODS or self.client is None:
+            reply.update(ok=False, error=f"method not available: {method}")
+        else:
+            try:
+                loop = asyncio.get_running_loop()
+                func = getattr(self.client, method)
+                kwargs = request.get("kwargs", {})
+                result = await loop.run_in_executor(None, lambda: func(**kwargs))
+                reply.update(ok=True, d=_to_wire(result))
+                self.rest_calls += 1
+            except Exception as e:
+                reply.update(ok=False, error=str(e))
+        sub.push(encode(reply))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "address": self.address,
+            "uptime_s": round(time.time() - self.started_at, 1) if self.started_at else 0,
+            "upstream_connected": bool(self.ws and self.ws.is_connected),
+            "upstream_subscriptions": sorted(self._upstream),
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped": sum(sub.dropped for sub in self._subscribers),
+            "rest_calls": self.rest_calls,
+            "topics": sorted(self._latest),
+        }
+
+
+# ═════════════════════════════════════════════════════════════════════════════════
+# CLIENTS
+# ═════════════════════════════════════════════════════════════════════════════════
+
+class FeedClient:
+    """
+    Subscriber side of the gateway.
+
+    Usage:
+        client = FeedClient()
+        await client.connect()
+        client.on("tick", lambda msg: print(msg["d"]["ltp"]))
+        await client.subscribe("tick:13", "bar:13")
+        candles = await client.request("get_historical_candles", security_id="13", ...)
+    """
+
+    def __init__(self, address: str = DEFAULT_ADDRESS):
+        self.address = address
+        self.is_connected = False
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._handlers: Dict[str, List[Callable[[Dict], None]]] = {}
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._next_id = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def connect(self):
+        kind, target = _parse_address(self.address)
+        if kind == "unix":
+            self._reader, self._writer = await asyncio.open_unix_connection(target, limit=MAX_LINE_BYTES)
+        else:
+            self._reader, self._writer = await asyncio.open_connection(*target, limit=MAX_LINE_BYTES)
+        self.is_connected = True
+        self._task = asyncio.create_task(self._receive())
+        logger.info(f"✓ Connected to feed gateway {self.address}")
+
+    async def disconnect(self):
+        if self._task is not None:
+            self._task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+        self.is_connected = False
+
+    def on(self, kind: str, callback: Callable[[Dict], None]):
+        """Register a handler for a message type: tick, bar, chain, depth"""
+        self._handlers.setdefault(kind, []).append(callback)
+
+    async def _send(self, message: Dict):
+        self._writer.write(encode(message))
+        await self._writer.drain()
+
+    async def subscribe(self, *topics: str, **extra):
+        await self._send({"op": "subscribe", "topics": list(topics), **extra})
+
+    async def unsubscribe(self, *topics: str):
+        await self._send({"op": "unsubscribe", "topics": list(topics)})
+
+    async def request(self, method: str, timeout: float = 60.0, **kwargs) -> Any:
+        """Call a DhanAPIClient method on the gateway (REST_METHODS)"""
+        self._next_id += 1
+        request_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        await self._send({"op": "rest", "id": request_id, "method": method, "kwargs": kwargs})
+        try:
+            return _from_wire(await asyncio.wait_for(future, timeout))
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def stats(self) -> Dict:
+        self._next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[self._next_id] = future
+        await self._send({"op": "stats", "id": self._next_id})
+        return await asyncio.wait_for(future, 10)
+
+    async def _receive(self):
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                kind = message.get("t")
+                WS_MESSAGES_DECODED.inc(kind="gateway")
+                if kind == "reply":
+                    future = self._pending.get(message.get("id"))
+                    if future is not None and not future.done():
+                        if message.get("ok"):
+                            future.set_result(message.get("d"))
+                        else:
+                            future.set_exception(RuntimeError(message.get("error")))
+                    continue
+                for handler in self._handlers.get(kind, ()):
+                    try:
+                        handler(message)
+                    except Exception as e:
+                        logger.error(f"Gateway handler error ({kind}): {e}")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.is_connected = False
+            logger.warning("Feed gateway connection closed")
+
+
+class GatewayFeed(FeedClient):
+    """
+    Drop-in for DhanWebSocket that reads from the gateway instead of Dhan.
+
+    Supports the subset the scripts use: on_tick / on_depth / on_error,
+    connect, subscribe_ticker, subscribe_depth, disconnect.
+    """
+
+    def __init__(self, address: str = DEFAULT_ADDRESS):
+        super().__init__(address)
+        self.on_tick_callback: Optional[Callable[[TickData], None]] = None
+        self.on_depth_callback: Optional[Callable[[MarketDepth], None]] = None
+        self.on_error_callback: Optional[Callable[[str], None]] = None
+        self.on("tick", self._dispatch_tick)
+        self.on("depth", self._dispatch_depth)
+
+    def _dispatch_tick(self, message: Dict):
+        if self.on_tick_callback:
+            self.on_tick_callback(tick_from_dict(message["d"]))
+
+    def _dispatch_depth(self, message: Dict):
+        if self.on_depth_callback:
+            self.on_depth_callback(depth_from_dict(message["d"]))
+
+    def on_tick(self, callback: Callable[[TickData], None]):
+        self.on_tick_callback = callback
+
+    def on_depth(self, callback: Callable[[MarketDepth], None]):
+        self.on_depth_callback = callback
+
+    def on_error(self, callback: Callable[[str], None]):
+        self.on_error_callback = callback
+
+    async def connect(self):
+        try:
+            await super().connect()
+        except OSError as e:
+            logger.error(f"Feed gateway not reachable at {self.address}: {e}")
+            if self.on_error_callback:
+                self.on_error_callback(str(e))
+
+    async def subscribe_ticker(self, security_id: str, exchange_segment: ExchangeSegment,
+                               instrument_type: InstrumentType):
+        await self.subscribe(f"tick:{security_id}", segment=exchange_segment.name,
+                             instrument_type=instrument_type.name)
+
+    async def subscribe_depth(self, security_id: str, exchange_segment: ExchangeSegment,
+                              instrument_type: InstrumentType):
+        await self.subscribe(f"depth:{security_id}")
+
+
+class GatewayRestClient:
+    """
+    Blocking DhanAPIClient stand-in whose REST_METHODS run on the gateway
+    (its session, cache and rate limiter), for threads and sync scripts.
+
+    Usage:
+        client = GatewayRestClient()
+        df = client.get_historical_candles(security_id="13", exchange_segment="IDX_I",
+                                           instrument="INDEX", interval=5, days=5)
+    """
+
+    def __init__(self, address: str = DEFAULT_ADDRESS, timeout: float = 60.0):
+        self.address = address
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+        self._file = None
+        self._next_id = 0
+
+    def _connect(self):
+        kind, target = _parse_address(self.address)
+        family = socket.AF_UNIX if kind == "unix" else socket.AF_INET
+        self._sock = socket.socket(family, socket.SOCK_STREAM)
+        self._sock.settimeout(self.timeout)
+        self._sock.connect(target)
+        self._file = self._sock.makefile("rb")
+
+    def call(self, method: str, *args, **kwargs) -> Any:
+        """Run ``DhanAPIClient.<method>(*args, **kwargs)`` on the gateway"""
+        from .dhan_client import DhanAPIClient
+
+        # The gateway takes keyword arguments only
+        bound = inspect.signature(getattr(DhanAPIClient, method)).bind(None, *args, **kwargs)
+        arguments = dict(list(bound.arguments.items())[1:])
+        with self._lock:
+            if self._sock is None:
+                self._connect()
+            self._next_id += 1
+            request_id = self._next_id
+            try:
+                self._sock.sendall(encode({"op": "rest", "id": request_id, "method": method, "kwargs": arguments}))
+                while True:
+                    line = self._file.readline(MAX_LINE_BYTES)
+                    if not line:
+                        raise ConnectionError(f"Feed gateway at {self.address} closed the connection")
+                    reply = json.loads(line)
+                    if reply.get("t") == "reply" and reply.get("id") == request_id:
+                        break
+            except OSError:
+                self.close()
+                raise
+        if not reply.get("ok"):
+            raise RuntimeError(f"Feed gateway error: {reply.get('error')}")
+        return _from_wire(reply.get("d"))
+
+    def __getattr__(self, name: str):
+        if name in REST_METHODS:
+            return lambda *args, **kwargs: self.call(name, *args, **kwargs)
+        raise AttributeError(f"{type(self).__name__} has no attribute {name!r} (gateway REST: {sorted(REST_METHODS)})")
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+        self._sock = self._file = None
+
+
+def gateway_available(address: str = DEFAULT_ADDRESS) -> bool:
+    """True if a gateway is listening at ``address`` (blocking; see probe_gateway for async code)"""
+    kind, target = _parse_address(address)
+    family = socket.AF_UNIX if kind == "unix" else socket.AF_INET
+    if kind == "unix" and not os.path.exists(target):
+        return False
+    with socket.socket(family, socket.SOCK_STREAM) as probe:
+        probe.settimeout(0.5)
+        try:
+            probe.connect(target)
+            return True
+        except OSError:
+            return False
+
+
+async def probe_gateway(address: str = DEFAULT_ADDRESS, timeout: float = 0.5) -> bool:
+    """gateway_available() for the event loop"""
+    kind, target = _parse_address(address)
+    if kind == "unix" and not os.path.exists(target):
+        return False
+    try:
+        if kind == "unix":
+            connecting = asyncio.open_unix_connection(target)
+        else:
+            connecting = asyncio.open_connection(*target)
+        _, writer = await asyncio.wait_for(connecting, timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    return True
+
+
+async def create_feed(access_token: str, client_id: str, address: str = DEFAULT_ADDRESS):
+    """GatewayFeed when a gateway is running, otherwise a direct DhanWebSocket"""
+    if await probe_gateway(address):
+        logger.info(f"Using feed gateway at {address}")
+        return GatewayFeed(address)
+    return DhanWebSocket(access_token=access_token, client_id=client_id)
+
+
+def create_rest_client(address: str = DEFAULT_ADDRESS):
+    """GatewayRestClient when a gateway is running, otherwise a direct DhanAPIClient"""
+    if gateway_available(address):
+        logger.info(f"Using feed gateway REST at {address}")
+        return GatewayRestClient(address)
+    from .dhan_client import DhanAPIClient
+
+    return DhanAPIClient()
+
+
+async def _run(args):
+    gateway = FeedGateway(
+        address=args.address,
+        instruments=args.instruments,
+        chain_interval=args.chain_interval,
+        journal_dir=args.journal_dir or None,
+    )
+    await gateway.start()
+    try:
+        await gateway.serve_forever()
+    finally:
+        await gateway.stop()
+
+
+def main():
+    import argparse
+    from pathlib import Path
+
+    sys.path.append(str(Path(__file__).parent.parent))
+
+    parser = argparse.ArgumentParser(description="Local Dhan feed gateway")
+    parser.add_argument("--address", default=DEFAULT_ADDRESS)
+    parser.add_argument("--instruments", nargs="+", default=["NIFTY", "SENSEX"])
+    parser.add_argument("--chain-interval", type=float, default=60.0)
+    parser.add_argument("--journal-dir", default=os.getenv("TICK_JOURNAL_DIR", "data/ticks"))
+    args = parser.parse_args()
+    try:
+        asyncio.run(_run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,8 @@ from dataclasses import dataclass
 from datetime import datetime
 from loguru import logger
 
+from .order_book import OrderBook, BookSide
+
 
 @dataclass
 class DepthLevel:
@@ -66,14 +68,72 @@ class MarketDepthAnalyzer:
     Analyzes 20-level market depth for trading insights
     """
     
-    def __init__(self, iceberg_threshold: int = 5):
+    def __init__(self, iceberg_threshold: int = 5, refill_threshold: int = 3):
         """
         Args:
             iceberg_threshold: Min orders at same price to flag iceberg
+            refill_threshold: Min refills at one price to flag iceberg (streaming books)
         """
         self.iceberg_threshold = iceberg_threshold
+        self.refill_threshold = refill_threshold
         logger.info("Market Depth Analyzer initialized")
     
+    def analyze_book(self, book: OrderBook, include_levels: bool = False) -> DepthAnalysis:
+        """
+        Analyze a streaming OrderBook from its running aggregates
+        
+        Totals, weighted prices and imbalance are already maintained by the
+        book, so this is O(levels) at worst. Icebergs come from refills seen
+        across updates rather than from a single snapshot.
+        
+        Args:
+            book: OrderBook fed by OrderBookManager
+            include_levels: Also materialize bid_levels/ask_levels objects
+        """
+        bids, asks = book.bids, book.asks
+        spread_pct = book.spread_pct
+        
+        _, bid_refills = bids.max_refills()
+        _, ask_refills = asks.max_refills()
+        
+        return DepthAnalysis(
+            timestamp=book.updated_at or datetime.now(),
+            total_bid_volume=bids.total_qty,
+            total_bid_orders=bids.total_orders,
+            weighted_bid_price=bids.weighted_price,
+            bid_levels=self._side_levels(bids) if include_levels else [],
+            total_ask_volume=asks.total_qty,
+            total_ask_orders=asks.total_orders,
+            weighted_ask_price=asks.weighted_price,
+            ask_levels=self._side_levels(asks) if include_levels else [],
+            best_bid=bids.best,
+            best_ask=asks.best,
+            spread=book.spread,
+            spread_pct=spread_pct,
+            liquidity_score=self._calculate_liquidity_score(bids.total_qty, asks.total_qty, spread_pct),
+            bid_ask_imbalance=book.imbalance,
+            large_orders_bid=bids.large_levels(),
+            large_orders_ask=asks.large_levels(),
+            iceberg_detected=max(bid_refills, ask_refills) >= self.refill_threshold,
+            support_zone=self._zone_from_side(bids),
+            resistance_zone=self._zone_from_side(asks)
+        )
+    
+    @staticmethod
+    def _side_levels(side: BookSide) -> List[DepthLevel]:
+        return [
+            DepthLevel(price=float(p), quantity=int(q), orders=int(o))
+            for p, q, o in zip(side.price[:side.depth], side.qty[:side.depth], side.orders[:side.depth])
+        ]
+    
+    @staticmethod
+    def _zone_from_side(side: BookSide) -> Optional[float]:
+        """Same rule as _find_support_zone/_find_resistance_zone, on book arrays"""
+        price, qty = side.heaviest_level()
+        if price is None:
+            return None
+        return price if qty > side.avg_level_qty * 1.5 else None
+    
     def analyze(
         self,
         bids: List[Dict[str, float]],
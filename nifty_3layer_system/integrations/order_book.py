@@ -0,0 +1,270 @@
+"""
+ORDER BOOK: Array-backed 20-level depth book with streaming aggregates
+- One preallocated NumPy book per instrument, updated in place
+- Running totals (qty, orders, notional) adjusted only by the levels that changed
+- Iceberg detection from refills at the same price across updates
+- Decodes Dhan 20-depth binary packets straight into the arrays (no dicts)
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+
+DEPTH_LEVELS = 20
+
+# Dhan 20-depth packet: 12-byte header + 20 x (float64 price, uint32 qty, uint32 orders)
+DEPTH_HEADER_BYTES = 12
+DEPTH_LEVEL_DTYPE = np.dtype([('price', '<f8'), ('qty', '<u4'), ('orders', '<u4')])
+DEPTH_PACKET_BYTES = DEPTH_HEADER_BYTES + DEPTH_LEVELS * DEPTH_LEVEL_DTYPE.itemsize
+DEPTH_BID_CODE = 41
+DEPTH_ASK_CODE = 51
+
+
+class BookSide:
+    """
+    One side of the book. Level 0 is the best price.
+
+    Aggregates are maintained from per-level deltas, so an update that only
+    touches the top two levels costs two subtractions, not a 20-level rescan.
+    """
+
+    __slots__ = (
+        "is_bid", "price", "qty", "orders", "depth",
+        "total_qty", "total_orders", "notional",
+        "refill_window", "_depleted", "refills",
+    )
+
+    def __init__(self, is_bid: bool, refill_window: int = 5):
+        self.is_bid = is_bid
+        self.price = np.zeros(DEPTH_LEVELS, dtype=np.float64)
+        self.qty = np.zeros(DEPTH_LEVELS, dtype=np.int64)
+        self.orders = np.zeros(DEPTH_LEVELS, dtype=np.int64)
+        self.depth = 0  # number of populated levels
+
+        self.total_qty = 0
+        self.total_orders = 0
+        self.notional = 0.0  # sum(price * qty)
+
+        # Iceberg tracking: price -> qty before it was traded down, and refill counts
+        self.refill_window = refill_window
+        self._depleted: Dict[float, int] = {}
+        self.refills: Dict[float, int] = {}
+
+    @property
+    def best(self) -> float:
+        return float(self.price[0]) if self.depth else 0.0
+
+    @property
+    def weighted_price(self) -> float:
+        return self.notional / self.total_qty if self.total_qty > 0 else 0.0
+
+    @property
+    def avg_level_qty(self) -> float:
+        return self.total_qty / self.depth if self.depth else 0.0
+
+    def apply(self, price: np.ndarray, qty: np.ndarray, orders: np.ndarray):
+        """
+        Apply a side update in place.
+
+        Arrays may be shorter than 20 (missing levels are treated as empty);
+        levels with a non-positive price are dropped.
+        """
+        n = min(len(price), DEPTH_LEVELS)
+        new_price = np.zeros(DEPTH_LEVELS, dtype=np.float64)
+        new_qty = np.zeros(DEPTH_LEVELS, dtype=np.int64)
+        new_orders = np.zeros(DEPTH_LEVELS, dtype=np.int64)
+        new_price[:n] = price[:n]
+        new_qty[:n] = qty[:n]
+        new_orders[:n] = orders[:n]
+
+        valid = new_price > 0
+        if not valid.all():
+            new_price[~valid] = 0.0
+            new_qty[~valid] = 0
+            new_orders[~valid] = 0
+
+        # Feed delivers levels best-first; only sort when it does not
+        populated = int(valid.sum())
+        if populated:
+            steps = np.diff(new_price[valid])
+            backwards = (steps > 0).any() if self.is_bid else (steps < 0).any()
+            if backwards or not valid[:populated].all():
+                key = np.where(valid, -new_price if self.is_bid else new_price, np.inf)
+                order = np.argsort(key, kind="stable")
+                new_price, new_qty, new_orders = new_price[order], new_qty[order], new_orders[order]
+
+        changed = (new_price != self.price) | (new_qty != self.qty) | (new_orders != self.orders)
+        if not changed.any():
+            return
+
+        idx = np.flatnonzero(changed)
+        old_p, old_q, old_o = self.price[idx], self.qty[idx], self.orders[idx]
+        new_p, new_q, new_o = new_price[idx], new_qty[idx], new_orders[idx]
+
+        self.total_qty += int(new_q.sum() - old_q.sum())
+        self.total_orders += int(new_o.sum() - old_o.sum())
+        self.notional += float(np.dot(new_p, new_q) - np.dot(old_p, old_q))
+
+        self._track_refills(new_price, new_qty)
+
+        self.price[idx] = new_p
+        self.qty[idx] = new_q
+        self.orders[idx] = new_o
+        self.depth = populated
+
+    def _track_refills(self, new_price: np.ndarray, new_qty: np.ndarray):
+        """Count qty refills at unchanged prices near the touch (iceberg footprint)"""
+        window = self.refill_window
+        old = {float(p): int(q) for p, q in zip(self.price[:window], self.qty[:window]) if p > 0}
+        live = set()
+        for p, q in zip(new_price[:window], new_qty[:window]):
+            if p <= 0:
+                continue
+            p = float(p)
+            q = int(q)
+            live.add(p)
+            prev = old.get(p)
+            if prev is None:
+                continue
+            if q < prev:
+                # Traded into: remember the high-water qty until it refills
+                self._depleted[p] = max(self._depleted.get(p, 0), prev)
+            elif p in self._depleted and q >= 0.8 * self._depleted[p]:
+                self.refills[p] = self.refills.get(p, 0) + 1
+                del self._depleted[p]
+
+        # Prices that left the touch window lose their history
+        for stale in [p for p in self._depleted if p not in live]:
+            del self._depleted[stale]
+        for stale in [p for p in self.refills if p not in live]:
+            del self.refills[stale]
+
+    def max_refills(self) -> Tuple[Optional[float], int]:
+        if not self.refills:
+            return None, 0
+        price = max(self.refills, key=self.refills.get)
+        return price, self.refills[price]
+
+    def heaviest_level(self) -> Tuple[Optional[float], int]:
+        if not self.depth:
+            return None, 0
+        i = int(np.argmax(self.qty[:self.depth]))
+        return float(self.price[i]), int(self.qty[i])
+
+    def large_levels(self, factor: float = 2.0) -> int:
+        if not self.depth:
+            return 0
+        return int((self.qty[:self.depth] > self.avg_level_qty * factor).sum())
+
+
+class OrderBook:
+    """20-level book for one instrument"""
+
+    def __init__(self, security_id: str, refill_window: int = 5):
+        self.security_id = str(security_id)
+        self.bids = BookSide(is_bid=True, refill_window=refill_window)
+        self.asks = BookSide(is_bid=False, refill_window=refill_window)
+        self.updates = 0
+        self.updated_at: Optional[datetime] = None
+
+    def apply_side(self, is_bid: bool, price, qty, orders):
+        side = self.bids if is_bid else self.asks
+        side.apply(np.asarray(price, dtype=np.float64),
+                   np.asarray(qty, dtype=np.int64),
+                   np.asarray(orders, dtype=np.int64))
+        self.updates += 1
+        self.updated_at = datetime.now()
+
+    def apply_levels(self, bids: Iterable[Dict], asks: Iterable[Dict]):
+        """Compatibility path for MarketDepth-style lists of {'price','qty','orders'}"""
+        for is_bid, levels in ((True, bids), (False, asks)):
+            levels = list(levels)
+            if not levels:
+                continue
+            self.apply_side(
+                is_bid,
+                [lvl['price'] for lvl in levels],
+                [lvl['qty'] for lvl in levels],
+                [lvl['orders'] for lvl in levels],
+            )
+
+    # ------------------------------------------------------------------ metrics
+
+    @property
+    def spread(self) -> float:
+        if self.bids.depth and self.asks.depth:
+            return self.asks.best - self.bids.best
+        return 0.0
+
+    @property
+    def spread_pct(self) -> float:
+        return self.spread / self.bids.best * 100 if self.bids.best > 0 else 0.0
+
+    @property
+    def mid(self) -> float:
+        if self.bids.depth and self.asks.depth:
+            return (self.bids.best + self.asks.best) / 2
+        return 0.0
+
+    @property
+    def imbalance(self) -> float:
+        total = self.bids.total_qty + self.asks.total_qty
+        return (self.bids.total_qty - self.asks.total_qty) / total if total > 0 else 0.0
+
+
+class OrderBookManager:
+    """Order books for every instrument on the depth feed"""
+
+    def __init__(self, refill_window: int = 5):
+        self.refill_window = refill_window
+        self.books: Dict[str, OrderBook] = {}
+
+    def get(self, security_id) -> OrderBook:
+        key = str(security_id)
+        book = self.books.get(key)
+        if book is None:
+            book = self.books[key] = OrderBook(key, refill_window=self.refill_window)
+        return book
+
+    def apply_depth(self, depth) -> OrderBook:
+        """Apply a parsed MarketDepth message"""
+        book = self.get(depth.security_id)
+        book.apply_levels(depth.bids, depth.asks)
+        return book
+
+    def apply_packet(self, data: bytes, offset: int = 0) -> Optional[OrderBook]:
+        """
+        Apply one Dhan 20-depth binary packet (bid code 41 / ask code 51).
+
+        The levels are viewed in place with np.frombuffer - nothing is copied
+        into Python objects.
+        """
+        if len(data) - offset < DEPTH_PACKET_BYTES:
+            return None
+        code = data[offset + 2]
+        if code not in (DEPTH_BID_CODE, DEPTH_ASK_CODE):
+            return None
+        security_id = int.from_bytes(data[offset + 4:offset + 8], "little", signed=True)
+        levels = np.frombuffer(
+            data, dtype=DEPTH_LEVEL_DTYPE, count=DEPTH_LEVELS, offset=offset + DEPTH_HEADER_BYTES
+        )
+        book = self.get(security_id)
+        book.apply_side(code == DEPTH_BID_CODE, levels['price'], levels['qty'], levels['orders'])
+        return book
+
+    def apply_stream(self, data: bytes) -> List[OrderBook]:
+        """Apply a frame holding back-to-back depth packets; returns the books updated"""
+        updated = []
+        offset = 0
+        while len(data) - offset >= DEPTH_PACKET_BYTES:
+            length = int.from_bytes(data[offset:offset + 2], "little") or DEPTH_PACKET_BYTES
+            book = self.apply_packet(data, offset)
+            if book is not None:
+                updated.append(book)
+            else:
+                logger.debug(f"Skipping non-depth packet (code {data[offset + 2]})")
+            offset += length
+        return updated
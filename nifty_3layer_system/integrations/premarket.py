@@ -0,0 +1,308 @@
+"""
+PREMARKET: Warm caches and the model before the session opens
+- Runs lead_minutes before each NSE session open (immediately if started later)
+- Backfills candles into the caller's store (cache_ttl keeps them cached until
+  the open), resolves current/next expiries for every InstrumentManager
+  instrument and takes the opening option chain snapshot (opening_chain())
+- Runs warm-up inferences so the model, feature code and first-call
+  allocations are hot before the first bar closes
+- Steps run concurrently through run_warmup(); the per-step report and a
+  readiness flag are available from stats() (and the shared state, if given)
+
+Run once now (from nifty_3layer_system/):
+    python -m integrations.premarket
+"""
+
+import asyncio
+import sys
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from loguru import logger
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.instrument_config import INSTRUMENTS, InstrumentManager
+from config.market_calendar import NSECalendar
+
+from .startup import StartupReport, run_warmup
+
+
+class PreMarketWarmer:
+    """
+    Pre-open warm-up of candles, expiries, option chains and the model.
+
+    Args:
+        client: DhanAPIClient (or a LazyComponent wrapping one)
+        candles: Blocking ``candles(symbol)`` that backfills the caller's candle store
+            (pass ``cache_ttl`` to the fetch so the result is still cached at the open)
+        candle_symbols: Symbols passed to ``candles``
+        inference: Named warm-up inferences, e.g. ``{"levels": predictor.warm_up}``
+        instruments: InstrumentManager keys to resolve expiries/chains for (default: all)
+        lead_minutes: How long before the session open to run
+        calendar: NSE calendar (default: holidays from data/nse_holidays.txt)
+        state: Shared state backend; expiries, chain summaries and the status are
+            published there so every worker can report them
+    """
+
+    def __init__(
+        self,
+        client,
+        candles: Optional[Callable[[str], Any]] = None,
+        candle_symbols: Iterable[str] = ("NIFTY", "SENSEX"),
+        inference: Optional[Dict[str, Callable[[], Any]]] = None,
+        instruments: Optional[Iterable[str]] = None,
+        lead_minutes: float = 20,
+        calendar: Optional[NSECalendar] = None,
+        state=None,
+    ):
+        self.client = client
+        self.candles = candles
+        self.candle_symbols = [s.upper() for s in candle_symbols]
+        self.inference = inference or {}
+        self.instruments = [s.upper() for s in (instruments or INSTRUMENTS.keys())]
+        self.lead = timedelta(minutes=lead_minutes)
+        self.calendar = calendar or NSECalendar()
+        self.state = state
+
+        self.expiries: Dict[str, Dict[str, Any]] = {}
+        self.chains: Dict[str, Dict[str, Any]] = {}
+        self._chain_summaries: Dict[str, Dict[str, Any]] = {}
+        self.report: Optional[StartupReport] = None
+        self.session: Optional[date] = None  # session the last run warmed
+        self.last_run: Optional[datetime] = None
+        self.next_run_at: Optional[datetime] = None
+
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # ------------------------------------------------------------------ steps
+
+    def resolve_expiries(self, symbol: str) -> Dict[str, Any]:
+        """Current and next expiry for ``symbol`` (dates on or after today)"""
+        inst = InstrumentManager.get_instrument(symbol)
+        if inst is None:
+            raise ValueError(f"Unknown instrument: {symbol}")
+
+        listed = self.client.get_expiry_list(
+            underlying_scrip=int(inst.security_id),
+            underlying_seg=inst.exchange_segment,
+        )
+        today = self.calendar.now().date()
+        from ml_models.real_option_fetcher import RealTimeOptionFetcher  # pandas: only once a run starts
+
+        parsed = ((RealTimeOptionFetcher._parse_expiry(e), e) for e in listed or [])
+        upcoming = sorted((when.date(), raw) for when, raw in parsed if when is not None and when.date() >= today)
+        if not upcoming:
+            raise ValueError(f"No upcoming expiries for {symbol}")
+
+        expiries = {
+            'current': upcoming[0][1],
+            'next': upcoming[1][1] if len(upcoming) > 1 else None,
+            'listed': len(listed),
+        }
+        self.expiries[symbol] = expiries
+        if self.state is not None:
+            self.state.put("expiries", symbol, expiries)
+        return expiries
+
+    def snapshot_chain(self, symbol: str, expiry: str) -> Dict[str, Any]:
+        """Fetch the option chain for ``expiry`` and keep it as the opening snapshot"""
+        inst = InstrumentManager.get_instrument(symbol)
+        raw = self.client.get_option_chain(
+            underlying_scrip=int(inst.security_id),
+            underlying_seg=inst.exchange_segment,
+            expiry=expiry,
+        )
+        data = raw.get('data', {}) or {}
+        summary = {
+            'expiry': expiry,
+            'strikes': len(data.get('oc', {}) or {}),
+            'underlying': data.get('last_price'),
+            'fetched_at': self.calendar.now().isoformat(),
+        }
+        self.chains[symbol] = raw
+        self._chain_summaries[symbol] = summary
+        if self.state is not None:
+            self.state.put("chains", symbol, summary)
+        return summary
+
+    def opening_chain(self, symbol: str, expiry: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Opening option chain snapshot for ``symbol``
+
+        Returns:
+            The raw chain from the last run (None if not taken, or taken for another expiry)
+        """
+        summary = self._chain_summaries.get(symbol.upper())
+        if summary is None or (expiry is not None and summary['expiry'] != expiry):
+            return None
+        return self.chains.get(symbol.upper())
+
+    def _warm_instrument(self, symbol: str):
+        expiries = self.resolve_expiries(symbol)
+        self.snapshot_chain(symbol, expiries['current'])
+
+    def steps(self) -> Dict[str, Callable[[], Any]]:
+        steps: Dict[str, Callable[[], Any]] = {}
+        if self.candles is not None:
+            for symbol in self.candle_symbols:
+                steps[f"candles:{symbol}"] = lambda s=symbol: self.candles(s)
+        for symbol in self.instruments:
+            # Chain requests share the broker's 1-per-3s limiter, so these serialize there
+            steps[f"chain:{symbol}"] = lambda s=symbol: self._warm_instrument(s)
+        for name, warm_up in self.inference.items():
+            steps[f"model:{name}"] = warm_up
+        return steps
+
+    # ------------------------------------------------------------------ runs
+
+    def _target_session(self, when: datetime) -> datetime:
+        """Open of the session in progress, else of the next one"""
+        if self.calendar.is_open(when):
+            return self.calendar.session_bounds(when.date())[0]
+        return self.calendar.next_session_open(when)
+
+    @property
+    def cache_ttl(self) -> float:
+        """Seconds until the session being warmed opens (never below the normal candle TTL)"""
+        from .dhan_client import CANDLE_CACHE_TTL
+
+        now = self.calendar.now()
+        return max((self._target_session(now) - now).total_seconds(), CANDLE_CACHE_TTL)
+
+    def next_run(self, when: Optional[datetime] = None) -> datetime:
+        """When the next warm-up is due (``when`` itself if it is already late)"""
+        when = when or self.calendar.now()
+        open_ = self._target_session(when)
+        if self.session == open_.date():
+            open_ = self.calendar.session_bounds(self.calendar.next_trading_day(open_.date()))[0]
+        return max(open_ - self.lead, when)
+
+    def run(self) -> StartupReport:
+        """Run every step now (blocking) and record the session it warmed"""
+        now = self.calendar.now()
+        session = self._target_session(now).date()
+        steps = self.steps()
+        report = StartupReport("premarket")
+        logger.info(f"Pre-market warm-up for session {session} | {len(steps)} steps")
+        run_warmup(report, steps)
+
+        self.report = report
+        self.session = session
+        self.last_run = now
+        if self.state is not None:
+            self.state.put("premarket", "status", self.stats())
+        return report
+
+    @property
+    def ready(self) -> bool:
+        """Last run finished for the current/next session (failed steps are in errors())"""
+        if self.report is None or not self.report.ready:
+            return False
+        return self.session == self._target_session(self.calendar.now()).date()
+
+    def errors(self) -> List[str]:
+        if self.report is None:
+            return []
+        return list(self.report.as_dict()['warmup_errors'])
+
+    # ------------------------------------------------------------------ schedule
+
+    @property
+    def is_running(self) -> bool:
+        if self._thread is not None:
+            return self._thread.is_alive()
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """Schedule runs on the event loop (steps execute in a worker thread)"""
+        if self.is_running:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"✓ Pre-market warmer scheduled | next run {self.next_run().strftime('%Y-%m-%d %H:%M %Z')}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self.next_run_at = self.next_run()
+            delay = (self.next_run_at - self.calendar.now()).total_seconds()
+            await asyncio.sleep(max(delay, 0))
+            await loop.run_in_executor(None, self.run)
+
+    def start_thread(self) -> threading.Thread:
+        """Schedule runs on a daemon thread (for synchronous entry points)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run_thread, name="premarket", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop_thread(self):
+        self._stop.set()
+
+    def _run_thread(self):
+        while True:
+            self.next_run_at = self.next_run()
+            delay = (self.next_run_at - self.calendar.now()).total_seconds()
+            if self._stop.wait(max(delay, 0)):
+                return
+            self.run()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'ready': self.ready,
+            'errors': self.errors(),
+            'scheduled': self.is_running,
+            'session': self.session.isoformat() if self.session else None,
+            'last_run': self.last_run.isoformat() if self.last_run else None,
+            'next_run': self.next_run_at.isoformat() if self.next_run_at else None,
+            'expiries': dict(self.expiries),
+            'chains': dict(self._chain_summaries),
+            'report': self.report.as_dict() if self.report else None,
+        }
+
+
+def main():
+    """Run the pre-market warm-up once against Dhan and print the readiness summary"""
+    import json
+    from .dhan_client import DhanAPIClient
+    from ml_models.live_predictor import LivePredictor
+
+    client = DhanAPIClient()
+
+    def backfill(symbol: str):
+        inst = InstrumentManager.get_instrument(symbol)
+        df = client.get_historical_candles(
+            security_id=inst.security_id,
+            exchange_segment=inst.exchange_segment,
+            instrument=inst.instrument_type,
+            interval=5,
+            days=5,
+            cache_ttl=warmer.cache_ttl,
+        )
+        logger.info(f"{symbol}: {len(df)} candles")
+
+    warmer = PreMarketWarmer(
+        client,
+        candles=backfill,
+        inference={"direction": lambda: LivePredictor().warm_up()},
+    )
+    warmer.run()
+    print(json.dumps(warmer.stats(), indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
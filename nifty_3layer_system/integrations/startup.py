@@ -0,0 +1,212 @@
+"""
+STARTUP: Lazy components, background warm-up and a startup-time report
+- LazyComponent defers an expensive constructor (model unpickle, API session,
+  DB init) until first use or warm-up, whichever comes first; thread-safe
+- run_warmup() builds/primes components concurrently once the process is
+  already serving (webapp) or waiting (monitor)
+- wait_until_serving() tells an ASGI startup hook when uvicorn has its
+  listening sockets up, so deferred work starts after the server accepts
+- StartupReport records import, listen and per-step warm-up times, logs a
+  table when warm-up finishes and exports startup_seconds{phase}
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from .telemetry import REGISTRY
+
+STARTUP_SECONDS = REGISTRY.gauge(
+    "startup_seconds", "Seconds from process import to each startup milestone / warm-up step", ["phase"])
+
+
+class StartupReport:
+    """
+    Milestones (time since the report was created) and warm-up step durations.
+
+    Create it as early as possible in the entry module so 'imports' covers
+    the module's own import time.
+    """
+
+    def __init__(self, name: str, started_at: Optional[float] = None):
+        """
+        Args:
+            name: Process label for the report
+            started_at: time.perf_counter() baseline (default: now)
+        """
+        self.name = name
+        self.t0 = started_at if started_at is not None else time.perf_counter()
+        self.milestones: List[Tuple[str, float]] = []
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self.ready = False
+        self._lock = threading.Lock()
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.t0
+
+    def mark(self, milestone: str) -> float:
+        """Record that ``milestone`` was reached now"""
+        at = self.elapsed()
+        with self._lock:
+            self.milestones.append((milestone, at))
+        STARTUP_SECONDS.set(at, phase=milestone)
+        return at
+
+    def record_step(self, step: str, seconds: float, error: Optional[str] = None):
+        with self._lock:
+            self.steps[step] = {'seconds': seconds, 'error': error}
+        STARTUP_SECONDS.set(seconds, phase=f"warmup:{step}")
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'ready': self.ready,
+                'milestones_ms': {name: round(at * 1000, 1) for name, at in self.milestones},
+                'warmup_ms': {name: round(s['seconds'] * 1000, 1) for name, s in self.steps.items()},
+                'warmup_errors': {name: s['error'] for name, s in self.steps.items() if s['error']},
+            }
+
+    def log(self):
+        lines = [f"Startup report: {self.name}"]
+        for name, at in self.milestones:
+            lines.append(f"  {name:<28}{at * 1000:>10.1f} ms")
+        for name, step in self.steps.items():
+            status = f"  ✗ {step['error']}" if step['error'] else ""
+            lines.append(f"  warm-up {name:<20}{step['seconds'] * 1000:>10.1f} ms{status}")
+        logger.info("\n".join(lines))
+
+
+class LazyComponent:
+    """
+    Builds ``factory()`` on first attribute access (or an explicit get()).
+
+    Attribute access is forwarded to the built object, so call sites keep
+    using the component as before.
+
+    Args:
+        name: Label used in the startup report
+        factory: Zero-argument constructor
+        report: Optional StartupReport that receives the build time
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any], report: Optional[StartupReport] = None):
+        self._name = name
+        self._factory = factory
+        self._report = report
+        self._instance = None
+        self._lock = threading.Lock()
+
+    @property
+    def built(self) -> bool:
+        return self._instance is not None
+
+    def get(self) -> Any:
+        instance = self._instance
+        if instance is not None:
+            return instance
+        with self._lock:
+            if self._instance is None:
+                start = time.perf_counter()
+                self._instance = self._factory()
+                if self._report is not None:
+                    self._report.mark(f"built:{self._name}")
+                logger.debug(f"Built {self._name} in {(time.perf_counter() - start) * 1000:.0f} ms")
+            return self._instance
+
+    def __getattr__(self, attr: str):
+        return getattr(self.get(), attr)
+
+    def __repr__(self) -> str:
+        return f"<LazyComponent {self._name} {'built' if self.built else 'pending'}>"
+
+
+def run_warmup(report: StartupReport, steps: Dict[str, Callable[[], Any]], max_workers: int = 4) -> StartupReport:
+    """
+    Run warm-up steps concurrently (blocking) and mark the report ready.
+
+    A failing step is logged and recorded; it never stops the others.
+    """
+    def run(name: str, step: Callable[[], Any]):
+        start = time.perf_counter()
+        error = None
+        try:
+            step()
+        except Exception as e:
+            error = str(e)
+            logger.warning(f"Warm-up step '{name}' failed: {e}")
+        report.record_step(name, time.perf_counter() - start, error)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="warmup") as pool:
+        for future in [pool.submit(run, name, step) for name, step in steps.items()]:
+            future.result()
+
+    report.ready = True
+    report.mark("ready")
+    report.log()
+    return report
+
+
+def start_warmup_thread(report: StartupReport, steps: Dict[str, Callable[[], Any]]) -> threading.Thread:
+    """run_warmup() on a daemon thread (for synchronous entry points)"""
+    thread = threading.Thread(target=run_warmup, args=(report, steps), name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+class _ServingHandler(logging.Handler):
+    """Sets an event on uvicorn's 'Uvicorn running on ...' record"""
+
+    def __init__(self, event: asyncio.Event):
+        super().__init__()
+        self.event = event
+
+    def emit(self, record: logging.LogRecord):
+        if str(record.msg).startswith("Uvicorn running on"):
+            self.event.set()
+
+
+def wait_until_serving(timeout: float = 5.0) -> "asyncio.Future[bool]":
+    """
+    Resolve once uvicorn is accepting connections
+
+    Call it from the startup hook (uvicorn only creates its servers after the
+    hook returns) and await the result from a background task.
+
+    - Single process: uvicorn logs 'Uvicorn running on ...' right after its
+      servers are listening; a handler on uvicorn.error catches that record
+    - --workers / --reload: the worker is a spawned process handed sockets
+      its supervisor already bound and put in listen mode, so it resolves at
+      once
+
+    Returns:
+        Future resolving to True when serving was observed, False after
+        ``timeout`` (another ASGI server, or uvicorn logging below INFO)
+    """
+    loop = asyncio.get_running_loop()
+    if multiprocessing.parent_process() is not None:
+        future = loop.create_future()
+        future.set_result(True)
+        return future
+
+    event = asyncio.Event()
+    handler = _ServingHandler(event)
+    uvicorn_logger = logging.getLogger("uvicorn.error")
+    uvicorn_logger.addHandler(handler)
+
+    async def wait() -> bool:
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f"No 'Uvicorn running on' within {timeout:g}s; starting deferred work anyway")
+            return False
+        finally:
+            uvicorn_logger.removeHandler(handler)
+
+    return asyncio.ensure_future(wait())
@@ -0,0 +1,271 @@
+"""
+STORAGE: Shared SQLite access layer for data/trading_metrics.db and friends
+- One SQLiteStore per database file per process (get_store); each thread
+  keeps its own long-lived connection instead of connecting per operation
+- Connections open in WAL mode with tuned pragmas (synchronous=NORMAL,
+  busy timeout, in-memory temp tables, page cache, mmap)
+- Connections run in autocommit mode: reads never hold a transaction open,
+  writes go through transaction() / executemany() as one BEGIN IMMEDIATE ..
+  COMMIT (commit latency recorded in sqlite_commit_seconds)
+- Statements are compiled once per connection and reused from sqlite3's
+  statement cache, so callers keep their SQL in module-level constants
+- Named schema migrations, applied once per database and recorded in
+  schema_migrations; each module registers the tables and indexes it owns
+
+Benchmark (from nifty_3layer_system/):
+    python -m integrations.storage
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from loguru import logger
+
+from .telemetry import SQLITE_COMMIT
+
+
+DEFAULT_DB = "data/trading_metrics.db"
+
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": -16000,          # KiB (16 MB page cache per connection)
+    "mmap_size": 64 * 1024 * 1024,
+}
+BUSY_TIMEOUT_SECONDS = 5.0
+STATEMENT_CACHE = 256
+
+# (name, SQL script or callable(conn)); steps must be idempotent, since two
+# processes opening a fresh database can race to apply the same step
+Migration = Tuple[str, Union[str, Callable[[sqlite3.Connection], None]]]
+
+MIGRATIONS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    name TEXT PRIMARY KEY,
+    applied_at TEXT NOT NULL
+)
+"""
+
+
+class SQLiteStore:
+    """
+    Per-thread pooled connections to one SQLite database
+
+    Args:
+        path: Database file (parent directory is created)
+        label: db label for the commit-latency histogram
+    """
+
+    def __init__(self, path: str = DEFAULT_DB, label: Optional[str] = None):
+        self.path = str(path)
+        self.label = label or Path(self.path).stem
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self._migrated: set = set()
+
+    # ------------------------------------------------------------------ connections
+
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection (opened on first use; reopened after a fork)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None,
+                               cached_statements=STATEMENT_CACHE)
+        for name, value in PRAGMAS.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        self._local.conn, self._local.pid = conn, os.getpid()
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def close(self):
+        """Close every connection this store opened (call at shutdown)"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                pass  # owned by another thread; it goes when that thread does
+        self._local = threading.local()
+
+    # ------------------------------------------------------------------ reads
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+        """All rows of a read query"""
+        return self.connection().execute(sql, params).fetchall()
+
+    def query_one(self, sql: str, params: Sequence[Any] = ()) -> Optional[tuple]:
+        """First row of a read query (None if empty)"""
+        return self.connection().execute(sql, params).fetchone()
+
+    def read_frame(self, sql: str, params: Sequence[Any] = ()):
+        """Read query as a pandas DataFrame"""
+        import pandas as pd
+
+        return pd.read_sql_query(sql, self.connection(), params=params)
+
+    # ------------------------------------------------------------------ writes
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        One write transaction on this thread's connection
+
+        Nested use joins the outer transaction. Rolled back if the block or
+        the COMMIT raises.
+        """
+        conn = self.connection()
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            with SQLITE_COMMIT.time(db=self.label):
+                conn.execute("COMMIT")
+        except BaseException:
+            # A failed COMMIT (e.g. SQLITE_BUSY, deferred constraint) leaves the transaction open
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> sqlite3.Cursor:
+        """Single write statement in its own transaction (lastrowid/rowcount on the cursor)"""
+        with self.transaction() as conn:
+            return conn.execute(sql, params)
+
+    def executemany(self, sql: str, rows: Iterable[Sequence[Any]]) -> int:
+        """Many rows of one statement in a single transaction; returns rows affected"""
+        with self.transaction() as conn:
+            return conn.executemany(sql, rows).rowcount
+
+    # ------------------------------------------------------------------ schema
+
+    def migrate(self, migrations: Sequence[Migration]):
+        """
+        Apply migrations not yet recorded in schema_migrations, in order
+
+        Each step and its schema_migrations row commit together. Already
+        checked step lists are skipped for the life of the store.
+        """
+        key = tuple(name for name, _ in migrations)
+        if key in self._migrated:
+            return
+        conn = self.connection()
+        conn.execute(MIGRATIONS_TABLE_SQL)
+        applied = {row[0] for row in conn.execute("SELECT name FROM schema_migrations")}
+        for name, step in migrations:
+            if name in applied:
+                continue
+            record = (name, datetime.now().isoformat(timespec="seconds"))
+            if callable(step):
+                with self.transaction():
+                    step(conn)
+                    conn.execute("INSERT OR IGNORE INTO schema_migrations VALUES (?, ?)", record)
+            else:
+                # executescript cannot take parameters or run inside transaction()
+                try:
+                    conn.executescript(f"BEGIN IMMEDIATE; {step}; "
+                                       f"INSERT OR IGNORE INTO schema_migrations "
+                                       f"VALUES ('{record[0]}', '{record[1]}'); COMMIT;")
+                except Exception:
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK")
+                    raise
+            logger.info(f"✓ Migration applied: {name} ({self.path})")
+        self._migrated.add(key)
+
+
+def add_column(table: str, column: str, definition: str) -> Callable[[sqlite3.Connection], None]:
+    """Migration step adding a column unless the table already has it"""
+    def step(conn: sqlite3.Connection):
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    return step
+
+
+_STORES: Dict[str, SQLiteStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_store(path: str = DEFAULT_DB) -> SQLiteStore:
+    """Process-wide SQLiteStore for a database file"""
+    key = os.path.abspath(path)
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = _STORES[key] = SQLiteStore(path)
+        return store
+
+
+def main():
+    """Per-call overhead: connect-per-operation (previous pattern) vs pooled connections"""
+    import tempfile
+
+    table = ("CREATE TABLE IF NOT EXISTS bench (id INTEGER PRIMARY KEY, "
+             "timestamp TEXT, symbol TEXT, outcome TEXT, pnl REAL)")
+    insert = "INSERT INTO bench (timestamp, symbol, outcome, pnl) VALUES (?, ?, ?, ?)"
+    point_read = "SELECT outcome, pnl FROM bench WHERE id = ?"
+    n = 2000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = str(Path(tmp) / "legacy.db")
+        conn = sqlite3.connect(legacy)
+        conn.execute(table)
+        conn.close()
+        store = SQLiteStore(str(Path(tmp) / "pooled.db"))
+        store.migrate([("bench_table", table)])
+
+        def per_call_insert(i):
+            conn = sqlite3.connect(legacy)
+            conn.execute(insert, ("2026-01-01 10:00:00", "NIFTY", "SL", float(i)))
+            conn.commit()
+            conn.close()
+
+        def per_call_read(i):
+            conn = sqlite3.connect(legacy)
+            conn.execute(point_read, (i % n + 1,)).fetchone()
+            conn.close()
+
+        def pooled_insert(i):
+            store.execute(insert, ("2026-01-01 10:00:00", "NIFTY", "SL", float(i)))
+
+        def pooled_read(i):
+            store.query_one(point_read, (i % n + 1,))
+
+        def timed(fn) -> float:
+            start = time.perf_counter()
+            for i in range(n):
+                fn(i)
+            return (time.perf_counter() - start) / n * 1e6
+
+        results = {
+            "insert, connect + commit per call": timed(per_call_insert),
+            "read, connect per call": timed(per_call_read),
+            "insert, pooled WAL connection": timed(pooled_insert),
+            "read, pooled connection": timed(pooled_read),
+        }
+        rows = [("2026-01-01 10:00:00", "NIFTY", "TARGET", float(i)) for i in range(n)]
+        start = time.perf_counter()
+        store.executemany(insert, rows)
+        results["insert, one executemany transaction (per row)"] = (time.perf_counter() - start) / n * 1e6
+
+        for name, us in results.items():
+            print(f"{name:<48} {us:>8.1f} us/call")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+TELEMETRY: Process-wide latency/throughput metrics in Prometheus text format
+- Counter, Gauge and Histogram with optional labels, no external dependency
+- Observations are a bisect plus two additions under an uncontended lock,
+  cheap enough to leave on in the tick path
+- Gauges can be bound to a callback evaluated at scrape time (queue depths)
+- REGISTRY.render() produces the text served at /api/metrics
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+# Seconds; spans sub-millisecond hot paths up to slow REST calls
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        try:
+            key = tuple([labels[n] for n in self.labelnames])
+        except KeyError:
+            key = None
+        if key is None or len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return key
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """Sample lines for the exposition format (after header())"""
+
+
+class Counter(_Metric):
+    """Monotonic count (use rate() in Prometheus for throughput)"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+
+class Gauge(_Metric):
+    """Point-in-time value, set directly or computed by a callback at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._functions: Dict[Tuple[str, ...], Callable[[], float]] = {}
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def set_function(self, fn: Callable[[], float], **labels):
+        """Evaluate ``fn()`` on every scrape (e.g. ``queue.qsize``)"""
+        self._functions[self._key(labels)] = fn
+
+    def samples(self) -> List[str]:
+        values = dict(self._values)
+        for key, fn in list(self._functions.items()):
+            try:
+                values[key] = float(fn())
+            except Exception:
+                continue
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in values.items()]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram (seconds unless the name says otherwise)"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Iterable[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels) if self.labelnames else ()
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[idx] += 1
+            self._sums[key] += value
+
+    def observe_since(self, start: Optional[float], **labels):
+        """
+        Observe ``time.perf_counter() - start``
+
+        A missing start (0/None) is skipped: ticks replayed from the journal
+        carry no receipt time, and would otherwise land in the top bucket.
+        """
+        if start:
+            self.observe(time.perf_counter() - start, **labels)
+
+    @contextmanager
+    def time(self, **labels):
+        """``with HIST.time(endpoint="x"):`` observes the block's wall time"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def timed(self, **labels):
+        """Decorator form of time()"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(time.perf_counter() - start, **labels)
+            return wrapper
+        return decorator
+
+    def count(self, **labels) -> int:
+        counts = self._counts.get(self._key(labels) if self.labelnames else ())
+        return sum(counts) if counts else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts), self._sums[key]) for key, counts in self._counts.items()]
+        lines = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Iterable[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# ---------------------------------------------------------------------- pipeline metrics
+
+DHAN_REST_LATENCY = REGISTRY.histogram(
+    "dhan_rest_latency_seconds", "Dhan REST round trip per endpoint", ["endpoint"])
+RATE_LIMIT_WAIT = REGISTRY.histogram(
+    "dhan_rate_limit_wait_seconds", "Time blocked in a Dhan rate limiter", ["limiter"])
+CACHE_REQUESTS = REGISTRY.counter(
+    "cache_requests_total", "Cache lookups by cache and result (hit/miss)", ["cache", "result"])
+CACHE_HIT_RATIO = REGISTRY.gauge(
+    "cache_hit_ratio", "Hits / lookups since start", ["cache"])
+FEATURE_GENERATION = REGISTRY.histogram(
+    "feature_generation_seconds", "FeatureEngineer.generate_all_features wall time")
+MODEL_INFERENCE = REGISTRY.histogram(
+    "model_inference_seconds", "Model predict/predict_proba wall time", ["model"])
+LEVELS_COMPUTE = REGISTRY.histogram(
+    "levels_compute_seconds", "End-to-end levels computation (fetch + features + model + filters)")
+WS_MESSAGES_DECODED = REGISTRY.counter(
+    "ws_messages_decoded_total", "Feed messages decoded by kind", ["kind"])
+WS_DECODE_TIME = REGISTRY.histogram(
+    "ws_decode_seconds", "Time to decode one feed message and run its callbacks")
+TICK_TO_BROADCAST = REGISTRY.histogram(
+    "tick_to_broadcast_seconds", "Frame receipt to WebSocket fan-out complete", ["symbol"])
+QUEUE_DEPTH = REGISTRY.gauge(
+    "fanout_queue_depth", "Items waiting in fan-out and writer queues", ["queue"])
+SQLITE_COMMIT = REGISTRY.histogram(
+    "sqlite_commit_seconds", "SQLite transaction commit latency", ["db"])
+
+
+def record_cache(cache: str, hit: bool):
+    """Count a cache lookup and keep the hit-ratio gauge current"""
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+    hits = CACHE_REQUESTS.value(cache=cache, result="hit")
+    total = hits + CACHE_REQUESTS.value(cache=cache, result="miss")
+    CACHE_HIT_RATIO.set(hits / total, cache=cache)
+
+
+def main():
+    """Overhead of the hot-path hooks"""
+    n = 200_000
+    hist = Histogram("bench_seconds", "bench", ["symbol"])
+    counter = Counter("bench_total", "bench", ["kind"])
+
+    start = time.perf_counter()
+    for _ in range(n):
+        hist.observe(0.0003, symbol="NIFTY")
+    observe_ns = (time.perf_counter() - start) / n * 1e9
+
+    start = time.perf_counter()
+    for _ in range(n):
+        counter.inc(kind="ticker")
+    inc_ns = (time.perf_counter() - start) / n * 1e9
+
+    print(f"Histogram.observe: {observe_ns:.0f} ns | Counter.inc: {inc_ns:.0f} ns")
+    print(hist.samples()[-1])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,705 @@
+"""
+TICK JOURNAL: Append-only binary journal of the live feed + replay engine
+- One file per trading day (data/ticks/YYYY-MM-DD.ticks), fixed 64-byte records
+- Memory-mapped for reading; time-indexed via binary search on the timestamp column
+- Ticks are one record; a depth snapshot is a header record + 3 levels per record
+- ReplayEngine feeds a journal back through on_tick / on_depth at 1x, Nx or max speed
+- ReplayClock gives handlers deterministic "now" (journal time, not wall time);
+  WallClock is the live stand-in with the same interface
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Union
+
+import numpy as np
+from loguru import logger
+
+from .dhan_websocket import MarketDepth, TickData
+from .order_book import DEPTH_LEVELS, DEPTH_LEVEL_DTYPE, OrderBook
+
+
+JOURNAL_MAGIC = b"NTJ1"
+JOURNAL_VERSION = 1
+JOURNAL_HEADER_BYTES = 16
+RECORD_BYTES = 64
+
+KIND_TICK = 1
+KIND_DEPTH = 2
+KIND_LEVELS = 3  # continuation records carrying a depth snapshot's levels
+
+# Tick record (64 bytes)
+TICK_DTYPE = np.dtype([
+    ('ts_ns', '<i8'),
+    ('kind', 'u1'),
+    ('segment', 'u1'),
+    ('flags', '<u2'),       # which optional TickData fields are present
+    ('security_id', '<i4'),
+    ('ltp', '<f8'),
+    ('bid', '<f8'),
+    ('ask', '<f8'),
+    ('volume', '<i8'),
+    ('ltt', '<u4'),         # epoch seconds
+    ('oi', '<i4'),
+    ('ltq', '<i4'),
+    ('oi_change', '<i4'),
+])
+
+# Depth header record (64 bytes); followed by level records
+DEPTH_HEAD_DTYPE = np.dtype([
+    ('ts_ns', '<i8'),
+    ('kind', 'u1'),
+    ('segment', 'u1'),
+    ('n_bids', 'u1'),
+    ('n_asks', 'u1'),
+    ('security_id', '<i4'),
+    ('_reserved', 'V48'),
+])
+
+# Level record (64 bytes): same ts/kind prefix as every record, then 3 levels.
+# Bids are packed first, then asks, across ceil((n_bids + n_asks) / 3) records.
+LEVELS_PER_RECORD = 3
+LEVELS_DTYPE = np.dtype([
+    ('ts_ns', '<i8'),
+    ('kind', 'u1'),
+    ('_pad', 'V7'),
+    ('levels', DEPTH_LEVEL_DTYPE, (LEVELS_PER_RECORD,)),
+])
+MAX_DEPTH_RECORDS = 1 + -(-2 * DEPTH_LEVELS // LEVELS_PER_RECORD)
+
+# Bits in TICK_DTYPE.flags
+_OPTIONAL_FIELDS = ('ltt', 'ltq', 'volume', 'bid', 'ask', 'oi', 'oi_change')
+_FLAG = {name: 1 << i for i, name in enumerate(_OPTIONAL_FIELDS)}
+
+assert TICK_DTYPE.itemsize == RECORD_BYTES
+assert DEPTH_HEAD_DTYPE.itemsize == RECORD_BYTES
+assert LEVELS_DTYPE.itemsize == RECORD_BYTES
+
+
+def _to_ns(dt: datetime) -> int:
+    return round(dt.timestamp() * 1_000_000) * 1000
+
+
+def _from_ns(ts_ns: int) -> datetime:
+    return datetime.fromtimestamp(ts_ns / 1_000_000_000)
+
+
+def _security_int(security_id) -> int:
+    try:
+        return int(security_id)
+    except (TypeError, ValueError):
+        return 0
+
+
+def journal_path(journal_dir: Union[str, Path], day: date) -> Path:
+    return Path(journal_dir) / f"{day.isoformat()}.ticks"
+
+
+class TickJournalWriter:
+    """
+    Append-only writer. Records are buffered and written in blocks;
+    a new file is started when the local date changes.
+
+    Timestamps are clamped to be non-decreasing per file so the reader
+    can binary-search them.
+    """
+
+    def __init__(
+        self,
+        journal_dir: Union[str, Path] = "data/ticks",
+        buffer_records: int = 1024,
+        flush_interval: float = 1.0,
+    ):
+        """
+        Args:
+            journal_dir: Directory holding one .ticks file per day
+            buffer_records: Records buffered before a write
+            flush_interval: Max seconds a record may sit in the buffer
+        """
+        self.journal_dir = Path(journal_dir)
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        self.buffer_records = buffer_records
+        self.flush_interval = flush_interval
+
+        self._buffer = np.zeros(buffer_records + MAX_DEPTH_RECORDS, dtype=TICK_DTYPE)
+        self._raw = self._buffer.view(np.uint8).reshape(-1, RECORD_BYTES)
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+        self._file = None
+        self._day: Optional[date] = None
+        self._last_ts = 0
+        self.records_written = 0
+
+    # ------------------------------------------------------------------ files
+
+    def _roll(self, day: date):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+
+        path = journal_path(self.journal_dir, day)
+        is_new = not path.exists() or path.stat().st_size == 0
+        self._file = open(path, "ab")
+        if is_new:
+            header = JOURNAL_MAGIC + np.array([JOURNAL_VERSION, RECORD_BYTES, 0], dtype='<u4').tobytes()
+            self._file.write(header)
+            self._last_ts = 0
+        else:
+            # Resume after a restart: keep timestamps monotonic with what is on disk
+            reader = TickJournalReader(path)
+            self._last_ts = reader.end_ns if len(reader) else 0
+            reader.close()
+        self._day = day
+        logger.info(f"✓ Tick journal → {path}")
+
+    def _slot(self, ts_ns: int, day: date) -> int:
+        if day != self._day:
+            self._roll(day)
+        if self._pending + MAX_DEPTH_RECORDS > len(self._buffer):
+            self.flush()
+        return max(ts_ns, self._last_ts)
+
+    def _committed(self, records: int, ts_ns: int):
+        self._pending += records
+        self._last_ts = ts_ns
+        if self._pending >= self.buffer_records or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    # ------------------------------------------------------------------ write
+
+    def write_tick(self, tick: TickData):
+        stamp = tick.timestamp or datetime.now()
+        ts_ns = self._slot(_to_ns(stamp), stamp.date())
+
+        rec = self._buffer[self._pending]
+        flags = 0
+        for name in _OPTIONAL_FIELDS:
+            if getattr(tick, name) is not None:
+                flags |= _FLAG[name]
+
+        rec['ts_ns'] = ts_ns
+        rec['kind'] = KIND_TICK
+        rec['segment'] = int(tick.exchange_segment or 0)
+        rec['flags'] = flags
+        rec['security_id'] = _security_int(tick.security_id)
+        rec['ltp'] = tick.ltp
+        rec['bid'] = tick.bid or 0.0
+        rec['ask'] = tick.ask or 0.0
+        rec['volume'] = tick.volume or 0
+        rec['ltt'] = int(tick.ltt.timestamp()) if tick.ltt else 0
+        rec['oi'] = tick.oi or 0
+        rec['ltq'] = tick.ltq or 0
+        rec['oi_change'] = tick.oi_change or 0
+        self._committed(1, ts_ns)
+
+    def write_depth_arrays(
+        self,
+        security_id,
+        exchange_segment: int,
+        bids: np.ndarray,
+        asks: np.ndarray,
+        timestamp: Optional[datetime] = None,
+    ):
+        """
+        Write a depth snapshot from DEPTH_LEVEL_DTYPE-compatible arrays
+        (fields price/qty/orders, best level first, at most 20 per side)
+        """
+        stamp = timestamp or datetime.now()
+        ts_ns = self._slot(_to_ns(stamp), stamp.date())
+        i = self._pending
+        n_bids = min(len(bids), DEPTH_LEVELS)
+        n_asks = min(len(asks), DEPTH_LEVELS)
+        n_records = -(-(n_bids + n_asks) // LEVELS_PER_RECORD)
+        self._raw[i:i + 1 + n_records] = 0
+
+        head = self._raw[i].view(DEPTH_HEAD_DTYPE)
+        head['ts_ns'] = ts_ns
+        head['kind'] = KIND_DEPTH
+        head['segment'] = int(exchange_segment or 0)
+        head['n_bids'] = n_bids
+        head['n_asks'] = n_asks
+        head['security_id'] = _security_int(security_id)
+
+        block = self._raw[i + 1:i + 1 + n_records].view(LEVELS_DTYPE).reshape(-1)
+        block['ts_ns'] = ts_ns
+        block['kind'] = KIND_LEVELS
+        levels = np.zeros(n_records * LEVELS_PER_RECORD, dtype=DEPTH_LEVEL_DTYPE)
+        for name in ('price', 'qty', 'orders'):
+            levels[name][:n_bids] = bids[name][:n_bids]
+            levels[name][n_bids:n_bids + n_asks] = asks[name][:n_asks]
+        block['levels'] = levels.reshape(n_records, LEVELS_PER_RECORD)
+        self._committed(1 + n_records, ts_ns)
+
+    def write_depth(self, depth: MarketDepth):
+        """Write a parsed MarketDepth message"""
+        def to_array(levels):
+            arr = np.zeros(min(len(levels), DEPTH_LEVELS), dtype=DEPTH_LEVEL_DTYPE)
+            for j, lvl in enumerate(levels[:DEPTH_LEVELS]):
+                arr[j] = (lvl['price'], lvl['qty'], lvl['orders'])
+            return arr
+        self.write_depth_arrays(
+            depth.security_id, depth.exchange_segment,
+            to_array(depth.bids), to_array(depth.asks), depth.timestamp,
+        )
+
+    def write_book(self, book: OrderBook, exchange_segment: int = 0, timestamp: Optional[datetime] = None):
+        """Snapshot a streaming OrderBook (used for binary 20-depth packets)"""
+        def side_array(side):
+            arr = np.zeros(side.depth, dtype=DEPTH_LEVEL_DTYPE)
+            arr['price'] = side.price[:side.depth]
+            arr['qty'] = side.qty[:side.depth]
+            arr['orders'] = side.orders[:side.depth]
+            return arr
+        self.write_depth_arrays(
+            book.security_id, exchange_segment,
+            side_array(book.bids), side_array(book.asks),
+            timestamp or book.updated_at,
+        )
+
+    def flush(self):
+        if self._pending and self._file is not None:
+            self._file.write(self._raw[:self._pending].tobytes())
+            self._file.flush()
+            self.records_written += self._pending
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._day = None
+
+
+class TickJournalReader:
+    """
+    Memory-mapped view of one day's journal.
+
+    Nothing is read until it is touched; ``seek`` is a binary search on the
+    timestamp column, so opening a file and jumping to 14:30 costs a few
+    page faults regardless of file size.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        size = self.path.stat().st_size
+        with open(self.path, "rb") as f:
+            header = f.read(JOURNAL_HEADER_BYTES)
+        if header[:4] != JOURNAL_MAGIC:
+            raise ValueError(f"Not a tick journal: {self.path}")
+        version, record_bytes = np.frombuffer(header[4:12], dtype='<u4')
+        if version != JOURNAL_VERSION or record_bytes != RECORD_BYTES:
+            raise ValueError(f"Unsupported journal format v{version} ({record_bytes}-byte records)")
+
+        # A torn trailing record (crash mid-write) is ignored
+        n = (size - JOURNAL_HEADER_BYTES) // RECORD_BYTES
+        if n > 0:
+            self.records = np.memmap(self.path, dtype=TICK_DTYPE, mode="r",
+                                     offset=JOURNAL_HEADER_BYTES, shape=(n,))
+        else:
+            self.records = np.zeros(0, dtype=TICK_DTYPE)
+
+    @classmethod
+    def open_day(cls, journal_dir: Union[str, Path], day: date) -> "TickJournalReader":
+        return cls(journal_path(journal_dir, day))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def close(self):
+        mm = getattr(self.records, "_mmap", None)
+        self.records = np.zeros(0, dtype=TICK_DTYPE)
+        if mm is not None:
+            mm.close()
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self.records['ts_ns']
+
+    @property
+    def start_ns(self) -> int:
+        return int(self.records['ts_ns'][0]) if len(self.records) else 0
+
+    @property
+    def end_ns(self) -> int:
+        return int(self.records['ts_ns'][-1]) if len(self.records) else 0
+
+    def seek(self, when: Union[datetime, int]) -> int:
+        """Index of the first event at or after ``when`` (datetime or epoch ns)"""
+        ts_ns = _to_ns(when) if isinstance(when, datetime) else int(when)
+        idx = int(np.searchsorted(self.records['ts_ns'], ts_ns, side="left"))
+        # Level records share their header's timestamp, so this only guards torn blocks
+        while idx < len(self.records) and self.records['kind'][idx] == KIND_LEVELS:
+            idx -= 1
+        return max(idx, 0)
+
+    def tick_records(self, security_id: Optional[int] = None) -> np.ndarray:
+        """All tick records as a structured array (vectorised analysis / bar building)"""
+        mask = self.records['kind'] == KIND_TICK
+        if security_id is not None:
+            mask &= self.records['security_id'] == int(security_id)
+        return self.records[mask]
+
+    # ------------------------------------------------------------------ decode
+
+    @staticmethod
+    def _tick_from_row(row: tuple) -> TickData:
+        """Build TickData from a TICK_DTYPE row as returned by ndarray.tolist()"""
+        ts_ns, _, segment, flags, security_id, ltp, bid, ask, volume, ltt, oi, ltq, oi_change = row
+        return TickData(
+            security_id=str(security_id),
+            exchange_segment=segment,
+            ltp=ltp,
+            ltt=datetime.fromtimestamp(ltt) if flags & _FLAG['ltt'] else None,
+            ltq=ltq if flags & _FLAG['ltq'] else None,
+            volume=volume if flags & _FLAG['volume'] else None,
+            bid=bid if flags & _FLAG['bid'] else None,
+            ask=ask if flags & _FLAG['ask'] else None,
+            oi=oi if flags & _FLAG['oi'] else None,
+            oi_change=oi_change if flags & _FLAG['oi_change'] else None,
+            timestamp=_from_ns(ts_ns),
+        )
+
+    def depth_arrays_at(self, i: int):
+        """Raw (head, bids, asks) for the depth snapshot at record ``i`` (None if torn)"""
+        head = self.records[i:i + 1].view(DEPTH_HEAD_DTYPE)[0]
+        n_bids, n_asks = int(head['n_bids']), int(head['n_asks'])
+        n_records = -(-(n_bids + n_asks) // LEVELS_PER_RECORD)
+        if i + 1 + n_records > len(self.records):
+            return None
+        levels = self.records[i + 1:i + 1 + n_records].view(LEVELS_DTYPE)['levels'].reshape(-1)
+        return head, levels[:n_bids], levels[n_bids:n_bids + n_asks]
+
+    def _depth_at(self, i: int) -> Optional[MarketDepth]:
+        decoded = self.depth_arrays_at(i)
+        if decoded is None:
+            return None
+        head, bids, asks = decoded
+
+        def to_dicts(levels):
+            return [
+                {'price': float(p), 'qty': int(q), 'orders': int(o)}
+                for p, q, o in zip(levels['price'], levels['qty'], levels['orders'])
+            ]
+
+        return MarketDepth(
+            security_id=str(int(head['security_id'])),
+            exchange_segment=int(head['segment']),
+            bids=to_dicts(bids),
+            asks=to_dicts(asks),
+            timestamp=_from_ns(int(head['ts_ns'])),
+        )
+
+    def events(
+        self,
+        start: Optional[Union[datetime, int]] = None,
+        end: Optional[Union[datetime, int]] = None,
+        chunk_records: int = 4096,
+    ) -> Iterator[tuple]:
+        """
+        Iterate (ts_ns, kind, TickData | MarketDepth) in journal order
+
+        Args:
+            start: First event time (inclusive), default start of file
+            end: Last event time (exclusive), default end of file
+        """
+        i = self.seek(start) if start is not None else 0
+        stop = self.seek(end) if end is not None else len(self.records)
+        # Decode in chunks: one tolist() per chunk instead of per-field scalar access
+        while i < stop:
+            chunk_end = min(i + chunk_records, stop)
+            rows = self.records[i:chunk_end].tolist()
+            j = 0
+            while j < len(rows):
+                row = rows[j]
+                kind = row[1]
+                if kind == KIND_TICK:
+                    yield row[0], kind, self._tick_from_row(row)
+                    j += 1
+                elif kind == KIND_DEPTH:
+                    depth = self._depth_at(i + j)
+                    if depth is None:
+                        return
+                    yield row[0], kind, depth
+                    j += 1 + -(-(len(depth.bids) + len(depth.asks)) // LEVELS_PER_RECORD)
+                else:
+                    j += 1
+            i += j
+
+
+def available_days(journal_dir: Union[str, Path] = "data/ticks") -> List[date]:
+    """Days with a journal file, oldest first"""
+    days = []
+    for path in sorted(Path(journal_dir).glob("*.ticks")):
+        try:
+            days.append(date.fromisoformat(path.stem))
+        except ValueError:
+            continue
+    return days
+
+
+class WallClock:
+    """Live clock: the time handlers read when no replay is driving them (naive UTC)"""
+
+    def now(self) -> datetime:
+        return datetime.utcnow()
+
+    def time(self) -> float:
+        return time.time()
+
+
+class ReplayClock:
+    """
+    Deterministic clock for replayed sessions.
+
+    Handlers that need "now" should read it from here rather than
+    datetime.now(), so a replay produces the same results at any speed.
+    now() is naive UTC like WallClock's, whatever the host's time zone.
+    """
+
+    def __init__(self):
+        self._ts_ns = 0
+
+    def advance(self, ts_ns: int):
+        self._ts_ns = ts_ns
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self._ts_ns / 1_000_000_000, timezone.utc).replace(tzinfo=None)
+
+    def time(self) -> float:
+        return self._ts_ns / 1_000_000_000
+
+
+@dataclass
+class ReplayStats:
+    """Outcome of one replay run"""
+    events: int = 0
+    ticks: int = 0
+    depths: int = 0
+    journal_seconds: float = 0.0
+    wall_seconds: float = 0.0
+    handler_seconds: float = 0.0
+    max_lag_ms: float = 0.0  # how far dispatch fell behind schedule (paced runs)
+
+    @property
+    def speedup(self) -> float:
+        return self.journal_seconds / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    @property
+    def events_per_sec(self) -> float:
+        return self.events / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    @property
+    def handler_us(self) -> float:
+        return self.handler_seconds / self.events * 1e6 if self.events else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.events:,} events ({self.ticks:,} ticks, {self.depths:,} depth) | "
+            f"{self.journal_seconds:,.0f}s of session in {self.wall_seconds:.2f}s "
+            f"({self.speedup:,.0f}x) | {self.events_per_sec:,.0f} ev/s | "
+            f"handlers {self.handler_us:.1f}us/ev | max lag {self.max_lag_ms:.1f}ms"
+        )
+
+
+class ReplayEngine:
+    """
+    Feed a journal back through the live callbacks.
+
+    Args:
+        reader: Journal to replay
+        speed: 1.0 = real time, N = N times faster, None/0 = as fast as possible
+        clock: Clock advanced to each event's timestamp before dispatch
+
+    Usage:
+        engine = ReplayEngine(TickJournalReader.open_day("data/ticks", day), speed=50)
+        engine.on_tick(handle_tick)
+        stats = engine.run()
+    """
+
+    def __init__(self, reader: TickJournalReader, speed: Optional[float] = 1.0,
+                 clock: Optional[ReplayClock] = None):
+        self.reader = reader
+        self.speed = speed if speed and speed > 0 else None
+        self.clock = clock or ReplayClock()
+
+        self.on_tick_callback: Optional[Callable[[TickData], None]] = None
+        self.on_depth_callback: Optional[Callable[[MarketDepth], None]] = None
+        self.on_book_callback: Optional[Callable[[OrderBook], None]] = None
+        self.order_books = None
+
+    def on_tick(self, callback: Callable[[TickData], None]):
+        self.on_tick_callback = callback
+
+    def on_depth(self, callback: Callable[[MarketDepth], None]):
+        self.on_depth_callback = callback
+
+    def on_book(self, callback: Callable[[OrderBook], None]):
+        self.on_book_callback = callback
+
+    def bind(self, ws) -> "ReplayEngine":
+        """Reuse the callbacks (and order books) registered on a DhanWebSocket"""
+        self.on_tick_callback = ws.on_tick_callback
+        self.on_depth_callback = ws.on_depth_callback
+        self.on_book_callback = ws.on_book_callback
+        self.order_books = ws.order_books
+        return self
+
+    def _dispatch(self, kind: int, event, stats: ReplayStats):
+        if kind == KIND_TICK:
+            stats.ticks += 1
+            if self.on_tick_callback:
+                self.on_tick_callback(event)
+        else:
+            stats.depths += 1
+            if self.order_books is not None:
+                book = self.order_books.apply_depth(event)
+                if self.on_book_callback:
+                    self.on_book_callback(book)
+            if self.on_depth_callback:
+                self.on_depth_callback(event)
+
+    def _schedule(self, ts_ns: int, first_ns: int, wall_start: float) -> float:
+        """Seconds to wait before dispatching an event stamped ``ts_ns``"""
+        if self.speed is None:
+            return 0.0
+        due = wall_start + (ts_ns - first_ns) / 1e9 / self.speed
+        return due - time.perf_counter()
+
+    def _finish(self, stats: ReplayStats, first_ns: Optional[int], last_ns: int, wall_start: float):
+        stats.wall_seconds = time.perf_counter() - wall_start
+        if first_ns is not None:
+            stats.journal_seconds = (last_ns - first_ns) / 1e9
+        logger.info(f"Replay done: {stats.summary()}")
+        return stats
+
+    def run(self, start=None, end=None) -> ReplayStats:
+        """Replay synchronously (blocking sleeps when paced)"""
+        stats = ReplayStats()
+        first_ns, last_ns = None, 0
+        wall_start = time.perf_counter()
+        for ts_ns, kind, event in self.reader.events(start, end):
+            if first_ns is None:
+                first_ns = ts_ns
+            wait = self._schedule(ts_ns, first_ns, wall_start)
+            if wait > 0:
+                time.sleep(wait)
+            elif self.speed is not None:
+                stats.max_lag_ms = max(stats.max_lag_ms, -wait * 1000)
+            self.clock.advance(ts_ns)
+            t0 = time.perf_counter()
+            self._dispatch(kind, event, stats)
+            stats.handler_seconds += time.perf_counter() - t0
+            stats.events += 1
+            last_ns = ts_ns
+        return self._finish(stats, first_ns, last_ns, wall_start)
+
+    async def run_async(self, start=None, end=None, yield_every: int = 256) -> ReplayStats:
+        """
+        Replay on the running event loop, so handlers can schedule tasks
+        (e.g. websocket broadcasts) exactly as they do live.
+
+        Args:
+            yield_every: At max speed, let the loop run queued tasks every N events
+        """
+        stats = ReplayStats()
+        first_ns, last_ns = None, 0
+        wall_start = time.perf_counter()
+        for ts_ns, kind, event in self.reader.events(start, end):
+            if first_ns is None:
+                first_ns = ts_ns
+            wait = self._schedule(ts_ns, first_ns, wall_start)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            elif self.speed is not None:
+                stats.max_lag_ms = max(stats.max_lag_ms, -wait * 1000)
+            elif stats.events % yield_every == 0:
+                await asyncio.sleep(0)
+            self.clock.advance(ts_ns)
+            t0 = time.perf_counter()
+            self._dispatch(kind, event, stats)
+            stats.handler_seconds += time.perf_counter() - t0
+            stats.events += 1
+            last_ns = ts_ns
+        await asyncio.sleep(0)
+        return self._finish(stats, first_ns, last_ns, wall_start)
+
+
+def write_synthetic_session(journal_dir: Union[str, Path], day: date, ticks: int = 50_000,
+                            depth_every: int = 10, security_id: int = 13, seed: int = 7) -> Path:
+    """Random-walk session for benchmarks (09:15-15:30, one index + its depth)"""
+    rng = np.random.default_rng(seed)
+    start = datetime.combine(day, datetime.min.time()).replace(hour=9, minute=15)
+    offsets = np.sort(rng.uniform(0, 6.25 * 3600, ticks))
+    prices = 25000 + np.cumsum(rng.normal(0, 1.5, ticks))
+
+    writer = TickJournalWriter(journal_dir, buffer_records=4096, flush_interval=1e9)
+    levels = np.zeros(DEPTH_LEVELS, dtype=DEPTH_LEVEL_DTYPE)
+    for k in range(ticks):
+        stamp = datetime.fromtimestamp(start.timestamp() + offsets[k])
+        ltp = round(float(prices[k]) * 20) / 20
+        writer.write_tick(TickData(
+            security_id=str(security_id), exchange_segment=0, ltp=ltp, ltt=None, ltq=None,
+            volume=None, bid=None, ask=None, oi=None, oi_change=None, timestamp=stamp,
+        ))
+        if depth_every and k % depth_every == 0:
+            bids = levels.copy()
+            asks = levels.copy()
+            bids['price'] = ltp - 0.05 * np.arange(1, DEPTH_LEVELS + 1)
+            asks['price'] = ltp + 0.05 * np.arange(1, DEPTH_LEVELS + 1)
+            bids['qty'] = rng.integers(50, 2000, DEPTH_LEVELS)
+            asks['qty'] = rng.integers(50, 2000, DEPTH_LEVELS)
+            bids['orders'] = rng.integers(1, 40, DEPTH_LEVELS)
+            asks['orders'] = rng.integers(1, 40, DEPTH_LEVELS)
+            writer.write_depth_arrays(security_id, 0, bids, asks, stamp)
+    writer.close()
+    return journal_path(journal_dir, day)
+
+
+def main():
+    """
+    Replay a recorded day, or benchmark against a synthetic session.
+
+        python -m integrations.tick_journal                 # synthetic, max speed
+        python -m integrations.tick_journal 2026-01-15 50   # recorded day at 50x
+    """
+    import sys
+    import tempfile
+
+    from .order_book import OrderBookManager
+
+    args = sys.argv[1:]
+    speed = float(args[1]) if len(args) > 1 else None
+
+    if args:
+        reader = TickJournalReader.open_day("data/ticks", date.fromisoformat(args[0]))
+    else:
+        tmp = tempfile.mkdtemp(prefix="tick_journal_")
+        t0 = time.perf_counter()
+        path = write_synthetic_session(tmp, date.today())
+        print(f"Wrote {path.stat().st_size / 1e6:.1f} MB in {time.perf_counter() - t0:.2f}s → {path}")
+        reader = TickJournalReader(path)
+
+    span = (reader.end_ns - reader.start_ns) / 1e9
+    print(f"Journal: {len(reader):,} records, {span / 3600:.2f}h")
+
+    t0 = time.perf_counter()
+    mid = reader.seek(reader.start_ns + int(span / 2 * 1e9))
+    print(f"Seek to mid-session: record {mid:,} in {(time.perf_counter() - t0) * 1e6:.0f}us")
+
+    engine = ReplayEngine(reader, speed=speed)
+    engine.order_books = OrderBookManager()
+    last = {}
+    engine.on_tick(lambda tick: last.__setitem__(tick.security_id, tick.ltp))
+    stats = engine.run()
+    print(stats.summary())
+    reader.close()
+
+
+if __name__ == "__main__":
+    main()
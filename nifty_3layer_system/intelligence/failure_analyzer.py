@@ -3,17 +3,19 @@ Failure pattern analyzer - detects why signals fail and identifies root causes.
 Uses real-time query of level_signals database to identify recurring failure patterns.
 """
 
-import sqlite3
 from datetime import datetime, timedelta
 from typing import List, Dict
 from collections import Counter
 
+from integrations.storage import get_store
+
 
 class FailureAnalyzer:
     """Analyzes signal failures to identify patterns and root causes."""
 
     def __init__(self, db_path: str = 'data/trading_metrics.db'):
         self.db_path = db_path
+        self.store = get_store(db_path)
         self.failure_types = [
             'counter_trend_entry',
             'poor_entry_quality',
@@ -45,11 +47,8 @@ class FailureAnalyzer:
         ]
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             # Query for failed signals (where sl_hit = True)
-            cursor.execute("""
+            rows = self.store.query("""
                 SELECT 
                     id, direction, timestamp, entry, sl, confidence,
                     market_hour, sl_reason, risk_points, reward_points, rr_ratio
@@ -60,7 +59,7 @@ class FailureAnalyzer:
             """, (hours,))
             
             failures = []
-            for row in cursor.fetchall():
+            for row in rows:
                 failures.append({
                     'signal_id': row[0],
                     'direction': row[1],
@@ -75,7 +74,6 @@ class FailureAnalyzer:
                     'rr_ratio': row[10]
                 })
             
-            conn.close()
             return failures
             
         except Exception as e:
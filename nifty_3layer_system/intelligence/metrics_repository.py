@@ -6,13 +6,180 @@ SQLite-based storage for complete market metrics accountability + auditability
 Stores all 67 metrics + decisions every 15 minutes for pattern analysis
 """
 
-import sqlite3
 import json
-from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 import pandas as pd
 
+from integrations.storage import get_store
+
+# TABLE 1: MARKET SNAPSHOTS (Every 15 minutes)
+# Stores complete 67 metrics + classification + decision
+MARKET_SNAPSHOTS_SQL = """
+CREATE TABLE IF NOT EXISTS market_snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    instrument TEXT NOT NULL,
+    
+    -- PRICE & VOLATILITY
+    ltp REAL NOT NULL,
+    atr REAL,
+    atr_ratio REAL,
+    current_range REAL,
+    volume REAL,
+    volume_ratio REAL,
+    
+    -- L1: STRUCTURE (11 metrics - 30%)
+    l1_market_structure_score REAL,
+    l1_current_level REAL,
+    l1_previous_support REAL,
+    l1_previous_resistance REAL,
+    l1_weekly_high REAL,
+    l1_weekly_low REAL,
+    l1_session_high REAL,
+    l1_session_low REAL,
+    l1_open_price REAL,
+    l1_breakout_confirmed INTEGER,
+    l1_structure_quality REAL,
+    
+    -- L2: INSTITUTIONAL (12 metrics - 30%)
+    l2_institutional_strength REAL,
+    l2_volume_profile_confluence REAL,
+    l2_order_flow_direction REAL,
+    l2_large_order_clustering REAL,
+    l2_bid_ask_imbalance REAL,
+    l2_market_microstructure REAL,
+    l2_smart_money_activity REAL,
+    l2_retail_flow REAL,
+    l2_accumulation_detected INTEGER,
+    l2_distribution_detected INTEGER,
+    l2_smart_money_entry REAL,
+    l2_institutional_conviction REAL,
+    
+    -- L3: TECHNICAL (14 metrics - 20%)
+    l3_ema_alignment REAL,
+    l3_ema_9 REAL,
+    l3_ema_20 REAL,
+    l3_ema_50 REAL,
+    l3_rsi REAL,
+    l3_rsi_strength REAL,
+    l3_macd REAL,
+    l3_macd_signal REAL,
+    l3_macd_histogram REAL,
+    l3_momentum_direction REAL,
+    l3_momentum_strength REAL,
+    l3_trend_confirmation INTEGER,
+    l3_candle_pattern TEXT,
+    l3_technical_score REAL,
+    
+    -- L4: BLOCKING (12 metrics - 15%)
+    l4_support_level REAL,
+    l4_resistance_level REAL,
+    l4_previous_trend_line REAL,
+    l4_fibonacci_support REAL,
+    l4_fibonacci_resistance REAL,
+    l4_pivot_level REAL,
+    l4_volume_profile_support REAL,
+    l4_volume_profile_resistance REAL,
+    l4_supply_demand_balance REAL,
+    l4_trendline_proximity REAL,
+    l4_barrier_strength REAL,
+    l4_blocking_score REAL,
+    
+    -- L5: MULTI-TIMEFRAME (8 metrics - 5%)
+    l5_4h_trend TEXT,
+    l5_1h_trend TEXT,
+    l5_15m_trend TEXT,
+    l5_4h_ma_alignment INTEGER,
+    l5_1h_ma_alignment INTEGER,
+    l5_mtf_confluence REAL,
+    l5_higher_tf_confirmation INTEGER,
+    l5_mtf_score REAL,
+    
+    -- AGGREGATE SCORES
+    score_structure REAL,
+    score_institutional REAL,
+    score_technical REAL,
+    score_blocking REAL,
+    score_mtf REAL,
+    score_overall_confidence REAL,
+    
+    -- MARKET CLASSIFICATION
+    market_condition TEXT,
+    market_volatility_pct REAL,
+    setup_quality TEXT,
+    
+    -- DYNAMIC TARGETS (Based on Market Condition)
+    dynamic_entry_precision REAL,
+    dynamic_stop_loss REAL,
+    dynamic_target1 REAL,
+    dynamic_target2 REAL,
+    position_size_multiplier REAL,
+    
+    -- FINAL DECISION
+    final_decision TEXT,  -- CALL, PUT, WAIT
+    decision_confidence REAL,
+    
+    -- METADATA
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+# TABLE 2: DAILY SUMMARY (Daily aggregates)
+DAILY_SUMMARY_SQL = """
+CREATE TABLE IF NOT EXISTS daily_summary (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL UNIQUE,
+    instrument TEXT NOT NULL,
+    
+    -- CONDITION DISTRIBUTION
+    quiet_count INTEGER,
+    normal_count INTEGER,
+    high_count INTEGER,
+    extreme_count INTEGER,
+    dominant_condition TEXT,
+    
+    -- QUALITY DISTRIBUTION
+    weak_count INTEGER,
+    moderate_count INTEGER,
+    strong_count INTEGER,
+    excellent_count INTEGER,
+    dominant_quality TEXT,
+    
+    -- DECISION DISTRIBUTION
+    call_count INTEGER,
+    put_count INTEGER,
+    wait_count INTEGER,
+    
+    -- PERFORMANCE METRICS
+    average_condition_volatility REAL,
+    average_setup_quality REAL,
+    best_condition TEXT,
+    worst_condition TEXT,
+    average_confidence REAL,
+    
+    -- METADATA
+    total_snapshots INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+# Covering index for update_daily_summary() (instrument + day range, the
+# five aggregated columns) and the retention cleanup by created_at
+SNAPSHOT_INDEXES_SQL = """
+CREATE INDEX IF NOT EXISTS idx_market_snapshots_instrument_time
+    ON market_snapshots (instrument, timestamp, market_condition, setup_quality,
+                         final_decision, market_volatility_pct, decision_confidence);
+CREATE INDEX IF NOT EXISTS idx_market_snapshots_created
+    ON market_snapshots (created_at);
+"""
+
+MIGRATIONS = [
+    ("market_snapshots_table", MARKET_SNAPSHOTS_SQL),
+    ("daily_summary_table", DAILY_SUMMARY_SQL),
+    ("market_snapshots_indexes", SNAPSHOT_INDEXES_SQL),
+]
+
 
 class MetricsRepository:
     """
@@ -28,167 +195,8 @@ class MetricsRepository:
             db_path: Path to SQLite database file
         """
         self.db_path = db_path
-        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
-        self._initialize_database()
-    
-    def _initialize_database(self):
-        """Create tables if they don't exist"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # TABLE 1: MARKET SNAPSHOTS (Every 15 minutes)
-        # Stores complete 67 metrics + classification + decision
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS market_snapshots (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            timestamp TEXT NOT NULL,
-            instrument TEXT NOT NULL,
-            
-            -- PRICE & VOLATILITY
-            ltp REAL NOT NULL,
-            atr REAL,
-            atr_ratio REAL,
-            current_range REAL,
-            volume REAL,
-            volume_ratio REAL,
-            
-            -- L1: STRUCTURE (11 metrics - 30%)
-            l1_market_structure_score REAL,
-            l1_current_level REAL,
-            l1_previous_support REAL,
-            l1_previous_resistance REAL,
-            l1_weekly_high REAL,
-            l1_weekly_low REAL,
-            l1_session_high REAL,
-            l1_session_low REAL,
-            l1_open_price REAL,
-            l1_breakout_confirmed INTEGER,
-            l1_structure_quality REAL,
-            
-            -- L2: INSTITUTIONAL (12 metrics - 30%)
-            l2_institutional_strength REAL,
-            l2_volume_profile_confluence REAL,
-            l2_order_flow_direction REAL,
-            l2_large_order_clustering REAL,
-            l2_bid_ask_imbalance REAL,
-            l2_market_microstructure REAL,
-            l2_smart_money_activity REAL,
-            l2_retail_flow REAL,
-            l2_accumulation_detected INTEGER,
-            l2_distribution_detected INTEGER,
-            l2_smart_money_entry REAL,
-            l2_institutional_conviction REAL,
-            
-            -- L3: TECHNICAL (14 metrics - 20%)
-            l3_ema_alignment REAL,
-            l3_ema_9 REAL,
-            l3_ema_20 REAL,
-            l3_ema_50 REAL,
-            l3_rsi REAL,
-            l3_rsi_strength REAL,
-            l3_macd REAL,
-            l3_macd_signal REAL,
-            l3_macd_histogram REAL,
-            l3_momentum_direction REAL,
-            l3_momentum_strength REAL,
-            l3_trend_confirmation INTEGER,
-            l3_candle_pattern TEXT,
-            l3_technical_score REAL,
-            
-            -- L4: BLOCKING (12 metrics - 15%)
-            l4_support_level REAL,
-            l4_resistance_level REAL,
-            l4_previous_trend_line REAL,
-            l4_fibonacci_support REAL,
-            l4_fibonacci_resistance REAL,
-            l4_pivot_level REAL,
-            l4_volume_profile_support REAL,
-            l4_volume_profile_resistance REAL,
-            l4_supply_demand_balance REAL,
-            l4_trendline_proximity REAL,
-            l4_barrier_strength REAL,
-            l4_blocking_score REAL,
-            
-            -- L5: MULTI-TIMEFRAME (8 metrics - 5%)
-            l5_4h_trend TEXT,
-            l5_1h_trend TEXT,
-            l5_15m_trend TEXT,
-            l5_4h_ma_alignment INTEGER,
-            l5_1h_ma_alignment INTEGER,
-            l5_mtf_confluence REAL,
-            l5_higher_tf_confirmation INTEGER,
-            l5_mtf_score REAL,
-            
-            -- AGGREGATE SCORES
-            score_structure REAL,
-            score_institutional REAL,
-            score_technical REAL,
-            score_blocking REAL,
-            score_mtf REAL,
-            score_overall_confidence REAL,
-            
-            -- MARKET CLASSIFICATION
-            market_condition TEXT,
-            market_volatility_pct REAL,
-            setup_quality TEXT,
-            
-            -- DYNAMIC TARGETS (Based on Market Condition)
-            dynamic_entry_precision REAL,
-            dynamic_stop_loss REAL,
-            dynamic_target1 REAL,
-            dynamic_target2 REAL,
-            position_size_multiplier REAL,
-            
-            -- FINAL DECISION
-            final_decision TEXT,  -- CALL, PUT, WAIT
-            decision_confidence REAL,
-            
-            -- METADATA
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """)
-        
-        # TABLE 2: DAILY SUMMARY (Daily aggregates)
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS daily_summary (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            date TEXT NOT NULL UNIQUE,
-            instrument TEXT NOT NULL,
-            
-            -- CONDITION DISTRIBUTION
-            quiet_count INTEGER,
-            normal_count INTEGER,
-            high_count INTEGER,
-            extreme_count INTEGER,
-            dominant_condition TEXT,
-            
-            -- QUALITY DISTRIBUTION
-            weak_count INTEGER,
-            moderate_count INTEGER,
-            strong_count INTEGER,
-            excellent_count INTEGER,
-            dominant_quality TEXT,
-            
-            -- DECISION DISTRIBUTION
-            call_count INTEGER,
-            put_count INTEGER,
-            wait_count INTEGER,
-            
-            -- PERFORMANCE METRICS
-            average_condition_volatility REAL,
-            average_setup_quality REAL,
-            best_condition TEXT,
-            worst_condition TEXT,
-            average_confidence REAL,
-            
-            -- METADATA
-            total_snapshots INTEGER,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """)
-        
-        conn.commit()
-        conn.close()
+        self.store = get_store(db_path)
+        self.store.migrate(MIGRATIONS)
     
     def save_snapshot(
         self,
@@ -218,9 +226,6 @@ class MetricsRepository:
             True if successful, False otherwise
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             # Prepare data - only include metrics that exist as columns
             data = {
                 'timestamp': timestamp,
@@ -246,9 +251,7 @@ class MetricsRepository:
             placeholders = ', '.join(['?' for _ in data.keys()])
             sql = f"INSERT INTO market_snapshots ({columns}) VALUES ({placeholders})"
             
-            cursor.execute(sql, tuple(data.values()))
-            conn.commit()
-            conn.close()
+            self.store.execute(sql, tuple(data.values()))
             
             return True
         
@@ -271,22 +274,17 @@ class MetricsRepository:
             date = datetime.now().strftime('%Y-%m-%d')
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get all snapshots for the day
-            cursor.execute("""
+            # Get all snapshots for the day (timestamp range, so the covering index applies)
+            next_day = (datetime.strptime(date, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+            snapshots = self.store.query("""
             SELECT 
                 market_condition, setup_quality, final_decision, 
                 market_volatility_pct, decision_confidence
             FROM market_snapshots
-            WHERE instrument = ? AND DATE(timestamp) = ?
-            """, (instrument, date))
-            
-            snapshots = cursor.fetchall()
+            WHERE instrument = ? AND timestamp >= ? AND timestamp < ?
+            """, (instrument, date, next_day))
             
             if not snapshots:
-                conn.close()
                 return False
             
             # Aggregate
@@ -310,7 +308,7 @@ class MetricsRepository:
             dominant_quality = max(quality_counts, key=quality_counts.get)
             
             # Upsert into daily_summary
-            cursor.execute("""
+            self.store.execute("""
             INSERT OR REPLACE INTO daily_summary 
             (date, instrument, quiet_count, normal_count, high_count, extreme_count,
              dominant_condition, weak_count, moderate_count, strong_count, excellent_count,
@@ -333,9 +331,6 @@ class MetricsRepository:
                 total_snapshots
             ))
             
-            conn.commit()
-            conn.close()
-            
             return True
         
         except Exception as e:
@@ -345,16 +340,13 @@ class MetricsRepository:
     def get_today_analysis(self, instrument: str) -> Dict:
         """Get today's complete analysis from database"""
         try:
-            conn = sqlite3.connect(self.db_path)
             today = datetime.now().strftime('%Y-%m-%d')
             
-            summary = pd.read_sql_query(
+            summary = self.store.read_frame(
                 "SELECT * FROM daily_summary WHERE date = ? AND instrument = ?",
-                conn, params=(today, instrument)
+                (today, instrument)
             )
             
-            conn.close()
-            
             if len(summary) == 0:
                 return {"error": "No data for today"}
             
@@ -374,19 +366,14 @@ class MetricsRepository:
             Number of records deleted
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             cutoff_date = (datetime.now() - timedelta(days=retention_days)).isoformat()
             
-            cursor.execute(
+            cursor = self.store.execute(
                 "DELETE FROM market_snapshots WHERE created_at < ?",
                 (cutoff_date,)
             )
             
             deleted_count = cursor.rowcount
-            conn.commit()
-            conn.close()
             
             return deleted_count
         
@@ -410,20 +397,17 @@ class MetricsRepository:
 def get_database_stats(db_path: str = "data/trading_metrics.db") -> Dict:
     """Get basic database statistics"""
     try:
-        conn = sqlite3.connect(db_path)
+        store = get_store(db_path)
         
         stats = {}
-        stats['snapshots'] = pd.read_sql_query(
-            "SELECT COUNT(*) as count, instrument FROM market_snapshots GROUP BY instrument",
-            conn
+        stats['snapshots'] = store.read_frame(
+            "SELECT COUNT(*) as count, instrument FROM market_snapshots GROUP BY instrument"
         ).to_dict('records')
         
-        stats['daily_summaries'] = pd.read_sql_query(
-            "SELECT COUNT(*) as count FROM daily_summary",
-            conn
+        stats['daily_summaries'] = store.read_frame(
+            "SELECT COUNT(*) as count FROM daily_summary"
         ).iloc[0]['count']
         
-        conn.close()
         return stats
     
     except Exception as e:
@@ -433,8 +417,6 @@ def get_database_stats(db_path: str = "data/trading_metrics.db") -> Dict:
 def query_best_conditions(db_path: str = "data/trading_metrics.db", days: int = 7) -> pd.DataFrame:
     """Query best performing market conditions from last N days"""
     try:
-        conn = sqlite3.connect(db_path)
-        
         sql = """
         SELECT 
             DATE(timestamp) as date,
@@ -446,13 +428,12 @@ def query_best_conditions(db_path: str = "data/trading_metrics.db", days: int =
             SUM(CASE WHEN final_decision='PUT' THEN 1 ELSE 0 END) as put_count,
             SUM(CASE WHEN final_decision='WAIT' THEN 1 ELSE 0 END) as wait_count
         FROM market_snapshots
-        WHERE DATE(timestamp) >= DATE('now', '-' || ? || ' days')
+        WHERE timestamp >= DATE('now', '-' || ? || ' days')
         GROUP BY DATE(timestamp), instrument, market_condition
         ORDER BY date DESC, avg_confidence DESC
         """
         
-        result = pd.read_sql_query(sql, conn, params=(days,))
-        conn.close()
+        result = get_store(db_path).read_frame(sql, (days,))
         
         return result
     
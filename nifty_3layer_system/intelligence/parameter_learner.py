@@ -3,16 +3,36 @@ Parameter learner - automatically adjusts trading parameters based on real-time
 Stores all adjustments in database for audit trail and continuous improvement.
 """
 
-import sqlite3
 from datetime import datetime
 from typing import Dict, List
 
+from integrations.storage import get_store
+
+
+PARAMETER_ADJUSTMENTS_SQL = """
+CREATE TABLE IF NOT EXISTS parameter_adjustments (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    parameter_name TEXT NOT NULL,
+    parameter_value TEXT NOT NULL,
+    changes_log TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_parameter_adjustments_time
+    ON parameter_adjustments (timestamp);
+"""
+
+MIGRATIONS = [
+    ("parameter_adjustments_table", PARAMETER_ADJUSTMENTS_SQL),
+]
+
 
 class ParameterLearner:
     """Learns from failures and auto-adjusts trading parameters."""
 
     def __init__(self, db_path: str = 'data/trading_metrics.db'):
         self.db_path = db_path
+        self.store = get_store(db_path)
+        self.store.migrate(MIGRATIONS)
         self.parameter_history = []
         
         # Default parameters
@@ -32,19 +52,13 @@ class ParameterLearner:
         Returns default if no adjustments have been made.
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
+            result = self.store.query_one("""
                 SELECT parameter_name, parameter_value, timestamp
                 FROM parameter_adjustments
                 ORDER BY timestamp DESC
                 LIMIT 1
             """)
             
-            result = cursor.fetchone()
-            conn.close()
-            
             if result:
                 # Parse stored JSON parameters
                 import json
@@ -125,22 +139,8 @@ class ParameterLearner:
         try:
             import json
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Create table if not exists
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS parameter_adjustments (
-                    id INTEGER PRIMARY KEY,
-                    timestamp TEXT NOT NULL,
-                    parameter_name TEXT NOT NULL,
-                    parameter_value TEXT NOT NULL,
-                    changes_log TEXT NOT NULL
-                )
-            """)
-            
             # Insert adjustment record
-            cursor.execute("""
+            self.store.execute("""
                 INSERT INTO parameter_adjustments (timestamp, parameter_name, parameter_value, changes_log)
                 VALUES (?, ?, ?, ?)
             """, (
@@ -150,9 +150,6 @@ class ParameterLearner:
                 '|'.join(changes)
             ))
             
-            conn.commit()
-            conn.close()
-            
             print(f"✅ Parameters adjusted: {len(changes)} changes")
             for change in changes:
                 print(f"   - {change}")
@@ -163,10 +160,7 @@ class ParameterLearner:
     def get_parameter_history(self, limit: int = 10) -> List[Dict]:
         """Retrieve history of parameter adjustments."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
+            rows = self.store.query("""
                 SELECT timestamp, parameter_name, parameter_value, changes_log
                 FROM parameter_adjustments
                 ORDER BY timestamp DESC
@@ -174,7 +168,7 @@ class ParameterLearner:
             """, (limit,))
             
             history = []
-            for row in cursor.fetchall():
+            for row in rows:
                 history.append({
                     'timestamp': row[0],
                     'parameter_name': row[1],
@@ -182,7 +176,6 @@ class ParameterLearner:
                     'changes_log': row[3]
                 })
             
-            conn.close()
             return history
             
         except Exception as e:
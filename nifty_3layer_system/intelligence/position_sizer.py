@@ -3,10 +3,11 @@ Position sizer - enforces capital preservation rules.
 Ensures no more than 2 trades/day and max daily loss of 900 rupees.
 """
 
-import sqlite3
 from datetime import datetime, timedelta
 from typing import Dict, Tuple
 
+from integrations.storage import get_store
+
 
 class PositionSizer:
     """Manages position sizing and capital preservation."""
@@ -23,6 +24,7 @@ class PositionSizer:
         self.max_sl_points = max_daily_loss / self.risk_per_point  # 14 points
         self.max_trades_per_day = 2
         self.db_path = db_path
+        self.store = get_store(db_path)
     
     def get_today_loss(self) -> Tuple[float, int]:
         """
@@ -32,13 +34,10 @@ class PositionSizer:
             (total_loss, trade_count)
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             today = datetime.now().date()
             
             # Sum actual losses from closed trades
-            cursor.execute("""
+            result = self.store.query_one("""
                 SELECT 
                     COUNT(*) as trade_count,
                     COALESCE(SUM(CASE WHEN sl_hit = 1 THEN risk_points * ? ELSE 0 END), 0) as total_loss
@@ -47,9 +46,6 @@ class PositionSizer:
                 AND (target_hit = 1 OR sl_hit = 1)
             """, (self.risk_per_point, today.isoformat()))
             
-            result = cursor.fetchone()
-            conn.close()
-            
             if result:
                 return (float(result[1]), result[0])
             return (0.0, 0)
@@ -4,6 +4,8 @@ Fetches levels, applies real-time filters, and sends alerts to Telegram
 All failures analyzed and parameters auto-tuned
 """
 import time
+_IMPORT_STARTED = time.perf_counter()  # startup report baseline
+
 import sys
 import asyncio
 import json
@@ -23,8 +25,10 @@ from intelligence.entry_quality_filter import EntryQualityFilter
 from intelligence.failure_analyzer import FailureAnalyzer
 from intelligence.parameter_learner import ParameterLearner
 from intelligence.position_sizer import PositionSizer
-from dhan_api_client import DhanAPIClient
 from telegram_notifier import TelegramNotifier
+from integrations.startup import LazyComponent, StartupReport, start_warmup_thread
+from integrations.premarket import PreMarketWarmer
+from config.instrument_config import InstrumentManager
 from loguru import logger
 
 # Configure logging
@@ -34,6 +38,8 @@ logger.add(sys.stdout, format="<level>{message}</level>", level="INFO")
 # IST Timezone
 IST = pytz.timezone('Asia/Kolkata')
 
+STARTUP = StartupReport("levels_monitor", started_at=_IMPORT_STARTED)
+
 
 def is_market_hours():
     """Check if current time is during market hours (9:15 AM - 3:30 PM IST)"""
@@ -51,19 +57,56 @@ def is_market_hours():
 def display_levels_loop():
     """Continuously fetch levels with all filters applied"""
     
-    # Initialize all components
-    generator = TradingLevelsGenerator()
-    extractor = DataExtractor()
-    option_fetcher = RealTimeOptionFetcher()
+    # Initialize all components (built on first use or by the warm-up thread below)
+    generator = LazyComponent("generator", TradingLevelsGenerator, STARTUP)
+    extractor = LazyComponent("extractor", DataExtractor, STARTUP)
+    # OI change on quotes is measured against the pre-market chain snapshot
+    option_fetcher = LazyComponent(
+        "option_fetcher",
+        lambda: RealTimeOptionFetcher(opening_chain=lambda symbol, expiry: premarket.opening_chain(symbol, expiry)),
+        STARTUP,
+    )
     
     # Initialize tracking & analysis
-    tracker = LevelTracker()  # Uses trading_metrics.db
+    tracker = LazyComponent("tracker", LevelTracker, STARTUP)  # Uses trading_metrics.db
     trend_analyzer = TrendAnalyzer()
     entry_filter = EntryQualityFilter()
     failure_analyzer = FailureAnalyzer()
     parameter_learner = ParameterLearner()
     position_sizer = PositionSizer()
     
+    # Model load + dummy inference and the API/DB clients warm up while the
+    # loop starts (usually while it waits for the market to open)
+    start_warmup_thread(STARTUP, {
+        "generator": lambda: generator.predictor.warm_up(),
+        "extractor": extractor.get,
+        "option_fetcher": option_fetcher.get,
+        "tracker": tracker.get,
+    })
+    
+    def warm_candles(symbol: str):
+        # Same cache key as the loop's fetch_historical_data(days=5), held until the open
+        inst = InstrumentManager.get_instrument(symbol)
+        return extractor.client.get_historical_candles(
+            security_id=inst.security_id,
+            exchange_segment=inst.exchange_segment,
+            instrument=inst.instrument_type,
+            interval=5,
+            days=5,
+            cache_ttl=premarket.cache_ttl,
+        )
+    
+    # Before each session: expiries (cached for the day) + chain snapshot on the
+    # option fetcher's client, a candle fetch and a model warm-up
+    premarket = PreMarketWarmer(
+        LazyComponent("option_client", lambda: option_fetcher.client),
+        candles=warm_candles,
+        candle_symbols=["NIFTY"],
+        inference={"generator": lambda: generator.predictor.warm_up()},
+        instruments=["NIFTY"],
+    )
+    premarket.start_thread()
+    
     # Initialize Telegram
     from telegram_config import BOT_TOKEN, CHAT_ID
     telegram = TelegramNotifier(BOT_TOKEN, CHAT_ID)
@@ -74,6 +117,7 @@ def display_levels_loop():
     logger.info("🤖 Real-time Filters: Trend + Entry Quality + Failure Detection + Parameter Learning")
     logger.info("💰 Capital Protection: ₹15K budget, ₹900 daily loss limit, 2 max trades/day")
     logger.info("Press Ctrl+C to stop\n")
+    STARTUP.mark("loop_started")
     
     iteration = 0
     
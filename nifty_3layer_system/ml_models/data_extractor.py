@@ -13,6 +13,8 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from integrations.dhan_client import DhanAPIClient, DhanConfig
+from integrations.feed_gateway import create_rest_client
+from ml_models.label_cube import build_label_cube
 from loguru import logger
 
 
@@ -20,7 +22,7 @@ class DataExtractor:
     """Extract and prepare historical data for ML training"""
     
     def __init__(self):
-        self.client = DhanAPIClient()
+        self.client = create_rest_client()  # via the feed gateway when one is running
         self.nifty_security_id = "13"  # NIFTY 50 index (correct Dhan API ID)
         self.exchange_segment = "IDX_I"
         self.instrument = "OPTIDX"
@@ -54,7 +56,8 @@ class DataExtractor:
             logger.error(f"Failed to fetch data: {e}")
             raise
     
-    def create_labels(self, df: pd.DataFrame, horizon_minutes: int = 15, min_profit_points: float = 5.0) -> pd.DataFrame:
+    @staticmethod
+    def create_labels(df: pd.DataFrame, horizon_minutes: int = 15, min_profit_points: float = 5.0) -> pd.DataFrame:
         """
         Create training labels: +1 if profitable 5+ point move in next 15min, -1 if not
         
@@ -76,33 +79,30 @@ class DataExtractor:
         # Calculate future window (3 candles ahead for 15min)
         candles_ahead = horizon_minutes // 5
         
-        # Get future high/low/close for next N candles
-        df['future_high'] = df['high'].shift(-1).rolling(window=candles_ahead).max()
-        df['future_low'] = df['low'].shift(-1).rolling(window=candles_ahead).min()
-        df['future_close'] = df['close'].shift(-candles_ahead)
-        
-        # Calculate maximum move in both directions within the window
-        df['max_upside'] = df['future_high'] - df['close']
-        df['max_downside'] = df['close'] - df['future_low']
-        
-        # Determine if there's a profitable move (5+ points in either direction)
-        # Label = 1 if profitable opportunity exists, -1 if choppy/no clear move
+        # Future max move in both directions over the next N candles (one
+        # strided pass; the caller's frame is left untouched)
+        cube = build_label_cube(df, (horizon_minutes,), (min_profit_points,))
+        moves = cube.moves(horizon_minutes)
+        
+        df = df.copy()
+        df['future_high'] = df['close'] + moves['max_upside']
+        df['future_low'] = df['close'] - moves['max_downside']
+        df['future_close'] = df['close'] + moves['close_return']
+        df['max_upside'] = moves['max_upside']
+        df['max_downside'] = moves['max_downside']
         df['has_upside_move'] = df['max_upside'] >= min_profit_points
         df['has_downside_move'] = df['max_downside'] >= min_profit_points
         
         # Target: 1 if profitable move exists (UP or DOWN), -1 if choppy
         # Priority: If both directions move 5+, choose the bigger one
-        df['target'] = np.where(
-            (df['has_upside_move']) | (df['has_downside_move']),
-            np.where(df['max_upside'] > df['max_downside'], 1, -1),
-            0  # No clear move = neutral (will be filtered later)
-        )
+        # (0 = no clear move = neutral, filtered below)
+        df['target'] = cube.target(horizon_minutes, min_profit_points)
         
         # Calculate actual profit potential (for analysis)
         df['profit_potential'] = np.maximum(df['max_upside'], df['max_downside'])
         
         # Drop rows without future data (last candles_ahead rows)
-        df_labeled = df[:-candles_ahead].copy()
+        df_labeled = df[:-candles_ahead]
         
         # Filter out neutral/choppy moves (target = 0)
         df_labeled = df_labeled[df_labeled['target'] != 0].copy()
@@ -14,6 +14,7 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent))
 
 from indicators.technical import TechnicalIndicators
+from integrations.telemetry import FEATURE_GENERATION
 
 
 class FeatureEngineer:
@@ -334,6 +335,7 @@ class FeatureEngineer:
         # logger.info("✓ Options-derived features calculated")
         return df
     
+    @FEATURE_GENERATION.timed()
     def generate_all_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Generate complete feature set"""
         # logger.info("="*70)
@@ -0,0 +1,521 @@
+"""
+HYPERPARAMETER SEARCH: Random / successive-halving search for the direction model
+- Searches XGBoost parameters together with the label definition
+  (create_labels' horizon_minutes and min_profit_points)
+- Features are generated once and the labels of every label setting in one
+  label-cube pass; the feature matrix is shared with the worker processes
+  through shared memory
+- Each trial trains on the older part of the data and early-stops on a
+  time-ordered validation fold (purged by the label horizon); trials run
+  concurrently in a process pool
+- Successive halving: every trial gets a small boosting-round budget, the
+  best 1/eta are re-run with eta x the budget, until max_rounds
+- Trials are ranked by validation AUC, which does not depend on the class
+  balance of the label setting
+- Searches, sampled trials and results live in SQLite, so an interrupted
+  search resumes where it stopped and searches can be compared
+
+CLI (from nifty_3layer_system/):
+    python -m ml_models.hyperparameter_search run --csv candles.csv [--trials 27]
+    python -m ml_models.hyperparameter_search run --synthetic 18750
+    python -m ml_models.hyperparameter_search resume <search_id> --csv candles.csv
+    python -m ml_models.hyperparameter_search list
+    python -m ml_models.hyperparameter_search show <search_id>
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import xgboost as xgb
+from sklearn.metrics import accuracy_score
+
+from ml_models.feature_engineer import FeatureEngineer
+from ml_models.label_cube import build_label_cube
+from ml_models.model_trainer import ModelTrainer
+from ml_models.walk_forward import MAX_BIN, SharedMatrix, attach, booster_params
+
+DB_PATH = Path(__file__).parent.parent / "data" / "hyperparameter_search.db"
+LABEL_PARAMS = ('horizon_minutes', 'min_profit_points')
+
+# name: (kind, low, high) for int/float/log, (kind, choices) for choice
+SEARCH_SPACE: Dict[str, Tuple] = {
+    'max_depth': ('int', 3, 10),
+    'learning_rate': ('log', 0.01, 0.3),
+    'subsample': ('float', 0.5, 1.0),
+    'colsample_bytree': ('float', 0.5, 1.0),
+    'min_child_weight': ('int', 1, 10),
+    'gamma': ('float', 0.0, 1.0),
+    'horizon_minutes': ('choice', [10, 15, 20, 30]),
+    'min_profit_points': ('choice', [3.0, 5.0, 8.0, 10.0]),
+}
+
+
+def sample_params(space: Dict[str, Tuple], rng: np.random.Generator) -> Dict[str, Any]:
+    """One random point of ``space``"""
+    params = {}
+    for name, spec in space.items():
+        kind = spec[0]
+        if kind == 'int':
+            params[name] = int(rng.integers(spec[1], spec[2] + 1))
+        elif kind == 'float':
+            params[name] = round(float(rng.uniform(spec[1], spec[2])), 4)
+        elif kind == 'log':
+            params[name] = round(float(np.exp(rng.uniform(np.log(spec[1]), np.log(spec[2])))), 5)
+        elif kind == 'choice':
+            params[name] = spec[1][int(rng.integers(len(spec[1])))]
+        else:
+            raise ValueError(f"Unknown search space kind for {name}: {kind}")
+    return params
+
+
+def halving_budgets(min_rounds: int, max_rounds: int, eta: int) -> List[int]:
+    """Boosting-round budget of each rung: min_rounds * eta**k, capped at max_rounds"""
+    budgets = [min_rounds]
+    while budgets[-1] < max_rounds:
+        budgets.append(min(budgets[-1] * eta, max_rounds))
+    return budgets
+
+
+class SearchStore:
+    """
+    SQLite persistence for searches, their sampled trials and per-rung results
+
+    Args:
+        db_path: Database file (default: data/hyperparameter_search.db)
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = Path(db_path or DB_PATH)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._initialize_database()
+
+    @contextmanager
+    def _connect(self):
+        """Connection that commits on success and is always closed"""
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _initialize_database(self):
+        with self._connect() as conn:
+            conn.executescript("""
+            CREATE TABLE IF NOT EXISTS searches (
+                search_id TEXT PRIMARY KEY,
+                created_at TEXT NOT NULL,
+                strategy TEXT NOT NULL,
+                config TEXT NOT NULL,
+                status TEXT NOT NULL,
+                best_trial INTEGER,
+                best_score REAL,
+                finished_at TEXT
+            );
+            CREATE TABLE IF NOT EXISTS search_trials (
+                search_id TEXT NOT NULL,
+                trial_id INTEGER NOT NULL,
+                params TEXT NOT NULL,
+                PRIMARY KEY (search_id, trial_id)
+            );
+            CREATE TABLE IF NOT EXISTS trial_results (
+                search_id TEXT NOT NULL,
+                trial_id INTEGER NOT NULL,
+                rung INTEGER NOT NULL,
+                budget INTEGER NOT NULL,
+                score REAL,
+                best_iteration INTEGER,
+                accuracy REAL,
+                logloss REAL,
+                train_rows INTEGER,
+                valid_rows INTEGER,
+                seconds REAL,
+                error TEXT,
+                finished_at TEXT NOT NULL,
+                PRIMARY KEY (search_id, trial_id, rung)
+            );
+            """)
+
+    def create_search(self, search_id: str, strategy: str, config: Dict[str, Any],
+                      trials: List[Dict[str, Any]]):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO searches (search_id, created_at, strategy, config, status) VALUES (?, ?, ?, ?, 'running')",
+                (search_id, datetime.now().isoformat(timespec='seconds'), strategy, json.dumps(config)))
+            conn.executemany(
+                "INSERT INTO search_trials (search_id, trial_id, params) VALUES (?, ?, ?)",
+                [(search_id, i, json.dumps(params)) for i, params in enumerate(trials)])
+
+    def get_search(self, search_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM searches WHERE search_id = ?", (search_id,)).fetchone()
+        if row is None:
+            return None
+        search = dict(row)
+        search['config'] = json.loads(search['config'])
+        return search
+
+    def trials(self, search_id: str) -> Dict[int, Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT trial_id, params FROM search_trials WHERE search_id = ? ORDER BY trial_id",
+                                (search_id,)).fetchall()
+        return {row['trial_id']: json.loads(row['params']) for row in rows}
+
+    def record(self, search_id: str, trial_id: int, rung: int, budget: int, result: Dict[str, Any]):
+        with self._connect() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO trial_results
+                (search_id, trial_id, rung, budget, score, best_iteration, accuracy, logloss,
+                 train_rows, valid_rows, seconds, error, finished_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (search_id, trial_id, rung, budget, result.get('score'), result.get('best_iteration'),
+                  result.get('accuracy'), result.get('logloss'), result.get('train_rows'),
+                  result.get('valid_rows'), result.get('seconds'), result.get('error'),
+                  datetime.now().isoformat(timespec='seconds')))
+
+    def results(self, search_id: str, rung: Optional[int] = None) -> pd.DataFrame:
+        """Trial results joined with their params (one column per parameter)"""
+        query = """
+            SELECT r.*, t.params FROM trial_results r
+            JOIN search_trials t ON t.search_id = r.search_id AND t.trial_id = r.trial_id
+            WHERE r.search_id = ?
+        """
+        args: Tuple = (search_id,)
+        if rung is not None:
+            query += " AND r.rung = ?"
+            args += (rung,)
+        with self._connect() as conn:
+            df = pd.read_sql_query(query + " ORDER BY r.rung, r.score DESC", conn, params=args)
+        if df.empty:
+            return df
+        params = pd.DataFrame([json.loads(p) for p in df.pop('params')], index=df.index)
+        return pd.concat([df, params], axis=1)
+
+    def finish(self, search_id: str, best_trial: Optional[int], best_score: Optional[float]):
+        with self._connect() as conn:
+            conn.execute("""
+                UPDATE searches SET status = 'finished', best_trial = ?, best_score = ?, finished_at = ?
+                WHERE search_id = ?
+            """, (best_trial, best_score, datetime.now().isoformat(timespec='seconds'), search_id))
+
+    def searches(self) -> pd.DataFrame:
+        with self._connect() as conn:
+            return pd.read_sql_query("""
+                SELECT s.search_id, s.created_at, s.strategy, s.status, s.best_trial, s.best_score,
+                       COUNT(DISTINCT t.trial_id) AS trials, COUNT(r.trial_id) AS results
+                FROM searches s
+                LEFT JOIN search_trials t ON t.search_id = s.search_id
+                LEFT JOIN trial_results r ON r.search_id = t.search_id AND r.trial_id = t.trial_id
+                GROUP BY s.search_id ORDER BY s.created_at
+            """, conn)
+
+
+# ---------------------------------------------------------------------- worker side
+
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(x_spec, base_params: Dict[str, Any], valid_fraction: float, early_stopping_rounds: int):
+    x_shm, X = attach(x_spec)
+    _WORKER.update(shm=x_shm, X=X, base=base_params, valid_fraction=valid_fraction,
+                   early_stopping_rounds=early_stopping_rounds, matrices={})
+
+
+def _matrices(label_key: Tuple, labels: np.ndarray, gap: int):
+    """Quantized train/validation matrices for one label setting (cached per worker)"""
+    cached = _WORKER["matrices"].get(label_key)
+    if cached is not None:
+        return cached
+
+    X = _WORKER["X"]
+    positions = np.flatnonzero(labels != 0)
+    valid_start = positions[int(len(positions) * (1 - _WORKER["valid_fraction"]))]
+    train_rows = positions[positions < valid_start - gap]
+    valid_rows = positions[positions >= valid_start]
+    y = (labels == 1).astype(np.float32)
+
+    dtrain = xgb.QuantileDMatrix(X[train_rows], y[train_rows], max_bin=MAX_BIN)
+    dvalid = xgb.QuantileDMatrix(X[valid_rows], y[valid_rows], ref=dtrain)
+    cached = (dtrain, dvalid, y[valid_rows])
+    _WORKER["matrices"][label_key] = cached
+    return cached
+
+
+def _run_trial(trial_id: int, params: Dict[str, Any], labels: np.ndarray, budget: int) -> Dict[str, Any]:
+    start = time.perf_counter()
+    try:
+        gap = int(params['horizon_minutes']) // 5
+        label_key = tuple(params[name] for name in LABEL_PARAMS)
+        dtrain, dvalid, y_valid = _matrices(label_key, labels, gap)
+
+        model_params = {k: v for k, v in params.items() if k not in LABEL_PARAMS}
+        train_params = {**_WORKER["base"], **booster_params(model_params), 'eval_metric': ['logloss', 'auc']}
+        evals_result: Dict[str, Any] = {}
+        # Early stopping watches the last eval metric (AUC)
+        booster = xgb.train(train_params, dtrain, num_boost_round=budget, evals=[(dvalid, 'valid')],
+                            early_stopping_rounds=_WORKER["early_stopping_rounds"],
+                            evals_result=evals_result, verbose_eval=False)
+
+        best = booster.best_iteration
+        p_up = booster.predict(dvalid, iteration_range=(0, best + 1))
+        return {
+            'trial_id': trial_id,
+            'score': float(evals_result['valid']['auc'][best]),
+            'logloss': float(evals_result['valid']['logloss'][best]),
+            'accuracy': float(accuracy_score(y_valid, p_up > 0.5)),
+            'best_iteration': int(best),
+            'train_rows': int(dtrain.num_row()),
+            'valid_rows': int(dvalid.num_row()),
+            'seconds': round(time.perf_counter() - start, 3),
+        }
+    except Exception as e:
+        return {'trial_id': trial_id, 'error': str(e), 'seconds': round(time.perf_counter() - start, 3)}
+
+
+# ---------------------------------------------------------------------- driver
+
+def _choices(space: Dict[str, Tuple], name: str, default) -> List:
+    spec = space.get(name)
+    return list(spec[1]) if spec and spec[0] == 'choice' else [default]
+
+
+class HyperparameterSearch:
+    """
+    Search over SEARCH_SPACE on one candle history
+
+    Args:
+        candles: 5-min OHLCV candles, time-ordered
+        store: SearchStore (default: data/hyperparameter_search.db)
+        space: Search space (default: SEARCH_SPACE)
+        valid_fraction: Newest share of labeled rows used for early stopping
+        early_stopping_rounds: Rounds without validation AUC improvement
+        workers: Worker processes (default: one per CPU)
+    """
+
+    def __init__(
+        self,
+        candles: pd.DataFrame,
+        store: Optional[SearchStore] = None,
+        space: Optional[Dict[str, Tuple]] = None,
+        valid_fraction: float = 0.2,
+        early_stopping_rounds: int = 25,
+        workers: Optional[int] = None,
+    ):
+        self.candles = candles
+        self.store = store or SearchStore()
+        self.space = space or SEARCH_SPACE
+        self.valid_fraction = valid_fraction
+        self.early_stopping_rounds = early_stopping_rounds
+        self.workers = workers or os.cpu_count() or 1
+
+        self.fe = FeatureEngineer()
+        self.features = self.fe.generate_all_features(candles)
+        self.feature_cols = self.fe.get_feature_columns()
+        self._labels: Dict[Tuple, np.ndarray] = {}
+        # Every label setting of the space in one pass
+        self.cube = build_label_cube(candles, _choices(self.space, 'horizon_minutes', 15),
+                                     _choices(self.space, 'min_profit_points', 5.0))
+
+    def labels(self, horizon_minutes: int, min_profit_points: float) -> np.ndarray:
+        """create_labels() target aligned to the feature rows (0 = unlabeled/choppy)"""
+        key = (horizon_minutes, min_profit_points)
+        if key not in self._labels:
+            try:
+                target = self.cube.target(horizon_minutes, min_profit_points)
+            except KeyError:  # value outside the space's choices
+                target = build_label_cube(self.candles, (horizon_minutes,), (min_profit_points,)).target(
+                    horizon_minutes, min_profit_points)
+            self._labels[key] = target.reindex(self.features.index).fillna(0).to_numpy(np.int8)
+        return self._labels[key]
+
+    def run(
+        self,
+        search_id: Optional[str] = None,
+        n_trials: int = 27,
+        strategy: str = 'halving',
+        min_rounds: int = 50,
+        max_rounds: int = 800,
+        eta: int = 3,
+        seed: int = 42,
+    ) -> str:
+        """
+        Run a new search, or resume ``search_id`` if it is already in the store
+
+        Args:
+            search_id: Id for a new search (default: timestamp) or one to resume
+            n_trials: Sampled configurations
+            strategy: 'halving' (successive halving) or 'random' (every trial at max_rounds)
+            min_rounds / max_rounds: Boosting-round budget of the first / last rung
+            eta: Halving rate (keep the best 1/eta per rung)
+            seed: Sampling seed
+
+        Returns:
+            Search id (results via store.results() / best_params())
+        """
+        search = self.store.get_search(search_id) if search_id else None
+        if search is None:
+            if strategy not in ('halving', 'random'):
+                raise ValueError(f"Unknown search strategy: {strategy}")
+            search_id = search_id or datetime.now().strftime("s%Y%m%d_%H%M%S")
+            rng = np.random.default_rng(seed)
+            config = {'n_trials': n_trials, 'min_rounds': min_rounds, 'max_rounds': max_rounds, 'eta': eta,
+                      'seed': seed, 'valid_fraction': self.valid_fraction,
+                      'early_stopping_rounds': self.early_stopping_rounds, 'space': self.space,
+                      'rows': len(self.features), 'start': str(self.features.index[0]),
+                      'end': str(self.features.index[-1])}
+            self.store.create_search(search_id, strategy, config,
+                                     [sample_params(self.space, rng) for _ in range(n_trials)])
+            logger.info(f"Search {search_id}: {n_trials} trials ({strategy})")
+        else:
+            strategy, config = search['strategy'], search['config']
+            logger.info(f"Resuming search {search_id} ({strategy})")
+
+        trials = self.store.trials(search_id)
+        budgets = ([config['max_rounds']] if strategy == 'random'
+                   else halving_budgets(config['min_rounds'], config['max_rounds'], config['eta']))
+
+        base = {k: v for k, v in booster_params(ModelTrainer.PARAMS).items() if k != 'eval_metric'}
+        base['nthread'] = max(1, (os.cpu_count() or 1) // self.workers)
+        shared = SharedMatrix(self.features[self.feature_cols].to_numpy(dtype=np.float32))
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(shared.spec, base, config['valid_fraction'], config['early_stopping_rounds']),
+            ) as pool:
+                active = sorted(trials)
+                for rung, budget in enumerate(budgets):
+                    active = self._run_rung(pool, search_id, trials, active, rung, budget)
+                    if rung < len(budgets) - 1:
+                        active = active[:max(1, len(active) // config['eta'])]
+        finally:
+            shared.close()
+
+        final = self.store.results(search_id, rung=len(budgets) - 1).dropna(subset=['score'])
+        best = final.iloc[0] if not final.empty else None
+        self.store.finish(search_id, int(best['trial_id']) if best is not None else None,
+                          float(best['score']) if best is not None else None)
+        if best is not None:
+            logger.info(f"✓ Search {search_id}: best trial {int(best['trial_id'])} | "
+                        f"AUC {best['score']:.4f} | accuracy {best['accuracy']*100:.2f}%")
+        return search_id
+
+    def _run_rung(self, pool, search_id: str, trials: Dict[int, Dict[str, Any]],
+                  active: List[int], rung: int, budget: int) -> List[int]:
+        """Run the rung's unfinished trials; return ``active`` ranked by score (best first)"""
+        done = self.store.results(search_id, rung=rung)
+        done_ids = set(done['trial_id']) if not done.empty else set()
+        pending = [t for t in active if t not in done_ids]
+        logger.info(f"Rung {rung}: {len(active)} trials at {budget} rounds ({len(pending)} to run)")
+
+        futures = []
+        for trial_id in pending:
+            params = trials[trial_id]
+            labels = self.labels(params['horizon_minutes'], params['min_profit_points'])
+            futures.append(pool.submit(_run_trial, trial_id, params, labels, budget))
+        for future in as_completed(futures):
+            result = future.result()
+            self.store.record(search_id, result['trial_id'], rung, budget, result)
+            if result.get('error'):
+                logger.warning(f"  Trial {result['trial_id']} failed: {result['error']}")
+            else:
+                logger.info(f"  Trial {result['trial_id']:3d} | AUC {result['score']:.4f} | "
+                            f"best iteration {result['best_iteration']} | {result['seconds']:.1f}s")
+
+        scores = self.store.results(search_id, rung=rung).set_index('trial_id')['score']
+        ranked = scores.reindex(active).fillna(-np.inf).sort_values(ascending=False, kind='stable')
+        return [int(t) for t in ranked.index]
+
+    def best_params(self, search_id: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """(ModelTrainer params, create_labels kwargs) of the search's best trial"""
+        return best_params(self.store, search_id)
+
+
+def best_params(store: SearchStore, search_id: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Best trial of a finished search, split for ModelTrainer(params=...) and
+    DataExtractor.create_labels(**label_kwargs); n_estimators is the trial's
+    early-stopped round count
+    """
+    search = store.get_search(search_id)
+    if search is None or search['best_trial'] is None:
+        raise ValueError(f"Search {search_id} has no finished best trial")
+    params = dict(store.trials(search_id)[search['best_trial']])
+    results = store.results(search_id)
+    best = results[results['trial_id'] == search['best_trial']].sort_values('rung').iloc[-1]
+    label_kwargs = {name: params.pop(name) for name in LABEL_PARAMS}
+    params['n_estimators'] = int(best['best_iteration']) + 1
+    return params, label_kwargs
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Hyperparameter search for the direction model")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("run", "resume"):
+        cmd = sub.add_parser(name)
+        if name == "resume":
+            cmd.add_argument("search_id")
+        source = cmd.add_mutually_exclusive_group(required=True)
+        source.add_argument("--csv", help="5-min OHLCV CSV (timestamp index)")
+        source.add_argument("--synthetic", type=int, help="Random-walk bars instead of real candles")
+        cmd.add_argument("--workers", type=int, default=None)
+        if name == "run":
+            cmd.add_argument("--trials", type=int, default=27)
+            cmd.add_argument("--strategy", choices=("halving", "random"), default="halving")
+            cmd.add_argument("--min-rounds", type=int, default=50)
+            cmd.add_argument("--max-rounds", type=int, default=800)
+            cmd.add_argument("--eta", type=int, default=3)
+            cmd.add_argument("--seed", type=int, default=42)
+    sub.add_parser("list")
+    show = sub.add_parser("show")
+    show.add_argument("search_id")
+    args = parser.parse_args()
+
+    store = SearchStore()
+    if args.command == "list":
+        print(store.searches().to_string(index=False))
+        return
+    if args.command == "show":
+        columns = ['trial_id', 'rung', 'budget', 'score', 'accuracy', 'best_iteration', *SEARCH_SPACE]
+        results = store.results(args.search_id)
+        print(results[[c for c in columns if c in results]].to_string(index=False))
+        return
+
+    if args.csv:
+        candles = pd.read_csv(args.csv, index_col=0, parse_dates=True)
+    else:
+        from ml_models.live_predictor import synthetic_candles
+        candles = synthetic_candles(args.synthetic, seed=3)
+
+    search = HyperparameterSearch(candles, store=store, workers=args.workers)
+    start = time.perf_counter()
+    if args.command == "resume":
+        search_id = search.run(search_id=args.search_id)
+    else:
+        search_id = search.run(n_trials=args.trials, strategy=args.strategy, min_rounds=args.min_rounds,
+                               max_rounds=args.max_rounds, eta=args.eta, seed=args.seed)
+    params, label_kwargs = search.best_params(search_id)
+    print(f"{search_id} finished in {time.perf_counter() - start:.1f}s")
+    print(f"Best params: {params}")
+    print(f"Best labels: {label_kwargs}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+INCREMENTAL UPDATE: Daily model updates without refetching or retraining history
+- FeatureStore keeps a bounded window of candles and their engineered
+  features on disk; each update appends only the new bars (features are
+  computed over a short warm-up tail plus the new bars)
+- Each update fetches from the store's last bar up to now, so a missed run
+  (weekend, outage) is backfilled; a gap longer than the API serves
+  rebuilds the window instead of computing indicators across the hole
+- Labels are recomputed over the window in one label-cube pass, so bars
+  whose future window completed since the last update become trainable
+- 'continue' mode boosts a few more rounds from the current booster on the
+  newly labeled rows; 'window' mode refits on the whole stored window (used
+  on the first run and once the tree count reaches its cap)
+- The newest session is held out: both the current and the candidate model
+  are scored on it for the promotion gate, and it is trained on the next day
+- Cost depends on the window length, not on the length of history
+
+Used by ModelRetrainingPipeline.run_incremental():
+    python -m ml_models.model_retraining_pipeline --incremental
+"""
+
+import os
+import sys
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
+
+from ml_models.label_cube import BAR_MINUTES, build_label_cube
+
+STORE_PATH = Path(__file__).parent.parent / "models" / "incremental" / "feature_store.pkl"
+
+
+class FeatureStore:
+    """
+    Rolling window of candles and engineered features
+
+    Args:
+        path: Pickle file (default: models/incremental/feature_store.pkl)
+        window_days: Calendar days of candles/features kept
+        warmup_bars: Candles before the new bars used to compute their indicators
+    """
+
+    def __init__(self, path: Optional[Path] = None, window_days: int = 60, warmup_bars: int = 400):
+        self.path = Path(path or STORE_PATH)
+        self.window = pd.Timedelta(days=window_days)
+        self.warmup_bars = warmup_bars
+        self.candles: Optional[pd.DataFrame] = None
+        self.features: Optional[pd.DataFrame] = None
+        self.trained_until: Optional[pd.Timestamp] = None  # last bar trained_version learned from
+        self.trained_version: Optional[str] = None  # registry version the cursor belongs to
+
+    @property
+    def empty(self) -> bool:
+        return self.candles is None or self.candles.empty
+
+    def load(self) -> "FeatureStore":
+        if self.path.exists():
+            state = pd.read_pickle(self.path)
+            self.candles = state['candles']
+            self.features = state['features']
+            self.trained_until = state['trained_until']
+            self.trained_version = state.get('trained_version')  # absent in older stores
+            logger.info(f"✓ Feature store: {len(self.features)} rows up to {self.candles.index[-1]}")
+        return self
+
+    def save(self):
+        """Write the store atomically (temp file + rename)"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.{uuid.uuid4().hex}.tmp")
+        pd.to_pickle({'candles': self.candles, 'features': self.features,
+                      'trained_until': self.trained_until, 'trained_version': self.trained_version}, tmp)
+        os.replace(tmp, self.path)
+
+    def reset(self):
+        """Drop the stored window (the next update refetches and refits it)"""
+        self.candles = self.features = self.trained_until = self.trained_version = None
+
+    def days_to_fetch(self, now: Optional[pd.Timestamp] = None) -> int:
+        """Calendar days of candles reaching back to the last stored bar's day"""
+        last = self.candles.index[-1]
+        now = now if now is not None else pd.Timestamp.now(tz=last.tz)
+        return (now.normalize() - last.normalize()).days + 1
+
+    def check_contiguous(self, candles: pd.DataFrame):
+        """Raise if fetched candles do not reach back to the last stored bar"""
+        if not self.empty and not candles.empty and candles.index[0] > self.candles.index[-1]:
+            raise ValueError(f"Fetched candles start at {candles.index[0]}, after the feature store's "
+                             f"last bar {self.candles.index[-1]}: the gap was not backfilled")
+
+    def append(self, candles: pd.DataFrame, engineer) -> int:
+        """
+        Add candles newer than the store's last bar and compute their features
+
+        Args:
+            candles: Recently fetched OHLCV (may overlap the stored bars)
+            engineer: FeatureEngineer
+
+        Returns:
+            Feature rows added
+        """
+        feature_cols = engineer.get_feature_columns()
+        if self.empty:
+            new = candles
+            history = candles.iloc[:0]
+        else:
+            new = candles[candles.index > self.candles.index[-1]]
+            history = self.candles.iloc[-self.warmup_bars:]
+        if new.empty:
+            return 0
+
+        computed = engineer.generate_all_features(pd.concat([history, new]))
+        added = computed.loc[computed.index.isin(new.index), feature_cols]
+
+        self.candles = pd.concat([c for c in (self.candles, new) if c is not None])
+        self.features = pd.concat([f for f in (self.features, added) if f is not None])
+
+        # Keep the window bounded
+        cutoff = self.candles.index[-1] - self.window
+        self.candles = self.candles[self.candles.index >= cutoff]
+        self.features = self.features[self.features.index >= cutoff]
+        return len(added)
+
+    def labels(self, horizon_minutes: int = 15, min_profit_points: float = 5.0) -> pd.Series:
+        """create_labels() target for every stored feature row (0 = choppy or future incomplete)"""
+        cube = build_label_cube(self.candles, (horizon_minutes,), (min_profit_points,))
+        return cube.target(horizon_minutes, min_profit_points).reindex(self.features.index).fillna(0)
+
+
+def split_update(
+    target: pd.Series,
+    trained_until: Optional[pd.Timestamp],
+    holdout_rows: int,
+    gap: int,
+) -> Tuple[pd.Index, pd.Index]:
+    """
+    Training and holdout rows of an update
+
+    The holdout is the newest ``holdout_rows`` labeled rows; training rows
+    are labeled rows after ``trained_until`` (all, if None) that end ``gap``
+    rows before the holdout, so no training label looks into it.
+
+    Returns:
+        (train index, holdout index)
+    """
+    labeled = target[target != 0]
+    holdout = labeled.index[-holdout_rows:]
+    if holdout.empty:
+        return labeled.index[:0], holdout
+    position = target.index.get_loc(holdout[0])
+    cutoff = target.index[max(position - gap, 0)]
+    train = labeled.index[labeled.index < cutoff]
+    if trained_until is not None:
+        train = train[train > trained_until]
+    return train, holdout
+
+
+def holdout_metrics(model, X: pd.DataFrame, y: np.ndarray) -> Dict[str, Any]:
+    """Metrics used by compare_performance (0/1 labels)"""
+    y_pred = model.predict(X)
+    f1 = float(f1_score(y, y_pred, zero_division=0))
+    return {
+        'accuracy': float(accuracy_score(y, y_pred)),
+        'precision': float(precision_score(y, y_pred, zero_division=0)),
+        'recall': float(recall_score(y, y_pred, zero_division=0)),
+        'f1': f1,
+        'f1_score': f1,
+        'test_samples': int(len(y)),
+    }
+
+
+def horizon_gap(horizon_minutes: int) -> int:
+    """Bars a label looks ahead"""
+    return max(horizon_minutes // BAR_MINUTES, 1)
@@ -0,0 +1,66 @@
+"""
+INFERENCE BENCHMARK: Single-row fast path vs XGBClassifier
+- Latency: per-call microseconds for the old predict + predict_proba pair on
+  a one-row DataFrame, predict_proba alone and the booster fast path
+- Batch: a year of 5-min bars through predict_batch() vs the per-bar loop
+
+Run (from nifty_3layer_system/):
+    python -m ml_models.inference_benchmark
+Parity with predict_proba / predict: tests/test_live_predictor.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from ml_models.live_predictor import LivePredictor, synthetic_candles
+
+
+def _per_call_us(fn, n: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main():
+    predictor = LivePredictor()
+    df_row = predictor.prepare_live_data(synthetic_candles(200))[predictor.feature_cols]
+    x = df_row.to_numpy(dtype=np.float32)
+    model = predictor.model
+    n = 2000
+
+    results = {
+        "predict + predict_proba (DataFrame)": _per_call_us(
+            lambda: (model.predict(df_row, validate_features=False),
+                     model.predict_proba(df_row, validate_features=False)), n // 4),
+        "predict_proba (DataFrame)": _per_call_us(
+            lambda: model.predict_proba(df_row, validate_features=False), n // 4),
+        "predict_up_probability (float32)": _per_call_us(
+            lambda: predictor.predict_up_probability(x), n),
+    }
+    baseline = next(iter(results.values()))
+    for name, us in results.items():
+        print(f"{name:<38}{us:>10.1f} µs/call  ({baseline / us:4.1f}x)")
+
+    # A year of 5-min bars (75 per session x 250 sessions)
+    year = synthetic_candles(75 * 250, seed=11)
+    start = time.perf_counter()
+    scored = predictor.predict_batch(year)
+    batch_s = time.perf_counter() - start
+
+    sample = 20
+    start = time.perf_counter()
+    for end in range(len(year) - sample, len(year)):
+        predictor.predict_direction(year.iloc[end - 300:end])  # 300-bar window per call
+    loop_s = (time.perf_counter() - start) / sample * len(scored)
+    print(f"{len(year)} bars: predict_batch {batch_s:.2f} s | per-bar loop ~{loop_s:.0f} s (estimated from {sample} calls)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+LABEL CUBE: Profitable-move labels for many horizons and thresholds in one pass
+- Future max-up (highest high of the next k bars - close), max-down
+  (close - lowest low of the next k bars) and close return for every
+  horizon, from one strided running max/min over the longest horizon
+- Labels for every (horizon, threshold) pair by broadcasting: +1 / -1 for the
+  bigger side of a move >= threshold, 0 for choppy bars and for bars
+  without a full future window (create_labels' rule)
+- The input frame is never modified; moves are (horizon, bar) float64
+  arrays and the labels one int8 tensor indexed [horizon, threshold, bar]
+
+Benchmark (from nifty_3layer_system/):
+    python -m ml_models.label_cube
+"""
+
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+BAR_MINUTES = 5
+
+
+@dataclass
+class LabelCube:
+    """
+    Future move statistics and labels for a grid of horizons x thresholds
+
+    Attributes:
+        index: Bar index of the source candles
+        horizons: Horizons in minutes
+        thresholds: Minimum profit points
+        max_upside / max_downside / close_return: (n_horizons, n_bars) float64,
+            NaN where the future window is incomplete
+        labels: (n_horizons, n_thresholds, n_bars) int8 in {-1, 0, +1}
+    """
+    index: pd.Index
+    horizons: np.ndarray
+    thresholds: np.ndarray
+    max_upside: np.ndarray
+    max_downside: np.ndarray
+    close_return: np.ndarray
+    labels: np.ndarray
+
+    def _position(self, values: np.ndarray, value: float, name: str) -> int:
+        matches = np.flatnonzero(np.isclose(values, value))
+        if not len(matches):
+            raise KeyError(f"{name} {value} is not in the cube ({values.tolist()})")
+        return int(matches[0])
+
+    def target(self, horizon_minutes: int, min_profit_points: float) -> pd.Series:
+        """Labels of one (horizon, threshold) pair as an int8 Series (0 = not labeled)"""
+        h = self._position(self.horizons, horizon_minutes, "Horizon")
+        t = self._position(self.thresholds, min_profit_points, "Threshold")
+        return pd.Series(self.labels[h, t], index=self.index, name='target')
+
+    def moves(self, horizon_minutes: int) -> pd.DataFrame:
+        """max_upside / max_downside / close_return of one horizon"""
+        h = self._position(self.horizons, horizon_minutes, "Horizon")
+        return pd.DataFrame({
+            'max_upside': self.max_upside[h],
+            'max_downside': self.max_downside[h],
+            'close_return': self.close_return[h],
+        }, index=self.index)
+
+    def summary(self) -> pd.DataFrame:
+        """Labeled / UP / DOWN counts for every (horizon, threshold) pair"""
+        up = (self.labels == 1).sum(axis=2)
+        down = (self.labels == -1).sum(axis=2)
+        grid = pd.MultiIndex.from_product([self.horizons, self.thresholds],
+                                          names=['horizon_minutes', 'min_profit_points'])
+        return pd.DataFrame({'labeled': (up + down).ravel(), 'up': up.ravel(), 'down': down.ravel()},
+                            index=grid)
+
+
+def _future_window(values: np.ndarray, max_bars: int) -> np.ndarray:
+    """(n_bars, max_bars) view of values[i+1 .. i+max_bars], NaN-padded past the end"""
+    padded = np.concatenate([values[1:], np.full(max_bars, np.nan, dtype=values.dtype)])
+    return sliding_window_view(padded, max_bars)[:len(values)]
+
+
+def build_label_cube(
+    df: pd.DataFrame,
+    horizons_minutes: Sequence[int] = (15,),
+    thresholds: Sequence[float] = (5.0,),
+    bar_minutes: int = BAR_MINUTES,
+) -> LabelCube:
+    """
+    Compute the label cube for ``df`` (OHLC candles, time-ordered)
+
+    Args:
+        df: Candles with high/low/close columns (not modified)
+        horizons_minutes: Prediction horizons; each must be >= one bar
+        thresholds: Minimum profit points for a move to count
+        bar_minutes: Candle interval
+
+    Returns:
+        LabelCube
+    """
+    horizons = np.asarray(sorted(set(horizons_minutes)), dtype=np.int64)
+    bars = horizons // bar_minutes
+    if (bars < 1).any():
+        raise ValueError(f"Horizons must be at least one {bar_minutes}-min bar: {horizons.tolist()}")
+    levels = np.asarray(sorted(set(thresholds)), dtype=np.float64)
+
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
+    close = df['close'].to_numpy(dtype=np.float64)
+    max_bars = int(bars.max())
+
+    # Running max/min along the window axis: column k-1 is the k-bar extreme.
+    # np.maximum/minimum propagate NaN, so incomplete windows stay NaN.
+    future_high = np.maximum.accumulate(_future_window(high, max_bars), axis=1)[:, bars - 1].T
+    future_low = np.minimum.accumulate(_future_window(low, max_bars), axis=1)[:, bars - 1].T
+    future_close = _future_window(close, max_bars)[:, bars - 1].T
+
+    max_upside = future_high - close
+    max_downside = close - future_low
+    close_return = future_close - close
+
+    up = max_upside[:, None, :]
+    down = max_downside[:, None, :]
+    threshold = levels[None, :, None]
+    with np.errstate(invalid='ignore'):
+        moved = (up >= threshold) | (down >= threshold)
+        labels = np.where(moved, np.where(up > down, 1, -1), 0).astype(np.int8)
+
+    return LabelCube(
+        index=df.index,
+        horizons=horizons,
+        thresholds=levels,
+        max_upside=max_upside,
+        max_downside=max_downside,
+        close_return=close_return,
+        labels=labels,
+    )
+
+
+def main():
+    import time
+
+    from ml_models.live_predictor import synthetic_candles
+
+    candles = synthetic_candles(18750, seed=3)
+    horizons = [5, 10, 15, 20, 30, 45, 60]
+    thresholds = [3.0, 5.0, 8.0, 10.0, 15.0, 20.0]
+
+    start = time.perf_counter()
+    cube = build_label_cube(candles, horizons, thresholds)
+    cube_seconds = time.perf_counter() - start
+
+    # The same grid one combination at a time (rolling max/min per horizon)
+    start = time.perf_counter()
+    for horizon in horizons:
+        k = horizon // BAR_MINUTES
+        future_high = candles['high'][::-1].rolling(k).max()[::-1].shift(-1)
+        future_low = candles['low'][::-1].rolling(k).min()[::-1].shift(-1)
+        for threshold in thresholds:
+            up = future_high - candles['close']
+            down = candles['close'] - future_low
+            expected = np.where((up >= threshold) | (down >= threshold), np.where(up > down, 1, -1), 0)
+            assert (cube.target(horizon, threshold).to_numpy() == expected).all(), (horizon, threshold)
+    loop_seconds = time.perf_counter() - start
+
+    print(f"{len(candles)} bars, {len(horizons)} horizons x {len(thresholds)} thresholds")
+    print(f"Label cube: {cube_seconds * 1000:.1f} ms | per-combination loop: {loop_seconds * 1000:.1f} ms "
+          f"(labels identical)")
+    print(f"Cube size: {cube.labels.nbytes / 1024:.0f} KiB labels + "
+          f"{3 * cube.max_upside.nbytes / 1024:.0f} KiB moves")
+    print(cube.summary().head(len(thresholds)).to_string())
+
+
+if __name__ == "__main__":
+    main()
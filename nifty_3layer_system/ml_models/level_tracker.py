@@ -1,72 +1,375 @@
 """
 Level Tracker - Track success/failure of generated trading levels
 Logs each signal and monitors whether target or SL hit first
+Outcomes of all pending signals are resolved in one vectorized pass
+(resolve_outcomes) and written in a single transaction
 """
 
-import sqlite3
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from loguru import logger
 import pytz
 
+from integrations.storage import add_column, get_store
+
 IST = pytz.timezone('Asia/Kolkata')
 
+LEVEL_SIGNALS_SQL = """
+CREATE TABLE IF NOT EXISTS level_signals (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    symbol TEXT,
+    direction TEXT NOT NULL,
+    action TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    
+    -- Price levels
+    current_price REAL NOT NULL,
+    entry_price REAL NOT NULL,
+    target_price REAL NOT NULL,
+    sl_price REAL NOT NULL,
+    
+    -- Risk metrics
+    atr REAL NOT NULL,
+    risk_points REAL NOT NULL,
+    reward_points REAL NOT NULL,
+    rr_ratio REAL NOT NULL,
+    
+    -- Context
+    market_hour INTEGER NOT NULL,
+    
+    -- Outcome (filled later)
+    outcome TEXT,
+    outcome_price REAL,
+    outcome_time TEXT,
+    duration_minutes INTEGER,
+    pnl_points REAL,
+    
+    -- Analysis
+    reason_for_sl TEXT,
+    market_volatility_at_exit REAL,
+    
+    UNIQUE(timestamp, direction)
+)
+"""
+
+# Hot queries: pending signals by time (check_outcomes, the signal book;
+# outcome IS NULL is an equality lookup) and resolved signals by outcome and time
+LEVEL_SIGNALS_INDEXES_SQL = """
+CREATE INDEX IF NOT EXISTS idx_level_signals_outcome_time
+    ON level_signals (outcome, timestamp);
+"""
+
+INSERT_SIGNAL_SQL = """
+INSERT OR IGNORE INTO level_signals (
+    timestamp, symbol, direction, action, confidence,
+    current_price, entry_price, target_price, sl_price,
+    atr, risk_points, reward_points, rr_ratio,
+    market_hour
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+UPDATE_OUTCOME_SQL = """
+UPDATE level_signals
+SET outcome = ?,
+    outcome_price = ?,
+    outcome_time = ?,
+    duration_minutes = ?,
+    pnl_points = ?,
+    reason_for_sl = ?
+WHERE id = ?
+"""
+
+# Rolling performance aggregates, maintained by triggers on level_signals so
+# every writer (LevelTracker, the webapp's OutcomeWriter) keeps them current.
+# One row per (day, symbol, hour, direction, outcome) bucket; stats queries
+# read a day range of buckets instead of the signals themselves.
+STATS_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS level_stats (
+    day TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    market_hour INTEGER NOT NULL,
+    direction TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    signals INTEGER NOT NULL,
+    pnl_sum REAL NOT NULL,
+    pnl_count INTEGER NOT NULL,
+    duration_sum REAL NOT NULL,
+    duration_count INTEGER NOT NULL,
+    PRIMARY KEY (day, symbol, market_hour, direction, outcome)
+);
+
+CREATE TABLE IF NOT EXISTS level_sl_reasons (
+    reason_for_sl TEXT PRIMARY KEY,
+    signals INTEGER NOT NULL,
+    confidence_sum REAL NOT NULL,
+    rr_sum REAL NOT NULL
+);
+"""
+
+# Add (sign=1) or remove (sign=-1) one signal row's contribution; {row} is NEW or OLD
+_STATS_DELTA_SQL = """
+INSERT INTO level_stats (day, symbol, market_hour, direction, outcome,
+                         signals, pnl_sum, pnl_count, duration_sum, duration_count)
+SELECT date({row}.timestamp), COALESCE({row}.symbol, ''), {row}.market_hour, {row}.direction, {row}.outcome,
+       {sign}, {sign} * COALESCE({row}.pnl_points, 0), {sign} * ({row}.pnl_points IS NOT NULL),
+       {sign} * COALESCE({row}.duration_minutes, 0), {sign} * ({row}.duration_minutes IS NOT NULL)
+WHERE {row}.outcome IS NOT NULL
+ON CONFLICT (day, symbol, market_hour, direction, outcome) DO UPDATE SET
+    signals = signals + excluded.signals,
+    pnl_sum = pnl_sum + excluded.pnl_sum,
+    pnl_count = pnl_count + excluded.pnl_count,
+    duration_sum = duration_sum + excluded.duration_sum,
+    duration_count = duration_count + excluded.duration_count;
+INSERT INTO level_sl_reasons (reason_for_sl, signals, confidence_sum, rr_sum)
+SELECT {row}.reason_for_sl, {sign}, {sign} * {row}.confidence, {sign} * {row}.rr_ratio
+WHERE {row}.outcome = 'SL' AND {row}.reason_for_sl IS NOT NULL
+ON CONFLICT (reason_for_sl) DO UPDATE SET
+    signals = signals + excluded.signals,
+    confidence_sum = confidence_sum + excluded.confidence_sum,
+    rr_sum = rr_sum + excluded.rr_sum;
+"""
+
+_PRUNE_STATS_SQL = """
+DELETE FROM level_stats WHERE day = date(OLD.timestamp) AND signals <= 0;
+DELETE FROM level_sl_reasons WHERE signals <= 0;
+"""
+
+STATS_TRIGGERS_SQL = f"""
+CREATE TRIGGER IF NOT EXISTS level_stats_insert AFTER INSERT ON level_signals
+WHEN NEW.outcome IS NOT NULL
+BEGIN
+{_STATS_DELTA_SQL.format(row='NEW', sign=1)}
+END;
+
+CREATE TRIGGER IF NOT EXISTS level_stats_update
+AFTER UPDATE OF timestamp, symbol, direction, confidence, rr_ratio, market_hour,
+                outcome, pnl_points, duration_minutes, reason_for_sl ON level_signals
+WHEN OLD.outcome IS NOT NULL OR NEW.outcome IS NOT NULL
+BEGIN
+{_STATS_DELTA_SQL.format(row='OLD', sign=-1)}
+{_STATS_DELTA_SQL.format(row='NEW', sign=1)}
+{_PRUNE_STATS_SQL}
+END;
+
+CREATE TRIGGER IF NOT EXISTS level_stats_delete AFTER DELETE ON level_signals
+WHEN OLD.outcome IS NOT NULL
+BEGIN
+{_STATS_DELTA_SQL.format(row='OLD', sign=-1)}
+{_PRUNE_STATS_SQL}
+END;
+"""
+
+REBUILD_STATS_SQL = """
+DELETE FROM level_stats;
+DELETE FROM level_sl_reasons;
+INSERT INTO level_stats (day, symbol, market_hour, direction, outcome,
+                         signals, pnl_sum, pnl_count, duration_sum, duration_count)
+SELECT date(timestamp), COALESCE(symbol, ''), market_hour, direction, outcome,
+       COUNT(*), COALESCE(SUM(pnl_points), 0), COUNT(pnl_points),
+       COALESCE(SUM(duration_minutes), 0), COUNT(duration_minutes)
+FROM level_signals
+WHERE outcome IS NOT NULL
+GROUP BY 1, 2, 3, 4, 5;
+INSERT INTO level_sl_reasons (reason_for_sl, signals, confidence_sum, rr_sum)
+SELECT reason_for_sl, COUNT(*), SUM(confidence), SUM(rr_ratio)
+FROM level_signals
+WHERE outcome = 'SL' AND reason_for_sl IS NOT NULL
+GROUP BY reason_for_sl;
+"""
+
+MIGRATIONS = [
+    ("level_signals_table", LEVEL_SIGNALS_SQL),
+    # Older databases were created before the symbol column existed
+    ("level_signals_symbol", add_column("level_signals", "symbol", "TEXT")),
+    ("level_stats_tables", STATS_SCHEMA_SQL + STATS_TRIGGERS_SQL + REBUILD_STATS_SQL),
+    ("level_signals_indexes", LEVEL_SIGNALS_INDEXES_SQL),
+]
+
+# Which level counts when target and SL are both inside the same candle
+# 'target_first' is the original _check_hit() order; 'nearest_open' picks the
+# level closer to the candle's open
+TIE_BREAKS = ('target_first', 'stop_first', 'nearest_open')
+
+# _analyze_sl_reason() checks, in reason-string order (bit i = SL_REASONS[i])
+SL_REASONS = (
+    "High volatility spike",
+    "Low confidence signal",
+    "Poor timing (outside prime hours)",
+    "Poor R:R ratio",
+)
+SL_REASON_TEXT = tuple(
+    '; '.join(r for bit, r in enumerate(SL_REASONS) if code & (1 << bit)) or "Normal market reversal"
+    for code in range(1 << len(SL_REASONS))
+)
+
+
+def _to_float(val):
+    """Convert numpy/str values to a plain float (None if not numeric)"""
+    if val is None:
+        return None
+    try:
+        return float(val)
+    except (TypeError, ValueError):
+        return None
+
+
+def sl_reason_codes(exit_range, atr, confidence, market_hour, rr_ratio) -> np.ndarray:
+    """Bitmask of SL_REASONS per signal (scalars or arrays); SL_REASON_TEXT[code] is the text"""
+    exit_range, atr, confidence, market_hour, rr_ratio = (
+        np.asarray(v, dtype=np.float64) for v in (exit_range, atr, confidence, market_hour, rr_ratio)
+    )
+    return ((exit_range > atr * 1.5).astype(np.int64)
+            | (confidence < 65) << 1
+            | ((market_hour < 10) | (market_hour > 14)) << 2
+            | (rr_ratio < 1.5) << 3)
+
+
+def _range_table(values: np.ndarray, op) -> List[np.ndarray]:
+    """Sparse table: level k holds op over values[i : i + 2**k] for every start i"""
+    table = [values]
+    span = 1
+    while 2 * span <= len(values):
+        prev = table[-1]
+        table.append(op(prev[:-span], prev[span:]))
+        span *= 2
+    return table
+
+
+def first_touch(table: List[np.ndarray], start: np.ndarray, level: np.ndarray, above: bool) -> np.ndarray:
+    """
+    First candle position >= start whose value crosses level, for many signals at once
+
+    Binary lifting over a _range_table(): each signal skips every block of
+    2**k candles whose max (above=True, value >= level) or min (above=False,
+    value <= level) does not reach its level, largest blocks first.
+
+    Args:
+        table: _range_table() of highs (np.maximum) or lows (np.minimum)
+        start: First candle position per signal
+        level: Price level per signal
+        above: True for value >= level, False for value <= level
+
+    Returns:
+        Position per signal; len(candles) where the level is never touched
+        or is not a finite price (NaN/None levels never resolve)
+    """
+    n = len(table[0])
+    # Comparisons with NaN are always False, so a NaN level would never skip
+    # a block and would "touch" on its first candle
+    pos = np.where(np.isfinite(level), start, n).astype(np.int64)
+    for k in range(len(table) - 1, -1, -1):
+        span = 1 << k
+        block = table[k]
+        fits = pos + span <= n
+        extreme = block[np.where(fits, pos, 0)]
+        missed = extreme < level if above else extreme > level
+        pos += np.where(fits & missed, span, 0)
+    return pos
+
+
+def resolve_outcomes(signals: pd.DataFrame, candles: pd.DataFrame,
+                     tie_break: str = 'target_first') -> pd.DataFrame:
+    """
+    Resolve target/SL for many signals against one candle frame
+
+    Args:
+        signals: level_signals rows (id, timestamp, direction, entry/target/sl
+            prices, atr, confidence, market_hour, rr_ratio)
+        candles: OHLC indexed by candle time; a signal is checked from the
+            first candle after its timestamp
+        tie_break: One of TIE_BREAKS, for candles that touch both levels
+
+    Returns:
+        DataFrame of resolved signals only, with the level_signals outcome
+        columns (outcome, outcome_price, outcome_time, duration_minutes,
+        pnl_points, reason_for_sl) and id
+    """
+    if tie_break not in TIE_BREAKS:
+        raise ValueError(f"Unknown tie_break {tie_break!r} (expected one of {TIE_BREAKS})")
+    columns = ['id', 'outcome', 'outcome_price', 'outcome_time', 'duration_minutes',
+               'pnl_points', 'reason_for_sl']
+    if signals.empty or candles.empty:
+        return pd.DataFrame(columns=columns)
+
+    if not candles.index.is_monotonic_increasing:
+        candles = candles.sort_index()
+    times = candles.index
+    signal_times = pd.DatetimeIndex(pd.to_datetime(signals['timestamp']))
+    if times.tz is not None and signal_times.tz is None:
+        signal_times = signal_times.tz_localize(IST).tz_convert(times.tz)
+
+    high = candles['high'].to_numpy(dtype=np.float64)
+    low = candles['low'].to_numpy(dtype=np.float64)
+    n = len(high)
+    start = times.searchsorted(signal_times, side='right')
+
+    buy = (signals['direction'] == 'BUY').to_numpy()
+    target = signals['target_price'].to_numpy(dtype=np.float64)
+    sl = signals['sl_price'].to_numpy(dtype=np.float64)
+    entry = signals['entry_price'].to_numpy(dtype=np.float64)
+
+    # BUY: target above (highs), SL below (lows); SELL the other way round
+    highs = _range_table(high, np.maximum)
+    lows = _range_table(low, np.minimum)
+    target_at = np.where(buy, first_touch(highs, start, target, above=True),
+                         first_touch(lows, start, target, above=False))
+    sl_at = np.where(buy, first_touch(lows, start, sl, above=False),
+                     first_touch(highs, start, sl, above=True))
+
+    hit_target = target_at < sl_at
+    same_bar = (target_at == sl_at) & (target_at < n)
+    if tie_break == 'target_first':
+        hit_target |= same_bar
+    elif tie_break == 'nearest_open':
+        bar_open = candles['open'].to_numpy(dtype=np.float64)[np.minimum(target_at, n - 1)]
+        hit_target |= same_bar & (np.abs(bar_open - target) < np.abs(bar_open - sl))
+
+    exit_at = np.minimum(target_at, sl_at)
+    resolved = exit_at < n
+    if not resolved.any():
+        return pd.DataFrame(columns=columns)
+
+    hit_target, exit_at, buy = hit_target[resolved], exit_at[resolved], buy[resolved]
+    rows = signals[resolved]
+    price = np.where(hit_target, target[resolved], sl[resolved])
+    pnl = np.where(buy, price - entry[resolved], entry[resolved] - price)
+    exit_time = times[exit_at]
+    duration = (exit_time - signal_times[resolved]).total_seconds() / 60
+
+    codes = sl_reason_codes(high[exit_at] - low[exit_at], rows['atr'], rows['confidence'],
+                            rows['market_hour'], rows['rr_ratio'])
+    reasons = np.asarray(SL_REASON_TEXT, dtype=object)[codes]
+
+    return pd.DataFrame({
+        'id': rows['id'].to_numpy(),
+        'outcome': np.where(hit_target, 'TARGET', 'SL'),
+        'outcome_price': price,
+        'outcome_time': exit_time.strftime('%Y-%m-%d %H:%M:%S'),
+        'duration_minutes': np.trunc(duration.to_numpy()).astype(np.int64),
+        'pnl_points': pnl,
+        'reason_for_sl': np.where(hit_target, None, reasons),
+    }, columns=columns)
+
 
 class LevelTracker:
     """Track and analyze trading level outcomes"""
     
-    def __init__(self, db_path: str = "data/trading_metrics.db"):
+    def __init__(self, db_path: str = "data/trading_metrics.db", tie_break: str = 'target_first'):
+        """
+        Args:
+            db_path: SQLite database file
+            tie_break: Outcome when one candle touches both target and SL (see TIE_BREAKS)
+        """
+        if tie_break not in TIE_BREAKS:
+            raise ValueError(f"Unknown tie_break {tie_break!r} (expected one of {TIE_BREAKS})")
         self.db_path = db_path
-        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
-        self._initialize_database()
-    
-    def _initialize_database(self):
-        """Create tracking table"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS level_signals (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            timestamp TEXT NOT NULL,
-            direction TEXT NOT NULL,
-            action TEXT NOT NULL,
-            confidence REAL NOT NULL,
-            
-            -- Price levels
-            current_price REAL NOT NULL,
-            entry_price REAL NOT NULL,
-            target_price REAL NOT NULL,
-            sl_price REAL NOT NULL,
-            
-            -- Risk metrics
-            atr REAL NOT NULL,
-            risk_points REAL NOT NULL,
-            reward_points REAL NOT NULL,
-            rr_ratio REAL NOT NULL,
-            
-            -- Context
-            market_hour INTEGER NOT NULL,
-            
-            -- Outcome (filled later)
-            outcome TEXT,
-            outcome_price REAL,
-            outcome_time TEXT,
-            duration_minutes INTEGER,
-            pnl_points REAL,
-            
-            -- Analysis
-            reason_for_sl TEXT,
-            market_volatility_at_exit REAL,
-            
-            UNIQUE(timestamp, direction)
-        )
-        """)
-        
-        conn.commit()
-        conn.close()
+        self.tie_break = tie_break
+        self.store = get_store(db_path)
+        self.store.migrate(MIGRATIONS)
         logger.info(f"✓ Level tracker database initialized: {self.db_path}")
     
     def log_signal(self, levels: Dict) -> bool:
@@ -80,98 +383,78 @@ class LevelTracker:
             True if logged successfully
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            timestamp = datetime.now(IST).strftime('%Y-%m-%d %H:%M:%S')
-            
-            # Convert numpy types to Python native types
-            def to_float(val):
-                if val is None:
-                    return None
-                try:
-                    return float(val)
-                except (TypeError, ValueError):
-                    return None
-            
-            cursor.execute("""
-            INSERT OR IGNORE INTO level_signals (
-                timestamp, symbol, direction, action, confidence,
-                current_price, entry_price, target_price, sl_price,
-                atr, risk_points, reward_points, rr_ratio,
-                market_hour
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                timestamp,
-                str(levels.get('symbol', 'NIFTY')),
-                str(levels.get('direction', '')),
-                str(levels.get('action', '')),
-                to_float(levels.get('confidence')),
-                to_float(levels.get('current_price')),
-                to_float(levels.get('entry')),
-                to_float(levels.get('exit_target')),
-                to_float(levels.get('stoploss')),
-                to_float(levels.get('atr')),
-                to_float(levels.get('risk_per_trade')),
-                to_float(levels.get('reward_per_trade')),
-                to_float(levels.get('risk_reward_ratio')),
-                datetime.now(IST).hour
-            ))
-            
+            cursor = self.store.execute(INSERT_SIGNAL_SQL, self.signal_params(levels))
             inserted_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
             
-            logger.info(f"✓ Signal logged ID:{inserted_id} | {levels.get('direction')} @ {to_float(levels.get('current_price')):.2f}")
+            logger.info(f"✓ Signal logged ID:{inserted_id} | {levels.get('direction')} @ {_to_float(levels.get('current_price')):.2f}")
             return inserted_id  # Return the actual DB ID
             
         except Exception as e:
             logger.error(f"Failed to log signal: {str(e)}")
             return None
     
-    def check_outcomes(self, current_df: pd.DataFrame):
+    @staticmethod
+    def signal_params(levels: Dict) -> tuple:
+        """
+        Build INSERT_SIGNAL_SQL parameters from a levels dict
+        
+        Shared with the webapp's async writer so both paths store identical rows.
+        """
+        now = datetime.now(IST)
+        return (
+            now.strftime('%Y-%m-%d %H:%M:%S'),
+            str(levels.get('symbol', 'NIFTY')),
+            str(levels.get('direction', '')),
+            str(levels.get('action', '')),
+            _to_float(levels.get('confidence')),
+            _to_float(levels.get('current_price')),
+            _to_float(levels.get('entry')),
+            _to_float(levels.get('exit_target')),
+            _to_float(levels.get('stoploss')),
+            _to_float(levels.get('atr')),
+            _to_float(levels.get('risk_per_trade')),
+            _to_float(levels.get('reward_per_trade')),
+            _to_float(levels.get('risk_reward_ratio')),
+            now.hour
+        )
+    
+    def check_outcomes(self, current_df: pd.DataFrame, lookback_hours: Optional[int] = 24) -> int:
         """
         Check all pending signals to see if target or SL hit
         
         Args:
             current_df: DataFrame with recent OHLC data
+            lookback_hours: Only signals from the last N hours (None = every pending signal)
+        
+        Returns:
+            Number of outcomes recorded
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            
             # Get all pending signals (no outcome yet)
-            pending = pd.read_sql_query("""
-                SELECT * FROM level_signals 
-                WHERE outcome IS NULL 
-                AND timestamp >= datetime('now', '-24 hours')
-            """, conn)
+            if lookback_hours is None:
+                pending = self.store.read_frame("SELECT * FROM level_signals WHERE outcome IS NULL")
+            else:
+                pending = self.store.read_frame("""
+                    SELECT * FROM level_signals
+                    WHERE outcome IS NULL
+                    AND timestamp >= datetime('now', ?)
+                """, (f"-{int(lookback_hours)} hours",))
             
             if pending.empty:
-                conn.close()
-                return
+                return 0
             
-            for _, signal in pending.iterrows():
-                signal_time = pd.to_datetime(signal['timestamp'])
-                
-                # Get candles after signal
-                future_candles = current_df[current_df.index > signal_time]
-                
-                if future_candles.empty:
-                    continue
-                
-                # Check if target or SL hit
-                outcome = self._check_hit(signal, future_candles)
-                
-                if outcome:
-                    self._update_outcome(conn, signal['id'], outcome)
+            outcomes = resolve_outcomes(pending, current_df, self.tie_break)
+            if not outcomes.empty:
+                self._update_outcomes(outcomes)
             
-            conn.close()
+            return len(outcomes)
             
         except Exception as e:
             logger.error(f"Failed to check outcomes: {str(e)}")
+            return 0
     
     def _check_hit(self, signal: pd.Series, candles: pd.DataFrame) -> Optional[Dict]:
-        """Check if target or SL was hit first"""
+        """Check if target or SL was hit first (per-candle reference for resolve_outcomes)"""
         
         direction = signal['direction']
         target = signal['target_price']
@@ -221,100 +504,81 @@ class LevelTracker:
     
     def _analyze_sl_reason(self, signal: pd.Series, exit_candle: pd.Series) -> str:
         """Analyze why SL was hit"""
-        reasons = []
-        
-        # Check volatility spike
-        signal_atr = signal['atr']
-        exit_range = exit_candle['high'] - exit_candle['low']
-        
-        if exit_range > signal_atr * 1.5:
-            reasons.append("High volatility spike")
-        
-        # Check if confidence was low
-        if signal['confidence'] < 65:
-            reasons.append("Low confidence signal")
-        
-        # Check market hour
-        hour = signal['market_hour']
-        if hour < 10 or hour > 14:
-            reasons.append("Poor timing (outside prime hours)")
-        
-        # Check R:R ratio
-        if signal['rr_ratio'] < 1.5:
-            reasons.append("Poor R:R ratio")
+        code = sl_reason_codes(exit_candle['high'] - exit_candle['low'], signal['atr'],
+                               signal['confidence'], signal['market_hour'], signal['rr_ratio'])
+        return SL_REASON_TEXT[int(code)]
+    
+    def _update_outcomes(self, outcomes: pd.DataFrame):
+        """Write resolve_outcomes() rows in one transaction"""
+        params = [
+            (row.outcome, float(row.outcome_price), row.outcome_time, int(row.duration_minutes),
+             float(row.pnl_points), row.reason_for_sl, int(row.id))
+            for row in outcomes.itertuples(index=False)
+        ]
+        self.store.executemany(UPDATE_OUTCOME_SQL, params)
         
-        return '; '.join(reasons) if reasons else "Normal market reversal"
+        counts = outcomes['outcome'].value_counts()
+        logger.info(f"✓ Outcomes recorded: {counts.get('TARGET', 0)} TARGET, {counts.get('SL', 0)} SL")
     
-    def _update_outcome(self, conn: sqlite3.Connection, signal_id: int, outcome: Dict):
-        """Update signal with outcome"""
-        cursor = conn.cursor()
+    def get_statistics(self, days: int = 7, symbol: Optional[str] = None) -> Dict:
+        """
+        Get success rate statistics
         
-        cursor.execute("""
-        UPDATE level_signals 
-        SET outcome = ?,
-            outcome_price = ?,
-            outcome_time = ?,
-            duration_minutes = ?,
-            pnl_points = ?,
-            reason_for_sl = ?
-        WHERE id = ?
-        """, (
-            outcome['outcome'],
-            outcome['price'],
-            outcome['time'].strftime('%Y-%m-%d %H:%M:%S'),
-            int(outcome['duration']),
-            outcome['pnl'],
-            outcome.get('reason', None),
-            signal_id
-        ))
+        Reads the level_stats buckets of the window, so the cost depends on
+        the window length, not on how many signals have accumulated.
         
-        conn.commit()
-        logger.info(f"✓ Outcome recorded: {outcome['outcome']} after {int(outcome['duration'])} min")
-    
-    def get_statistics(self, days: int = 7) -> Dict:
-        """Get success rate statistics"""
+        Args:
+            days: Window in calendar days (signals from this date onwards)
+            symbol: Only this symbol's signals (None = all)
+        """
         try:
-            conn = sqlite3.connect(self.db_path)
-            
             cutoff = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+            query = """
+                SELECT market_hour, outcome,
+                       SUM(signals) AS signals,
+                       SUM(pnl_sum) AS pnl_sum, SUM(pnl_count) AS pnl_count,
+                       SUM(duration_sum) AS duration_sum, SUM(duration_count) AS duration_count
+                FROM level_stats
+                WHERE day >= ?
+            """
+            params = [cutoff]
+            if symbol is not None:
+                query += " AND symbol = ?"
+                params.append(symbol)
+            buckets = self.store.read_frame(query + " GROUP BY market_hour, outcome", params)
             
-            df = pd.read_sql_query(f"""
-                SELECT * FROM level_signals 
-                WHERE timestamp >= '{cutoff}'
-                AND outcome IS NOT NULL
-            """, conn)
-            
-            conn.close()
-            
-            if df.empty:
+            buckets = buckets[buckets['signals'] > 0]
+            if buckets.empty:
                 return {'message': 'No completed signals yet'}
             
-            total = len(df)
-            wins = len(df[df['outcome'] == 'TARGET'])
-            losses = len(df[df['outcome'] == 'SL'])
+            def ratio(numerator, denominator):
+                return float(numerator / denominator) if denominator > 0 else None
+            
+            by_outcome = buckets.groupby('outcome')[['signals', 'duration_sum', 'duration_count']].sum()
+            by_hour = buckets.groupby('market_hour')[['pnl_sum', 'pnl_count']].sum()
+            by_hour = by_hour[by_hour['pnl_count'] > 0]
+            hour_pnl = by_hour['pnl_sum'] / by_hour['pnl_count']
             
-            avg_win_duration = df[df['outcome'] == 'TARGET']['duration_minutes'].mean()
-            avg_loss_duration = df[df['outcome'] == 'SL']['duration_minutes'].mean()
+            def outcome_value(outcome, column):
+                return by_outcome.at[outcome, column] if outcome in by_outcome.index else 0
             
-            # Helper to convert numpy types to Python native
-            def to_native(val):
-                if pd.isna(val):
-                    return None
-                if hasattr(val, 'item'):
-                    return val.item()
-                return val
+            total = int(buckets['signals'].sum())
+            wins = int(outcome_value('TARGET', 'signals'))
+            losses = int(outcome_value('SL', 'signals'))
             
             return {
-                'total_signals': int(total),
-                'wins': int(wins),
-                'losses': int(losses),
+                'total_signals': total,
+                'wins': wins,
+                'losses': losses,
                 'win_rate': float((wins / total * 100) if total > 0 else 0),
-                'avg_win_duration_min': to_native(avg_win_duration),
-                'avg_loss_duration_min': to_native(avg_loss_duration),
-                'avg_pnl_per_trade': to_native(df['pnl_points'].mean()),
-                'total_pnl': to_native(df['pnl_points'].sum()),
-                'best_hour': to_native(df.groupby('market_hour')['pnl_points'].mean().idxmax()),
-                'worst_hour': to_native(df.groupby('market_hour')['pnl_points'].mean().idxmin())
+                'avg_win_duration_min': ratio(outcome_value('TARGET', 'duration_sum'),
+                                              outcome_value('TARGET', 'duration_count')),
+                'avg_loss_duration_min': ratio(outcome_value('SL', 'duration_sum'),
+                                               outcome_value('SL', 'duration_count')),
+                'avg_pnl_per_trade': ratio(buckets['pnl_sum'].sum(), buckets['pnl_count'].sum()),
+                'total_pnl': float(buckets['pnl_sum'].sum()),
+                'best_hour': int(hour_pnl.idxmax()) if not hour_pnl.empty else None,
+                'worst_hour': int(hour_pnl.idxmin()) if not hour_pnl.empty else None
             }
             
         except Exception as e:
@@ -324,21 +588,21 @@ class LevelTracker:
     def get_sl_analysis(self) -> pd.DataFrame:
         """Get analysis of why SL was hit"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            
-            df = pd.read_sql_query("""
-                SELECT reason_for_sl, COUNT(*) as count,
-                       AVG(confidence) as avg_confidence,
-                       AVG(rr_ratio) as avg_rr
-                FROM level_signals
-                WHERE outcome = 'SL' AND reason_for_sl IS NOT NULL
-                GROUP BY reason_for_sl
+            df = self.store.read_frame("""
+                SELECT reason_for_sl, signals AS count,
+                       confidence_sum / signals AS avg_confidence,
+                       rr_sum / signals AS avg_rr
+                FROM level_sl_reasons
+                WHERE signals > 0
                 ORDER BY count DESC
-            """, conn)
-            
-            conn.close()
+            """)
             return df
             
         except Exception as e:
             logger.error(f"Failed to get SL analysis: {str(e)}")
             return pd.DataFrame()
+    
+    def rebuild_statistics(self):
+        """Recompute level_stats / level_sl_reasons from level_signals (repair or after bulk edits)"""
+        self.store.connection().executescript(f"BEGIN IMMEDIATE; {REBUILD_STATS_SQL} COMMIT;")
+        logger.info("✓ Level statistics rebuilt")
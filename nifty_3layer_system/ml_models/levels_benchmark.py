@@ -0,0 +1,101 @@
+"""
+LEVELS BENCHMARK: Vectorized quality filter and levels vs the per-bar path
+- Parity: signal_quality_batch() / levels_arrays() against
+  _check_signal_quality() and _calculate_buy/sell_levels() on every bar
+  (score, pass/fail, which checks rejected, every level)
+- Speed: a year of 5-min bars through calculate_levels_batch() vs the
+  per-bar scalar calls
+
+Run (from nifty_3layer_system/):
+    python -m ml_models.levels_benchmark
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from ml_models.live_predictor import synthetic_candles
+from ml_models.trading_levels_generator import (
+    REJECT_CHOPPY, REJECT_CONFIDENCE, REJECT_MACD, REJECT_RSI, REJECT_TREND, TradingLevelsGenerator,
+)
+
+# Prefix of each rejection reason string in _check_signal_quality()
+REASON_PREFIX = {
+    REJECT_CONFIDENCE: "Low ML confidence",
+    REJECT_TREND: ("Bearish trend", "Bullish trend"),
+    REJECT_RSI: ("RSI overbought", "RSI oversold"),
+    REJECT_MACD: ("MACD bearish", "MACD bullish"),
+    REJECT_CHOPPY: "Choppy market",
+}
+
+
+def scalar_mask(reasons) -> int:
+    mask = 0
+    for bit, prefix in REASON_PREFIX.items():
+        if any(r.startswith(prefix) for r in reasons):
+            mask |= bit
+    return mask
+
+
+def check_parity(generator: TradingLevelsGenerator, n_bars: int = 3000) -> int:
+    """
+    Compare the vectorized path with the scalar methods bar by bar
+
+    Returns:
+        Bars compared (raises AssertionError on a mismatch)
+    """
+    features = generator.predictor.fe.generate_all_features(synthetic_candles(n_bars, seed=11))
+    predictions = generator.predictor.predict_batch(features, features_ready=True)
+    context = generator._batch_context(features)
+    quality = generator.signal_quality_batch(features, predictions['direction'], predictions['confidence'])
+    levels = generator.levels_arrays(context['current_price'], context['atr'], context['recent_20c_high'],
+                                     context['recent_20c_low'], predictions['confidence'] / 100,
+                                     predictions['direction'])
+
+    for i in range(len(features)):
+        direction, confidence = predictions['direction'].iloc[i], predictions['confidence'].iloc[i]
+        expected = generator._check_signal_quality(features.iloc[:i + 1], direction, confidence)
+        assert abs(quality['quality_score'].iloc[i] - expected['quality_score']) < 1e-9, i
+        assert quality['is_quality_signal'].iloc[i] == expected['is_quality_signal'], i
+        assert quality['rejection_mask'].iloc[i] == scalar_mask(expected['rejection_reasons']), i
+
+        calculate = generator._calculate_buy_levels if direction == 'BUY' else generator._calculate_sell_levels
+        row = context.iloc[i]
+        scalar = calculate(row['current_price'], row['atr'], row['recent_20c_high'], row['recent_20c_low'],
+                           confidence / 100, predictions.iloc[i].to_dict())
+        for key in ('level_zone', 'entry', 'exit_target', 'stoploss', 'risk_per_trade',
+                    'reward_per_trade', 'risk_reward_ratio'):
+            assert abs(levels[key][i] - scalar[key]) <= 0.010001, (i, key)
+    return len(features)
+
+
+def main():
+    generator = TradingLevelsGenerator()
+    bars = check_parity(generator)
+    print(f"Parity OK on {bars} bars (quality score, pass/fail, rejection bits, levels)")
+
+    candles = synthetic_candles(18750, seed=3)
+    start = time.perf_counter()
+    batch = generator.calculate_levels_batch(candles)
+    batch_seconds = time.perf_counter() - start
+
+    features = generator.predictor.fe.generate_all_features(candles)
+    predictions = generator.predictor.predict_batch(features, features_ready=True)
+    sample = min(2000, len(features))
+    start = time.perf_counter()
+    for i in range(len(features) - sample, len(features)):
+        generator._check_signal_quality(features.iloc[:i + 1], predictions['direction'].iloc[i],
+                                        predictions['confidence'].iloc[i])
+    per_bar = (time.perf_counter() - start) / sample
+
+    passed = batch['is_quality_signal'].mean() * 100
+    print(f"{len(batch)} bars: calculate_levels_batch {batch_seconds:.2f}s (features + model + quality + levels)")
+    print(f"Scalar quality check alone: {per_bar * 1e6:.0f} us/bar -> {per_bar * len(batch):.1f}s for the year")
+    print(f"Quality pass rate {passed:.1f}% | rejection bits: "
+          f"{ {bit: int((batch['rejection_mask'] & bit).astype(bool).sum()) for bit in REASON_PREFIX} }")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,44 @@
 """
 LIVE PREDICTOR: Real-Time 30-Min Direction Prediction
-- Loads trained XGBoost model
+- Uses the process-wide trained XGBoost model (ml_models.model_server)
 - Generates features from live candle data
 - Returns UP/DOWN probability with confidence
+- Single-row inference goes straight to the booster (inplace_predict on a
+  contiguous float32 vector): one pass, no DataFrame -> DMatrix conversion
+- Batch APIs score every bar of a series, or a panel of instruments, with one
+  feature pass per instrument and one inference pass overall
 """
 
 import pandas as pd
 import numpy as np
 from pathlib import Path
-import pickle
 from datetime import datetime
 from loguru import logger
-from typing import Dict, Optional
+from typing import Dict, Mapping, Optional, Union
 import sys
 sys.path.append(str(Path(__file__).parent.parent))
 
 from ml_models.feature_engineer import FeatureEngineer
+from ml_models.model_server import get_model_handle
+from integrations.telemetry import MODEL_INFERENCE
+
+
+def synthetic_candles(n_bars: int, seed: int = 0) -> pd.DataFrame:
+    """Random-walk 5-min OHLCV ending now (warm-ups and benchmarks)"""
+    rng = np.random.default_rng(seed)
+    close = 25000 + rng.normal(0, 5, n_bars).cumsum()
+    index = pd.date_range(end=pd.Timestamp.now().floor('5min'), periods=n_bars, freq='5min')
+    return pd.DataFrame({
+        'open': close, 'high': close + 3, 'low': close - 3, 'close': close,
+        'volume': rng.integers(1000, 50000, n_bars).astype(float),
+    }, index=index)
 
 
 class LivePredictor:
     """Real-time direction prediction using trained XGBoost model"""
     
+    MIN_ACTION_CONFIDENCE = 60  # Below this the action is WAIT
+    
     def __init__(self, model_path: Optional[str] = None):
         """
         Initialize predictor with trained model
@@ -29,24 +47,45 @@ class LivePredictor:
             model_path: Path to saved model (default: latest in models/)
         """
         self.fe = FeatureEngineer()
-        self.model = None
+        self._handle = None
         self.feature_cols = self.fe.get_feature_columns()
         
-        # Load model
-        if model_path is None:
-            model_path = Path(__file__).parent.parent / "models" / "xgboost_direction_model.pkl"
-        
+        # Load model (shared with every other predictor in the process)
         self.load_model(model_path)
     
-    def load_model(self, model_path: Path):
-        """Load trained model from disk"""
-        if not Path(model_path).exists():
-            raise FileNotFoundError(f"Model not found: {model_path}\nRun model_trainer.py first!")
-        
-        with open(model_path, 'rb') as f:
-            self.model = pickle.load(f)
-        
-        logger.info(f"✓ Model loaded: {model_path}")
+    def load_model(self, model_path: Optional[Path] = None):
+        """
+        Attach the shared handle for ``model_path`` (loaded from disk once per
+        process). Without a path the handle follows the registry's current
+        version and is hot-swapped when a new version is promoted.
+        """
+        self._handle = get_model_handle(Path(model_path) if model_path else None)
+    
+    @property
+    def model(self):
+        """Model currently bound to this predictor"""
+        return self._handle.model
+    
+    @property
+    def model_version(self) -> Optional[str]:
+        return self._handle.version
+
+    def predict_up_probability(self, x: np.ndarray) -> np.ndarray:
+        """
+        P(UP) for feature rows in one inference pass
+
+        Args:
+            x: (n_rows, n_features) features in feature_cols order
+
+        Returns:
+            (n_rows,) probabilities; class is UP when > 0.5 (XGBClassifier.predict rule)
+        """
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        model, booster, _, trees = self._handle.binding  # one read: a concurrent swap cannot split this call
+        if booster is not None:
+            # Same trees as predict_proba (stops at best_iteration on early-stopped models)
+            return booster.inplace_predict(x, iteration_range=trees, validate_features=False)
+        return model.predict_proba(x, validate_features=False)[:, 1]
     
     def prepare_live_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -86,22 +125,22 @@ class LivePredictor:
             # Prepare features
             df_prepared = self.prepare_live_data(df)
             
-            # Extract features
-            X = df_prepared[self.feature_cols]
+            # Extract features (column order = training order)
+            x = df_prepared[self.feature_cols].to_numpy(dtype=np.float32)
             
-            # Predict (preserve column order, bypass feature name validation issues)
-            prediction = self.model.predict(X, validate_features=False)[0]  # 0 or 1
-            probabilities = self.model.predict_proba(X, validate_features=False)[0]  # [prob_down, prob_up]
+            # Predict: probability and class from a single pass
+            with MODEL_INFERENCE.time(model="direction"):
+                p_up = float(self.predict_up_probability(x)[0])
             
             # Interpret results
-            down_prob = probabilities[0] * 100
-            up_prob = probabilities[1] * 100
+            down_prob = (1 - p_up) * 100
+            up_prob = p_up * 100
             
-            direction = "BUY" if prediction == 1 else "SELL"
+            direction = "BUY" if p_up > 0.5 else "SELL"
             confidence = max(down_prob, up_prob)
             
             # Decision logic: Only trade if confidence > 60%
-            if confidence >= 60:
+            if confidence >= self.MIN_ACTION_CONFIDENCE:
                 action = direction
             else:
                 action = "WAIT"
@@ -112,7 +151,8 @@ class LivePredictor:
                 'up_probability': round(up_prob, 2),
                 'down_probability': round(down_prob, 2),
                 'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'action': action
+                'action': action,
+                'model_version': self.model_version
             }
             
             logger.info(f"Prediction: {direction} | Confidence: {confidence:.1f}% | Action: {action}")
@@ -122,7 +162,86 @@ class LivePredictor:
         except Exception as e:
             logger.error(f"Prediction error: {e}")
             raise
-    
+
+    def _prediction_frame(self, p_up: np.ndarray, index: pd.Index) -> pd.DataFrame:
+        """predict_direction's fields as columns (same rules, vectorized)"""
+        up = p_up.astype(np.float64) * 100
+        down = 100 - up
+        direction = np.where(p_up > 0.5, "BUY", "SELL")
+        confidence = np.maximum(up, down)
+        return pd.DataFrame({
+            'direction': direction,
+            'confidence': confidence.round(2),
+            'up_probability': up.round(2),
+            'down_probability': down.round(2),
+            'action': np.where(confidence >= self.MIN_ACTION_CONFIDENCE, direction, "WAIT"),
+        }, index=index)
+
+    def predict_batch(self, df: pd.DataFrame, features_ready: bool = False) -> pd.DataFrame:
+        """
+        Predict direction for every bar of one instrument
+        
+        Features are computed once over the whole series (they only look
+        back), so row i matches predict_direction(df up to bar i).
+        
+        Args:
+            df: OHLCV candles (or output of generate_all_features with features_ready=True)
+            features_ready: Skip feature generation
+        
+        Returns:
+            DataFrame indexed by bar with direction, confidence,
+            up_probability, down_probability and action (warm-up bars dropped)
+        """
+        features = df if features_ready else self.fe.generate_all_features(df)
+        return self.predict_features(features)
+
+    def predict_features(self, features: pd.DataFrame) -> pd.DataFrame:
+        """predict_batch() for rows that already carry the feature columns (any index)"""
+        with MODEL_INFERENCE.time(model="batch"):
+            p_up = self.predict_up_probability(features[self.feature_cols].to_numpy(dtype=np.float32))
+        return self._prediction_frame(p_up, features.index)
+
+    def predict_panel(self, panel: Union[Mapping[str, pd.DataFrame], pd.DataFrame],
+                      symbol_col: str = 'symbol') -> pd.DataFrame:
+        """
+        Predict direction for many instruments (and all their bars) at once
+        
+        Args:
+            panel: {symbol: OHLCV DataFrame}, or one long DataFrame with a
+                ``symbol_col`` column
+            symbol_col: Symbol column of a long DataFrame
+        
+        Returns:
+            predict_batch() columns indexed by (symbol, timestamp)
+        """
+        return self.predict_features(self.panel_features(panel, symbol_col))
+
+    def panel_features(self, panel: Union[Mapping[str, pd.DataFrame], pd.DataFrame],
+                       symbol_col: str = 'symbol') -> pd.DataFrame:
+        """Features per instrument (indicators never cross symbols), stacked as (symbol, timestamp)"""
+        if isinstance(panel, pd.DataFrame):
+            panel = {symbol: frame.drop(columns=symbol_col) for symbol, frame in panel.groupby(symbol_col, sort=False)}
+        frames = {symbol: self.fe.generate_all_features(frame) for symbol, frame in panel.items()}
+        return pd.concat(frames, names=['symbol', 'timestamp'])
+
+    def warm_up(self, n_bars: int = 200) -> float:
+        """
+        Run one silent prediction on synthetic candles so the first real call
+        does not pay for lazy imports and first-call allocations
+
+        Args:
+            n_bars: Synthetic 5-min candles to generate (enough for all indicators)
+
+        Returns:
+            Seconds taken
+        """
+        start = datetime.now()
+        df = synthetic_candles(n_bars)
+        x = self.prepare_live_data(df)[self.feature_cols].to_numpy(dtype=np.float32)
+        with MODEL_INFERENCE.time(model="warmup"):
+            self.predict_up_probability(x)
+        return (datetime.now() - start).total_seconds()
+
     def predict_from_current_candle(self, current_candle: Dict) -> Dict:
         """
         Predict from single candle dict (for integration with analyzer.py)
@@ -0,0 +1,242 @@
+"""
+MODEL REGISTRY: Immutable model versions behind an atomic "current" pointer
+- Each version is a directory models/registry/<version>/ holding the booster
+  in XGBoost's native format (model.ubj) and metadata.json (metrics, feature
+  list, training window, hyperparameters)
+- Versions are staged in a temporary directory and renamed into place, then
+  made read-only: readers never see a half-written model
+- CURRENT is a small JSON file replaced with os.replace(), so promotion and
+  rollback are a single atomic rename
+- ModelServer watches the pointer and hot-swaps live predictors
+
+CLI (from nifty_3layer_system/):
+    python -m ml_models.model_registry list
+    python -m ml_models.model_registry promote <version>
+    python -m ml_models.model_registry rollback
+    python -m ml_models.model_registry import [models/xgboost_direction_model.pkl]
+"""
+
+import json
+import os
+import pickle
+import shutil
+import stat
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from loguru import logger
+
+MODELS_DIR = Path(__file__).parent.parent / "models"
+REGISTRY_DIR = MODELS_DIR / "registry"
+MODEL_FILE = "model.ubj"
+METADATA_FILE = "metadata.json"
+POINTER_FILE = "CURRENT"
+
+
+def _json_default(obj):
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    if hasattr(obj, 'item'):  # numpy scalars
+        return obj.item()
+    return str(obj)
+
+
+def _write_atomic(path: Path, text: str):
+    """Write ``text`` to a sibling temp file, fsync, then rename over ``path``"""
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp, 'w') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class ModelRegistry:
+    """
+    Versioned model store.
+
+    Args:
+        root: Registry directory (default: models/registry)
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root or REGISTRY_DIR)
+        self.pointer = self.root / POINTER_FILE
+
+    # ------------------------------------------------------------------ reads
+
+    def versions(self) -> List[str]:
+        """Registered versions, oldest first"""
+        if not self.root.exists():
+            return []
+        return sorted(p.name for p in self.root.iterdir()
+                      if p.is_dir() and not p.name.startswith('.') and (p / METADATA_FILE).exists())
+
+    def model_path(self, version: str) -> Path:
+        return self.root / version / MODEL_FILE
+
+    def metadata(self, version: str) -> Dict[str, Any]:
+        with open(self.root / version / METADATA_FILE) as f:
+            return json.load(f)
+
+    def pointer_state(self) -> Optional[Dict[str, Any]]:
+        """Contents of CURRENT (version, previous, promoted_at), None if nothing is promoted"""
+        try:
+            with open(self.pointer) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def current_version(self) -> Optional[str]:
+        state = self.pointer_state()
+        return state['version'] if state else None
+
+    def current_path(self) -> Optional[Path]:
+        version = self.current_version()
+        return self.model_path(version) if version else None
+
+    # ------------------------------------------------------------------ writes
+
+    def _new_version(self) -> str:
+        base = datetime.now().strftime("v%Y%m%d_%H%M%S")
+        version, n = base, 1
+        while (self.root / version).exists():
+            n += 1
+            version = f"{base}_{n}"
+        return version
+
+    def register(
+        self,
+        model,
+        metrics: Dict[str, Any],
+        feature_cols: Sequence[str],
+        train_start=None,
+        train_end=None,
+        train_rows: Optional[int] = None,
+        params: Optional[Dict[str, Any]] = None,
+        notes: str = "",
+        promote: bool = False,
+    ) -> str:
+        """
+        Store ``model`` as a new immutable version
+
+        Args:
+            model: Fitted XGBClassifier
+            metrics: Evaluation metrics (accuracy, precision, ...)
+            feature_cols: Feature columns in training order
+            train_start / train_end / train_rows: Training window
+            params: Hyperparameters (default: model.get_params())
+            notes: Free text (e.g. which pipeline produced it)
+            promote: Point CURRENT at the new version
+
+        Returns:
+            Version id
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        version = self._new_version()
+        staging = self.root / f".staging-{uuid.uuid4().hex}"
+        staging.mkdir()
+        try:
+            model.save_model(staging / MODEL_FILE)
+            metadata = {
+                'version': version,
+                'created_at': datetime.now().isoformat(timespec='seconds'),
+                'metrics': metrics,
+                'feature_cols': list(feature_cols),
+                'train_window': {'start': train_start, 'end': train_end, 'rows': train_rows},
+                'params': params if params is not None else model.get_params(),
+                'notes': notes,
+            }
+            with open(staging / METADATA_FILE, 'w') as f:
+                json.dump(metadata, f, indent=2, default=_json_default)
+                f.flush()
+                os.fsync(f.fileno())
+            for path in staging.iterdir():
+                path.chmod(stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            os.rename(staging, self.root / version)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        logger.info(f"✓ Registered model {version} ({len(feature_cols)} features)")
+        if promote:
+            self.promote(version)
+        return version
+
+    def promote(self, version: str):
+        """Atomically point CURRENT at ``version``"""
+        if version not in self.versions():
+            raise ValueError(f"Unknown model version: {version}")
+        previous = self.current_version()
+        _write_atomic(self.pointer, json.dumps({
+            'version': version,
+            'previous': previous if previous != version else None,
+            'promoted_at': datetime.now().isoformat(timespec='seconds'),
+        }))
+        logger.info(f"✓ Current model: {version} (was {previous})")
+
+    def rollback(self) -> str:
+        """Point CURRENT back at the previously promoted version"""
+        state = self.pointer_state()
+        if not state or not state.get('previous'):
+            raise ValueError("No previous model version to roll back to")
+        self.promote(state['previous'])
+        return state['previous']
+
+    def import_pickle(self, pickle_path: Path, metrics_path: Optional[Path] = None, promote: bool = True) -> str:
+        """Register a legacy pickled model (and its metrics JSON) as a version"""
+        with open(pickle_path, 'rb') as f:
+            model = pickle.load(f)
+        metrics_path = metrics_path or Path(pickle_path).with_suffix('.json')
+        metrics = {}
+        if metrics_path.exists():
+            with open(metrics_path) as f:
+                metrics = json.load(f)
+
+        from ml_models.feature_engineer import FeatureEngineer
+        return self.register(
+            model,
+            metrics=metrics,
+            feature_cols=FeatureEngineer().get_feature_columns(),
+            train_end=metrics.get('train_date'),
+            notes=f"imported from {Path(pickle_path).name}",
+            promote=promote,
+        )
+
+
+def main():
+    import argparse
+    import sys
+
+    sys.path.append(str(Path(__file__).parent.parent))
+
+    parser = argparse.ArgumentParser(description="Model registry")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list")
+    sub.add_parser("rollback")
+    promote = sub.add_parser("promote")
+    promote.add_argument("version")
+    imp = sub.add_parser("import")
+    imp.add_argument("pickle", nargs="?", default=str(MODELS_DIR / "xgboost_direction_model.pkl"))
+    args = parser.parse_args()
+
+    registry = ModelRegistry()
+    if args.command == "list":
+        current = registry.current_version()
+        for version in registry.versions():
+            meta = registry.metadata(version)
+            accuracy = meta['metrics'].get('accuracy')
+            marker = "*" if version == current else " "
+            print(f"{marker} {version}  accuracy={accuracy if accuracy is None else f'{accuracy:.4f}'}  {meta.get('notes', '')}")
+    elif args.command == "promote":
+        registry.promote(args.version)
+    elif args.command == "rollback":
+        print(registry.rollback())
+    elif args.command == "import":
+        print(registry.import_pickle(Path(args.pickle)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 """
 Automated Model Retraining Pipeline
 Fetches fresh 90-day data, retrains XGBoost, compares performance
+New models become immutable registry versions; promotion is an atomic pointer swap
+Incremental mode appends the new day's features and continues boosting from
+the current model, promoting only if it passes the compare_performance gate
 """
 
 import sys
@@ -16,6 +19,8 @@ import pickle
 from ml_models.data_extractor import DataExtractor
 from ml_models.feature_engineer import FeatureEngineer
 from ml_models.model_trainer import ModelTrainer
+from ml_models.model_registry import ModelRegistry, METADATA_FILE
+from ml_models.incremental_update import FeatureStore, split_update, holdout_metrics, horizon_gap
 
 
 class ModelRetrainingPipeline:
@@ -27,27 +32,26 @@ class ModelRetrainingPipeline:
         self.trainer = ModelTrainer()
         self.models_dir = Path(__file__).parent.parent / "models"
         self.models_dir.mkdir(exist_ok=True)
+        self.registry = ModelRegistry(self.models_dir / "registry")
     
     def backup_old_model(self):
-        """Backup existing model before retraining"""
-        old_model_path = self.models_dir / "xgboost_direction_model.pkl"
-        old_metrics_path = self.models_dir / "model_metrics.json"
-        
-        if old_model_path.exists():
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_model = self.models_dir / f"xgboost_direction_model_backup_{timestamp}.pkl"
-            backup_metrics = self.models_dir / f"model_metrics_backup_{timestamp}.json"
-            
-            import shutil
-            shutil.copy(old_model_path, backup_model)
-            if old_metrics_path.exists():
-                shutil.copy(old_metrics_path, backup_metrics)
-            
-            logger.info(f"✓ Backed up old model: {backup_model.name}")
-            logger.info(f"✓ Backed up metrics: {backup_metrics.name}")
-            
-            return backup_metrics
-        return None
+        """
+        Locate the current model's metrics before retraining
+        
+        Registry versions are immutable, so nothing is copied: the current
+        version stays available for rollback. A legacy pickle is imported as
+        the first version.
+        """
+        if self.registry.current_version() is None:
+            legacy = self.models_dir / "xgboost_direction_model.pkl"
+            if legacy.exists():
+                self.registry.import_pickle(legacy, promote=True)
+        
+        version = self.registry.current_version()
+        if version is None:
+            return None
+        logger.info(f"✓ Current model version: {version} (kept for rollback)")
+        return self.registry.root / version / METADATA_FILE
     
     def fetch_fresh_data(self, days: int = 90) -> pd.DataFrame:
         """Fetch latest data from Dhan API"""
@@ -94,7 +98,7 @@ class ModelRetrainingPipeline:
         feature_cols = self.engineer.get_feature_columns()
         
         X = features_df[feature_cols].copy()
-        y = features_df['label'].copy()
+        y = features_df['target'].copy()
         
         # Check class balance
         class_counts = y.value_counts()
@@ -115,12 +119,23 @@ class ModelRetrainingPipeline:
         return X, y
     
     def train_new_model(self, X: pd.DataFrame, y: pd.Series) -> dict:
-        """Train fresh XGBoost model"""
+        """
+        Train fresh XGBoost model on the first 80% and evaluate on the last 20%
+        
+        The split is kept on the pipeline (self.X_train / self.X_test /
+        self.y_test) so registration records the training window and the
+        current model can be scored on the same test rows.
+        """
         logger.info(f"\n{'='*70}")
         logger.info(f"🤖 STEP 4: TRAINING XGBOOST MODEL")
         logger.info(f"{'='*70}")
         
-        metrics = self.trainer.train_and_evaluate(X, y)
+        data = X.assign(label=y)
+        self.X_train, self.X_test, y_train, self.y_test = self.trainer.prepare_data(
+            data, list(X.columns), target_col='label')
+        self.trainer.train_model(self.X_train, y_train)
+        metrics = dict(self.trainer.evaluate_model(self.X_test, self.y_test))
+        metrics['f1'] = metrics['f1_score']  # compare_performance / format_summary key
         
         logger.info(f"\n✓ Model trained successfully")
         logger.info(f"✓ Test accuracy: {metrics['accuracy']:.2%}")
@@ -130,8 +145,25 @@ class ModelRetrainingPipeline:
         
         return metrics
     
-    def compare_performance(self, old_metrics_path: Path, new_metrics: dict) -> dict:
-        """Compare old vs new model performance"""
+    def current_model_metrics(self) -> dict:
+        """Current version scored on the new model's test rows ({} without one)"""
+        import xgboost as xgb
+        
+        current_path = self.registry.current_path()
+        if current_path is None:
+            return {}
+        current = xgb.XGBClassifier()
+        current.load_model(current_path)
+        return holdout_metrics(current, self.X_test, self.y_test)
+    
+    def compare_performance(self, old_metrics_path, new_metrics: dict) -> dict:
+        """
+        Compare old vs new model performance
+        
+        Args:
+            old_metrics_path: Metrics JSON / registry metadata path, or a metrics dict
+            new_metrics: Metrics of the new model
+        """
         logger.info(f"\n{'='*70}")
         logger.info(f"📊 STEP 5: PERFORMANCE COMPARISON")
         logger.info(f"{'='*70}")
@@ -144,9 +176,12 @@ class ModelRetrainingPipeline:
         
         # Load old metrics
         old_metrics = {}
-        if old_metrics_path and old_metrics_path.exists():
+        if isinstance(old_metrics_path, dict):
+            old_metrics = old_metrics_path
+        elif old_metrics_path and old_metrics_path.exists():
             with open(old_metrics_path) as f:
                 old_metrics = json.load(f)
+            old_metrics = old_metrics.get('metrics', old_metrics)  # registry metadata nests them
         
         # Compare key metrics
         metrics_to_compare = ['accuracy', 'precision', 'recall', 'f1']
@@ -173,21 +208,28 @@ class ModelRetrainingPipeline:
         
         return comparison
     
-    def save_new_model(self, X: pd.DataFrame):
-        """Save retrained model and metadata"""
+    def save_new_model(self, promote: bool = True) -> str:
+        """
+        Register the retrained model and its training window
+        
+        Args:
+            promote: Make it the current version (running predictors hot-swap)
+        """
         logger.info(f"\n{'='*70}")
         logger.info(f"💾 STEP 6: SAVING NEW MODEL")
         logger.info(f"{'='*70}")
         
-        # Model already saved by trainer, just log it
-        model_path = self.models_dir / "xgboost_direction_model.pkl"
-        metrics_path = self.models_dir / "model_metrics.json"
-        importance_path = self.models_dir / "feature_importance.csv"
+        # New immutable version; promotion is an atomic pointer swap
+        version = self.trainer.register_model(self.X_train, registry=self.registry, promote=promote,
+                                              notes="model_retraining_pipeline")
         
-        logger.info(f"\n✓ Model saved: {model_path}")
-        logger.info(f"✓ Metrics saved: {metrics_path}")
-        logger.info(f"✓ Feature importance: {importance_path}")
-        logger.info(f"\n✓ Ready for live trading!")
+        logger.info(f"\n✓ Model registered: {version}")
+        logger.info(f"✓ Metadata: {self.registry.root / version / METADATA_FILE}")
+        if promote:
+            logger.info(f"\n✓ Ready for live trading!")
+        else:
+            logger.warning(f"⚠️  Not promoted: {self.registry.current_version()} stays live")
+        return version
     
     def run_full_pipeline(self) -> dict:
         """Execute complete retraining pipeline"""
@@ -199,10 +241,10 @@ class ModelRetrainingPipeline:
         
         try:
             # Step 1: Backup old model
-            old_metrics_path = self.backup_old_model()
+            self.backup_old_model()
             
-            # Step 2: Fetch fresh data
-            df = self.fetch_fresh_data(days=90)
+            # Step 2: Fetch fresh data (labels need the raw candles ahead of each bar)
+            df = self.extractor.create_labels(self.fetch_fresh_data(days=90))
             
             # Step 3: Engineer features
             features_df = self.engineer_features(df)
@@ -213,11 +255,12 @@ class ModelRetrainingPipeline:
             # Step 5: Train model
             new_metrics = self.train_new_model(X, y)
             
-            # Step 6: Compare performance
-            comparison = self.compare_performance(old_metrics_path, new_metrics)
+            # Step 6: Compare with the current model on the same test rows
+            comparison = self.compare_performance(self.current_model_metrics(), new_metrics)
+            promoted = self.passes_gate(comparison)
             
-            # Step 7: Save model
-            self.save_new_model(X)
+            # Step 7: Save model (promoted only if it passes the gate)
+            version = self.save_new_model(promote=promoted)
             
             end_time = datetime.now()
             duration = (end_time - start_time).total_seconds()
@@ -227,10 +270,14 @@ class ModelRetrainingPipeline:
             logger.info(f"{'='*70}")
             logger.info(f"Total time: {duration:.1f} seconds")
             logger.info(f"Completed at: {end_time.strftime('%Y-%m-%d %H:%M:%S IST')}")
-            logger.info(f"\nModel is ready for live trading!")
+            if promoted:
+                logger.info(f"\nModel is ready for live trading!")
             
             return {
                 'success': True,
+                'mode': 'full',
+                'promoted': promoted,
+                'version': version,
                 'metrics': new_metrics,
                 'comparison': comparison,
                 'duration': duration
@@ -244,6 +291,150 @@ class ModelRetrainingPipeline:
                 'error': str(e)
             }
     
+    def passes_gate(self, comparison: dict, metric: str = 'accuracy') -> bool:
+        """Promotion gate: the candidate must not degrade ``metric`` on the shared holdout"""
+        return metric not in comparison['degraded']
+    
+    def run_incremental(
+        self,
+        max_fetch_days: int = 90,
+        rounds_per_update: int = 20,
+        max_trees: int = 600,
+        holdout_rows: int = 75,
+        window_days: int = 60,
+        horizon_minutes: int = 15,
+        min_profit_points: float = 5.0,
+        store: FeatureStore = None,
+    ) -> dict:
+        """
+        Daily incremental update: new bars only, continued boosting, gated promotion
+        
+        Args:
+            max_fetch_days: Longest history the candle API serves; a larger gap since
+                the last update rebuilds the window
+            rounds_per_update: Trees added per update in 'continue' mode
+            max_trees: Tree cap; past it the model is refit on the stored window
+            holdout_rows: Newest labeled rows scored by both models (one session = 75)
+            window_days: Days of candles/features kept in the feature store
+            horizon_minutes / min_profit_points: create_labels() settings
+            store: FeatureStore (default: models/incremental/feature_store.pkl)
+        
+        Returns:
+            run_full_pipeline()-style result plus 'mode', 'promoted' and 'version'
+        """
+        import xgboost as xgb
+        
+        logger.info("\n" + "="*70)
+        logger.info("🔄 INCREMENTAL MODEL UPDATE STARTED")
+        logger.info("="*70)
+        
+        start_time = datetime.now()
+        try:
+            self.backup_old_model()
+            store = store or FeatureStore(window_days=window_days)
+            store.load()
+            
+            # Step 1: Only the bars since the last update (the whole window on the first run)
+            if not store.empty and store.days_to_fetch() > max_fetch_days:
+                logger.warning(f"⚠️  Feature store ends at {store.candles.index[-1]}, more than "
+                               f"{max_fetch_days} days ago: rebuilding the window")
+                store.reset()
+            df = self.fetch_fresh_data(days=window_days if store.empty else store.days_to_fetch())
+            store.check_contiguous(df)
+            added = store.append(df, self.engineer)
+            logger.info(f"✓ Appended {added} feature rows (store: {len(store.features)} rows)")
+            
+            # Step 2: Labels over the window; bars whose future completed become trainable
+            target = store.labels(horizon_minutes, min_profit_points)
+            
+            current_path = self.registry.current_path()
+            current = None
+            if current_path is not None:
+                current = xgb.XGBClassifier()
+                current.load_model(current_path)
+            
+            trees = current.get_booster().num_boosted_rounds() if current is not None else 0
+            mode = 'continue'
+            if current is None or store.trained_until is None or trees + rounds_per_update > max_trees:
+                mode = 'window'
+            elif store.trained_version != self.registry.current_version():
+                # Another run promoted since: the cursor belongs to a model that is no longer live
+                logger.warning(f"⚠️  Current version {self.registry.current_version()} is not the one the "
+                               f"store's cursor belongs to ({store.trained_version}): refitting the window")
+                mode = 'window'
+            
+            train_idx, holdout_idx = split_update(
+                target, None if mode == 'window' else store.trained_until,
+                holdout_rows, horizon_gap(horizon_minutes))
+            if len(train_idx) == 0 or len(holdout_idx) == 0:
+                logger.info("✓ No newly labeled rows: current model kept")
+                store.save()
+                return {'success': True, 'mode': mode, 'promoted': False, 'version': None,
+                        'metrics': {}, 'comparison': {'improved': {}, 'degraded': {}, 'unchanged': {}},
+                        'duration': (datetime.now() - start_time).total_seconds()}
+            
+            X_train = store.features.loc[train_idx]
+            y_train = np.where(target.loc[train_idx] == 1, 1, 0)
+            X_holdout = store.features.loc[holdout_idx]
+            y_holdout = np.where(target.loc[holdout_idx] == 1, 1, 0)
+            
+            # Step 3: Candidate
+            logger.info(f"Mode: {mode} | train rows: {len(X_train)} | holdout rows: {len(X_holdout)}")
+            if mode == 'continue':
+                params = {**self.trainer.params, 'n_estimators': rounds_per_update}
+                params.pop('use_label_encoder', None)
+                candidate = xgb.XGBClassifier(**params)
+                candidate.fit(X_train, y_train, xgb_model=current.get_booster(), verbose=False)
+            else:
+                candidate = self.trainer.train_model(X_train, y_train)
+            
+            # Step 4: Gate on the shared holdout
+            new_metrics = holdout_metrics(candidate, X_holdout, y_holdout)
+            old_metrics = holdout_metrics(current, X_holdout, y_holdout) if current is not None else {}
+            comparison = self.compare_performance(old_metrics, new_metrics)
+            promoted = self.passes_gate(comparison)
+            
+            version = None
+            if promoted:
+                base = self.registry.current_version()
+                train_start = store.trained_until if mode == 'continue' else X_train.index[0]
+                version = self.registry.register(
+                    candidate,
+                    metrics=new_metrics,
+                    feature_cols=list(X_train.columns),
+                    train_start=train_start,
+                    train_end=X_train.index[-1],
+                    train_rows=len(X_train),
+                    notes=f"incremental:{mode} from {base}",
+                    promote=True,
+                )
+                store.trained_until = X_train.index[-1]
+                store.trained_version = version
+                logger.info(f"✓ Promoted {version}")
+            else:
+                logger.warning("⚠️  Candidate degraded accuracy on the holdout: current model kept")
+            store.save()
+            
+            duration = (datetime.now() - start_time).total_seconds()
+            logger.info(f"Total time: {duration:.1f} seconds")
+            return {
+                'success': True,
+                'mode': mode,
+                'promoted': promoted,
+                'version': version,
+                'metrics': new_metrics,
+                'comparison': comparison,
+                'duration': duration
+            }
+        
+        except Exception as e:
+            logger.error(f"\n❌ INCREMENTAL UPDATE FAILED")
+            logger.error(f"Error: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
     def format_summary(self, result: dict) -> str:
         """Format retraining summary for display"""
         
@@ -261,6 +452,19 @@ Reverting to previous model...
         metrics = result['metrics']
         comparison = result['comparison']
         
+        if result.get('promoted') is False:
+            title = "RETRAINING" if result['mode'] == 'full' else "INCREMENTAL UPDATE"
+            return f"""
+╔═══════════════════════════════════════════════════════════════════════════╗
+║{f"⏸️  {title} NOT PROMOTED":^74}║
+╚═══════════════════════════════════════════════════════════════════════════╝
+
+⏱️  Time Taken: {result['duration']:.1f} seconds
+Mode: {result['mode']} | Degraded: {', '.join(comparison['degraded']) or 'none'}
+
+The current model stays live.
+"""
+        
         summary = f"""
 ╔═══════════════════════════════════════════════════════════════════════════╗
 ║                   ✅ RETRAINING SUCCESSFUL                               ║
@@ -297,16 +501,23 @@ Reverting to previous model...
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
 ✅ Model saved and ready for live trading!
-   Levels Monitor will use new model next startup.
+   Running predictors switch to it within seconds (no restart needed).
 """
         
         return summary
 
 
 def main():
-    """Execute retraining pipeline"""
+    """Execute retraining pipeline (--incremental for the daily update)"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Model retraining")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Append the new day's features and continue boosting from the current model")
+    args = parser.parse_args()
+    
     pipeline = ModelRetrainingPipeline()
-    result = pipeline.run_full_pipeline()
+    result = pipeline.run_incremental() if args.incremental else pipeline.run_full_pipeline()
     print(pipeline.format_summary(result))
 
 
@@ -0,0 +1,441 @@
+"""
+MODEL SERVER: One copy of each model per process, optionally shared over a socket
+- The default model is the registry's current version (ml_models.model_registry);
+  until one is promoted, XGBoost's native UBJ file (xgboost_direction_model.ubj)
+  when it is at least as new as the pickle, otherwise the pickle
+- ModelServer caches models by path, so every LivePredictor /
+  TradingLevelsGenerator in a process shares one booster
+- Predictors hold a ModelHandle; a watcher thread loads a newly promoted
+  version off the request path and rebinds the handle in one attribute store
+- serve() answers predict_proba for other local processes (newline-delimited
+  JSON over a Unix socket, TCP loopback on Windows); RemoteModel is the client
+  and stands in for XGBClassifier.predict/predict_proba
+- get_model() uses a running server when MODEL_SERVER_ADDRESS is set
+
+Run a shared server (from nifty_3layer_system/):
+    python -m ml_models.model_server
+Write the native file next to an existing pickle:
+    python -m ml_models.model_server --export
+"""
+
+import json
+import os
+import pickle
+import socket
+import socketserver
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from ml_models.model_registry import MODEL_FILE, ModelRegistry
+
+MODELS_DIR = Path(__file__).parent.parent / "models"
+DEFAULT_MODEL_PATH = MODELS_DIR / "xgboost_direction_model.pkl"
+NATIVE_SUFFIX = ".ubj"  # the .json sibling holds training metrics, not the model
+
+MAX_LINE_BYTES = 1 << 20
+
+
+def _default_address() -> str:
+    if hasattr(socket, "AF_UNIX") and sys.platform != "win32":
+        return "unix:/tmp/nifty_model_server.sock"
+    return "tcp:127.0.0.1:8766"
+
+
+DEFAULT_ADDRESS = _default_address()
+
+
+def _parse_address(address: str):
+    kind, _, rest = address.partition(":")
+    if kind == "unix":
+        return "unix", rest
+    if kind == "tcp":
+        host, _, port = rest.rpartition(":")
+        return "tcp", (host or "127.0.0.1", int(port))
+    raise ValueError(f"Unsupported model server address: {address} (use unix:/path or tcp:host:port)")
+
+
+def native_path(model_path: Path) -> Path:
+    return Path(model_path).with_suffix(NATIVE_SUFFIX)
+
+
+def load_model(model_path: Path) -> Tuple[Any, Path]:
+    """
+    Load an XGBClassifier, preferring the native UBJ sibling of ``model_path``
+
+    Returns:
+        (model, file actually loaded)
+    """
+    model_path = Path(model_path)
+    native = native_path(model_path)
+    pickled = model_path.with_suffix(".pkl")
+
+    # A pickle written after the native file (old trainer, manual restore) wins
+    if native.exists() and (not pickled.exists() or native.stat().st_mtime >= pickled.stat().st_mtime):
+        import xgboost as xgb
+        model = xgb.XGBClassifier()
+        model.load_model(native)
+        return model, native
+
+    if not pickled.exists():
+        raise FileNotFoundError(f"Model not found: {model_path}\nRun model_trainer.py first!")
+    with open(pickled, 'rb') as f:
+        return pickle.load(f), pickled
+
+
+def export_native(model_path: Path = DEFAULT_MODEL_PATH) -> Path:
+    """Write the native UBJ file for a pickled model"""
+    with open(model_path, 'rb') as f:
+        model = pickle.load(f)
+    target = native_path(model_path)
+    model.save_model(target)
+    logger.info(f"✓ Native model saved: {target}")
+    return target
+
+
+def _label_of(path: Path) -> str:
+    """Version id for a registry model file, file name for the legacy model"""
+    path = Path(path)
+    return path.parent.name if path.name == MODEL_FILE else path.name
+
+
+def _booster_of(model):
+    # RemoteModel (shared server in another process) has no local booster
+    return model.get_booster() if hasattr(model, 'get_booster') else None
+
+
+def _iteration_range(booster) -> Tuple[int, int]:
+    """Trees XGBClassifier.predict_proba uses: up to best_iteration if early-stopped, else all"""
+    try:
+        return (0, booster.best_iteration + 1)
+    except AttributeError:  # no booster (RemoteModel) or trained without early stopping
+        return (0, 0)
+
+
+def _prime(model):
+    """One throwaway prediction so the first real call on a new booster is not the slow one"""
+    booster = _booster_of(model)
+    if booster is not None:
+        booster.inplace_predict(np.zeros((1, booster.num_features()), dtype=np.float32),
+                                iteration_range=_iteration_range(booster), validate_features=False)
+
+
+class ModelHandle:
+    """
+    The model currently bound to a name.
+
+    ``binding`` is one (model, booster, version, iteration_range) tuple:
+    callers read it once per prediction, so a swap never affects a
+    prediction already running. ``iteration_range`` is what booster calls
+    need to match predict_proba on an early-stopped model.
+    """
+
+    __slots__ = ('name', 'binding')
+
+    def __init__(self, name: str, model, version: Optional[str] = None):
+        self.name = name
+        self.swap(model, version)
+
+    def swap(self, model, version: Optional[str] = None):
+        booster = _booster_of(model)
+        self.binding = (model, booster, version, _iteration_range(booster))
+
+    @property
+    def model(self):
+        return self.binding[0]
+
+    @property
+    def booster(self):
+        return self.binding[1]
+
+    @property
+    def version(self) -> Optional[str]:
+        return self.binding[2]
+
+
+class ModelServer:
+    """
+    Process-local model cache.
+
+    ``get()`` loads each model file once and hands the same object to every
+    caller; XGBoost prediction is thread-safe, so no per-caller copies.
+
+    Args:
+        registry: Model registry whose current version is the default model
+        watch_interval: Seconds between checks of the registry pointer
+    """
+
+    def __init__(self, registry: Optional[ModelRegistry] = None, watch_interval: float = 2.0):
+        self.registry = registry or ModelRegistry()
+        self.watch_interval = watch_interval
+        self._models: Dict[Path, Dict[str, Any]] = {}
+        self._handles: Dict[str, ModelHandle] = {}
+        self._lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self.swaps = 0
+        self._server: Optional[socketserver.BaseServer] = None
+        self._socket_path: Optional[str] = None
+
+    def handle(self, model_path: Optional[Path] = None) -> ModelHandle:
+        """
+        Shared handle for ``model_path``
+
+        Without a path (or with the legacy default path) the handle follows
+        the registry's current version, serving the legacy model file until
+        the first version is promoted.
+        """
+        if model_path is None or Path(model_path).resolve() == DEFAULT_MODEL_PATH.resolve():
+            return self._current_handle()
+        key = str(Path(model_path).resolve())
+        handle = self._handles.get(key)
+        if handle is None:
+            model = self._load(Path(key))
+            with self._lock:
+                handle = self._handles.setdefault(key, ModelHandle(key, model))
+        return handle
+
+    def _current_handle(self) -> ModelHandle:
+        handle = self._handles.get('current')
+        if handle is not None:
+            return handle
+        version = self.registry.current_version()
+        model = self._load(self.registry.model_path(version) if version else DEFAULT_MODEL_PATH)
+        with self._lock:
+            handle = self._handles.get('current')
+            if handle is None:
+                handle = self._handles['current'] = ModelHandle('current', model, version)
+                self._watcher = threading.Thread(target=self._watch, name="model-watch", daemon=True)
+                self._watcher.start()
+        return handle
+
+    def _watch(self):
+        while True:
+            time.sleep(self.watch_interval)
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Model pointer check failed: {e}")
+
+    def refresh(self) -> bool:
+        """Swap the current handle if the registry pointer moved (returns True on a swap)"""
+        handle = self._handles.get('current')
+        version = self.registry.current_version()
+        if handle is None or version is None or version == handle.version:
+            return False
+        old_path = self.registry.model_path(handle.version) if handle.version else DEFAULT_MODEL_PATH
+        model = self._load(self.registry.model_path(version))  # loaded before the swap
+        _prime(model)
+        handle.swap(model, version)
+        self.swaps += 1
+        self.evict(old_path)  # in-flight predictions keep their own reference
+        logger.info(f"✓ Hot-swapped model {_label_of(old_path)} → {version}")
+        return True
+
+    def get(self, model_path: Optional[Path] = None):
+        """Shared model for ``model_path`` (default: the registry's current version)"""
+        return self.handle(model_path).model
+
+    def _load(self, path: Path):
+        key = Path(path).resolve()
+        entry = self._models.get(key)
+        if entry is not None:
+            return entry['model']
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is None:
+                start = time.perf_counter()
+                model, source = load_model(key)
+                entry = self._models[key] = {
+                    'model': model,
+                    'source': source,
+                    'load_ms': (time.perf_counter() - start) * 1000,
+                    'loaded_at': time.time(),
+                }
+                logger.info(f"✓ Model loaded: {source} ({entry['load_ms']:.0f} ms)")
+            return entry['model']
+
+    def predict_proba(self, X, model_path: Optional[Path] = None) -> np.ndarray:
+        return self.get(model_path).predict_proba(X, validate_features=False)
+
+    def evict(self, model_path: Optional[Path] = None):
+        """Drop a cached model file (the next load reads it from disk again)"""
+        with self._lock:
+            self._models.pop(Path(model_path or DEFAULT_MODEL_PATH).resolve(), None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'current': self._handles['current'].version if 'current' in self._handles else None,
+            'swaps': self.swaps,
+            'loaded': {
+                str(path): {
+                    'source': entry['source'].name,
+                    'load_ms': round(entry['load_ms'], 1),
+                    'loaded_at': entry['loaded_at'],
+                }
+                for path, entry in list(self._models.items())
+            },
+        }
+
+    # ------------------------------------------------------------------ socket
+
+    def serve(self, address: str = DEFAULT_ADDRESS, background: bool = False):
+        """
+        Answer predict_proba requests from other local processes
+
+        Args:
+            address: unix:/path/to.sock or tcp:host:port
+            background: Serve on a daemon thread instead of blocking
+        """
+        kind, target = _parse_address(address)
+        server_ref = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    self.wfile.write(server_ref._respond(line))
+                    self.wfile.flush()
+
+        self._socket_path = target if kind == "unix" else None
+        if kind == "unix":
+            if os.path.exists(target):
+                os.unlink(target)
+            self._server = socketserver.ThreadingUnixStreamServer(target, Handler)
+        else:
+            socketserver.ThreadingTCPServer.allow_reuse_address = True
+            self._server = socketserver.ThreadingTCPServer(target, Handler)
+        self._server.daemon_threads = True
+        logger.info(f"✓ Model server listening on {address}")
+
+        if background:
+            threading.Thread(target=self._server.serve_forever, name="model-server", daemon=True).start()
+        else:
+            self._server.serve_forever()
+
+    def shutdown(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._socket_path and os.path.exists(self._socket_path):
+            os.unlink(self._socket_path)
+
+    def _respond(self, line: bytes) -> bytes:
+        try:
+            request = json.loads(line)
+            op = request.get('op')
+            if op == 'predict_proba':
+                X = np.asarray(request['X'], dtype=np.float32)
+                result = {'ok': True, 'proba': self.predict_proba(X, request.get('model')).tolist()}
+            elif op == 'stats':
+                result = {'ok': True, 'models': self.stats()}
+            else:
+                result = {'ok': False, 'error': f"Unknown op: {op}"}
+        except Exception as e:
+            result = {'ok': False, 'error': str(e)}
+        return json.dumps(result, separators=(",", ":")).encode() + b"\n"
+
+
+class RemoteModel:
+    """
+    XGBClassifier stand-in that predicts through a ModelServer socket.
+
+    Args:
+        address: Address the server listens on
+        model_path: Model file on the server side (default: its default model)
+    """
+
+    def __init__(self, address: str = DEFAULT_ADDRESS, model_path: Optional[str] = None):
+        self.address = address
+        self.model_path = model_path
+        self._lock = threading.Lock()
+        kind, target = _parse_address(address)
+        family = socket.AF_UNIX if kind == "unix" else socket.AF_INET
+        self._sock = socket.socket(family, socket.SOCK_STREAM)
+        self._sock.connect(target)
+        self._file = self._sock.makefile('rb')
+
+    def _call(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        line = json.dumps(request, separators=(",", ":")).encode() + b"\n"
+        with self._lock:
+            self._sock.sendall(line)
+            response = json.loads(self._file.readline(MAX_LINE_BYTES))
+        if not response.get('ok'):
+            raise RuntimeError(f"Model server error: {response.get('error')}")
+        return response
+
+    def predict_proba(self, X, validate_features: bool = False) -> np.ndarray:
+        rows = np.asarray(X, dtype=np.float32).tolist()
+        return np.asarray(self._call({'op': 'predict_proba', 'model': self.model_path, 'X': rows})['proba'])
+
+    def predict(self, X, validate_features: bool = False) -> np.ndarray:
+        return self.predict_proba(X).argmax(axis=1)
+
+    def close(self):
+        self._sock.close()
+
+
+def server_available(address: str = DEFAULT_ADDRESS) -> bool:
+    """True if a model server is listening at ``address``"""
+    kind, target = _parse_address(address)
+    if kind == "unix" and not os.path.exists(target):
+        return False
+    family = socket.AF_UNIX if kind == "unix" else socket.AF_INET
+    with socket.socket(family, socket.SOCK_STREAM) as probe:
+        probe.settimeout(0.5)
+        try:
+            probe.connect(target)
+            return True
+        except OSError:
+            return False
+
+
+MODEL_SERVER = ModelServer(watch_interval=float(os.getenv("MODEL_WATCH_SECONDS", "2")))
+
+
+def get_model_handle(model_path: Optional[Path] = None) -> ModelHandle:
+    """
+    Model handle for a predictor: the shared server's when MODEL_SERVER_ADDRESS
+    points at a running one (it swaps versions itself), otherwise this
+    process's hot-swappable handle
+    """
+    address = os.getenv("MODEL_SERVER_ADDRESS")
+    if address and server_available(address):
+        logger.info(f"Using model server at {address}")
+        return ModelHandle('remote', RemoteModel(address, str(model_path) if model_path else None))
+    return MODEL_SERVER.handle(model_path)
+
+
+def get_model(model_path: Optional[Path] = None):
+    """Model currently behind get_model_handle(model_path)"""
+    return get_model_handle(model_path).model
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Shared XGBoost model server")
+    parser.add_argument("--address", default=os.getenv("MODEL_SERVER_ADDRESS", DEFAULT_ADDRESS))
+    parser.add_argument("--model", default=str(DEFAULT_MODEL_PATH))
+    parser.add_argument("--export", action="store_true", help="Write the native .ubj file and exit")
+    args = parser.parse_args()
+
+    if args.export:
+        export_native(Path(args.model))
+        return
+
+    MODEL_SERVER.get(Path(args.model))
+    try:
+        MODEL_SERVER.serve(args.address)
+    except KeyboardInterrupt:
+        MODEL_SERVER.shutdown()
+
+
+if __name__ == "__main__":
+    main()
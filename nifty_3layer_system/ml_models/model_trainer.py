@@ -1,6 +1,7 @@
 """
 MODEL TRAINER: Train XGBoost Model for 30-Min Direction Prediction
 - Uses cross-validation for robust training
+- Parallel walk-forward validation over N expanding/rolling folds (walk_forward.py)
 - Optimized hyperparameters for financial data
 - Saves trained model + performance metrics
 """
@@ -28,7 +29,27 @@ except ImportError:
 class ModelTrainer:
     """Train and evaluate XGBoost classification model"""
     
-    def __init__(self):
+    # Optimized hyperparameters (shared by train_model and walk_forward)
+    PARAMS = {
+        'objective': 'binary:logistic',
+        'max_depth': 6,
+        'learning_rate': 0.05,
+        'n_estimators': 200,
+        'subsample': 0.8,
+        'colsample_bytree': 0.8,
+        'min_child_weight': 3,
+        'gamma': 0.1,
+        'random_state': 42,
+        'eval_metric': 'logloss',
+        'use_label_encoder': False
+    }
+    
+    def __init__(self, params: dict = None):
+        """
+        Args:
+            params: Overrides for PARAMS (e.g. HyperparameterSearch.best_params())
+        """
+        self.params = {**self.PARAMS, **(params or {})}
         self.model = None
         self.feature_importance = None
         self.metrics = {}
@@ -72,7 +93,7 @@ class ModelTrainer:
         """
         Train XGBoost classifier with optimized hyperparameters
         
-        Hyperparameters tuned for financial time series:
+        Hyperparameters tuned for financial time series (PARAMS, overridable per trainer):
         - max_depth: 6 (prevent overfitting)
         - learning_rate: 0.05 (slower, more stable)
         - n_estimators: 200 (enough trees for complex patterns)
@@ -84,23 +105,8 @@ class ModelTrainer:
         # Convert -1/1 labels to 0/1 (XGBoost requirement)
         y_train = np.where(y_train == 1, 1, 0)
         
-        # Optimized hyperparameters
-        params = {
-            'objective': 'binary:logistic',
-            'max_depth': 6,
-            'learning_rate': 0.05,
-            'n_estimators': 200,
-            'subsample': 0.8,
-            'colsample_bytree': 0.8,
-            'min_child_weight': 3,
-            'gamma': 0.1,
-            'random_state': 42,
-            'eval_metric': 'logloss',
-            'use_label_encoder': False
-        }
-        
         # Train model
-        self.model = xgb.XGBClassifier(**params)
+        self.model = xgb.XGBClassifier(**self.params)
         self.model.fit(
             X_train, 
             y_train,
@@ -117,6 +123,47 @@ class ModelTrainer:
         
         return self.model
     
+    def walk_forward(self, df: pd.DataFrame, feature_cols: list, target_col: str = 'target',
+                     n_folds: int = 5, mode: str = 'expanding', test_size: int = None,
+                     train_size: int = None, gap: int = 3, workers: int = None) -> dict:
+        """
+        Walk-forward validation: train and test N chronological folds in parallel
+        
+        Args:
+            df: DataFrame with features and target, time-ordered
+            feature_cols: List of feature column names
+            target_col: Target column name (-1/+1 labels)
+            n_folds: Number of test windows
+            mode: 'expanding' or 'rolling' train window
+            test_size / train_size: Rows per test / rolling train window
+            gap: Rows purged between train and test (label horizon)
+            workers: Worker processes (default: one per CPU, at most n_folds)
+        
+        Returns:
+            {'folds': per-fold metrics, 'summary': mean/std/pooled metrics};
+            the summary is also stored in self.metrics['walk_forward']
+        """
+        from ml_models.walk_forward import make_folds, summarize, walk_forward
+        
+        X = df[feature_cols].to_numpy(dtype=np.float32)
+        y = np.where(df[target_col] == 1, 1, 0)
+        folds = make_folds(len(df), n_folds=n_folds, mode=mode, test_size=test_size,
+                           train_size=train_size, gap=gap)
+        logger.info(f"Walk-forward: {n_folds} {mode} folds over {len(df)} samples...")
+        
+        results = walk_forward(X, y, self.params, folds, workers=workers)
+        for fold in results:
+            fold['test_from'] = str(df.index[fold['test_start']])
+            fold['test_to'] = str(df.index[fold['test_end'] - 1])
+            logger.info(f"  Fold {fold['index'] + 1}: {fold['test_from']} → {fold['test_to']} | "
+                        f"Accuracy {fold['accuracy']*100:.2f}% | F1 {fold['f1_score']*100:.2f}%")
+        
+        summary = summarize(results)
+        self.metrics['walk_forward'] = summary
+        logger.info(f"✓ Walk-forward accuracy: {summary['accuracy_mean']*100:.2f}% "
+                    f"± {summary['accuracy_std']*100:.2f}% (pooled {summary['pooled_accuracy']*100:.2f}%)")
+        return {'folds': results, 'summary': summary}
+    
     def evaluate_model(self, X_test, y_test):
         """Evaluate model performance on test set"""
         logger.info("Evaluating model...")
@@ -137,8 +184,8 @@ class ModelTrainer:
         # Confusion matrix
         cm = confusion_matrix(y_test, y_pred)
         
-        # Store metrics
-        self.metrics = {
+        # Store metrics (alongside any walk-forward summary)
+        self.metrics.update({
             'accuracy': float(accuracy),
             'precision': float(precision),
             'recall': float(recall),
@@ -146,7 +193,7 @@ class ModelTrainer:
             'confusion_matrix': cm.tolist(),
             'test_samples': len(y_test),
             'train_date': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
+        })
         
         # Print results
         logger.info("="*70)
@@ -172,11 +219,12 @@ class ModelTrainer:
         """Save trained model to disk"""
         model_path = Path(__file__).parent.parent / "models" / model_name
         
-        # Save model
+        # Save model (pickle + XGBoost native format, which the model server prefers)
         with open(model_path, 'wb') as f:
             pickle.dump(self.model, f)
+        self.model.save_model(model_path.with_suffix('.ubj'))
         
-        logger.info(f"✓ Model saved: {model_path}")
+        logger.info(f"✓ Model saved: {model_path} (+ {model_path.with_suffix('.ubj').name})")
         
         # Save metrics
         metrics_path = model_path.with_suffix('.json')
@@ -192,6 +240,34 @@ class ModelTrainer:
         
         return model_path
     
+    def register_model(self, X_train: pd.DataFrame, registry=None, promote: bool = True, notes: str = "") -> str:
+        """
+        Store the trained model as a new registry version (live predictors
+        hot-swap to it when promoted)
+        
+        Args:
+            X_train: Training features (column order and time window are recorded)
+            registry: ModelRegistry (default: models/registry)
+            promote: Make it the current version
+            notes: Free text stored with the version
+        
+        Returns:
+            Version id
+        """
+        from ml_models.model_registry import ModelRegistry
+        
+        registry = registry or ModelRegistry()
+        return registry.register(
+            self.model,
+            metrics=self.metrics,
+            feature_cols=list(X_train.columns),
+            train_start=X_train.index[0],
+            train_end=X_train.index[-1],
+            train_rows=len(X_train),
+            notes=notes,
+            promote=promote,
+        )
+    
     def show_top_features(self, top_n: int = 10):
         """Display top N most important features"""
         logger.info(f"\nTop {top_n} Most Important Features:")
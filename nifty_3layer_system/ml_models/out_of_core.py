@@ -0,0 +1,424 @@
+"""
+OUT-OF-CORE TRAINING: Multi-year minute history without loading it into RAM
+- History lives as day partitions (<root>/<SYMBOL>/<YYYY-MM-DD>.csv);
+  partition_csv() splits one large CSV into them chunk by chunk
+- StreamingFeatures turns one day at a time into model features: 1-min bars
+  are resampled to 5-min, indicators run over a carried tail of previous
+  bars (long enough for the EMAs to converge) and the cumulative VWAP sums
+  are carried so dist_vwap matches a single full-history pass
+- Labels come from the label cube per day, so they never look across the
+  overnight gap
+- Feature rows are spooled to disk in fixed-size float32 batches; an
+  xgboost DataIter feeds them into an external-memory quantile matrix
+- Peak memory is one day of features + one spool batch + XGBoost's page
+  cache, independent of how many years are streamed
+
+Benchmark (from nifty_3layer_system/):
+    python -m ml_models.out_of_core [--years 2] [--symbols NIFTY BANKNIFTY SENSEX]
+"""
+
+import json
+import shutil
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import xgboost as xgb
+
+from ml_models.feature_engineer import FeatureEngineer
+from ml_models.label_cube import build_label_cube
+from ml_models.walk_forward import MAX_BIN, booster_params, fold_metrics
+
+OHLCV = ['open', 'high', 'low', 'close', 'volume']
+OHLCV_AGG = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+
+
+# ---------------------------------------------------------------------- partitions
+
+def partition_csv(csv_path: Path, root: Path, symbol: str, chunksize: int = 500_000) -> int:
+    """
+    Split a large time-ordered OHLCV CSV into day partitions, one chunk at a time
+
+    A day the CSV covers replaces any existing partition for that day, so
+    re-running (or re-partitioning an overlapping export) never duplicates
+    bars; days outside the CSV are left alone.
+
+    Returns:
+        Rows written
+    """
+    out = Path(root) / symbol.upper()
+    out.mkdir(parents=True, exist_ok=True)
+    rows = 0
+    started = set()  # days truncated by this run; a day can span two chunks
+    for chunk in pd.read_csv(csv_path, index_col=0, parse_dates=True, chunksize=chunksize):
+        for day, frame in chunk.groupby(chunk.index.date, sort=True):
+            path = out / f"{day.isoformat()}.csv"
+            first = path not in started
+            frame[OHLCV].to_csv(path, mode='w' if first else 'a', header=first)
+            started.add(path)
+            rows += len(frame)
+    return rows
+
+
+def iter_days(root: Path, symbol: str, start=None, end=None) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """(YYYY-MM-DD, candles) for each partition of ``symbol`` in date order"""
+    for path in sorted((Path(root) / symbol.upper()).glob("*.csv")):
+        day = path.stem
+        if (start and day < str(start)) or (end and day > str(end)):
+            continue
+        yield day, pd.read_csv(path, index_col=0, parse_dates=True)
+
+
+def resample_bars(df: pd.DataFrame, minutes: int) -> pd.DataFrame:
+    """Aggregate one day of bars to ``minutes`` OHLCV bars"""
+    bars = df[OHLCV].resample(f"{minutes}min", label='left', closed='left').agg(OHLCV_AGG)
+    return bars.dropna(subset=['close'])
+
+
+# ---------------------------------------------------------------------- features
+
+class StreamingFeatures:
+    """
+    Day-at-a-time FeatureEngineer with carry-over state
+
+    Args:
+        engineer: FeatureEngineer
+        warmup_bars: Previous bars carried into each day (indicator warm-up;
+            1000 5-min bars shrink EMA-200 start-up error below 1e-4)
+        resample_minutes: Bar size fed to the features (None = as stored)
+    """
+
+    def __init__(self, engineer: FeatureEngineer, warmup_bars: int = 1000,
+                 resample_minutes: Optional[int] = 5):
+        self.engineer = engineer
+        self.feature_cols = engineer.get_feature_columns()
+        self.warmup_bars = warmup_bars
+        self.resample_minutes = resample_minutes
+        self.tail: Optional[pd.DataFrame] = None
+        self.cum_pv = 0.0  # sum(close * volume) before the tail
+        self.cum_v = 0.0   # sum(volume) before the tail
+
+    def process(self, day: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Features for one day's bars
+
+        Returns:
+            (day's bars as fed to the features, feature rows for those bars)
+        """
+        bars = resample_bars(day, self.resample_minutes) if self.resample_minutes else day[OHLCV]
+        if bars.empty:
+            return bars, pd.DataFrame(columns=self.feature_cols)
+        frame = bars if self.tail is None else pd.concat([self.tail, bars])
+        features = self.engineer.generate_all_features(frame)
+        features = features[features.index >= bars.index[0]]
+
+        # VWAP over the full history: prefix sums carried from dropped bars
+        pv = (frame['close'] * frame['volume']).cumsum() + self.cum_pv
+        v = frame['volume'].cumsum() + self.cum_v
+        vwap = (pv / v).reindex(features.index)
+        features = features[self.feature_cols].copy()
+        features['dist_vwap'] = ((bars['close'].reindex(features.index) - vwap) / bars['close'].reindex(features.index)) * 100
+
+        # Carry state: drop bars that fall out of the tail, folding them into the prefix sums
+        dropped = frame.iloc[:-self.warmup_bars] if len(frame) > self.warmup_bars else frame.iloc[:0]
+        self.cum_pv += float((dropped['close'] * dropped['volume']).sum())
+        self.cum_v += float(dropped['volume'].sum())
+        self.tail = frame.iloc[-self.warmup_bars:]
+        return bars, features
+
+
+# ---------------------------------------------------------------------- spool
+
+@dataclass
+class FeatureSpool:
+    """
+    Feature/label batches on disk (X_<n>.npy float32, y_<n>.npy float32)
+
+    Args:
+        root: Spool directory (recreated)
+        batch_rows: Rows per batch file
+    """
+    root: Path
+    batch_rows: int = 200_000
+    batches: List[int] = field(default_factory=list)
+    rows: int = 0
+    start: Optional[str] = None
+    end: Optional[str] = None
+
+    def __post_init__(self):
+        self.root = Path(self.root)
+        shutil.rmtree(self.root, ignore_errors=True)
+        self.root.mkdir(parents=True)
+        self._X: List[np.ndarray] = []
+        self._y: List[np.ndarray] = []
+        self._pending = 0
+
+    def append(self, X: np.ndarray, y: np.ndarray, index: pd.Index):
+        if not len(X):
+            return
+        self._X.append(np.asarray(X, dtype=np.float32))
+        self._y.append(np.asarray(y, dtype=np.float32))
+        self._pending += len(X)
+        self.rows += len(X)
+        self.start = self.start or str(index[0])
+        self.end = str(index[-1])
+        if self._pending >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        n = len(self.batches)
+        np.save(self.root / f"X_{n}.npy", np.concatenate(self._X))
+        np.save(self.root / f"y_{n}.npy", np.concatenate(self._y))
+        self.batches.append(n)
+        self._X, self._y, self._pending = [], [], 0
+
+    def load(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Memory-mapped batch ``n``"""
+        return (np.load(self.root / f"X_{n}.npy", mmap_mode='r'),
+                np.load(self.root / f"y_{n}.npy", mmap_mode='r'))
+
+
+class SpoolIter(xgb.DataIter):
+    """Feeds spool batches to XGBoost (one batch in memory at a time)"""
+
+    def __init__(self, spool: FeatureSpool, cache_prefix: Optional[str] = None):
+        self.spool = spool
+        self._position = 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data) -> bool:
+        if self._position >= len(self.spool.batches):
+            return False
+        X, y = self.spool.load(self.spool.batches[self._position])
+        input_data(data=np.ascontiguousarray(X), label=np.ascontiguousarray(y))
+        self._position += 1
+        return True
+
+    def reset(self):
+        self._position = 0
+
+
+# ---------------------------------------------------------------------- pipeline
+
+def build_spools(
+    root: Path,
+    symbols: Sequence[str],
+    work_dir: Path,
+    valid_from: Optional[str] = None,
+    horizon_minutes: int = 15,
+    min_profit_points: float = 5.0,
+    resample_minutes: Optional[int] = 5,
+    warmup_bars: int = 1000,
+    batch_rows: int = 200_000,
+) -> Tuple[FeatureSpool, Optional[FeatureSpool]]:
+    """
+    Stream every day partition of ``symbols`` through features and labels into spools
+
+    Args:
+        root: Partition root
+        symbols: Instruments (each streamed with its own carry-over state)
+        work_dir: Spool directory
+        valid_from: First day (YYYY-MM-DD) of the validation spool (None = no validation)
+        horizon_minutes / min_profit_points: create_labels() settings
+        resample_minutes: Bar size of the model (5); None keeps stored bars
+        warmup_bars: Indicator warm-up carried between days
+        batch_rows: Rows per spool batch
+
+    Returns:
+        (train spool, validation spool or None)
+    """
+    engineer = FeatureEngineer()
+    train = FeatureSpool(Path(work_dir) / "train", batch_rows)
+    valid = FeatureSpool(Path(work_dir) / "valid", batch_rows) if valid_from else None
+
+    for symbol in symbols:
+        stream = StreamingFeatures(engineer, warmup_bars=warmup_bars, resample_minutes=resample_minutes)
+        days = 0
+        for day, candles in iter_days(root, symbol):
+            bars, features = stream.process(candles)
+            if features.empty:
+                continue
+            target = build_label_cube(bars, (horizon_minutes,), (min_profit_points,),
+                                      bar_minutes=resample_minutes or 1).target(horizon_minutes, min_profit_points)
+            target = target.reindex(features.index)
+            labeled = target != 0
+            spool = valid if valid is not None and day >= valid_from else train
+            spool.append(features[labeled].to_numpy(dtype=np.float32),
+                         (target[labeled] == 1).to_numpy(dtype=np.float32), features.index[labeled])
+            days += 1
+        logger.info(f"✓ {symbol}: {days} days streamed")
+
+    train.flush()
+    if valid is not None:
+        valid.flush()
+    return train, valid
+
+
+def external_matrix(spool: FeatureSpool, cache_prefix: str, ref=None):
+    """External-memory quantile matrix over ``spool`` (DMatrix on XGBoost < 3.0)"""
+    iterator = SpoolIter(spool, cache_prefix=cache_prefix)
+    if hasattr(xgb, "ExtMemQuantileDMatrix"):
+        return xgb.ExtMemQuantileDMatrix(iterator, max_bin=MAX_BIN, ref=ref)
+    return xgb.DMatrix(iterator)
+
+
+def train_out_of_core(
+    train: FeatureSpool,
+    valid: Optional[FeatureSpool] = None,
+    params: Optional[Dict] = None,
+    cache_dir: Optional[Path] = None,
+) -> Tuple[xgb.Booster, Dict]:
+    """
+    Train the direction model from spools through external memory
+
+    Args:
+        train / valid: From build_spools()
+        params: XGBClassifier keyword params (default: ModelTrainer.PARAMS)
+        cache_dir: XGBoost page cache (default: <train spool>/../cache)
+
+    Returns:
+        (booster, metrics) - metrics on the validation spool when given
+    """
+    from ml_models.model_trainer import ModelTrainer
+
+    params = params or ModelTrainer.PARAMS
+    cache_dir = Path(cache_dir or train.root.parent / "cache")
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    dtrain = external_matrix(train, str(cache_dir / "train"))
+    booster = xgb.train(booster_params(params), dtrain, num_boost_round=params.get('n_estimators', 100))
+
+    metrics = {'train_samples': train.rows}
+    if valid is not None and valid.rows:
+        y_true, p_up = [], []
+        for n in valid.batches:
+            X, y = valid.load(n)
+            p_up.append(booster.inplace_predict(np.ascontiguousarray(X)))
+            y_true.append(np.asarray(y))
+        metrics.update(fold_metrics(np.concatenate(y_true), np.concatenate(p_up)))
+        metrics['test_samples'] = valid.rows
+    return booster, metrics
+
+
+def register_out_of_core(booster: xgb.Booster, metrics: Dict, train: FeatureSpool,
+                         params: Optional[Dict] = None, promote: bool = False) -> str:
+    """Store the booster as a registry version"""
+    from ml_models.model_registry import ModelRegistry
+    from ml_models.model_trainer import ModelTrainer
+
+    return ModelRegistry().register(
+        booster,
+        metrics=metrics,
+        feature_cols=FeatureEngineer().get_feature_columns(),
+        train_start=train.start,
+        train_end=train.end,
+        train_rows=train.rows,
+        params=params or ModelTrainer.PARAMS,
+        notes="out_of_core",
+        promote=promote,
+    )
+
+
+# ---------------------------------------------------------------------- benchmark
+
+def write_synthetic_history(root: Path, symbols: Sequence[str], years: float, seed: int = 0) -> int:
+    """Random-walk 1-min session bars (09:15-15:29, weekdays) as day partitions"""
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=int(years * 250))
+    minutes = pd.timedelta_range(start="09:15:00", periods=375, freq="1min")
+    rows = 0
+    for symbol in symbols:
+        out = Path(root) / symbol
+        out.mkdir(parents=True, exist_ok=True)
+        price = 25000.0
+        for day in days:
+            close = price + rng.normal(0, 2.5, len(minutes)).cumsum()
+            price = close[-1]
+            spread = rng.uniform(0.5, 3, len(minutes))
+            frame = pd.DataFrame({
+                'open': close - rng.normal(0, 1, len(minutes)), 'high': close + spread,
+                'low': close - spread, 'close': close,
+                'volume': rng.integers(100, 5000, len(minutes)).astype(float),
+            }, index=day + minutes)
+            frame['high'] = frame[['open', 'high', 'close']].max(axis=1)
+            frame['low'] = frame[['open', 'low', 'close']].min(axis=1)
+            frame.to_csv(out / f"{day.date().isoformat()}.csv")
+            rows += len(frame)
+    return rows
+
+
+def check_parity(root: Path, symbol: str, days: int = 30) -> float:
+    """Max |streamed - in-memory| feature difference over the first ``days`` partitions"""
+    engineer = FeatureEngineer()
+    stream = StreamingFeatures(engineer)
+    streamed, bars = [], []
+    for i, (_, candles) in enumerate(iter_days(root, symbol)):
+        if i >= days:
+            break
+        day_bars, features = stream.process(candles)
+        streamed.append(features)
+        bars.append(day_bars)
+    full = engineer.generate_all_features(pd.concat(bars))[engineer.get_feature_columns()]
+    streamed = pd.concat(streamed)
+    common = streamed.index.intersection(full.index)
+    # Skip the first days, where the in-memory pass itself is still warming up its EMAs
+    common = common[common >= streamed.index[0] + pd.Timedelta(days=14)]
+    diff = (streamed.loc[common].astype(float) - full.loc[common].astype(float)).abs()
+    scale = full.loc[common].astype(float).abs().clip(lower=1.0)
+    return float((diff / scale).max().max())
+
+
+def main():
+    import argparse
+    import tempfile
+    try:
+        import resource  # Unix only; peak RSS is not reported without it
+    except ImportError:
+        resource = None
+
+    parser = argparse.ArgumentParser(description="Out-of-core training benchmark on synthetic 1-min history")
+    parser.add_argument("--years", type=float, default=1.0)
+    parser.add_argument("--symbols", nargs="+", default=["NIFTY", "BANKNIFTY", "SENSEX"])
+    parser.add_argument("--batch-rows", type=int, default=50_000)
+    args = parser.parse_args()
+
+    work = Path(tempfile.mkdtemp(prefix="out_of_core_"))
+    try:
+        rows = write_synthetic_history(work / "history", args.symbols, args.years)
+        print(f"Synthetic history: {rows:,} 1-min bars ({args.years} years x {len(args.symbols)} symbols)")
+        print(f"Streamed vs in-memory features (30 days): max relative difference "
+              f"{check_parity(work / 'history', args.symbols[0]):.2e}")
+
+        days = sorted(p.stem for p in (work / "history" / args.symbols[0]).glob("*.csv"))
+        valid_from = days[int(len(days) * 0.8)]
+        start = time.perf_counter()
+        train, valid = build_spools(work / "history", args.symbols, work / "spool",
+                                    valid_from=valid_from, batch_rows=args.batch_rows)
+        spool_seconds = time.perf_counter() - start
+        booster, metrics = train_out_of_core(train, valid)
+        total = time.perf_counter() - start
+
+        print(f"Spooled {train.rows:,} train + {valid.rows:,} validation rows in {len(train.batches)} "
+              f"batches ({spool_seconds:.1f}s); trained in {total - spool_seconds:.1f}s")
+        if resource is not None:
+            peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            print(f"Validation accuracy {metrics['accuracy']:.3f} | peak RSS {peak_mb:.0f} MB")
+        else:
+            print(f"Validation accuracy {metrics['accuracy']:.3f}")
+        print(json.dumps({k: round(v, 4) if isinstance(v, float) else v for k, v in metrics.items()}))
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+OUTCOME BENCHMARK: Batch target/SL resolution vs the per-signal candle walk
+- Parity: resolve_outcomes() against LevelTracker._check_hit() for every
+  signal (outcome, price, exit candle, duration, P&L, SL reason)
+- Tie-break policies: how many signals change outcome when a candle touches
+  both levels
+- Speed: thousands of backtest signals over a year of 5-min bars, and the
+  whole check_outcomes() round trip (read, resolve, one UPDATE transaction)
+
+Run (from nifty_3layer_system/):
+    python -m ml_models.outcome_benchmark [--signals 5000]
+"""
+
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from ml_models.level_tracker import TIE_BREAKS, LevelTracker, resolve_outcomes
+from ml_models.live_predictor import synthetic_candles
+
+
+def synthetic_signals(candles: pd.DataFrame, n_signals: int, seed: int = 0) -> pd.DataFrame:
+    """level_signals-shaped rows at random candle times with ATR-scaled levels"""
+    rng = np.random.default_rng(seed)
+    at = np.sort(rng.choice(len(candles) - 1, n_signals, replace=False))
+    entry = candles['close'].to_numpy()[at]
+    buy = rng.random(n_signals) < 0.5
+    atr = rng.uniform(4, 12, n_signals)
+    reward, risk = atr * rng.uniform(0.8, 2.5, n_signals), atr * rng.uniform(0.5, 1.5, n_signals)
+    return pd.DataFrame({
+        'id': np.arange(1, n_signals + 1),
+        'timestamp': candles.index[at].strftime('%Y-%m-%d %H:%M:%S'),
+        'symbol': 'NIFTY',
+        'direction': np.where(buy, 'BUY', 'SELL'),
+        'action': np.where(buy, 'BUY', 'SELL'),
+        'confidence': rng.uniform(55, 85, n_signals).round(1),
+        'current_price': entry,
+        'entry_price': entry,
+        'target_price': np.where(buy, entry + reward, entry - reward).round(2),
+        'sl_price': np.where(buy, entry - risk, entry + risk).round(2),
+        'atr': atr,
+        'risk_points': risk,
+        'reward_points': reward,
+        'rr_ratio': reward / risk,
+        'market_hour': candles.index[at].hour,
+    })
+
+
+def scalar_outcomes(tracker: LevelTracker, signals: pd.DataFrame, candles: pd.DataFrame) -> pd.DataFrame:
+    """The original per-signal path: filter candles after the signal, walk them with _check_hit()"""
+    rows = []
+    for _, signal in signals.iterrows():
+        future = candles[candles.index > pd.to_datetime(signal['timestamp'])]
+        if future.empty:
+            continue
+        outcome = tracker._check_hit(signal, future)
+        if outcome:
+            rows.append({'id': signal['id'], 'outcome': outcome['outcome'], 'outcome_price': outcome['price'],
+                         'outcome_time': outcome['time'].strftime('%Y-%m-%d %H:%M:%S'),
+                         'duration_minutes': int(outcome['duration']), 'pnl_points': outcome['pnl'],
+                         'reason_for_sl': outcome.get('reason')})
+    return pd.DataFrame(rows)
+
+
+def check_parity(tracker: LevelTracker, signals: pd.DataFrame, candles: pd.DataFrame) -> int:
+    """
+    Compare resolve_outcomes(tie_break='target_first') with scalar_outcomes()
+
+    Returns:
+        Signals compared (raises AssertionError on a mismatch)
+    """
+    expected = scalar_outcomes(tracker, signals, candles).set_index('id')
+    batch = resolve_outcomes(signals, candles, 'target_first').set_index('id')
+    assert batch.index.equals(expected.index), "resolved signal sets differ"
+    for column in ('outcome', 'outcome_time', 'duration_minutes', 'reason_for_sl'):
+        assert (batch[column].fillna('') == expected[column].fillna('')).all(), column
+    for column in ('outcome_price', 'pnl_points'):
+        assert np.allclose(batch[column].astype(float), expected[column].astype(float)), column
+    return len(signals)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Batch outcome resolution benchmark on synthetic 5-min bars")
+    parser.add_argument("--bars", type=int, default=18750)
+    parser.add_argument("--signals", type=int, default=5000)
+    args = parser.parse_args()
+
+    candles = synthetic_candles(args.bars, seed=3)
+    # Wider, open-offset bars so some candles straddle both levels
+    rng = np.random.default_rng(5)
+    candles['open'] = candles['close'] + rng.normal(0, 2, len(candles))
+    candles['high'] = candles[['open', 'close']].max(axis=1) + rng.uniform(0, 6, len(candles))
+    candles['low'] = candles[['open', 'close']].min(axis=1) - rng.uniform(0, 6, len(candles))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tracker = LevelTracker(db_path=str(Path(tmp) / "outcomes.db"))
+
+        sample = synthetic_signals(candles, 500, seed=1)
+        print(f"Parity OK on {check_parity(tracker, sample, candles)} signals "
+              f"(outcome, price, exit time, duration, P&L, SL reason)")
+
+        signals = synthetic_signals(candles, args.signals, seed=2)
+        outcomes = {}
+        for tie_break in TIE_BREAKS:
+            start = time.perf_counter()
+            outcomes[tie_break] = resolve_outcomes(signals, candles, tie_break)
+            elapsed = time.perf_counter() - start
+            wins = (outcomes[tie_break]['outcome'] == 'TARGET').mean() * 100
+            print(f"{tie_break:>13}: {len(outcomes[tie_break])} resolved in {elapsed * 1000:.1f} ms | "
+                  f"win rate {wins:.1f}%")
+        changed = (outcomes['target_first']['outcome'] != outcomes['stop_first']['outcome']).sum()
+        print(f"Same-candle target+SL touches: {changed} signals")
+
+        per_signal_sample = signals.iloc[:300]
+        start = time.perf_counter()
+        scalar_outcomes(tracker, per_signal_sample, candles)
+        per_signal = (time.perf_counter() - start) / len(per_signal_sample)
+        print(f"Per-signal walk: {per_signal * 1000:.1f} ms/signal -> "
+              f"{per_signal * len(signals):.1f}s for {len(signals)} signals")
+
+        # Full round trip: pending rows in the table, one check_outcomes() call
+        conn = sqlite3.connect(tracker.db_path)
+        signals.drop(columns='id').to_sql('level_signals', conn, if_exists='append', index=False)
+        conn.close()
+        start = time.perf_counter()
+        recorded = tracker.check_outcomes(candles, lookback_hours=None)
+        print(f"check_outcomes(): {recorded} outcomes read, resolved and written in "
+              f"{(time.perf_counter() - start) * 1000:.0f} ms (one transaction)")
+
+
+if __name__ == "__main__":
+    main()
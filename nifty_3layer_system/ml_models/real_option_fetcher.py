@@ -10,18 +10,27 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional
 from loguru import logger
 from integrations.dhan_client import DhanAPIClient
+from integrations.feed_gateway import create_rest_client
 import requests
 import json
 
 
 class RealTimeOptionFetcher:
-    """Fetch real option prices from Dhan API"""
+    """
+    Fetch real option prices from Dhan API
+
+    Args:
+        opening_chain: Optional ``opening_chain(symbol, expiry)`` returning the
+            session's opening option chain snapshot (e.g. PreMarketWarmer.opening_chain);
+            quotes then carry the OI change since the open
+    """
     
-    def __init__(self):
-        self.client = DhanAPIClient()
+    def __init__(self, opening_chain: Optional[Callable[[str, str], Optional[Dict]]] = None):
+        self.client = create_rest_client()  # via the feed gateway when one is running
+        self.opening_chain = opening_chain
         self.nifty_security_id = "13"
         self.nifty_lot_size = 65  # CORRECT lot size for NIFTY
         
@@ -33,7 +42,8 @@ class RealTimeOptionFetcher:
         """Get ATM strike from spot price"""
         return round(spot_price / strike_gap) * strike_gap
 
-    def _parse_expiry(self, expiry_str: str) -> Optional[datetime]:
+    @staticmethod
+    def _parse_expiry(expiry_str: str) -> Optional[datetime]:
         """Parse expiry string into datetime (best-effort)."""
         for fmt in ("%Y-%m-%d", "%d-%m-%Y", "%d%b%y", "%d%b%Y"):
             try:
@@ -136,6 +146,13 @@ class RealTimeOptionFetcher:
 
             logger.info(f"✅ Got Real Premium: ₹{premium:.2f} from Dhan API")
 
+            oi_change = None
+            opening = self.opening_chain('NIFTY', expiry_str) if self.opening_chain else None
+            if opening:
+                open_side = (opening.get('data', {}).get('oc', {}).get(strike_key) or {}).get(side_key)
+                if open_side:
+                    oi_change = oi - int(open_side.get('oi', 0))
+
             return {
                 'strike': int(float(strike_key)),
                 'option_type': option_type,
@@ -145,6 +162,7 @@ class RealTimeOptionFetcher:
                 'ask': round(float(ask), 2),
                 'volume': volume,
                 'oi': oi,
+                'oi_change_since_open': oi_change,
                 'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             }
         
@@ -185,6 +203,8 @@ class RealTimeOptionFetcher:
         logger.info(f"Bid-Ask: ₹{quote['bid']} - ₹{quote['ask']}")
         logger.info(f"Volume: {quote['volume']:,}")
         logger.info(f"OI: {quote['oi']:,}")
+        if quote.get('oi_change_since_open') is not None:
+            logger.info(f"OI change since open: {quote['oi_change_since_open']:+,}")
         
         return quote
     
@@ -230,6 +250,7 @@ class RealTimeOptionFetcher:
             'risk_reward': round(profit_rupees / loss_rupees, 2) if loss_rupees > 0 else 0,
             'volume': quote['volume'],
             'oi': quote['oi'],
+            'oi_change_since_open': quote.get('oi_change_since_open'),
             'bid_ask_spread': quote['ask'] - quote['bid']
         }
     
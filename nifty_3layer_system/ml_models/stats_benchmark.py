@@ -0,0 +1,157 @@
+"""
+STATS BENCHMARK: Aggregate-table statistics vs scanning level_signals
+- Parity: get_statistics() / get_sl_analysis() read from the trigger-
+  maintained level_stats / level_sl_reasons tables, compared with the
+  previous pandas aggregation over the raw rows, after outcomes written by
+  check_outcomes(), OutcomeWriter-style updates, re-resolution and deletes
+- Speed: both paths as the table grows; the aggregate path stays flat
+
+Run (from nifty_3layer_system/):
+    python -m ml_models.stats_benchmark
+"""
+
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from integrations.storage import SQLiteStore
+from ml_models.level_tracker import MIGRATIONS, LevelTracker
+from ml_models.live_predictor import synthetic_candles
+from ml_models.outcome_benchmark import synthetic_signals
+
+
+def scan_statistics(db_path: str, days: int) -> dict:
+    """The previous get_statistics(): SELECT * over the window, aggregate in pandas"""
+    conn = sqlite3.connect(db_path)
+    cutoff = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+    df = pd.read_sql_query(f"""
+        SELECT * FROM level_signals
+        WHERE timestamp >= '{cutoff}'
+        AND outcome IS NOT NULL
+    """, conn)
+    conn.close()
+    if df.empty:
+        return {'message': 'No completed signals yet'}
+
+    total = len(df)
+    wins = len(df[df['outcome'] == 'TARGET'])
+    hour_pnl = df.groupby('market_hour')['pnl_points'].mean()
+    return {
+        'total_signals': total,
+        'wins': wins,
+        'losses': len(df[df['outcome'] == 'SL']),
+        'win_rate': wins / total * 100,
+        'avg_win_duration_min': df[df['outcome'] == 'TARGET']['duration_minutes'].mean(),
+        'avg_loss_duration_min': df[df['outcome'] == 'SL']['duration_minutes'].mean(),
+        'avg_pnl_per_trade': df['pnl_points'].mean(),
+        'total_pnl': df['pnl_points'].sum(),
+        'best_hour': hour_pnl.idxmax(),
+        'worst_hour': hour_pnl.idxmin(),
+    }
+
+
+def scan_sl_analysis(db_path: str) -> pd.DataFrame:
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query("""
+        SELECT reason_for_sl, COUNT(*) as count,
+               AVG(confidence) as avg_confidence,
+               AVG(rr_ratio) as avg_rr
+        FROM level_signals
+        WHERE outcome = 'SL' AND reason_for_sl IS NOT NULL
+        GROUP BY reason_for_sl
+    """, conn)
+    conn.close()
+    return df
+
+
+def populate(tracker: LevelTracker, n_signals: int, seed: int = 0):
+    """Insert synthetic signals and resolve them the way the live writers do"""
+    candles = synthetic_candles(max(n_signals * 2, 18750), seed=seed)
+    signals = synthetic_signals(candles, n_signals, seed=seed)
+    conn = sqlite3.connect(tracker.db_path)
+    signals.drop(columns='id').to_sql('level_signals', conn, if_exists='append', index=False)
+    conn.close()
+
+    # Outcomes for most signals in one check_outcomes() transaction
+    tracker.check_outcomes(candles.iloc[:int(len(candles) * 0.9)], lookback_hours=None)
+
+    # The webapp's OutcomeWriter (no duration), a re-resolution and deletes
+    conn = sqlite3.connect(tracker.db_path)
+    pending = [row[0] for row in conn.execute("SELECT id FROM level_signals WHERE outcome IS NULL")]
+    conn.executemany("UPDATE level_signals SET outcome = ?, outcome_price = ?, outcome_time = ?, "
+                     "pnl_points = ? WHERE id = ?",
+                     [('TARGET' if i % 2 else 'SL', 25000.0, '2026-01-01 10:00:00', 4.0 - i % 9, i)
+                      for i in pending[::2]])
+    conn.execute("UPDATE level_signals SET outcome = 'SL', pnl_points = -7.5, "
+                 "reason_for_sl = 'Manual close' WHERE id % 97 = 0")
+    conn.execute("DELETE FROM level_signals WHERE id % 89 = 0")
+    conn.commit()
+    conn.close()
+
+
+def check_parity(tracker: LevelTracker) -> int:
+    """
+    Compare the aggregate path with the raw-row scan for several windows
+
+    Returns:
+        Windows compared (raises AssertionError on a mismatch)
+    """
+    windows = (1, 7, 30, 90)
+    for days in windows:
+        fast, slow = tracker.get_statistics(days=days), scan_statistics(tracker.db_path, days)
+        assert fast.keys() == slow.keys(), days
+        for key, expected in slow.items():
+            if pd.isna(expected):
+                assert fast[key] is None, (days, key)
+            else:
+                assert np.isclose(fast[key], expected), (days, key, fast[key], expected)
+
+    fast = tracker.get_sl_analysis().set_index('reason_for_sl').sort_index()
+    slow = scan_sl_analysis(tracker.db_path).set_index('reason_for_sl').sort_index()
+    assert fast.index.equals(slow.index)
+    assert np.allclose(fast.to_numpy(dtype=float), slow.to_numpy(dtype=float))
+    return len(windows)
+
+
+def time_call(fn, repeat: int = 20) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        tracker = LevelTracker(db_path=str(Path(tmp) / "stats.db"))
+        populate(tracker, 3000, seed=1)
+        print(f"Parity OK on {check_parity(tracker)} windows + SL analysis "
+              f"(check_outcomes, OutcomeWriter updates, re-resolution, deletes)")
+
+        # Backfill: a database that predates the aggregate tables
+        conn = sqlite3.connect(tracker.db_path)
+        conn.executescript("DROP TABLE level_stats; DROP TABLE level_sl_reasons; "
+                           "DELETE FROM schema_migrations WHERE name = 'level_stats_tables';")
+        conn.close()
+        SQLiteStore(tracker.db_path).migrate(MIGRATIONS)
+        check_parity(tracker)
+        print("Backfill on first open matches")
+
+        for n_signals in (2000, 20000, 100000):
+            tracker = LevelTracker(db_path=str(Path(tmp) / f"stats_{n_signals}.db"))
+            populate(tracker, n_signals, seed=2)
+            fast = time_call(lambda: (tracker.get_statistics(days=90), tracker.get_sl_analysis()))
+            slow = time_call(lambda: (scan_statistics(tracker.db_path, 90), scan_sl_analysis(tracker.db_path)),
+                             repeat=3)
+            print(f"{n_signals:>7} signals: aggregates {fast * 1000:.1f} ms | raw scan {slow * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
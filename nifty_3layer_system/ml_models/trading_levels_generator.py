@@ -3,6 +3,9 @@ TRADING LEVELS GENERATOR: Convert ML Predictions to Actual Trading Setup
 - Uses ML probability to calculate Level, Entry, Exit, SL
 - IST timezone
 - 15-30min forecast
+- predict_batch / predict_panel score whole series or many instruments at once
+- calculate_levels_batch runs the quality filter and BUY/SELL levels for every
+  bar at once (quality score, pass/fail, rejection bitmask, level arrays)
 """
 
 import pandas as pd
@@ -10,7 +13,7 @@ import numpy as np
 from datetime import datetime, timedelta
 import pytz
 from loguru import logger
-from typing import Dict, Optional
+from typing import Dict, List, Mapping, Optional, Union
 import sys
 from pathlib import Path
 
@@ -19,6 +22,28 @@ sys.path.append(str(Path(__file__).parent.parent))
 from ml_models.live_predictor import LivePredictor
 
 
+# Rejection bits of signal_quality_batch(), one per _check_signal_quality() check
+REJECT_CONFIDENCE = 1
+REJECT_TREND = 2
+REJECT_RSI = 4
+REJECT_MACD = 8
+REJECT_CHOPPY = 16
+REJECTION_NAMES = {
+    REJECT_CONFIDENCE: 'low_confidence',
+    REJECT_TREND: 'trend',
+    REJECT_RSI: 'rsi_extreme',
+    REJECT_MACD: 'macd',
+    REJECT_CHOPPY: 'choppy',
+}
+
+MAX_SL_POINTS = 13.0  # Rs.900 / 65 lot size = 13.8, using 13 for safety
+
+
+def decode_rejections(mask: int) -> List[str]:
+    """Names of the checks set in a rejection bitmask"""
+    return [name for bit, name in REJECTION_NAMES.items() if int(mask) & bit]
+
+
 class TradingLevelsGenerator:
     """Convert ML predictions into actual trading levels"""
     
@@ -261,7 +286,7 @@ class TradingLevelsGenerator:
         
         # STOPLOSS: Below entry by ATR * multiplier (CAPPED at 13 points max)
         calculated_sl_distance = atr * self.atr_multiplier
-        max_sl_points = 13.0  # Rs.900 / 65 lot size = 13.8, using 13 for safety
+        max_sl_points = MAX_SL_POINTS
         sl_distance = min(calculated_sl_distance, max_sl_points)
         sl_price = entry - sl_distance
         
@@ -322,7 +347,7 @@ class TradingLevelsGenerator:
         
         # STOPLOSS: Above entry by ATR * multiplier (CAPPED at 13 points max)
         calculated_sl_distance = atr * self.atr_multiplier
-        max_sl_points = 13.0  # Rs.900 / 65 lot size = 13.8, using 13 for safety
+        max_sl_points = MAX_SL_POINTS
         sl_distance = min(calculated_sl_distance, max_sl_points)
         sl_price = entry + sl_distance
         
@@ -362,6 +387,183 @@ class TradingLevelsGenerator:
             'sl_description': f"Stop loss at {round(sl_price, 2)} (risk {round(risk, 2)} points)"
         }
     
+    def signal_quality_batch(self, df: pd.DataFrame, direction, ml_confidence) -> pd.DataFrame:
+        """
+        _check_signal_quality() for every bar at once
+        
+        Row i equals _check_signal_quality(df.iloc[:i+1], direction[i], ml_confidence[i]).
+        
+        Args:
+            df: Feature frame of one instrument (close, ema_5/20/50, rsi, macd_histogram)
+            direction: 'BUY'/'SELL' per bar
+            ml_confidence: ML confidence per bar (0-100)
+        
+        Returns:
+            DataFrame with quality_score, quality_pct, is_quality_signal and
+            rejection_mask (REJECT_* bits), indexed like df
+        """
+        n = len(df)
+        close = df['close'].to_numpy(dtype=np.float64)
+        
+        def column(name, default):
+            return df[name].to_numpy(dtype=np.float64) if name in df.columns else np.broadcast_to(default, n)
+        
+        buy = np.asarray(direction) == 'BUY'
+        confidence = np.asarray(ml_confidence, dtype=np.float64)
+        score = np.zeros(n)
+        mask = np.zeros(n, dtype=np.int64)
+        
+        # CHECK 1: ML confidence >= 70%
+        ok = confidence >= 70
+        score += ok
+        mask |= np.where(ok, 0, REJECT_CONFIDENCE)
+        
+        # CHECK 2: EMA trend alignment
+        ema5, ema20, ema50 = column('ema_5', close), column('ema_20', close), column('ema_50', close)
+        full = np.where(buy, (close > ema20) & (ema5 > ema20), (close < ema20) & (ema5 < ema20))
+        half = np.where(buy, close > ema50, close < ema50)
+        score += np.where(full, 1, np.where(half, 0.5, 0))
+        mask |= np.where(full | half, 0, REJECT_TREND)
+        
+        # CHECK 3: RSI not extreme against direction (+0.5 bonus coming from the other extreme)
+        rsi = column('rsi', 50.0)
+        full = np.where(buy, rsi < 70, rsi > 30)
+        half = np.where(buy, rsi < 80, rsi > 20)
+        score += np.where(full, 1, np.where(half, 0.5, 0))
+        score += np.where(np.where(buy, rsi < 40, rsi > 60), 0.5, 0)
+        mask |= np.where(full | half, 0, REJECT_RSI)
+        
+        # CHECK 4: MACD histogram positive/improving (BUY) or negative/declining (SELL)
+        hist = column('macd_histogram', 0.0)
+        prev = np.concatenate([[0.0], hist[:-1]]) if n else hist
+        ok = np.where(buy, (hist > 0) | (hist > prev), (hist < 0) | (hist < prev))
+        score += ok
+        mask |= np.where(ok, 0, REJECT_MACD)
+        
+        # CHECK 5: direction changes over the last 10 closes (9 moves, 8 possible flips)
+        up = (np.diff(close, prepend=np.nan) > 0).astype(np.float64)
+        flips = np.abs(np.diff(up, prepend=np.nan))
+        flips[:2] = np.nan  # the first move has no predecessor
+        changes = pd.Series(flips).rolling(8, min_periods=1).sum().fillna(0).to_numpy()
+        score += np.where(changes <= 5, 1, np.where(changes <= 7, 0.5, 0))
+        mask |= np.where(changes <= 7, 0, REJECT_CHOPPY)
+        
+        quality_pct = score / 5 * 100
+        return pd.DataFrame({
+            'quality_score': score,
+            'quality_pct': quality_pct,
+            'is_quality_signal': quality_pct >= 60,
+            'rejection_mask': mask,
+        }, index=df.index)
+    
+    def levels_arrays(self, price, atr, high, low, confidence, direction) -> Dict[str, np.ndarray]:
+        """
+        _calculate_buy_levels() / _calculate_sell_levels() numbers for arrays of bars
+        
+        Args:
+            price, atr, high, low: Per-bar current price, ATR and 20-candle high/low
+            confidence: ML confidence per bar (0-1)
+            direction: 'BUY'/'SELL' per bar
+        
+        Returns:
+            level_zone, entry, exit_target, stoploss, risk_per_trade,
+            reward_per_trade, risk_reward_ratio and target_points arrays (rounded like the scalar path)
+        """
+        price, atr = np.asarray(price, dtype=np.float64), np.asarray(atr, dtype=np.float64)
+        high, low = np.asarray(high, dtype=np.float64), np.asarray(low, dtype=np.float64)
+        confidence = np.asarray(confidence, dtype=np.float64)
+        sign = np.where(np.asarray(direction) == 'BUY', 1.0, -1.0)
+        
+        level_zone = np.where(sign > 0, low, high)
+        entry = price * (1 + sign * self.buffer_pct / 100)
+        target_points = atr * np.where(confidence >= 0.75, 2.5, np.where(confidence >= 0.65, 2.0, 1.5))
+        exit_price = entry + sign * target_points
+        sl_price = entry - sign * np.minimum(atr * self.atr_multiplier, MAX_SL_POINTS)
+        
+        risk = sign * (entry - sl_price)
+        reward = sign * (exit_price - entry)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rr_ratio = np.where(risk > 0, reward / risk, 0.0)
+        
+        return {
+            'level_zone': level_zone.round(2),
+            'entry': entry.round(2),
+            'exit_target': exit_price.round(2),
+            'stoploss': sl_price.round(2),
+            'risk_per_trade': risk.round(2),
+            'reward_per_trade': reward.round(2),
+            'risk_reward_ratio': rr_ratio.round(2),
+            'target_points': target_points.round(2),
+        }
+    
+    def calculate_levels_batch(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        calculate_levels() for every bar of one instrument in one pass
+        
+        Args:
+            df: OHLCV candles
+        
+        Returns:
+            predict_batch() columns plus quality_score, is_quality_signal,
+            rejection_mask and the level columns; bars failing the quality
+            filter get action WAIT and no entry/exit/stoploss (level_zone kept)
+        """
+        features = self.predictor.fe.generate_all_features(df)
+        result = self.predictor.predict_batch(features, features_ready=True)
+        context = self._batch_context(features)
+        quality = self.signal_quality_batch(features, result['direction'], result['confidence'])
+        levels = pd.DataFrame(self.levels_arrays(
+            context['current_price'], context['atr'], context['recent_20c_high'],
+            context['recent_20c_low'], result['confidence'] / 100, result['direction'],
+        ), index=features.index)
+        
+        failed = ~quality['is_quality_signal']
+        tradable = ['entry', 'exit_target', 'stoploss', 'risk_per_trade', 'reward_per_trade',
+                    'risk_reward_ratio', 'target_points']
+        levels.loc[failed, tradable] = np.nan
+        result.loc[failed, 'action'] = 'WAIT'
+        
+        return pd.concat([result, context.round(2), quality.drop(columns='quality_score')
+                          .rename(columns={'quality_pct': 'quality_score'}), levels], axis=1)
+    
+    def _batch_context(self, features: pd.DataFrame, by_symbol: bool = False) -> pd.DataFrame:
+        """Per-bar market context calculate_levels reads from the last rows"""
+        high, low = features['high'], features['low']
+        if by_symbol:
+            # Windows restart at each symbol; drop the group level groupby prepends
+            high = high.groupby(level='symbol', sort=False).rolling(20, min_periods=1).max().droplevel(0)
+            low = low.groupby(level='symbol', sort=False).rolling(20, min_periods=1).min().droplevel(0)
+        else:
+            high = high.rolling(20, min_periods=1).max()
+            low = low.rolling(20, min_periods=1).min()
+        return pd.DataFrame({
+            'current_price': features['close'],
+            'atr': features['atr'],
+            'recent_20c_high': high,
+            'recent_20c_low': low,
+        }, index=features.index)
+
+    def predict_batch(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        ML direction plus market context for every bar of one instrument
+        
+        Args:
+            df: OHLCV candles
+        
+        Returns:
+            LivePredictor.predict_batch() columns plus current_price, atr,
+            recent_20c_high and recent_20c_low
+        """
+        features = self.predictor.fe.generate_all_features(df)
+        predictions = self.predictor.predict_batch(features, features_ready=True)
+        return predictions.join(self._batch_context(features))
+
+    def predict_panel(self, panel: Union[Mapping[str, pd.DataFrame], pd.DataFrame]) -> pd.DataFrame:
+        """predict_batch() for many instruments, indexed by (symbol, timestamp)"""
+        features = self.predictor.panel_features(panel)
+        predictions = self.predictor.predict_features(features)
+        return predictions.join(self._batch_context(features, by_symbol=True))
+
     def format_for_display(self, levels: Dict) -> str:
         """Format levels for beautiful display"""
         
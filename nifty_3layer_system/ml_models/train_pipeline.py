@@ -13,7 +13,7 @@ from ml_models.feature_engineer import FeatureEngineer
 from ml_models.model_trainer import ModelTrainer
 
 
-def run_complete_pipeline(days: int = 90):
+def run_complete_pipeline(days: int = 90, walk_forward_folds: int = 5):
     """
     Run complete ML training pipeline
     
@@ -22,11 +22,12 @@ def run_complete_pipeline(days: int = 90):
     2. Create UP/DOWN labels for 30-min predictions
     3. Generate 30 technical features
     4. Train XGBoost model
-    5. Evaluate performance
+    5. Evaluate performance (hold-out split + parallel walk-forward folds)
     6. Save model for live trading
     
     Args:
         days: Number of days to fetch (max 90)
+        walk_forward_folds: Walk-forward folds to validate on (0 to skip)
     """
     logger.info("="*70)
     logger.info("ML PIPELINE - COMPLETE TRAINING")
@@ -67,10 +68,13 @@ def run_complete_pipeline(days: int = 90):
     logger.info("-"*70)
     
     trainer.evaluate_model(X_test, y_test)
+    if walk_forward_folds:
+        trainer.walk_forward(df_features, feature_cols, n_folds=walk_forward_folds)
     trainer.show_top_features(top_n=15)
     
-    # Save model
+    # Save model (legacy files + a new registry version that live predictors pick up)
     model_path = trainer.save_model()
+    version = trainer.register_model(X_train, notes="train_pipeline")
     
     # Final summary
     logger.info("\n" + "="*70)
@@ -79,7 +83,7 @@ def run_complete_pipeline(days: int = 90):
     logger.info(f"Training samples: {len(X_train)}")
     logger.info(f"Test samples: {len(X_test)}")
     logger.info(f"Accuracy: {trainer.metrics['accuracy']*100:.2f}%")
-    logger.info(f"Model saved: {model_path}")
+    logger.info(f"Model saved: {model_path} (registry version {version})")
     logger.info("\nNext step: Run live_predictor.py for real-time predictions")
     logger.info("="*70)
 
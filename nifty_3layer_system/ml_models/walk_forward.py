@@ -0,0 +1,265 @@
+"""
+WALK-FORWARD: Parallel walk-forward training and evaluation
+- N chronological folds, expanding (train from the first row) or rolling
+  (fixed-length train window); a purge gap between train and test keeps the
+  labels' look-ahead out of the training rows
+- The feature matrix and labels are copied once into shared memory; worker
+  processes map them without pickling per fold
+- Quantile cuts are sketched once per worker from the rows before the first
+  fold's train end, which precede every fold's test window (and are inside
+  every expanding fold's training set); each fold's QuantileDMatrix reuses
+  them via ref=, so no feature values from a test window leak into the bins
+- Per-fold accuracy/precision/recall/F1/log-loss plus mean, std and pooled
+  out-of-sample accuracy
+
+Benchmark (from nifty_3layer_system/):
+    python -m ml_models.walk_forward [--folds 8] [--workers 4] [--mode rolling]
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import xgboost as xgb
+from sklearn.metrics import accuracy_score, f1_score, log_loss, precision_score, recall_score
+
+MAX_BIN = 256
+
+
+@dataclass
+class Fold:
+    """Row positions [train_start, train_end) and [test_start, test_end)"""
+    index: int
+    train_start: int
+    train_end: int
+    test_start: int
+    test_end: int
+
+
+def make_folds(
+    n_rows: int,
+    n_folds: int = 5,
+    mode: str = "expanding",
+    test_size: Optional[int] = None,
+    train_size: Optional[int] = None,
+    gap: int = 3,
+) -> List[Fold]:
+    """
+    Chronological walk-forward folds over ``n_rows`` rows
+
+    Args:
+        n_rows: Rows in the (time-ordered) dataset
+        n_folds: Number of test windows; they tile the end of the data
+        mode: 'expanding' (train from row 0) or 'rolling' (train_size rows)
+        test_size: Rows per test window (default: n_rows // (n_folds + 1))
+        train_size: Rolling train window (default: the first fold's train length)
+        gap: Rows dropped between train and test (default 3 = create_labels'
+            15-min horizon on 5-min bars)
+
+    Returns:
+        List of Fold, oldest first
+    """
+    if mode not in ("expanding", "rolling"):
+        raise ValueError(f"Unknown walk-forward mode: {mode}")
+    test_size = test_size or n_rows // (n_folds + 1)
+    first_test = n_rows - n_folds * test_size
+    if test_size <= 0 or first_test - gap <= 0:
+        raise ValueError(f"{n_rows} rows are not enough for {n_folds} folds of {test_size}")
+    train_size = train_size or first_test - gap
+
+    folds = []
+    for i in range(n_folds):
+        test_start = first_test + i * test_size
+        train_end = test_start - gap
+        train_start = 0 if mode == "expanding" else max(0, train_end - train_size)
+        folds.append(Fold(i, train_start, train_end, test_start, test_start + test_size))
+    return folds
+
+
+def booster_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """XGBClassifier keyword params as xgb.train() params (n_estimators is returned separately)"""
+    params = {k: v for k, v in params.items() if k not in ("n_estimators", "use_label_encoder")}
+    if "random_state" in params:
+        params["seed"] = params.pop("random_state")
+    params.setdefault("tree_method", "hist")
+    params.setdefault("max_bin", MAX_BIN)
+    return params
+
+
+# ---------------------------------------------------------------------- shared memory
+
+class SharedMatrix:
+    """A numpy array copied into a named shared-memory block (owner side)"""
+
+    def __init__(self, array: np.ndarray):
+        array = np.ascontiguousarray(array)
+        self.shape, self.dtype = array.shape, array.dtype.str
+        self.shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf)[...] = array
+
+    @property
+    def spec(self):
+        return self.shm.name, self.shape, self.dtype
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def attach(spec):
+    """Map a SharedMatrix by its spec (worker side); keep the returned block open while using the array"""
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+# ---------------------------------------------------------------------- worker side
+
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(x_spec, y_spec, params: Dict[str, Any], num_boost_round: int, sketch_rows: int):
+    """Map the shared matrices and sketch the quantile cuts once per worker"""
+    x_shm, X = attach(x_spec)
+    y_shm, y = attach(y_spec)
+    # Only rows every fold has seen by its test window: the cuts carry no future values
+    reference = xgb.QuantileDMatrix(X[:sketch_rows], max_bin=params["max_bin"])
+    _WORKER.update(shm=(x_shm, y_shm), X=X, y=y, reference=reference, params=params,
+                   num_boost_round=num_boost_round)
+
+
+def fold_metrics(y_true: np.ndarray, p_up: np.ndarray) -> Dict[str, float]:
+    """Classification metrics for one test window (class = p_up > 0.5)"""
+    y_pred = (p_up > 0.5).astype(int)
+    return {
+        'accuracy': float(accuracy_score(y_true, y_pred)),
+        'precision': float(precision_score(y_true, y_pred, zero_division=0)),
+        'recall': float(recall_score(y_true, y_pred, zero_division=0)),
+        'f1_score': float(f1_score(y_true, y_pred, zero_division=0)),
+        'log_loss': float(log_loss(y_true, p_up, labels=[0, 1])),
+        'up_rate': float(y_true.mean()),
+    }
+
+
+def _run_fold(fold: Fold) -> Dict[str, Any]:
+    X, y = _WORKER["X"], _WORKER["y"]
+    start = time.perf_counter()
+    train_rows = slice(fold.train_start, fold.train_end)
+    dtrain = xgb.QuantileDMatrix(X[train_rows], y[train_rows], ref=_WORKER["reference"])
+    booster = xgb.train(_WORKER["params"], dtrain, num_boost_round=_WORKER["num_boost_round"])
+
+    test_rows = slice(fold.test_start, fold.test_end)
+    p_up = booster.inplace_predict(X[test_rows])
+    return {
+        **asdict(fold),
+        **fold_metrics(y[test_rows], p_up),
+        'correct': int(((p_up > 0.5) == (y[test_rows] == 1)).sum()),
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+
+
+# ---------------------------------------------------------------------- driver
+
+def summarize(folds: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Mean/std of each per-fold metric and pooled out-of-sample accuracy"""
+    frame = pd.DataFrame(folds)
+    summary = {}
+    for metric in ('accuracy', 'precision', 'recall', 'f1_score', 'log_loss'):
+        summary[f'{metric}_mean'] = float(frame[metric].mean())
+        summary[f'{metric}_std'] = float(frame[metric].std(ddof=0))
+    test_rows = int((frame['test_end'] - frame['test_start']).sum())
+    summary['pooled_accuracy'] = float(frame['correct'].sum() / test_rows)
+    summary['folds'] = len(frame)
+    summary['test_samples'] = test_rows
+    return summary
+
+
+def walk_forward(
+    X: np.ndarray,
+    y: np.ndarray,
+    params: Dict[str, Any],
+    folds: Sequence[Fold],
+    workers: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Train and evaluate every fold in a process pool
+
+    Args:
+        X: (n_rows, n_features) features, time-ordered
+        y: (n_rows,) 0/1 labels
+        params: XGBClassifier keyword params (ModelTrainer.PARAMS)
+        folds: From make_folds()
+        workers: Processes (default: min(folds, CPUs))
+
+    Returns:
+        Per-fold dicts (row bounds, metrics, seconds), in fold order
+    """
+    cpus = os.cpu_count() or 1
+    workers = max(1, min(workers or cpus, len(folds)))
+    train_params = booster_params(params)
+    # Split the cores between workers instead of oversubscribing them
+    train_params["nthread"] = max(1, cpus // workers)
+
+    x_shared = SharedMatrix(np.asarray(X, dtype=np.float32))
+    y_shared = SharedMatrix(np.asarray(y, dtype=np.float32))
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(x_shared.spec, y_shared.spec, train_params, params.get("n_estimators", 100),
+                      min(fold.train_end for fold in folds)),
+        ) as pool:
+            return list(pool.map(_run_fold, folds))
+    finally:
+        x_shared.close()
+        y_shared.close()
+
+
+def main():
+    import argparse
+
+    from ml_models.feature_engineer import FeatureEngineer
+    from ml_models.live_predictor import synthetic_candles
+    from ml_models.model_trainer import ModelTrainer
+
+    parser = argparse.ArgumentParser(description="Walk-forward benchmark on a synthetic year of 5-min bars")
+    parser.add_argument("--bars", type=int, default=18750)
+    parser.add_argument("--folds", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--mode", choices=("expanding", "rolling"), default="expanding")
+    args = parser.parse_args()
+
+    fe = FeatureEngineer()
+    df = fe.generate_all_features(synthetic_candles(args.bars, seed=3))
+    future = df['close'].shift(-3) - df['close']
+    df['target'] = np.where(future > 0, 1, -1)
+    df = df.iloc[:-3]
+
+    trainer = ModelTrainer()
+    start = time.perf_counter()
+    result = trainer.walk_forward(df, fe.get_feature_columns(), n_folds=args.folds,
+                                  mode=args.mode, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    for fold in result['folds']:
+        print(f"fold {fold['index']}: train {fold['train_end'] - fold['train_start']:>6} rows | "
+              f"test {fold['test_end'] - fold['test_start']:>5} | acc {fold['accuracy']:.3f} | "
+              f"{fold['seconds']:.1f}s")
+    summary = result['summary']
+    print(f"{len(df)} rows, {args.folds} {args.mode} folds in {elapsed:.1f}s | "
+          f"accuracy {summary['accuracy_mean']:.3f} ± {summary['accuracy_std']:.3f} "
+          f"(pooled {summary['pooled_accuracy']:.3f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,8 @@
 Monitor WebSocket live feed and show real-time ticks
 """
 import asyncio
-from integrations.dhan_websocket import DhanWebSocket, ExchangeSegment, InstrumentType
+from integrations.dhan_websocket import ExchangeSegment, InstrumentType
+from integrations.feed_gateway import create_feed
 from config.instrument_config import InstrumentManager
 from dotenv import load_dotenv
 import os
@@ -39,7 +40,7 @@ def on_tick(tick):
     print(f"[{datetime.now().strftime('%H:%M:%S')}] {symbol:8} | LTP: {tick.ltp:10.2f} | Tick #{tick_count[symbol]}")
 
 async def monitor_feed():
-    ws = DhanWebSocket(access_token=ACCESS_TOKEN, client_id=CLIENT_ID)
+    ws = await create_feed(access_token=ACCESS_TOKEN, client_id=CLIENT_ID)
     ws.on_tick(on_tick)
     
     await ws.connect()
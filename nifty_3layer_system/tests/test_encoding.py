@@ -0,0 +1,45 @@
+"""webapp.encoding: the stdlib json fallback matches orjson's output"""
+
+import json
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from webapp import encoding
+
+PAYLOAD = {
+    "symbol": "NIFTY",
+    "entry": np.float64(25012.35),
+    "quality_score": np.int64(7),
+    "confidence": np.float32(71.5),
+    "atr": float("nan"),
+    "closes": np.array([25000.0, np.nan, 25010.5]),
+    "volumes": np.array([100, 200], dtype=np.int64),
+    "generated_at": datetime(2026, 1, 20, 9, 20),
+    "zones": [{"price": np.float64(25000), "strength": np.inf}],
+}
+
+EXPECTED = {
+    "symbol": "NIFTY",
+    "entry": 25012.35,
+    "quality_score": 7,
+    "confidence": 71.5,
+    "atr": None,
+    "closes": [25000.0, None, 25010.5],
+    "volumes": [100, 200],
+    "generated_at": "2026-01-20T09:20:00+00:00",
+    "zones": [{"price": 25000.0, "strength": None}],
+}
+
+
+def test_stdlib_fallback(monkeypatch):
+    monkeypatch.setattr(encoding, "orjson", None)
+    assert json.loads(encoding.dumps(PAYLOAD)) == EXPECTED
+    assert encoding.dumps({"a": 1.5}) == b'{"a":1.5}'
+
+
+def test_orjson_matches_fallback():
+    if encoding.orjson is None:
+        pytest.skip("orjson not installed")
+    assert json.loads(encoding.dumps(PAYLOAD)) == EXPECTED
@@ -0,0 +1,82 @@
+"""FeedGateway: lazy bar snapshots, REST through the gateway, async probe"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from integrations.dhan_websocket import TickData
+from integrations.feed_gateway import FeedClient, FeedGateway, GatewayRestClient, probe_gateway
+
+
+def _tick(k: int) -> TickData:
+    return TickData(security_id="13", exchange_segment=0, ltp=25000.0 + k, ltt=None, ltq=None, volume=None,
+                    bid=None, ask=None, oi=None, oi_change=None,
+                    timestamp=datetime(2026, 1, 15, 9, 15) + timedelta(seconds=20 * k))
+
+
+class _Candles:
+    """The one DhanAPIClient method the REST test needs"""
+
+    def get_historical_candles(self, security_id, exchange_segment, instrument, interval=5, days=5):
+        index = pd.date_range("2026-01-15 09:15", periods=days, freq=f"{interval}min", name="timestamp")
+        return pd.DataFrame({"close": [25000.0 + i for i in range(days)], "volume": range(days)}, index=index)
+
+
+def test_bar_snapshot_is_built_only_for_subscribers(tmp_path):
+    address = f"unix:{tmp_path / 'gateway.sock'}"
+
+    async def run():
+        gateway = FeedGateway(address=address, chain_interval=0)
+        builds = []
+        build = gateway.bars.snapshot
+        gateway.bars.snapshot = lambda security_id: builds.append(security_id) or build(security_id)
+        await gateway.start(connect_upstream=False)
+
+        for k in range(30):
+            gateway.on_tick(_tick(k))
+        assert builds == []
+
+        received = asyncio.Queue()
+        client = FeedClient(address)
+        await client.connect()
+        client.on("bar", received.put_nowait)
+        await client.subscribe("bar:13")
+        snapshot = await asyncio.wait_for(received.get(), 5)
+
+        await client.disconnect()
+        await gateway.stop()
+        return builds, snapshot
+
+    builds, snapshot = asyncio.run(run())
+    assert builds == ["13"]
+    assert snapshot["snapshot"]
+    assert len(snapshot["d"]["bars"]) == 9 and snapshot["d"]["current"]["ticks"] == 3
+
+
+def test_rest_client_round_trips_dataframes(tmp_path):
+    address = f"unix:{tmp_path / 'gateway.sock'}"
+    expected = _Candles().get_historical_candles("13", "IDX_I", "INDEX", days=10)
+
+    async def run():
+        gateway = FeedGateway(address=address, chain_interval=0)
+        gateway.client = _Candles()
+        await gateway.start(connect_upstream=False)
+        assert await probe_gateway(address)
+
+        client = GatewayRestClient(address, timeout=5)
+        # Positional arguments are bound to DhanAPIClient's signature
+        df = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: client.get_historical_candles("13", "IDX_I", "INDEX", days=10))
+        client.close()
+        await gateway.stop()
+        return df
+
+    df = asyncio.run(run())
+    pd.testing.assert_frame_equal(df, expected, check_freq=False, check_index_type=False)
+    assert isinstance(df.index, pd.DatetimeIndex)
+
+
+def test_probe_without_gateway(tmp_path):
+    assert not asyncio.run(probe_gateway(f"unix:{tmp_path / 'missing.sock'}"))
+    assert not asyncio.run(probe_gateway("tcp:127.0.0.1:9"))
@@ -0,0 +1,76 @@
+"""ml_models.hyperparameter_search: halving budgets, purged validation split, resume"""
+
+import sqlite3
+
+import numpy as np
+import pytest
+
+from ml_models import hyperparameter_search as hs
+from ml_models.live_predictor import synthetic_candles
+
+SPACE = {
+    'max_depth': ('int', 2, 4),
+    'learning_rate': ('log', 0.05, 0.3),
+    'horizon_minutes': ('choice', [15]),
+    'min_profit_points': ('choice', [3.0]),
+}
+
+
+def test_halving_budgets():
+    assert hs.halving_budgets(50, 800, 3) == [50, 150, 450, 800]
+    assert hs.halving_budgets(20, 100, 2) == [20, 40, 80, 100]
+    assert hs.halving_budgets(10, 10, 3) == [10]
+
+
+def test_matrices_purge_the_label_horizon(monkeypatch):
+    X = np.arange(200 * 3, dtype=np.float32).reshape(200, 3)
+    labels = np.zeros(200, dtype=np.int8)
+    labels[::2] = 1
+    labels[1::4] = -1  # rows 3, 7, ... stay unlabeled
+    monkeypatch.setattr(hs, "_WORKER", {"X": X, "valid_fraction": 0.2, "matrices": {}})
+
+    dtrain, dvalid, y_valid = hs._matrices((15, 3.0), labels, gap=3)
+
+    positions = np.flatnonzero(labels)
+    valid_start = positions[int(len(positions) * 0.8)]
+    assert dvalid.num_row() == len(y_valid) == (positions >= valid_start).sum()
+    # No training row within ``gap`` rows of the first validation row
+    assert dtrain.num_row() == (positions < valid_start - 3).sum()
+    assert dtrain.num_row() < (positions < valid_start).sum()
+    assert hs._matrices((15, 3.0), labels, gap=3)[0] is dtrain  # cached per label setting
+
+
+@pytest.fixture
+def search(tmp_path):
+    store = hs.SearchStore(tmp_path / "search.db")
+    return hs.HyperparameterSearch(synthetic_candles(1500, seed=5), store=store, space=SPACE,
+                                   early_stopping_rounds=5, workers=1)
+
+
+def test_resume_skips_finished_rungs(search):
+    search_id = search.run(search_id="partial", n_trials=4, min_rounds=5, max_rounds=20, eta=2)
+    finished = search.store.get_search(search_id)
+    results = search.store.results(search_id)
+    assert sorted(results.groupby('rung').size()) == [1, 2, 4]  # budgets 5, 10, 20
+    assert results['error'].isna().all()
+
+    # Interrupted after the first rung: later rungs lost, rung 0 tagged to see whether it re-runs
+    conn = sqlite3.connect(search.store.db_path)
+    conn.execute("DELETE FROM trial_results WHERE search_id = ? AND rung > 0", (search_id,))
+    conn.execute("UPDATE trial_results SET error = 'first run' WHERE search_id = ?", (search_id,))
+    conn.execute("UPDATE searches SET status = 'running', best_trial = NULL WHERE search_id = ?", (search_id,))
+    conn.commit()
+    conn.close()
+
+    assert search.run(search_id=search_id) == search_id
+
+    resumed = search.store.results(search_id)
+    assert (resumed[resumed['rung'] == 0]['error'] == 'first run').all()
+    assert resumed[resumed['rung'] > 0]['error'].isna().all()
+    assert sorted(resumed.groupby('rung').size()) == [1, 2, 4]
+    after = search.store.get_search(search_id)
+    assert after['status'] == 'finished'
+    assert after['best_trial'] == finished['best_trial']
+    params, label_kwargs = search.best_params(search_id)
+    assert label_kwargs == {'horizon_minutes': 15, 'min_profit_points': 3.0}
+    assert params['n_estimators'] >= 1
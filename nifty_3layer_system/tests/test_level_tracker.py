@@ -0,0 +1,74 @@
+"""resolve_outcomes(): batch target/SL resolution"""
+
+import numpy as np
+import pandas as pd
+
+from ml_models.level_tracker import LevelTracker, resolve_outcomes
+from ml_models.live_predictor import synthetic_candles
+from ml_models.outcome_benchmark import scalar_outcomes, synthetic_signals
+
+
+def _candles():
+    candles = synthetic_candles(600, seed=4)
+    rng = np.random.default_rng(9)
+    candles['high'] = candles['close'] + rng.uniform(0, 6, len(candles))
+    candles['low'] = candles['close'] - rng.uniform(0, 6, len(candles))
+    return candles
+
+
+def test_matches_per_signal_walk(tmp_path):
+    candles = _candles()
+    signals = synthetic_signals(candles, 150, seed=2)
+    tracker = LevelTracker(db_path=str(tmp_path / "levels.db"))
+
+    expected = scalar_outcomes(tracker, signals, candles).set_index('id')
+    batch = resolve_outcomes(signals, candles).set_index('id')
+
+    assert batch.index.equals(expected.index)
+    assert (batch['outcome'] == expected['outcome']).all()
+    assert (batch['outcome_time'] == expected['outcome_time']).all()
+    assert np.allclose(batch['pnl_points'].astype(float), expected['pnl_points'].astype(float))
+
+
+def test_nan_levels_stay_unresolved(tmp_path):
+    candles = _candles()
+    signals = synthetic_signals(candles, 40, seed=3)
+    signals.loc[:9, 'target_price'] = np.nan          # calculate_levels_batch() on filtered bars
+    signals.loc[10:19, ['target_price', 'sl_price']] = np.nan
+    signals.loc[20:29, 'sl_price'] = np.nan
+
+    outcomes = resolve_outcomes(signals, candles).set_index('id')
+    ids = signals['id'].to_numpy()
+
+    # Both levels missing: never resolved
+    assert not outcomes.index.isin(ids[10:20]).any()
+    # One level missing: only the other one can resolve it
+    assert (outcomes.loc[outcomes.index.isin(ids[:10]), 'outcome'] == 'SL').all()
+    assert (outcomes.loc[outcomes.index.isin(ids[20:30]), 'outcome'] == 'TARGET').all()
+    assert np.isfinite(outcomes['outcome_price'].astype(float)).all()
+    assert np.isfinite(outcomes['pnl_points'].astype(float)).all()
+
+    # Same as the per-candle walk, which never matches a NaN level
+    tracker = LevelTracker(db_path=str(tmp_path / "levels.db"))
+    expected = scalar_outcomes(tracker, signals, candles).set_index('id')
+    assert outcomes.index.equals(expected.index)
+    assert (outcomes['outcome'] == expected['outcome']).all()
+
+
+def test_none_levels_stay_unresolved():
+    candles = _candles()
+    signals = synthetic_signals(candles, 10, seed=5)
+    signals['target_price'] = signals['target_price'].astype(object)
+    signals.loc[:4, 'target_price'] = None            # NULL read back from level_signals
+    signals.loc[:4, 'sl_price'] = np.nan
+
+    outcomes = resolve_outcomes(signals, candles)
+    assert not outcomes['id'].isin(signals['id'].iloc[:5]).any()
+
+
+def test_all_levels_missing_resolves_nothing():
+    candles = _candles()
+    signals = synthetic_signals(candles, 5, seed=1)
+    signals[['target_price', 'sl_price']] = np.nan
+
+    assert resolve_outcomes(signals, candles).empty
@@ -0,0 +1,45 @@
+"""LivePredictor fast path: same probabilities and classes as XGBClassifier"""
+
+import numpy as np
+import pytest
+import xgboost as xgb
+
+from ml_models.feature_engineer import FeatureEngineer
+from ml_models.live_predictor import LivePredictor, synthetic_candles
+
+
+@pytest.fixture(scope="module")
+def features():
+    fe = FeatureEngineer()
+    frame = fe.generate_all_features(synthetic_candles(2000, seed=7))
+    return frame[fe.get_feature_columns()]
+
+
+def _predictor(tmp_path, features, early_stopping: bool) -> LivePredictor:
+    X = features.to_numpy(dtype=np.float32)
+    y = (np.random.default_rng(0).random(len(X)) < 0.3 + 0.4 * (features['rsi'] > 50)).astype(int)
+    split = len(X) * 3 // 4
+    params = dict(n_estimators=200, max_depth=4, learning_rate=0.3)
+    if early_stopping:
+        model = xgb.XGBClassifier(**params, early_stopping_rounds=5)
+        model.fit(X[:split], y[:split], eval_set=[(X[split:], y[split:])], verbose=False)
+        assert model.best_iteration + 1 < model.get_booster().num_boosted_rounds()
+    else:
+        model = xgb.XGBClassifier(**params).fit(X, y)
+    model.save_model(tmp_path / "model.ubj")
+    return LivePredictor(model_path=str(tmp_path / "model.pkl"))
+
+
+@pytest.mark.parametrize("early_stopping", [False, True], ids=["all_trees", "early_stopped"])
+def test_matches_predict_proba(tmp_path, features, early_stopping):
+    predictor = _predictor(tmp_path, features, early_stopping)
+    expected = predictor.model.predict_proba(features, validate_features=False)[:, 1]
+    expected_class = predictor.model.predict(features, validate_features=False)
+
+    p_up = predictor.predict_up_probability(features.to_numpy(dtype=np.float32))
+    row_by_row = np.array([predictor.predict_up_probability(features.iloc[[i]].to_numpy(dtype=np.float32))[0]
+                           for i in range(0, len(features), 7)])
+
+    assert np.abs(p_up - expected).max() <= 1e-6
+    assert np.abs(row_by_row - expected[::7]).max() <= 1e-6
+    assert ((p_up > 0.5).astype(int) == expected_class).all()
@@ -0,0 +1,20 @@
+"""NSE calendar: the shipped holiday list is loaded, a missing one is an error"""
+
+from datetime import date, datetime
+
+import pytest
+
+from config.market_calendar import IST, NSECalendar, load_holidays
+
+
+def test_shipped_holidays_are_not_trading_days():
+    calendar = NSECalendar()
+    assert not calendar.is_trading_day(date(2026, 1, 26))  # Republic Day, a Monday
+    assert calendar.is_trading_day(date(2026, 1, 27))
+    assert calendar.next_session_open(IST.localize(datetime(2026, 1, 23, 16, 0))).date() == date(2026, 1, 27)
+
+
+def test_missing_holiday_file_fails_loudly(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_holidays(tmp_path / "nse_holidays.txt")
+    assert NSECalendar(holidays=()).is_trading_day(date(2026, 1, 26))
@@ -0,0 +1,114 @@
+"""run_full_pipeline(): train, gate against the current version, register"""
+
+import pandas as pd
+import pytest
+
+from ml_models.incremental_update import FeatureStore
+from ml_models.live_predictor import synthetic_candles
+from ml_models.model_registry import ModelRegistry
+from ml_models.model_retraining_pipeline import ModelRetrainingPipeline
+
+
+CANDLES = synthetic_candles(3000, seed=7)
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    for name in ('DHAN_CLIENT_ID', 'DHAN_API_KEY', 'DHAN_API_SECRET', 'DHAN_ACCESS_TOKEN'):
+        monkeypatch.setenv(name, 'test')
+    pipeline = ModelRetrainingPipeline()
+    pipeline.models_dir = tmp_path
+    pipeline.registry = ModelRegistry(tmp_path / "registry")
+    pipeline.fetched = []
+
+    def fetch(days=90):
+        # Like the API: the last ``days`` calendar days up to now
+        pipeline.fetched.append(days)
+        return CANDLES[CANDLES.index >= pd.Timestamp.now().normalize() - pd.Timedelta(days=days - 1)]
+
+    monkeypatch.setattr(pipeline, 'fetch_fresh_data', fetch)
+    return pipeline
+
+
+def test_first_run_registers_and_promotes(pipeline):
+    result = pipeline.run_full_pipeline()
+
+    assert result['success'], result.get('error')
+    assert result['promoted']
+    assert pipeline.registry.current_version() == result['version']
+
+    # Training window is the train split, not every labeled row
+    window = pipeline.registry.metadata(result['version'])['train_window']
+    assert window['rows'] == len(pipeline.X_train)
+    assert window['end'] == pipeline.X_train.index[-1].isoformat()
+    assert window['end'] < pipeline.X_test.index[0].isoformat()
+
+
+def test_degraded_candidate_is_registered_but_not_promoted(pipeline, monkeypatch):
+    first = pipeline.run_full_pipeline()['version']
+    monkeypatch.setattr(pipeline, 'passes_gate', lambda comparison, metric='accuracy': False)
+
+    result = pipeline.run_full_pipeline()
+
+    assert result['success'], result.get('error')
+    assert not result['promoted']
+    assert result['version'] in pipeline.registry.versions()
+    assert pipeline.registry.current_version() == first
+
+
+def _store(tmp_path, pipeline, until: pd.Timestamp) -> FeatureStore:
+    store = FeatureStore(path=tmp_path / "store.pkl")
+    store.append(CANDLES[CANDLES.index <= until], pipeline.engineer)
+    return store
+
+
+def test_incremental_fetches_back_to_the_last_stored_bar(tmp_path, pipeline):
+    until = CANDLES.index[-1].normalize() - pd.Timedelta(days=3) + pd.Timedelta(hours=15)
+    store = _store(tmp_path, pipeline, until)
+
+    result = pipeline.run_incremental(store=store)
+
+    assert result['success'], result.get('error')
+    assert pipeline.fetched == [4]
+    assert store.candles.index[-1] == CANDLES.index[-1]
+    # No hole: every 5-min bar between the old last bar and now is stored
+    assert (store.candles.index.to_series().diff().dropna() == pd.Timedelta(minutes=5)).all()
+
+
+def test_incremental_rebuilds_after_a_gap_beyond_the_api_range(tmp_path, pipeline):
+    store = _store(tmp_path, pipeline, CANDLES.index[-1])
+    store.candles.index = store.candles.index - pd.Timedelta(days=120)
+    store.features.index = store.features.index - pd.Timedelta(days=120)
+
+    result = pipeline.run_incremental(store=store, window_days=30)
+
+    assert result['success'], result.get('error')
+    assert pipeline.fetched == [30]
+    assert store.candles.index[0] > CANDLES.index[-1] - pd.Timedelta(days=31)
+
+
+def test_incremental_fails_when_the_gap_is_not_covered(tmp_path, pipeline, monkeypatch):
+    store = _store(tmp_path, pipeline, CANDLES.index[-1] - pd.Timedelta(days=2))
+    monkeypatch.setattr(pipeline, 'fetch_fresh_data', lambda days: CANDLES.iloc[-50:])
+
+    result = pipeline.run_incremental(store=store)
+
+    assert not result['success']
+    assert 'gap' in result['error']
+
+
+def test_incremental_refits_after_another_run_promotes(tmp_path, pipeline, monkeypatch):
+    monkeypatch.setattr(pipeline, 'passes_gate', lambda comparison, metric='accuracy': True)
+    store = FeatureStore(path=tmp_path / "store.pkl")
+
+    first = pipeline.run_incremental(store=store)
+    assert first['success'], first.get('error')
+    assert store.trained_version == first['version']
+    assert pipeline.run_incremental(store=FeatureStore(path=store.path))['mode'] == 'continue'
+
+    # A full retrain promotes a model the store's cursor knows nothing about
+    assert pipeline.run_full_pipeline()['promoted']
+    result = pipeline.run_incremental(store=FeatureStore(path=store.path))
+
+    assert result['success'], result.get('error')
+    assert result['mode'] == 'window'
@@ -0,0 +1,38 @@
+"""ModelServer: the default handle follows the registry from the legacy model on"""
+
+import pickle
+
+import numpy as np
+import xgboost as xgb
+
+from ml_models import model_server
+from ml_models.model_registry import ModelRegistry
+from ml_models.model_server import ModelServer
+
+
+def _model(seed: int) -> xgb.XGBClassifier:
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(200, 4)).astype(np.float32)
+    model = xgb.XGBClassifier(n_estimators=5, max_depth=2)
+    model.fit(X, (X[:, seed % 4] > 0).astype(int))
+    return model
+
+
+def test_first_promotion_hot_swaps_the_legacy_model(tmp_path, monkeypatch):
+    legacy = tmp_path / "xgboost_direction_model.pkl"
+    with open(legacy, 'wb') as f:
+        pickle.dump(_model(0), f)
+    monkeypatch.setattr(model_server, 'DEFAULT_MODEL_PATH', legacy)
+    registry = ModelRegistry(tmp_path / "registry")
+    server = ModelServer(registry=registry, watch_interval=3600)
+
+    handle = server.handle()
+    assert handle.version is None
+    assert server._watcher is not None and server._watcher.is_alive()
+    assert server.handle(legacy) is handle
+
+    version = registry.register(_model(1), metrics={}, feature_cols=['a', 'b', 'c', 'd'], promote=True)
+    assert server.refresh()
+    assert handle.version == version
+    assert server.get() is handle.model
+    assert not server.refresh()
@@ -0,0 +1,21 @@
+"""ml_models.out_of_core: day partitions written from a large CSV"""
+
+import pandas as pd
+
+from ml_models.live_predictor import synthetic_candles
+from ml_models.out_of_core import OHLCV, iter_days, partition_csv
+
+
+def test_partitioning_twice_does_not_duplicate_bars(tmp_path):
+    candles = synthetic_candles(400, seed=2)[OHLCV]
+    csv_path = tmp_path / "history.csv"
+    candles.to_csv(csv_path)
+
+    # Small chunks, so days span chunk boundaries
+    assert partition_csv(csv_path, tmp_path / "parts", "nifty", chunksize=50) == len(candles)
+    assert partition_csv(csv_path, tmp_path / "parts", "NIFTY", chunksize=50) == len(candles)
+
+    stored = pd.concat(frame for _, frame in iter_days(tmp_path / "parts", "NIFTY"))
+    assert len(stored) == len(candles)
+    assert stored.index.equals(candles.index)
+    pd.testing.assert_frame_equal(stored, candles, check_freq=False, check_names=False)
@@ -0,0 +1,91 @@
+"""OutcomeWriter: batch isolation and retries of failed writes"""
+
+import asyncio
+import sqlite3
+
+import pytest
+
+from ml_models.level_tracker import LevelTracker
+from ml_models.live_predictor import synthetic_candles
+from ml_models.outcome_benchmark import synthetic_signals
+from webapp.outcome_writer import OutcomeWriter
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "metrics.db")
+    LevelTracker(db_path=path)
+    conn = sqlite3.connect(path)
+    signals = synthetic_signals(synthetic_candles(50, seed=0), 3)
+    signals.drop(columns='id').to_sql('level_signals', conn, if_exists='append', index=False)
+    conn.close()
+    return path
+
+
+def _outcomes(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = dict(conn.execute("SELECT id, outcome FROM level_signals"))
+    conn.close()
+    return rows
+
+
+def test_bad_write_fails_alone(db_path):
+    writer = OutcomeWriter(db_path=db_path)
+
+    async def run():
+        await writer.start()
+        ids = [1, 2, 3]
+        # Queued together, so they share one batch
+        futures = [writer.submit_outcome(ids[0], 'TARGET', 25020.0, 20.0),
+                   writer._enqueue("UPDATE missing_table SET x = ?", (1,), "rowcount"),
+                   writer.submit_outcome(ids[2], 'SL', 24990.0, -10.0)]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        await writer.stop()
+        return ids, results
+
+    ids, results = asyncio.run(run())
+    assert results[0] == 1 and results[2] == 1
+    assert isinstance(results[1], sqlite3.OperationalError)
+    assert _outcomes(db_path) == {ids[0]: 'TARGET', ids[1]: None, ids[2]: 'SL'}
+    assert writer.stats()['errors'] == 1
+
+
+def test_transient_failure_is_requeued(db_path, monkeypatch):
+    writer = OutcomeWriter(db_path=db_path, retries=2)
+    commit = writer._commit
+    failures = iter([True, False])
+
+    def flaky_commit(batch):
+        if any(sql.lstrip().startswith("UPDATE") for sql, _, _ in batch) and next(failures, False):
+            raise sqlite3.OperationalError("database is locked")
+        return commit(batch)
+
+    monkeypatch.setattr(writer, '_commit', flaky_commit)
+
+    async def run():
+        await writer.start()
+        rows = await writer.submit_outcome(2, 'TARGET', 25020.0, 20.0)
+        await writer.stop()
+        return rows
+
+    assert asyncio.run(run()) == 1
+    assert _outcomes(db_path) == {1: None, 2: 'TARGET', 3: None}
+    assert writer.stats()['retries'] == 1
+
+
+def test_retries_are_bounded(db_path, monkeypatch):
+    writer = OutcomeWriter(db_path=db_path, retries=2)
+
+    def locked(batch):
+        raise sqlite3.OperationalError("database is locked")
+
+    async def run():
+        await writer.start()
+        monkeypatch.setattr(writer, '_commit', locked)
+        future = writer.submit_outcome(1, 'TARGET', 25020.0, 20.0)
+        with pytest.raises(sqlite3.OperationalError):
+            await future
+        await writer.stop()
+
+    asyncio.run(run())
+    assert writer.stats()['retries'] == 2
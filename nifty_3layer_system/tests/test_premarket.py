@@ -0,0 +1,80 @@
+"""Pre-market warm-up: cache lifetime, opening chain snapshot and the warmed candles in compute_levels"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from config.market_calendar import IST, NSECalendar
+from integrations.dhan_client import CANDLE_CACHE_TTL
+from integrations.premarket import PreMarketWarmer
+from webapp import app as live
+from webapp.candle_store import CandleStore
+
+
+class _FixedCalendar(NSECalendar):
+    def __init__(self, now: datetime):
+        super().__init__()
+        self._now = now
+
+    def now(self) -> datetime:
+        return self._now
+
+
+class _Chains:
+    def get_expiry_list(self, underlying_scrip, underlying_seg):
+        return ["2026-01-13", "2026-01-20", "27JAN26"]
+
+    def get_option_chain(self, underlying_scrip, underlying_seg, expiry):
+        return {"data": {"last_price": 25000.0, "oc": {"25000": {"ce": {"oi": 1200}, "pe": {"oi": 900}}}}}
+
+
+PRE_OPEN = IST.localize(datetime(2026, 1, 20, 8, 55))
+
+
+def test_warmed_entries_outlive_the_lead():
+    warmer = PreMarketWarmer(_Chains(), instruments=["NIFTY"], lead_minutes=20, calendar=_FixedCalendar(PRE_OPEN))
+    assert warmer.cache_ttl == 20 * 60
+    warmer.calendar = _FixedCalendar(IST.localize(datetime(2026, 1, 20, 11, 0)))
+    assert warmer.cache_ttl == CANDLE_CACHE_TTL
+
+
+def test_opening_chain_is_kept_for_its_expiry():
+    warmer = PreMarketWarmer(_Chains(), instruments=["NIFTY"], calendar=_FixedCalendar(PRE_OPEN))
+    assert warmer.run().ready
+    assert warmer.expiries["NIFTY"] == {"current": "2026-01-20", "next": "27JAN26", "listed": 3}
+    assert warmer.opening_chain("nifty", "2026-01-20")["data"]["oc"]["25000"]["pe"]["oi"] == 900
+    assert warmer.opening_chain("NIFTY", "27JAN26") is None
+
+
+def _seed(store: CandleStore, start: str, end: str, seeded_at: float):
+    times = pd.date_range(start, end, freq="5min")  # UTC
+    epoch = times.values.astype("datetime64[s]").astype(np.int64)
+    close = 25000 + np.arange(len(epoch), dtype=float)
+    series = store.get("NIFTY", 5)
+    series.merge({"time": epoch, "open": close, "high": close + 1, "low": close - 1, "close": close,
+                  "volume": np.ones(len(epoch))})
+    series.seeded_at = seeded_at
+
+
+def test_compute_levels_reads_warmed_candles(monkeypatch):
+    monkeypatch.setattr(live.levels_scheduler, "calendar", _FixedCalendar(PRE_OPEN))
+    store = CandleStore()
+    monkeypatch.setattr(live, "CANDLES", store)
+
+    # Warmed at 08:40 IST, after the previous session closed: served from the store
+    _seed(store, "2026-01-14 03:45", "2026-01-19 10:00", PRE_OPEN.timestamp() - 15 * 60)
+    df = live._stored_candles("NIFTY", 5, 5)
+    assert isinstance(df.index, pd.DatetimeIndex) and df.index.name == "timestamp"
+    assert list(df.columns) == ["open", "high", "low", "close", "volume"]
+    assert df.index[0] >= pd.Timestamp("2026-01-15 03:25") and df.index[-1] == pd.Timestamp("2026-01-19 10:00")
+
+    # Seeded before the last close: stale
+    store.get("NIFTY", 5).seeded_at = IST.localize(datetime(2026, 1, 19, 15, 0)).timestamp()
+    assert live._stored_candles("NIFTY", 5, 5) is None
+
+    # Does not reach back as far as the requested lookback
+    store = CandleStore()
+    monkeypatch.setattr(live, "CANDLES", store)
+    _seed(store, "2026-01-19 03:45", "2026-01-19 10:00", PRE_OPEN.timestamp())
+    assert live._stored_candles("NIFTY", 5, 5) is None
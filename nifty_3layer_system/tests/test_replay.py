@@ -0,0 +1,96 @@
+"""webapp.replay: a replayed session records the same outcomes every time"""
+
+import asyncio
+import sqlite3
+import time
+from datetime import date, timedelta, timezone
+
+import pytest
+
+from integrations.tick_journal import KIND_TICK, TickJournalReader, write_synthetic_session
+from ml_models.level_tracker import LevelTracker
+from webapp import replay
+
+
+SIGNALS = [('BUY', 8, 12), ('SELL', 10, 6), ('BUY', 30, 4), ('SELL', 5, 25), ('BUY', 15, 15)]
+
+
+def _seed_signals(db_path: str, day: date, times=None):
+    LevelTracker(db_path=db_path)
+    conn = sqlite3.connect(db_path)
+    rows = []
+    times = times or [f"{day} 09:0{k}:00" for k in range(len(SIGNALS))]
+    for when, (direction, reward, risk) in zip(times, SIGNALS):
+        sign = 1 if direction == 'BUY' else -1
+        rows.append((when, 'NIFTY', direction, direction, 70.0, 25000.0, 25000.0,
+                     25000.0 + sign * reward, 25000.0 - sign * risk, 8.0, risk, reward, reward / risk, 9))
+    conn.executemany("""
+        INSERT INTO level_signals (timestamp, symbol, direction, action, confidence, current_price,
+                                   entry_price, target_price, sl_price, atr, risk_points, reward_points,
+                                   rr_ratio, market_hour)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    conn.commit()
+    conn.close()
+
+
+def _outcomes(db_path) -> list:
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT id, outcome, outcome_price, outcome_time FROM level_signals ORDER BY id").fetchall()
+    conn.close()
+    return rows
+
+
+def test_two_replays_record_identical_outcome_times(tmp_path):
+    day = date.today() - timedelta(days=3)
+    write_synthetic_session(tmp_path / "ticks", day, ticks=5000, depth_every=0)
+    source = str(tmp_path / "metrics.db")
+    _seed_signals(source, day)
+
+    first = asyncio.run(replay.replay(day, str(tmp_path / "ticks"), 0, source))
+    second = asyncio.run(replay.replay(day, str(tmp_path / "ticks"), 0, source))
+
+    outcomes = _outcomes(first)
+    assert all(outcome is not None for _, outcome, _, _ in outcomes)
+    # Journal time, not the wall clock of the run
+    assert all(when.startswith(str(day)) for *_, when in outcomes)
+    assert outcomes == _outcomes(second)
+
+
+@pytest.fixture
+def ist_host(monkeypatch):
+    """Run with the host clock in IST, as on the production box"""
+    monkeypatch.setenv("TZ", "Asia/Kolkata")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_replayed_outcome_time_is_the_tick_utc_time(tmp_path, ist_host):
+    day = date.today() - timedelta(days=3)
+    journal = write_synthetic_session(tmp_path / "ticks", day, ticks=5000, depth_every=0)
+    source = str(tmp_path / "metrics.db")
+    _seed_signals(source, day)
+
+    outcomes = _outcomes(asyncio.run(replay.replay(day, str(tmp_path / "ticks"), 0, source)))
+
+    reader = TickJournalReader(journal)
+    ticks = {(tick.timestamp.astimezone(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'), tick.ltp)
+             for _, kind, tick in reader.events() if kind == KIND_TICK}
+    reader.close()
+    assert outcomes and all((when, price) in ticks for _, _, price, when in outcomes)
+
+
+def test_only_signals_of_the_replayed_session_resolve(tmp_path, ist_host):
+    day = date.today() - timedelta(days=3)
+    write_synthetic_session(tmp_path / "ticks", day, ticks=5000, depth_every=0)
+    source = str(tmp_path / "metrics.db")
+    # Two in the session, one the day before, one after the last tick, one the day after
+    _seed_signals(source, day, [f"{day} 09:00:00", f"{day} 11:00:00", f"{day - timedelta(days=1)} 10:00:00",
+                                f"{day} 23:00:00", f"{day + timedelta(days=1)} 10:00:00"])
+
+    outcomes = _outcomes(asyncio.run(replay.replay(day, str(tmp_path / "ticks"), 0, source)))
+    assert [outcome is not None for _, outcome, _, _ in outcomes] == [True, True, False, False, False]
+    # The 11:00 signal only sees ticks from 11:00 IST (05:30 UTC) on
+    assert outcomes[1][3] >= f"{day} 05:30:00"
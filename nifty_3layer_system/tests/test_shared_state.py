@@ -0,0 +1,40 @@
+"""WorkerCoordinator.put(): shared-state writes stay off the event loop"""
+
+import asyncio
+import threading
+
+from webapp.shared_state import LocalState, SQLiteState, WorkerCoordinator
+
+
+def test_local_put_is_immediate():
+    state = LocalState()
+    WorkerCoordinator(state).put("signals", "active", {"count": 1})
+    assert state.get("signals", "active") == {"count": 1}
+
+
+def test_shared_put_is_written_by_the_exchange_thread(tmp_path):
+    state = SQLiteState(str(tmp_path / "state.db"))
+    writers = []
+    put = state.put
+
+    def recording_put(namespace, key, value):
+        writers.append(threading.current_thread())
+        put(namespace, key, value)
+
+    state.put = recording_put
+    coordinator = WorkerCoordinator(state, poll_interval=0.01)
+
+    async def run():
+        await coordinator.start()
+        for count in range(5):
+            coordinator.put("signals", "active", {"count": count})
+        assert state.get("signals", "active") is None  # nothing written on the loop
+        await asyncio.sleep(0.1)
+        await coordinator.stop()
+
+    asyncio.run(run())
+
+    assert state.get("signals", "active") == {"count": 4}
+    assert writers and all(t is not threading.main_thread() for t in writers)
+    assert len(writers) < 5  # coalesced per key
+    state.close()
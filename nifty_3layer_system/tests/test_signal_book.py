@@ -0,0 +1,71 @@
+"""SignalBook: per-tick target/SL resolution and bulk loading of pending signals"""
+
+import sqlite3
+
+from ml_models.level_tracker import LevelTracker
+from webapp.signal_book import ActiveSignal, SignalBook
+
+
+def test_targets_resolve_before_stops():
+    book = SignalBook()
+    book.add(ActiveSignal(1, "NIFTY", "BUY", 100.0, 105.0, 95.0))
+    book.add(ActiveSignal(2, "NIFTY", "SELL", 100.0, 96.0, 104.0))
+    book.add(ActiveSignal(3, "NIFTY", "BUY", 100.0, 110.0, 98.0))
+
+    # Up through the BUY target of 1 and the SELL stop of 2; 3 is untouched
+    hits = book.on_price("NIFTY", 106.0)
+    assert [(s.id, outcome, pnl) for s, outcome, pnl in hits] == [(1, "TARGET", 5.0), (2, "SL", -4.0)]
+    assert 3 in book and len(book) == 1
+
+    hits = book.on_price("NIFTY", 97.0)
+    assert [(s.id, outcome, pnl) for s, outcome, pnl in hits] == [(3, "SL", -2.0)]
+    assert len(book) == 0
+    assert book.on_price("NIFTY", 120.0) == []
+
+
+def test_same_tick_target_and_stop_keeps_target():
+    book = SignalBook()
+    # Inverted levels: one price crosses both, the target wins as in the per-symbol check
+    book.add(ActiveSignal(1, "NIFTY", "BUY", 100.0, 101.0, 102.0))
+    hits = book.on_price("NIFTY", 101.5)
+    assert [(s.id, outcome) for s, outcome, _ in hits] == [(1, "TARGET")]
+    assert len(book) == 0
+
+
+def test_nan_and_none_levels_are_rejected():
+    nan = float("nan")
+    book = SignalBook()
+    rejected = [
+        ActiveSignal(1, "NIFTY", "BUY", 100.0, nan, 95.0),
+        ActiveSignal(2, "NIFTY", "BUY", 100.0, 105.0, None),
+        ActiveSignal(3, "NIFTY", "SELL", nan, 96.0, 104.0),
+        ActiveSignal(4, "NIFTY", "SELL", 100.0, float("inf"), 104.0),
+    ]
+    assert not any(book.add(signal) for signal in rejected)
+    assert book.add_many(rejected + [ActiveSignal(5, "NIFTY", "BUY", 100.0, 105.0, 95.0)]) == 1
+
+    hits = book.on_price("NIFTY", 106.0)
+    assert [(s.id, outcome, pnl) for s, outcome, pnl in hits] == [(5, "TARGET", 5.0)]
+
+
+def test_load_pending_skips_resolved_old_and_unusable_rows(tmp_path):
+    db_path = str(tmp_path / "metrics.db")
+    LevelTracker(db_path=db_path)
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO level_signals (timestamp, symbol, direction, action, confidence, current_price, "
+        "entry_price, target_price, sl_price, atr, risk_points, reward_points, rr_ratio, market_hour, outcome) "
+        "VALUES (datetime('now', ?), ?, ?, ?, 70, ?, ?, ?, ?, 5, 5, 5, 1, 10, ?)",
+        [("-1 minute", "NIFTY", "BUY", "BUY", 100.0, 100.0, 105.0, 95.0, None),
+         ("-2 minute", "BANKNIFTY", "SELL", "SELL", 200.0, 200.0, 190.0, 205.0, None),
+         ("-3 minute", "NIFTY", "BUY", "BUY", 100.0, 100.0, 105.0, 95.0, "TARGET"),
+         ("-4 minute", "NIFTY", "HOLD", "HOLD", 100.0, 100.0, 105.0, 95.0, None),
+         ("-10 day", "NIFTY", "BUY", "BUY", 100.0, 100.0, 105.0, 95.0, None)],
+    )
+    conn.commit()
+    conn.close()
+
+    book = SignalBook()
+    assert book.load_pending(db_path) == 2
+    assert book.symbols() == ["BANKNIFTY", "NIFTY"]
+    assert [(s.id, outcome) for s, outcome, _ in book.on_price("BANKNIFTY", 189.0)] == [(2, "TARGET")]
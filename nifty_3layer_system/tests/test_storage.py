@@ -0,0 +1,40 @@
+"""integrations.storage: transactions roll back when the COMMIT itself fails"""
+
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from integrations.storage import SQLiteStore
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_failed_commit_rolls_back(tmp_path):
+    store = SQLiteStore(str(tmp_path / "store.db"))
+    store.migrate([("tables", "CREATE TABLE parent (id INTEGER PRIMARY KEY); "
+                              "CREATE TABLE child (parent_id INTEGER REFERENCES parent(id) "
+                              "DEFERRABLE INITIALLY DEFERRED)")])
+    conn = store.connection()
+    conn.execute("PRAGMA foreign_keys=ON")
+
+    # The deferred foreign key is only checked at COMMIT
+    with pytest.raises(sqlite3.IntegrityError):
+        with store.transaction() as tx:
+            tx.execute("INSERT INTO child VALUES (1)")
+    assert not conn.in_transaction
+    assert store.query("SELECT * FROM child") == []
+
+    store.executemany("INSERT INTO parent VALUES (?)", [(1,)])
+    store.execute("INSERT INTO child VALUES (1)")
+    assert store.query("SELECT * FROM child") == [(1,)]
+    store.close()
+
+
+def test_package_import_leaves_storage_runnable_as_main():
+    # python -m integrations.storage warns if the package already imported it
+    code = "import sys, integrations; print('integrations.storage' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
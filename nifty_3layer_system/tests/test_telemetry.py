@@ -0,0 +1,24 @@
+"""integrations.telemetry: exposition format and latency observations"""
+
+import time
+
+import pytest
+
+from integrations.telemetry import MetricsRegistry, _Metric
+
+
+def test_replayed_ticks_are_not_observed():
+    registry = MetricsRegistry()
+    latency = registry.histogram("tick_to_broadcast_seconds", "test", ["symbol"])
+    latency.observe_since(0.0, symbol="NIFTY")  # journal replay: no receipt time
+    latency.observe_since(None, symbol="NIFTY")
+    assert latency.count(symbol="NIFTY") == 0
+
+    latency.observe_since(time.perf_counter(), symbol="NIFTY")
+    assert latency.count(symbol="NIFTY") == 1
+    assert 'tick_to_broadcast_seconds_count{symbol="NIFTY"} 1' in registry.render()
+
+
+def test_metric_base_is_abstract():
+    with pytest.raises(TypeError):
+        _Metric("untyped_metric", "no samples()")
@@ -1,26 +1,44 @@
+import time
+_IMPORT_STARTED = time.perf_counter()  # startup report baseline
+
 import sys
+import json
+from dataclasses import asdict
 from pathlib import Path
-from typing import Dict, Set, Any
+from typing import TYPE_CHECKING, Dict, Set, Any, Optional
 from datetime import datetime, timedelta
 import asyncio
-import json
-import numpy as np
-import pandas as pd
+import os
 
-from fastapi import FastAPI, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 
 # Allow importing project modules
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.append(str(PROJECT_ROOT))
 
-from integrations.dhan_client import DhanAPIClient, DhanConfig
 from integrations.dhan_websocket import DhanWebSocket, ExchangeSegment, InstrumentType, TickData
+from integrations.tick_journal import TickJournalWriter, WallClock
+from integrations.feed_gateway import create_feed, create_rest_client
+from integrations.telemetry import LEVELS_COMPUTE, REGISTRY, TICK_TO_BROADCAST
+from integrations.startup import LazyComponent, StartupReport, run_warmup, wait_until_serving
+from integrations.premarket import PreMarketWarmer
 from config.instrument_config import InstrumentManager
-from ml_models.trading_levels_generator import TradingLevelsGenerator
-from ml_models.level_tracker import LevelTracker
+from ml_models.model_server import MODEL_SERVER
+from webapp.outcome_writer import OutcomeWriter
+from webapp.signal_book import ActiveSignal, SignalBook
+from webapp.levels_scheduler import LevelsScheduler
+from webapp.candle_store import CandleStore, frame_columns
+from webapp.encoding import dumps_text, json_response
+from webapp.shared_state import WorkerCoordinator, create_state
+
+if TYPE_CHECKING:
+    # pandas, the Dhan REST client and the model stack load during the warm-up,
+    # after the server is accepting connections
+    import pandas as pd
+    from integrations.dhan_client import DhanAPIClient
 
 
 app = FastAPI(title="NIFTY/SENSEX Levels Dashboard", version="1.0.0")
@@ -37,60 +55,89 @@ STATIC_DIR = Path(__file__).parent / "static"
 app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
 
-# Initialize clients with error handling
-try:
-    dhan_client = DhanAPIClient()
-    print("DhanAPIClient initialized successfully")
-except Exception as e:
-    print(f"ERROR: Failed to initialize DhanAPIClient: {e}")
-    print(f"DhanAPIClient type: {type(dhan_client)}")
-    raise
+STARTUP = StartupReport("webapp", started_at=_IMPORT_STARTED)
+# Signals and outcomes; point elsewhere for dev runs that must not touch the tracked copy
+METRICS_DB = os.getenv("METRICS_DB", "data/trading_metrics.db")
 
-levels_generator = TradingLevelsGenerator()
-level_tracker = LevelTracker(db_path="data/trading_metrics.db")
-LEVEL_CACHE: Dict[str, Dict[str, Any]] = {}
-ACTIVE_SIGNALS: Dict[str, Dict[str, Any]] = {}  # Track active signals for outcome checking
-HOLD_WINDOW_SECONDS = 15 * 60  # 15-minute cadence from server start
+
+def _build_dhan_client() -> "DhanAPIClient":
+    # REST calls go through the feed gateway's session when one is running
+    try:
+        client = create_rest_client()
+        print(f"{type(client).__name__} initialized successfully")
+        return client
+    except Exception as e:
+        print(f"ERROR: Failed to initialize DhanAPIClient: {e}")
+        raise
+
+
+def _build_levels_generator():
+    from ml_models.trading_levels_generator import TradingLevelsGenerator
+    return TradingLevelsGenerator()
+
+
+def _build_level_tracker():
+    from ml_models.level_tracker import LevelTracker
+    return LevelTracker(db_path=METRICS_DB)
+
+
+# Heavy components (model unpickle, API session, DB init) are built on first use
+# or by the warm-up that runs once the server is listening
+dhan_client = LazyComponent("dhan_client", _build_dhan_client, STARTUP)
+levels_generator = LazyComponent("levels_generator", _build_levels_generator, STARTUP)
+level_tracker = LazyComponent("level_tracker", _build_level_tracker, STARTUP)
+outcome_writer = OutcomeWriter(db_path=METRICS_DB)
+# Levels cache, latest levels and signal summary live in STATE so that several
+# uvicorn workers agree on them (WEBAPP_STATE=sqlite); only the elected feed owner
+# runs the Dhan feed, the levels scheduler and signal resolution.
+STATE = create_state()
+coordinator = WorkerCoordinator(STATE)
+ACTIVE_SIGNALS = SignalBook()  # Price-indexed active signals (resolved by the feed owner)
+LEVELS_INTERVAL = 5  # Bar size levels are computed on (and scheduled against)
+LEVELS_DAYS = 5
+CANDLES = CandleStore()  # Live OHLC series behind /api/candles?since= and bar pushes
+CANDLE_STALE_SECONDS = 60  # Refetch from Dhan when neither REST nor ticks touched a series
+BAR_PUSH_SECONDS = 1.0  # Max rate of in-progress bar pushes per symbol
+TICK_JOURNAL_DIR = os.getenv("TICK_JOURNAL_DIR", "data/ticks")  # empty string disables recording
+tick_journal = None
+dhan_feed = None
+# "Now" for the tick path, signal logging and outcomes; webapp.replay swaps in
+# the replay's ReplayClock so a replayed session is deterministic
+CLOCK = WallClock()
 
 
 def load_pending_signals_from_db():
-    """Load pending signals (no outcome yet) from DB into ACTIVE_SIGNALS on startup"""
-    import sqlite3
+    """Bulk-load pending signals (no outcome yet) from DB into ACTIVE_SIGNALS (feed owner only, blocking)"""
     try:
-        conn = sqlite3.connect("data/trading_metrics.db")
-        cursor = conn.cursor()
-        # Get today's signals with no outcome
-        cursor.execute("""
-            SELECT id, symbol, direction, entry_price, target_price, sl_price, timestamp
-            FROM level_signals 
-            WHERE outcome IS NULL 
-            AND date(timestamp) >= date('now', '-1 day')
-            ORDER BY id DESC
-        """)
-        rows = cursor.fetchall()
-        conn.close()
-        
-        for row in rows:
-            sig_id, symbol, direction, entry, target, sl, timestamp = row
-            symbol = symbol or "NIFTY"  # Default to NIFTY if null
-            if symbol not in ACTIVE_SIGNALS:
-                ACTIVE_SIGNALS[symbol] = {
-                    "id": sig_id,
-                    "direction": direction,
-                    "entry": entry,
-                    "target": target,
-                    "stoploss": sl,
-                    "logged_at": timestamp,
-                }
-                print(f"✓ Loaded pending signal: {symbol} {direction} @ {entry}")
-        
-        print(f"✓ Loaded {len(ACTIVE_SIGNALS)} pending signals from DB")
+        level_tracker.get()  # schema migrations run when the tracker is built
+        loaded = ACTIVE_SIGNALS.load_pending(METRICS_DB)
+        print(f"✓ Loaded {loaded} pending signals from DB")
     except Exception as e:
         print(f"Error loading pending signals: {e}")
 
 
-# Load pending signals on module load
-load_pending_signals_from_db()
+def _publish_signal_summary():
+    # Runs on the event loop (every new signal and outcome): a shared backend
+    # is written by the coordinator's exchange thread
+    coordinator.put("signals", "active", {
+        "count": len(ACTIVE_SIGNALS),
+        "symbols": ACTIVE_SIGNALS.symbols(),
+    })
+
+
+def track_signal(active: ActiveSignal):
+    """Hand a newly logged signal to whichever worker resolves signals"""
+    if coordinator.is_owner:
+        ACTIVE_SIGNALS.add(active)
+        _publish_signal_summary()
+    else:
+        coordinator.publish("signal", active.symbol, dumps_text(asdict(active)))
+
+
+def _on_relayed_signal(symbol: str, payload: str):
+    if coordinator.is_owner:
+        ACTIVE_SIGNALS.add(ActiveSignal(**json.loads(payload)))
+        _publish_signal_summary()
 
 
 class StreamHub:
@@ -105,13 +152,21 @@ class StreamHub:
         if symbol in self.connections and ws in self.connections[symbol]:
             self.connections[symbol].remove(ws)
 
-    async def broadcast(self, symbol: str, payload: Dict):
+    async def broadcast(self, symbol: str, payload: Dict, received_at: Optional[float] = None):
+        # Encode once per broadcast, not once per connection (or per worker)
+        message = dumps_text(payload)
+        coordinator.publish("broadcast", symbol, message)
+        await self.broadcast_text(symbol, message)
+        TICK_TO_BROADCAST.observe_since(received_at, symbol=symbol)
+
+    async def broadcast_text(self, symbol: str, message: str):
+        """Send an encoded message to this worker's connections only"""
         if symbol not in self.connections:
             return
         dead = []
-        for ws in self.connections[symbol]:
+        for ws in list(self.connections[symbol]):
             try:
-                await ws.send_text(json.dumps(payload))
+                await ws.send_text(message)
             except Exception:
                 dead.append(ws)
         for ws in dead:
@@ -133,87 +188,80 @@ def _instrument_lookup():
 SECURITY_ID_TO_SYMBOL = _instrument_lookup()
 
 
-async def _start_dhan_stream():
-    config = DhanConfig.from_env()
-    ws = DhanWebSocket(access_token=config.access_token, client_id=config.client_id)
+def _report_outcome_write(future: asyncio.Future):
+    """Done-callback for fire-and-forget outcome writes (the writer already retried)"""
+    if not future.cancelled() and future.exception() is not None:
+        print(f"ERROR: Failed to record outcome: {future.exception()}")
 
-    def on_tick(tick: TickData):
-        symbol = SECURITY_ID_TO_SYMBOL.get(str(tick.security_id))
-        if not symbol:
-            return
-        payload = {
+
+def handle_tick(tick: TickData):
+    """Live tick path: broadcast LTP and resolve active signals (also driven by replays)"""
+    symbol = SECURITY_ID_TO_SYMBOL.get(str(tick.security_id))
+    if not symbol:
+        return
+    payload = {
+        "symbol": symbol,
+        "ltp": tick.ltp,
+        "timestamp": tick.timestamp.isoformat(),
+    }
+    asyncio.create_task(stream_hub.broadcast(symbol, payload, tick.received_at))
+    
+    # Resolve every active signal whose target or SL this tick crossed
+    ltp = tick.ltp
+    for active, outcome, pnl in ACTIVE_SIGNALS.on_price(symbol, ltp):
+        # Persist off-loop; the writer thread owns the DB connection
+        outcome_writer.submit_outcome(active.id, outcome, ltp, pnl, CLOCK.now()).add_done_callback(
+            _report_outcome_write)
+        
+        # Broadcast outcome to connected clients
+        outcome_payload = {
+            "type": "outcome",
             "symbol": symbol,
-            "ltp": tick.ltp,
-            "timestamp": tick.timestamp.isoformat(),
+            "signal_id": active.id,
+            "outcome": outcome,
+            "price": ltp,
+            "direction": active.direction,
+            "entry": active.entry,
+            "target": active.target,
+            "stoploss": active.stoploss,
+            "pnl": pnl,
         }
-        asyncio.create_task(stream_hub.broadcast(symbol, payload))
-        
-        # Check if active signal hit target or SL
-        active = ACTIVE_SIGNALS.get(symbol)
-        if active:
-            ltp = tick.ltp
-            direction = active.get("direction")
-            target = active.get("target")
-            stoploss = active.get("stoploss")
-            entry = active.get("entry")
-            signal_id = active.get("id")
-            
-            # Debug logging
-            print(f"[TICK] {symbol} LTP:{ltp:.2f} | Active: {direction} Entry:{entry:.2f} Tgt:{target:.2f} SL:{stoploss:.2f}")
-            
-            outcome = None
-            pnl = 0
-            if direction == "BUY":
-                if ltp >= target:
-                    outcome = "TARGET"
-                    pnl = target - entry
-                elif ltp <= stoploss:
-                    outcome = "SL"
-                    pnl = stoploss - entry
-            elif direction == "SELL":
-                if ltp <= target:
-                    outcome = "TARGET"
-                    pnl = entry - target
-                elif ltp >= stoploss:
-                    outcome = "SL"
-                    pnl = entry - stoploss
-            
-            if outcome:
-                # Update database with outcome using actual signal ID
-                try:
-                    import sqlite3
-                    conn = sqlite3.connect("data/trading_metrics.db")
-                    cursor = conn.cursor()
-                    cursor.execute("""
-                        UPDATE level_signals 
-                        SET outcome = ?, outcome_price = ?, outcome_time = ?, pnl_points = ?
-                        WHERE id = ?
-                    """, (outcome, ltp, datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'), pnl, signal_id))
-                    rows_affected = cursor.rowcount
-                    conn.commit()
-                    conn.close()
-                    print(f"✓ DB Updated ID:{signal_id} | {direction} @ {entry} -> {outcome} @ {ltp} | P&L: {pnl:.2f} | Rows: {rows_affected}")
-                except Exception as e:
-                    print(f"DB update error: {e}")
-                
-                # Broadcast outcome to connected clients
-                outcome_payload = {
-                    "type": "outcome",
-                    "symbol": symbol,
-                    "outcome": outcome,
-                    "price": ltp,
-                    "direction": direction,
-                    "entry": entry,
-                    "target": target,
-                    "stoploss": stoploss,
-                    "pnl": pnl,
-                }
-                asyncio.create_task(stream_hub.broadcast(symbol, outcome_payload))
-                # Clear active signal
-                del ACTIVE_SIGNALS[symbol]
-                print(f"✓ {symbol} {direction} signal hit {outcome} @ {ltp}")
-
-    ws.on_tick(on_tick)
+        asyncio.create_task(stream_hub.broadcast(symbol, outcome_payload))
+        print(f"✓ {symbol} {active.direction} signal {active.id} hit {outcome} @ {ltp}")
+        _publish_signal_summary()
+
+    # Fold the tick into the chart series and push the bar delta (once history is loaded)
+    series = CANDLES.get(symbol, LEVELS_INTERVAL)
+    if len(series):
+        bar, is_new = series.apply_tick(ltp, tick.timestamp.timestamp())
+        now = time.monotonic()
+        if is_new or now - series.last_push >= BAR_PUSH_SECONDS:
+            series.last_push = now
+            # A new bar also carries the final state of the one it replaced
+            bars = series.since(bar["time"] - LEVELS_INTERVAL * 60 if is_new else bar["time"])
+            asyncio.create_task(stream_hub.broadcast(symbol, {
+                "type": "bar",
+                "symbol": symbol,
+                "interval": LEVELS_INTERVAL,
+                "bars": bars,
+                "cursor": bar["time"],
+            }))
+
+
+async def _start_dhan_stream():
+    global tick_journal, dhan_feed
+    from integrations.dhan_client import DhanConfig
+
+    config = DhanConfig.from_env()
+    # Reads from the local feed gateway when one is running, else connects to Dhan directly
+    ws = await create_feed(access_token=config.access_token, client_id=config.client_id)
+    dhan_feed = ws
+
+    if TICK_JOURNAL_DIR and isinstance(ws, DhanWebSocket):
+        tick_journal = TickJournalWriter(TICK_JOURNAL_DIR)
+        ws.attach_journal(tick_journal)
+
+    ws.on_tick(handle_tick)
     await ws.connect()
 
     for key in ["NIFTY", "SENSEX"]:
@@ -227,9 +275,83 @@ async def _start_dhan_stream():
         )
 
 
+async def _on_feed_elected():
+    """This worker now owns the feed: resolve signals, stream ticks, precompute levels"""
+    # pandas import, tracker build, migrations and the read stay off the event loop
+    await asyncio.get_running_loop().run_in_executor(None, load_pending_signals_from_db)
+    _publish_signal_summary()
+    asyncio.create_task(_start_dhan_stream())
+    await levels_scheduler.start()
+    await premarket.start()
+
+
+async def _on_feed_demoted():
+    global dhan_feed
+    await levels_scheduler.stop()
+    await premarket.stop()
+    if dhan_feed is not None:
+        await dhan_feed.disconnect()
+        dhan_feed = None
+    ACTIVE_SIGNALS.clear()
+
+
+def _warm_levels_model():
+    levels_generator.predictor.warm_up()
+
+
+def _prefetch_candles():
+    for symbol in levels_scheduler.symbols:
+        try:
+            _fetch_candles(symbol, LEVELS_INTERVAL, LEVELS_DAYS)
+        except Exception as e:
+            print(f"Warning: candle prefetch failed for {symbol}: {e}")
+
+
+WARMUP_STEPS = {
+    "dhan_client": dhan_client.get,
+    "level_tracker": level_tracker.get,
+    "levels_model": _warm_levels_model,  # unpickle + one dummy inference
+    "candles": _prefetch_candles,
+}
+
+
+# uvicorn binds its socket only after the startup hook returns; the deferred
+# start waits for it, or at most this long (see wait_until_serving)
+ACCEPT_TIMEOUT_SECONDS = float(os.getenv("ACCEPT_TIMEOUT_SECONDS", "5"))
+_deferred_start: Optional[asyncio.Task] = None
+
+
 @app.on_event("startup")
 async def startup_event():
-    asyncio.create_task(_start_dhan_stream())
+    global _deferred_start
+    STARTUP.mark("startup_hook")
+    await outcome_writer.start()
+    coordinator.on("broadcast", stream_hub.broadcast_text)
+    coordinator.on("signal", _on_relayed_signal)
+    coordinator.on_elected = _on_feed_elected
+    coordinator.on_demoted = _on_feed_demoted
+    # Feed election (pending signals, Dhan stream, levels scheduler prime - the
+    # model load) and the warm-up start once the server is accepting
+    _deferred_start = asyncio.create_task(_start_when_accepting(wait_until_serving(ACCEPT_TIMEOUT_SECONDS)))
+
+
+async def _start_when_accepting(serving: "asyncio.Future[bool]"):
+    await serving
+    STARTUP.mark("accepting")
+    await coordinator.start()
+    asyncio.get_running_loop().run_in_executor(None, run_warmup, STARTUP, WARMUP_STEPS)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if _deferred_start is not None and not _deferred_start.done():
+        _deferred_start.cancel()
+    await levels_scheduler.stop()
+    await premarket.stop()
+    await coordinator.stop()
+    await outcome_writer.stop()
+    if tick_journal is not None:
+        tick_journal.close()
 
 
 @app.get("/")
@@ -239,19 +361,36 @@ def index():
 
 @app.get("/api/health")
 def health():
-    return {"status": "ok", "timestamp": datetime.utcnow().isoformat()}
+    return {
+        "status": "ok",
+        "timestamp": CLOCK.now().isoformat(),
+        "writer": outcome_writer.stats(),
+        "levels_scheduler": levels_scheduler.stats(),
+        "shared_state": coordinator.stats(),
+        "startup": STARTUP.as_dict(),
+        "models": MODEL_SERVER.stats(),
+        # Run by the feed owner; other workers read its last published status
+        "premarket": premarket.stats() if coordinator.is_owner else STATE.get("premarket", "status"),
+    }
+
+
+@app.get("/api/metrics")
+def metrics():
+    """Pipeline latency/throughput metrics in Prometheus text format"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
 
 @app.get("/api/stats")
-def stats(days: int = Query(7, ge=1, le=90)):
-    """Get win rate and performance statistics from tracked signals"""
+def stats(request: Request, days: int = Query(7, ge=1, le=90), symbol: Optional[str] = None):
+    """Get win rate and performance statistics from tracked signals (aggregate tables)"""
     try:
-        stats = level_tracker.get_statistics(days=days)
+        stats = level_tracker.get_statistics(days=days, symbol=symbol.upper() if symbol else None)
         sl_analysis = level_tracker.get_sl_analysis()
         
-        # Add active signals info
-        stats["active_signals"] = len(ACTIVE_SIGNALS)
-        stats["active_symbols"] = list(ACTIVE_SIGNALS.keys())
+        # Add active signals info (held by the feed owner, possibly another worker)
+        active = STATE.get("signals", "active") or {}
+        stats["active_signals"] = active.get("count", 0)
+        stats["active_symbols"] = active.get("symbols", [])
         
         # Convert SL analysis to dict
         if not sl_analysis.empty:
@@ -259,7 +398,7 @@ def stats(days: int = Query(7, ge=1, le=90)):
         else:
             stats["sl_reasons"] = []
             
-        return stats
+        return json_response(stats, request)
     except Exception as e:
         return {"error": str(e), "message": "No data available yet"}
 
@@ -269,56 +408,91 @@ def stats_today():
     """Get today's performance only"""
     try:
         stats = level_tracker.get_statistics(days=1)
-        stats["active_signals"] = len(ACTIVE_SIGNALS)
+        stats["active_signals"] = (STATE.get("signals", "active") or {}).get("count", 0)
         return stats
     except Exception as e:
         return {"error": str(e)}
 
 
-def _normalize_time_index(df: pd.DataFrame, interval: int) -> pd.DataFrame:
+def _normalize_time_index(df: "pd.DataFrame", interval: int) -> "pd.DataFrame":
+    import pandas as pd
+
     if isinstance(df.index, pd.DatetimeIndex):
         return df
 
     # Rebuild a datetime index if missing (cache path)
-    end = datetime.utcnow()
+    end = CLOCK.now()
     freq = f"{interval}min"
     df = df.copy()
     df.index = pd.date_range(end=end, periods=len(df), freq=freq)
     return df
 
 
-def _fetch_candles(symbol: str, interval: int, days: int):
+def _fetch_candles(symbol: str, interval: int, days: int, cache_ttl: Optional[float] = None):
+    """Fetch candles from Dhan and merge them into the candle store"""
     instrument = InstrumentManager.get_instrument(symbol)
     if not instrument:
         raise HTTPException(status_code=400, detail=f"Unknown symbol: {symbol}")
 
+    extra = {"cache_ttl": cache_ttl} if cache_ttl is not None else {}
     df = dhan_client.get_historical_candles(
         security_id=instrument.security_id,
         exchange_segment=instrument.exchange_segment,
         instrument=instrument.instrument_type,
         interval=interval,
         days=days,
+        **extra,
     )
 
     if df.empty:
         raise HTTPException(status_code=404, detail="No candle data returned")
 
     df = _normalize_time_index(df, interval)
-    df = df.copy()
-    df.reset_index(inplace=True)
-
-    if "timestamp" not in df.columns:
-        if "index" in df.columns:
-            df["timestamp"] = pd.to_datetime(df["index"], errors="coerce")
-        else:
-            df["timestamp"] = pd.to_datetime(datetime.utcnow())
-
-    # Convert to Unix epoch seconds properly
-    df["time"] = df["timestamp"].apply(lambda x: int(x.timestamp()))
-
-    candles = df[["time", "open", "high", "low", "close", "volume"]].to_dict(orient="records")
-
-    return candles, float(df["close"].iloc[-1])
+    candles = frame_columns(df)
+    CANDLES.get(symbol, interval).merge(candles)
+
+    return candles, float(candles["close"][-1])
+
+
+def _stored_candles(symbol: str, interval: int, days: int) -> Optional["pd.DataFrame"]:
+    """
+    Closed bars already in CANDLES (pre-market warm-up or an earlier fetch)
+
+    Only used when the series was seeded from Dhan after the most recent bar
+    close, i.e. a fresh fetch could not return anything newer, and covers the
+    requested lookback.
+    """
+    series = CANDLES.get(symbol, interval)
+    if not len(series) or series.seeded_at is None:
+        return None
+    calendar = levels_scheduler.calendar
+    now = calendar.now()
+    boundary = calendar.last_bar_close(interval, now)
+    if boundary is None:  # before the first close today: the previous session's close
+        boundary = calendar.session_bounds(calendar.previous_trading_day(now.date()))[1]
+    if series.seeded_at < boundary.timestamp() or not _covers_lookback(series, days):
+        return None
+
+    import pandas as pd
+
+    cutoff = now - timedelta(days=days)
+    bars = pd.DataFrame(series.since(int(cutoff.timestamp())))
+    # Tick-built bars newer than the seed are still forming
+    bars = bars[bars["time"] + interval * 60 <= series.seeded_at]
+    if bars.empty:
+        return None
+    bars.index = pd.to_datetime(bars.pop("time"), unit="s").rename("timestamp")
+    return bars
+
+
+def _covers_lookback(series, days: int) -> bool:
+    """True if the series reaches back as far as a Dhan fetch of ``days`` would"""
+    if not len(series):
+        return False
+    calendar = levels_scheduler.calendar
+    cutoff = calendar.now() - timedelta(days=days)
+    first_bar = cutoff if calendar.is_open(cutoff) else calendar.next_session_open(cutoff)
+    return series.times[0] <= first_bar.timestamp() + series.interval * 60
 
 
 def _is_levels_unchanged(new_levels: Dict[str, Any], prev_levels: Dict[str, Any]) -> bool:
@@ -343,102 +517,208 @@ def _is_levels_unchanged(new_levels: Dict[str, Any], prev_levels: Dict[str, Any]
 
 @app.get("/api/candles")
 def candles(
+    request: Request,
     symbol: str = Query("NIFTY"),
     interval: int = Query(5, ge=1, le=60),
     days: int = Query(5, ge=1, le=90),
+    since: Optional[int] = Query(None, ge=0, description="Return bars with time >= since (epoch s)"),
+    format: str = Query("columns", pattern="^(columns|records)$"),
 ):
-    data, last_price = _fetch_candles(symbol, interval, days)
-    return {"symbol": symbol.upper(), "interval": interval, "last_price": last_price, "candles": data}
+    """
+    Candles from the live store.
+
+    Bars come from the store; Dhan is only hit if the series is empty, stale
+    or (without ``since``) does not reach back ``days``. Without ``since``
+    the full window is returned, with it only bars at or after the cursor
+    (the last bar may be in progress). Both forms honour If-None-Match.
+
+    Candles are columnar (``{"time": [...], "open": [...], ...}``);
+    ``format=records`` returns the older list-of-objects shape.
+    """
+    symbol = symbol.upper()
+    # Before CANDLES.get, so unknown symbols never leave an empty series behind
+    if not InstrumentManager.get_instrument(symbol):
+        raise HTTPException(status_code=400, detail=f"Unknown symbol: {symbol}")
 
+    series = CANDLES.get(symbol, interval)
+    if (not len(series) or series.is_stale(CANDLE_STALE_SECONDS)
+            or (since is None and not _covers_lookback(series, days))):
+        _fetch_candles(symbol, interval, days)
+
+    # The full-window tag names its window: a client changing ``days`` must not get a 304
+    etag = series.etag(since)[:-1] + (f'-{format}"' if since is not None else f'-{days}d-{format}"')
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    cursor = since if since is not None else int(time.time()) - days * 86400
+    data = series.since(cursor)
+    if format == "records":
+        data = [dict(zip(data, row)) for row in zip(*data.values())]
+    return json_response(
+        {
+            "symbol": symbol,
+            "interval": interval,
+            "last_price": series.last_price,
+            "candles": data,
+            "cursor": series.last_time,
+        },
+        request,
+        headers={"ETag": etag, "Cache-Control": "no-cache"},
+    )
 
-@app.get("/api/levels")
-def levels(
-    symbol: str = Query("NIFTY"),
-    interval: int = Query(5, ge=1, le=60),
-    days: int = Query(5, ge=1, le=90),
-):
+
+def _level_cache_key(symbol: str, interval: int, days: int) -> str:
+    # The scheduled parameters keep the bare symbol key used by existing shared state
+    if interval == LEVELS_INTERVAL and days == LEVELS_DAYS:
+        return symbol
+    return f"{symbol}:{interval}m:{days}d"
+
+
+@LEVELS_COMPUTE.timed()
+def compute_levels(symbol: str, interval: int = LEVELS_INTERVAL, days: int = LEVELS_DAYS) -> Dict[str, Any]:
+    """Fetch candles, calculate levels, decide NEW vs HOLD and log new signals (blocking)"""
+    symbol = symbol.upper()
     instrument = InstrumentManager.get_instrument(symbol)
     if not instrument:
         raise HTTPException(status_code=400, detail=f"Unknown symbol: {symbol}")
 
-    now = datetime.utcnow()
-    cache_entry = LEVEL_CACHE.get(symbol.upper())
-    if cache_entry:
-        age = (now - cache_entry["generated_at"]).total_seconds()
-        if age < HOLD_WINDOW_SECONDS:
-            cached = cache_entry["data"].copy()
-            cached["position_status"] = "HOLD"
-            cached["hold_reason"] = f"Within 15-min window; next refresh in {int(HOLD_WINDOW_SECONDS - age)}s"
-            return cached
-
-    df = dhan_client.get_historical_candles(
-        security_id=instrument.security_id,
-        exchange_segment=instrument.exchange_segment,
-        instrument=instrument.instrument_type,
-        interval=interval,
-        days=days,
-    )
-
-    df = _normalize_time_index(df, interval)
+    now = CLOCK.now()
+    df = _stored_candles(symbol, interval, days)
+    if df is None:
+        df = dhan_client.get_historical_candles(
+            security_id=instrument.security_id,
+            exchange_segment=instrument.exchange_segment,
+            instrument=instrument.instrument_type,
+            interval=interval,
+            days=days,
+        )
+        df = _normalize_time_index(df, interval)
+        if not df.empty:
+            CANDLES.get(symbol, interval).merge(frame_columns(df))
 
     if len(df) < 60:
         raise HTTPException(status_code=400, detail="Not enough candles for feature generation")
 
     result = levels_generator.calculate_levels(df)
-    result["symbol"] = symbol.upper()
+    result["symbol"] = symbol
     result["generated_at_utc"] = now.isoformat()
+    # NumPy scalars are left in place: webapp.encoding serializes them natively
 
-    def _to_python(value: Any):
-        if isinstance(value, np.generic):
-            return value.item()
-        if isinstance(value, dict):
-            return {k: _to_python(v) for k, v in value.items()}
-        if isinstance(value, list):
-            return [_to_python(v) for v in value]
-        return value
-    result_py = _to_python(result)
-
-    # Compare with previous levels to decide HOLD vs NEW
-    prev_entry = LEVEL_CACHE.get(symbol.upper())
-    if prev_entry and _is_levels_unchanged(result_py, prev_entry["data"]):
-        result_py["position_status"] = "HOLD"
-        result_py["hold_reason"] = "Structure unchanged; keeping previous position"
-        # Do not update cache timestamp so we still respect the 15-min cadence
-        return result_py
-
-    result_py["position_status"] = "NEW"
-    result_py["hold_reason"] = None
-    LEVEL_CACHE[symbol.upper()] = {
-        "data": result_py,
-        "generated_at": now,
-    }
+    # Compare with previous levels (for the same bar size and lookback) to decide HOLD vs NEW
+    cache_key = _level_cache_key(symbol, interval, days)
+    prev_levels = STATE.get("level_cache", cache_key)
+    if prev_levels and _is_levels_unchanged(result, prev_levels):
+        result["position_status"] = "HOLD"
+        result["hold_reason"] = "Structure unchanged; keeping previous position"
+        return result
+
+    result["position_status"] = "NEW"
+    result["hold_reason"] = None
+    STATE.put("level_cache", cache_key, result)
 
-    # Log new signal to tracker for outcome analysis
+    # Log new signal to tracker for outcome analysis (the writer reports the id back)
     try:
-        signal_id = level_tracker.log_signal(result_py)
-        if signal_id:
-            # Store active signal for real-time outcome checking
-            ACTIVE_SIGNALS[symbol.upper()] = {
-                "id": signal_id,  # Actual DB ID
-                "direction": result_py.get("direction"),
-                "entry": result_py.get("entry"),
-                "target": result_py.get("exit_target"),
-                "stoploss": result_py.get("stoploss"),
-                "logged_at": now,
-            }
-            print(f"✓ Active signal stored: {symbol.upper()} ID:{signal_id}")
+        if outcome_writer.is_running:
+            outcome_writer.submit_signal_threadsafe(result).add_done_callback(
+                lambda future: _on_signal_logged(future, symbol, result, now))
+        else:
+            _track_new_signal(level_tracker.log_signal(result), symbol, result, now)
     except Exception as e:
         print(f"Warning: Failed to log signal: {e}")
 
-    return result_py
+    return result
+
+
+def _on_signal_logged(future, symbol: str, levels: Dict[str, Any], logged_at: datetime):
+    try:
+        signal_id = future.result()
+    except Exception as e:
+        print(f"Warning: Failed to log signal: {e}")
+        return
+    _track_new_signal(signal_id, symbol, levels, logged_at)
+
+
+def _track_new_signal(signal_id: Optional[int], symbol: str, levels: Dict[str, Any], logged_at: datetime):
+    if not signal_id:
+        return
+    # Store active signal for real-time outcome checking
+    track_signal(ActiveSignal(
+        id=signal_id,  # Actual DB ID
+        symbol=symbol,
+        direction=levels.get("direction"),
+        entry=levels.get("entry"),
+        target=levels.get("exit_target"),
+        stoploss=levels.get("stoploss"),
+        logged_at=logged_at,
+    ))
+    print(f"✓ Active signal stored: {symbol} ID:{signal_id}")
+
+
+async def publish_levels(symbol: str, levels: Dict[str, Any]):
+    # The precompute just merged Dhan's bars: push the authoritative closed bar + live bar
+    series = CANDLES.get(symbol, LEVELS_INTERVAL)
+    if len(series):
+        await stream_hub.broadcast(symbol, {
+            "type": "bar",
+            "symbol": symbol,
+            "interval": LEVELS_INTERVAL,
+            "bars": series.since(series.last_time - LEVELS_INTERVAL * 60),
+            "cursor": series.last_time,
+        })
+    await stream_hub.broadcast(symbol, {"type": "levels", **levels})
+
+
+levels_scheduler = LevelsScheduler(
+    compute=compute_levels,
+    publish=publish_levels,
+    symbols=["NIFTY", "SENSEX"],
+    interval_minutes=LEVELS_INTERVAL,
+    state=STATE,
+)
+
+# Before each session (feed owner): candles into CANDLES, expiries + chain snapshot
+# for every instrument and a model warm-up, so the first bar close is not cold
+premarket = PreMarketWarmer(
+    dhan_client,
+    candles=lambda symbol: _fetch_candles(symbol, LEVELS_INTERVAL, LEVELS_DAYS, cache_ttl=premarket.cache_ttl),
+    candle_symbols=levels_scheduler.symbols,
+    inference={"levels": _warm_levels_model},
+    lead_minutes=float(os.getenv("PREMARKET_LEAD_MINUTES", "20")),
+    state=STATE,
+)
+
+
+@app.get("/api/levels")
+def levels(
+    request: Request,
+    symbol: str = Query("NIFTY"),
+    interval: int = Query(LEVELS_INTERVAL, ge=1, le=60),
+    days: int = Query(LEVELS_DAYS, ge=1, le=90),
+):
+    # Scheduled symbols/params are precomputed at each bar close: a dict lookup
+    if interval == LEVELS_INTERVAL and days == LEVELS_DAYS:
+        latest = levels_scheduler.latest(symbol)
+        if latest is not None:
+            return json_response(latest, request)
+
+    result = compute_levels(symbol, interval, days)
+    if interval == LEVELS_INTERVAL and days == LEVELS_DAYS:
+        levels_scheduler.store(symbol, result)
+    return json_response(result, request)
 
 
 @app.websocket("/ws/stream")
 async def ws_stream(websocket: WebSocket):
     symbol = websocket.query_params.get("symbol", "NIFTY").upper()
     await stream_hub.register(symbol, websocket)
+    latest = levels_scheduler.latest(symbol)
+    if latest is not None:
+        await websocket.send_text(dumps_text({"type": "levels", **latest}))
     try:
         while True:
             await websocket.receive_text()
     except WebSocketDisconnect:
         stream_hub.unregister(symbol, websocket)
+
+
+STARTUP.mark("imports")
@@ -0,0 +1,186 @@
+"""
+CANDLE STORE: Server-side OHLC series per symbol/interval for incremental reads
+- Seeded from Dhan REST candles, kept live from ticks between fetches
+- Held as parallel columns (time/open/high/low/close/volume), served columnar
+- since(cursor) returns only bars at or after the cursor (bisect on bar times)
+- A version counter per series backs ETag / If-None-Match on /api/candles
+- apply_tick reports whether a bar was opened or updated so it can be pushed
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+CANDLE_FIELDS = ("time", "open", "high", "low", "close", "volume")
+
+
+def frame_columns(df: "pd.DataFrame") -> Dict[str, np.ndarray]:
+    """
+    OHLCV columns straight from a candle frame's arrays (no per-row Python).
+
+    Times are UTC epoch seconds taken from the DatetimeIndex (or a
+    'timestamp' column).
+    """
+    import pandas as pd
+
+    stamps = df.index if isinstance(df.index, pd.DatetimeIndex) else pd.DatetimeIndex(df["timestamp"])
+    if stamps.tz is not None:
+        stamps = stamps.tz_convert("UTC").tz_localize(None)
+    return {
+        "time": stamps.values.astype("datetime64[s]").astype(np.int64),
+        "open": df["open"].to_numpy(dtype=np.float64),
+        "high": df["high"].to_numpy(dtype=np.float64),
+        "low": df["low"].to_numpy(dtype=np.float64),
+        "close": df["close"].to_numpy(dtype=np.float64),
+        "volume": df["volume"].to_numpy(dtype=np.float64),
+    }
+
+
+class CandleSeries:
+    """Bars for one symbol at one interval, times in UTC epoch seconds"""
+
+    def __init__(self, symbol: str, interval: int):
+        self.symbol = symbol
+        self.interval = interval
+        self.columns: Dict[str, List] = {field: [] for field in CANDLE_FIELDS}
+        self.version = 0
+        self.seeded_at: Optional[float] = None
+        self.updated_at: Optional[float] = None
+        self.last_push: float = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.columns["time"])
+
+    @property
+    def times(self) -> List[int]:
+        return self.columns["time"]
+
+    @property
+    def last_time(self) -> Optional[int]:
+        return self.times[-1] if self.times else None
+
+    @property
+    def last_price(self) -> Optional[float]:
+        return self.columns["close"][-1] if self.times else None
+
+    def merge(self, columns: Dict[str, np.ndarray]) -> int:
+        """
+        Merge REST bars given as columns (see frame_columns).
+
+        Bars already present are replaced (REST is authoritative for closed
+        bars); tick-built bars newer than the REST data are kept. The common
+        case - REST covers everything held so far - is a straight replace.
+
+        Returns:
+            Number of bars added or changed
+        """
+        incoming = {field: np.asarray(columns[field]).tolist() for field in CANDLE_FIELDS}
+        new_times = incoming["time"]
+        with self._lock:
+            cols = self.columns
+            if not new_times:
+                changed = 0
+            elif not cols["time"] or cols["time"][0] >= new_times[0]:
+                # Keep only tick-built bars newer than the REST window
+                keep = bisect_left(cols["time"], new_times[-1] + 1)
+                merged = {field: incoming[field] + cols[field][keep:] for field in CANDLE_FIELDS}
+                changed = self._count_changed(cols, merged)
+                self.columns = merged
+            else:
+                changed = 0
+                for i, t in enumerate(new_times):
+                    idx = bisect_left(cols["time"], t)
+                    row = [incoming[field][i] for field in CANDLE_FIELDS]
+                    if idx < len(cols["time"]) and cols["time"][idx] == t:
+                        if any(cols[f][idx] != v for f, v in zip(CANDLE_FIELDS, row)):
+                            for f, v in zip(CANDLE_FIELDS, row):
+                                cols[f][idx] = v
+                            changed += 1
+                    else:
+                        for f, v in zip(CANDLE_FIELDS, row):
+                            cols[f].insert(idx, v)
+                        changed += 1
+            self.seeded_at = time.time()
+            if changed:
+                self.version += 1
+                self.updated_at = self.seeded_at
+        return changed
+
+    @staticmethod
+    def _count_changed(old: Dict[str, List], new: Dict[str, List]) -> int:
+        n_old, n_new = len(old["time"]), len(new["time"])
+        changed = abs(n_new - n_old)
+        for i in range(min(n_old, n_new)):
+            if any(old[field][i] != new[field][i] for field in CANDLE_FIELDS):
+                changed += 1
+        return changed
+
+    def apply_tick(self, price: float, epoch_seconds: float) -> Tuple[Dict, bool]:
+        """
+        Fold a tick into the bar it belongs to.
+
+        Returns:
+            (bar, is_new): the affected bar as a dict and whether the tick opened it
+        """
+        t = int(epoch_seconds) // (self.interval * 60) * (self.interval * 60)
+        with self._lock:
+            cols = self.columns
+            if cols["time"] and cols["time"][-1] == t:
+                cols["high"][-1] = max(cols["high"][-1], price)
+                cols["low"][-1] = min(cols["low"][-1], price)
+                cols["close"][-1] = price
+                is_new = False
+            elif not cols["time"] or t > cols["time"][-1]:
+                for field, value in zip(CANDLE_FIELDS, (t, price, price, price, price, 0.0)):
+                    cols[field].append(value)
+                is_new = True
+            else:
+                # Late tick for an older bar: leave history to REST
+                return self._row(-1), False
+            self.version += 1
+            self.updated_at = time.time()
+            return self._row(-1), is_new
+
+    def _row(self, idx: int) -> Dict:
+        return {field: self.columns[field][idx] for field in CANDLE_FIELDS}
+
+    def since(self, cursor: Optional[int] = None) -> Dict[str, List]:
+        """Columns for bars with time >= cursor (all bars if no cursor)"""
+        with self._lock:
+            start = 0 if cursor is None else bisect_left(self.columns["time"], int(cursor))
+            return {field: self.columns[field][start:] for field in CANDLE_FIELDS}
+
+    def etag(self, cursor: Optional[int] = None) -> str:
+        return f'"{self.symbol}-{self.interval}-{self.version}-{cursor if cursor is not None else "all"}"'
+
+    def is_stale(self, max_age: float) -> bool:
+        """True if neither a REST seed nor a tick has touched the series within max_age"""
+        latest = max(self.seeded_at or 0, self.updated_at or 0)
+        return time.time() - latest > max_age
+
+
+class CandleStore:
+    """All series held by the webapp"""
+
+    def __init__(self):
+        self._series: Dict[Tuple[str, int], CandleSeries] = {}
+        self._lock = threading.Lock()
+
+    def get(self, symbol: str, interval: int) -> CandleSeries:
+        key = (symbol.upper(), interval)
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(key, CandleSeries(key[0], interval))
+        return series
+
+    def series_for(self, symbol: str) -> List[CandleSeries]:
+        return [s for (sym, _), s in self._series.items() if sym == symbol.upper()]
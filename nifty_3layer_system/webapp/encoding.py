@@ -0,0 +1,181 @@
+"""
+ENCODING: Fast JSON responses for the dashboard
+- orjson with native NumPy support when installed, stdlib json otherwise (same
+  output: NaN/inf as null, naive datetimes as UTC)
+- NumPy scalars/arrays and datetimes encode directly (no _to_python walk)
+- Optional gzip / brotli negotiated from Accept-Encoding, above a size floor
+- Benchmark of the old records path vs the columnar path: python -m webapp.encoding
+"""
+
+import gzip
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import orjson
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+
+def _default(obj: Any):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _json_default(obj: Any):
+    # orjson's OPT_NAIVE_UTC for plain datetimes
+    if type(obj) is datetime and obj.tzinfo is None:
+        return obj.isoformat() + "+00:00"
+    return _default(obj)
+
+
+def _finite(value: Any):
+    """NaN/inf -> None (orjson writes null; stdlib json would emit invalid JSON)"""
+    if isinstance(value, (float, np.floating)):
+        return float(value) if np.isfinite(value) else None
+    if isinstance(value, np.ndarray) and value.dtype.kind == "f":
+        return [_finite(v) for v in value.tolist()]
+    if isinstance(value, dict):
+        return {k: _finite(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_finite(v) for v in value]
+    return value
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize to UTF-8 JSON bytes (NumPy-aware)"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+    try:
+        return json.dumps(obj, default=_json_default, separators=(",", ":"), allow_nan=False).encode()
+    except ValueError:
+        # Only payloads that actually contain NaN/inf pay for the walk
+        return json.dumps(_finite(obj), default=_json_default, separators=(",", ":")).encode()
+
+
+def dumps_text(obj: Any) -> str:
+    """Serialize to a str (for WebSocket text frames)"""
+    return dumps(obj).decode()
+
+
+def compress(body: bytes, accept_encoding: str = "") -> Tuple[bytes, Optional[str]]:
+    """
+    Compress ``body`` with the best encoding the client accepts.
+
+    Returns:
+        (body, content_encoding) - content_encoding is None if left as-is
+    """
+    if len(body) < COMPRESS_MIN_BYTES or not accept_encoding:
+        return body, None
+    accepted = {part.split(";")[0].strip().lower() for part in accept_encoding.split(",")}
+    if brotli is not None and "br" in accepted:
+        return brotli.compress(body, quality=BROTLI_QUALITY), "br"
+    if "gzip" in accepted:
+        return gzip.compress(body, compresslevel=GZIP_LEVEL), "gzip"
+    return body, None
+
+
+def json_response(
+    payload: Any,
+    request: Optional[Request] = None,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """JSON response encoded once with dumps() and compressed if the client allows"""
+    body = dumps(payload)
+    headers = dict(headers or {})
+    if request is not None:
+        body, encoding = compress(body, request.headers.get("accept-encoding", ""))
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        headers["Vary"] = "Accept-Encoding"
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
+
+
+def main():
+    """Benchmark: records + stdlib json (old path) vs columnar + dumps (new path)"""
+    import time
+
+    import pandas as pd
+
+    from webapp.candle_store import frame_columns
+
+    def bench(fn, repeat=50):
+        fn()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            out = fn()
+        return (time.perf_counter() - start) / repeat * 1000, out
+
+    def to_python(value: Any):
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, dict):
+            return {k: to_python(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [to_python(v) for v in value]
+        return value
+
+    rng = np.random.default_rng(0)
+    print(f"Encoder: {'orjson ' + orjson.__version__ if orjson else 'stdlib json'} | "
+          f"brotli: {'yes' if brotli else 'no'}")
+    print(f"\n{'payload':<28}{'path':<10}{'encode ms':>10}{'bytes':>10}{'gzip':>10}")
+    print("-" * 68)
+
+    for label, bars in (("candles 5m x 5d", 375), ("candles 1m x 5d", 1875), ("candles 1m x 30d", 11250)):
+        index = pd.date_range("2026-01-05 03:45", periods=bars, freq="1min")
+        close = np.round(25000 + rng.normal(0, 5, bars).cumsum() / 0.05) * 0.05
+        df = pd.DataFrame({
+            "open": close, "high": close + 3, "low": close - 3, "close": close,
+            "volume": rng.integers(1000, 50000, bars).astype(float),
+        }, index=index)
+
+        def old_path():
+            frame = df.reset_index().rename(columns={"index": "timestamp"})
+            frame["time"] = frame["timestamp"].apply(lambda x: int(x.timestamp()))
+            records = frame[["time", "open", "high", "low", "close", "volume"]].to_dict(orient="records")
+            return json.dumps({"symbol": "NIFTY", "candles": records}).encode()
+
+        def new_path():
+            return dumps({"symbol": "NIFTY", "candles": frame_columns(df)})
+
+        for name, fn in (("records", old_path), ("columnar", new_path)):
+            ms, body = bench(fn, repeat=20 if bars > 5000 else 50)
+            print(f"{label:<28}{name:<10}{ms:>10.2f}{len(body):>10,}{len(gzip.compress(body, GZIP_LEVEL)):>10,}")
+
+    levels = {
+        "symbol": "NIFTY", "direction": "BUY", "entry": np.float64(25012.35),
+        "exit_target": np.float64(25080.1), "stoploss": np.float64(24980.0),
+        "confidence": np.float32(71.2), "risk_reward_ratio": np.float64(2.1),
+        "quality_score": np.int64(7), "zones": [{"price": np.float64(25000 + i), "strength": np.int64(i)}
+                                                for i in range(20)],
+    }
+    for name, fn in (("walk+json", lambda: json.dumps(to_python(levels)).encode()),
+                     ("dumps", lambda: dumps(levels))):
+        ms, body = bench(fn, repeat=2000)
+        print(f"{'levels dict':<28}{name:<10}{ms * 1000:>9.1f}u{len(body):>10,}{'':>10}")
+
+
+if __name__ == "__main__":
+    main()
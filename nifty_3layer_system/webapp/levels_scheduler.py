@@ -0,0 +1,139 @@
+"""
+LEVELS SCHEDULER: Precompute trading levels right after each bar closes
+- Wakes at every bar close on the NSE calendar (plus a short settle delay)
+- Recomputes levels for each symbol off the event loop
+- Stores the latest result per symbol for constant-time reads (optionally in the
+  cross-worker shared state, so every uvicorn worker serves the same levels)
+- Publishes each fresh result so every client sees the same levels at the same time
+"""
+
+import asyncio
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from loguru import logger
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.market_calendar import NSECalendar
+
+
+class LevelsScheduler:
+    """
+    Bar-close aligned levels precompute.
+
+    Args:
+        compute: Blocking ``compute(symbol) -> levels dict`` (runs in a worker thread)
+        publish: ``async publish(symbol, levels)`` called after each successful compute
+        symbols: Symbols to keep fresh
+        interval_minutes: Bar size the schedule is aligned to
+        settle_seconds: Delay after the close so the broker has published the bar
+        state: Shared state backend for the latest levels (default: in-process dict)
+    """
+
+    def __init__(
+        self,
+        compute: Callable[[str], Dict[str, Any]],
+        publish: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None,
+        symbols: Iterable[str] = ("NIFTY", "SENSEX"),
+        interval_minutes: int = 5,
+        settle_seconds: float = 3.0,
+        calendar: Optional[NSECalendar] = None,
+        state=None,
+    ):
+        self.compute = compute
+        self.publish = publish
+        self.symbols = [s.upper() for s in symbols]
+        self.interval_minutes = interval_minutes
+        self.settle_seconds = settle_seconds
+        self.calendar = calendar or NSECalendar()
+
+        self.state = state
+        self._latest: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        self.runs = 0
+        self.errors = 0
+        self.last_compute_ms: Dict[str, float] = {}
+        self.next_run: Optional[datetime] = None
+
+    # ------------------------------------------------------------------ reads
+
+    def latest(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Most recent levels for ``symbol`` (None until the first compute finishes)"""
+        if self.state is not None:
+            return self.state.get("levels", symbol.upper())
+        return self._latest.get(symbol.upper())
+
+    def store(self, symbol: str, levels: Dict[str, Any]):
+        if self.state is not None:
+            self.state.put("levels", symbol.upper(), levels)
+        else:
+            self._latest[symbol.upper()] = levels
+
+    # ------------------------------------------------------------------ lifecycle
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        if self.is_running:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"✓ Levels scheduler started | {', '.join(self.symbols)} | {self.interval_minutes}m bars")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self):
+        # Prime the store so the first request never waits on a compute
+        await self.refresh_all(self.calendar.last_bar_close(self.interval_minutes))
+        while True:
+            bar_close = self.calendar.next_bar_close(self.interval_minutes)
+            self.next_run = bar_close
+            delay = (bar_close - self.calendar.now()).total_seconds() + self.settle_seconds
+            await asyncio.sleep(max(delay, 0))
+            await self.refresh_all(bar_close)
+
+    async def refresh_all(self, bar_close: Optional[datetime] = None):
+        """Recompute every symbol (sequentially: they share the broker rate limiter)"""
+        for symbol in self.symbols:
+            await self.refresh(symbol, bar_close)
+
+    async def refresh(self, symbol: str, bar_close: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            levels = await loop.run_in_executor(None, self.compute, symbol)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Levels precompute failed for {symbol}: {e}")
+            return None
+        self.last_compute_ms[symbol] = (time.perf_counter() - start) * 1000
+        self.runs += 1
+
+        levels["bar_close"] = bar_close.isoformat() if bar_close else None
+        self.store(symbol, levels)
+        if self.publish is not None:
+            await self.publish(symbol, levels)
+        return levels
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'running': self.is_running,
+            'symbols': self.symbols,
+            'interval_minutes': self.interval_minutes,
+            'next_run': self.next_run.isoformat() if self.next_run else None,
+            'runs': self.runs,
+            'errors': self.errors,
+            'last_compute_ms': {k: round(v, 1) for k, v in self.last_compute_ms.items()},
+        }
@@ -0,0 +1,261 @@
+"""
+OUTCOME WRITER: Off-loop SQLite persistence for the dashboard
+- The dedicated writer thread's pooled WAL connection (integrations.storage)
+- Signal inserts and outcome updates arrive through an asyncio queue
+- Whatever is queued when the writer wakes up is committed as one batch; if
+  the batch fails, its writes are retried one by one so a bad statement only
+  fails its own future
+- Outcome updates that fail with a transient error (locked/busy database,
+  I/O) are logged and re-queued up to ``retries`` times
+- Queue depth and commit latency exposed via stats()
+"""
+
+import asyncio
+import sqlite3
+import sys
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from integrations.storage import SQLiteStore, get_store
+from integrations.tick_journal import WallClock
+from integrations.telemetry import QUEUE_DEPTH
+
+
+UPDATE_OUTCOME_SQL = """
+UPDATE level_signals
+SET outcome = ?, outcome_price = ?, outcome_time = ?, pnl_points = ?
+WHERE id = ?
+"""
+
+_STOP = object()
+
+
+class OutcomeWriter:
+    """
+    Asynchronous writer for level_signals.
+
+    The feed loop only ever calls ``submit_*`` (a non-blocking queue put).
+    The drain task batches queued writes and hands each batch to a
+    single-thread executor, so sqlite3 never runs on the event loop.
+    """
+
+    def __init__(self, db_path: str = "data/trading_metrics.db", max_batch: int = 256, retries: int = 3,
+                 clock=None):
+        """
+        Args:
+            db_path: SQLite database file (shared with LevelTracker)
+            max_batch: Max writes committed in a single transaction
+            retries: Re-queues of an outcome update after a transient failure
+            clock: Default outcome time source (WallClock; a ReplayClock in replays)
+        """
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self.retries = retries
+        self.clock = clock or WallClock()
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="outcome-writer")
+        self._store: Optional[SQLiteStore] = None
+
+        # Metrics
+        self._writes = 0
+        self._batches = 0
+        self._errors = 0
+        self._retries = 0
+        self._max_queue_depth = 0
+        self._last_commit_ms = 0.0
+        self._max_commit_ms = 0.0
+        self._total_commit_ms = 0.0
+        QUEUE_DEPTH.set_function(lambda: self._queue.qsize() if self._queue else 0, queue="outcome_writer")
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """Open the connection on the writer thread and start draining the queue"""
+        if self.is_running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        await self._loop.run_in_executor(self._executor, self._open)
+        self._task = asyncio.create_task(self._drain())
+        logger.info(f"✓ Outcome writer started (WAL) | {self.db_path}")
+
+    async def stop(self):
+        """Flush everything still queued, then close the connection"""
+        if not self.is_running:
+            return
+        self._queue.put_nowait(_STOP)
+        await self._task
+        await self._loop.run_in_executor(self._executor, self._close)
+        logger.info("✓ Outcome writer stopped")
+
+    # ------------------------------------------------------------------ submit
+
+    def submit_outcome(
+        self,
+        signal_id: int,
+        outcome: str,
+        price: float,
+        pnl: float,
+        outcome_time: Optional[datetime] = None,
+    ) -> asyncio.Future:
+        """
+        Queue an outcome update (call from the event loop). Resolves to rows affected.
+
+        A transient failure is logged and the update re-queued (up to
+        ``retries`` times); the future fails only once the retries are spent.
+        """
+        outcome_time = outcome_time or self.clock.now()
+        params = (outcome, price, outcome_time.strftime('%Y-%m-%d %H:%M:%S'), pnl, signal_id)
+        attempt = self._enqueue(UPDATE_OUTCOME_SQL, params, "rowcount")
+        outer = self._loop.create_future()
+        self._retry_on_failure(attempt, outer, UPDATE_OUTCOME_SQL, params, "rowcount", self.retries)
+        return outer
+
+    def _retry_on_failure(self, attempt: asyncio.Future, outer: asyncio.Future,
+                          sql: str, params: Tuple, result: str, retries: int):
+        """Resolve ``outer`` from ``attempt``, re-queueing the write after a transient error"""
+        def done(attempt: asyncio.Future):
+            if outer.done():
+                return
+            if attempt.cancelled():
+                outer.cancel()
+                return
+            error = attempt.exception()
+            if error is None:
+                outer.set_result(attempt.result())
+            elif retries > 0 and isinstance(error, sqlite3.OperationalError) and self.is_running:
+                self._retries += 1
+                logger.warning(f"Outcome write failed, re-queued ({retries} retries left): {error} | {params}")
+                self._retry_on_failure(self._enqueue(sql, params, result), outer, sql, params, result, retries - 1)
+            else:
+                outer.set_exception(error)
+
+        attempt.add_done_callback(done)
+
+    def submit_signal(self, levels: Dict) -> asyncio.Future:
+        """Queue a signal insert (call from the event loop). Resolves to the new row id."""
+        from ml_models.level_tracker import INSERT_SIGNAL_SQL, LevelTracker  # pandas: not at import
+
+        return self._enqueue(INSERT_SIGNAL_SQL, LevelTracker.signal_params(levels), "lastrowid")
+
+    def submit_signal_threadsafe(self, levels: Dict) -> Future:
+        """Queue a signal insert from a worker thread (e.g. a sync FastAPI endpoint)"""
+        async def _submit():
+            return await self.submit_signal(levels)
+        return asyncio.run_coroutine_threadsafe(_submit(), self._loop)
+
+    def _enqueue(self, sql: str, params: Tuple, result: str) -> asyncio.Future:
+        if not self.is_running:
+            raise RuntimeError("OutcomeWriter is not running")
+        future = self._loop.create_future()
+        self._queue.put_nowait((sql, params, result, future))
+        depth = self._queue.qsize()
+        if depth > self._max_queue_depth:
+            self._max_queue_depth = depth
+        return future
+
+    # ------------------------------------------------------------------ drain
+
+    async def _drain(self):
+        stopping = False
+        while not stopping:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            if _STOP in batch:
+                stopping = True
+                batch = [item for item in batch if item is not _STOP]
+                # Anything queued behind the sentinel still gets written
+                while not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+            if not batch:
+                continue
+
+            try:
+                results = await self._loop.run_in_executor(
+                    self._executor, self._commit_batch, [item[:3] for item in batch]
+                )
+            except Exception as e:
+                results = [e] * len(batch)
+
+            for (*_, future), value in zip(batch, results):
+                if isinstance(value, Exception):
+                    self._errors += 1
+                    if not future.done():
+                        future.set_exception(value)
+                elif not future.done():
+                    future.set_result(value)
+
+    # ------------------------------------------------------- writer thread only
+
+    def _open(self):
+        self._store = get_store(self.db_path)
+        self._store.connection()  # this thread's pooled connection
+
+    def _close(self):
+        self._store = None
+
+    def _commit_batch(self, batch: List[Tuple[str, Tuple, str]]) -> List[Any]:
+        """One transaction for the batch; if it fails, one per write (errors returned in place)"""
+        try:
+            return self._commit(batch)
+        except sqlite3.Error as e:
+            if len(batch) == 1:
+                return [e]
+            logger.warning(f"Outcome writer batch failed ({len(batch)} writes), retrying one by one: {e}")
+        results = []
+        for item in batch:
+            try:
+                results.extend(self._commit([item]))
+            except sqlite3.Error as e:
+                logger.error(f"Outcome write failed: {e} | {item[1]}")
+                results.append(e)
+        return results
+
+    def _commit(self, batch: List[Tuple[str, Tuple, str]]) -> List[Any]:
+        start = time.perf_counter()
+        results = []
+        with self._store.transaction() as conn:
+            for sql, params, result in batch:
+                cursor = conn.execute(sql, params)
+                results.append(getattr(cursor, result))
+
+        # sqlite_commit_seconds is recorded by the store's transaction()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._writes += len(batch)
+        self._batches += 1
+        self._last_commit_ms = elapsed_ms
+        self._max_commit_ms = max(self._max_commit_ms, elapsed_ms)
+        self._total_commit_ms += elapsed_ms
+        return results
+
+    # ------------------------------------------------------------------ stats
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and commit latency snapshot"""
+        return {
+            'running': self.is_running,
+            'queue_depth': self._queue.qsize() if self._queue else 0,
+            'max_queue_depth': self._max_queue_depth,
+            'writes': self._writes,
+            'batches': self._batches,
+            'errors': self._errors,
+            'retries': self._retries,
+            'avg_batch_size': round(self._writes / self._batches, 2) if self._batches else 0.0,
+            'last_commit_ms': round(self._last_commit_ms, 3),
+            'avg_commit_ms': round(self._total_commit_ms / self._batches, 3) if self._batches else 0.0,
+            'max_commit_ms': round(self._max_commit_ms, 3),
+        }
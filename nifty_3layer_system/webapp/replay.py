@@ -0,0 +1,98 @@
+"""
+REPLAY: Drive the dashboard's live tick path from a recorded journal
+- Same handle_tick the Dhan stream uses (broadcast + outcome checks + writer)
+- Outcomes go to a scratch copy of the metrics DB, never the live one
+- Pending signals of the replayed day are loaded from that copy and join the
+  book once the replay reaches the time they were logged; handlers and the
+  writer read journal time from the replay's clock, so two replays of a day
+  record identical outcomes
+- Reports achieved speed-up and per-tick handler cost
+
+Usage (from nifty_3layer_system/):
+    python -m webapp.replay 2026-01-15            # as fast as possible
+    python -m webapp.replay 2026-01-15 --speed 20
+"""
+
+import argparse
+import asyncio
+import sqlite3
+import sys
+import tempfile
+from bisect import bisect_right
+from contextlib import closing
+from datetime import date, datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from integrations.tick_journal import ReplayClock, ReplayEngine, TickJournalReader
+from ml_models.level_tracker import IST
+from webapp import app as live
+from webapp.outcome_writer import OutcomeWriter
+from webapp.signal_book import pending_signals
+
+
+async def replay(day: date, journal_dir: str, speed: float, db_path: str) -> Path:
+    """
+    Replay one journal day through webapp.app.handle_tick
+
+    Returns:
+        Scratch database holding the replay's outcomes
+    """
+    reader = TickJournalReader.open_day(journal_dir, day)
+
+    scratch = Path(tempfile.mkdtemp(prefix="replay_")) / "trading_metrics.db"
+    if Path(db_path).exists():
+        # Backup API, not a file copy: recent writes may still sit in the -wal file
+        with closing(sqlite3.connect(db_path)) as source, closing(sqlite3.connect(scratch)) as target:
+            source.backup(target)
+
+    clock = ReplayClock()
+    live.CLOCK = clock
+    live.ACTIVE_SIGNALS.clear()
+    # level_signals timestamps are IST wall time; compare them with the clock as epoch seconds
+    pending = pending_signals(str(scratch), day=day) if scratch.exists() else []
+    logged = [IST.localize(datetime.fromisoformat(signal.logged_at)).timestamp() for signal in pending]
+    joined = 0
+
+    def on_tick(tick):
+        nonlocal joined
+        due = bisect_right(logged, clock.time())
+        if due > joined:
+            live.ACTIVE_SIGNALS.add_many(pending[joined:due])
+            joined = due
+        live.handle_tick(tick)
+
+    live.outcome_writer = OutcomeWriter(db_path=str(scratch), clock=clock)
+    await live.outcome_writer.start()
+
+    engine = ReplayEngine(reader, speed=speed, clock=clock)
+    engine.on_tick(on_tick)
+    stats = await engine.run_async()
+
+    await live.outcome_writer.stop()
+    reader.close()
+
+    print(f"\n{'=' * 80}")
+    print(f"REPLAY {day} | speed={'max' if not speed else f'{speed:g}x'}")
+    print(f"{'=' * 80}")
+    print(stats.summary())
+    print(f"Active signals left: {len(live.ACTIVE_SIGNALS)} "
+          f"(+{len(pending) - joined} logged after the last tick)")
+    print(f"Writer: {live.outcome_writer.stats()}")
+    print(f"Scratch DB: {scratch}")
+    return scratch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded session through the live tick path")
+    parser.add_argument("day", type=date.fromisoformat, help="Journal day (YYYY-MM-DD)")
+    parser.add_argument("--speed", type=float, default=0, help="1 = real time, N = Nx, 0 = max")
+    parser.add_argument("--journal-dir", default=live.TICK_JOURNAL_DIR or "data/ticks")
+    parser.add_argument("--db", default="data/trading_metrics.db", help="DB copied as the starting state")
+    args = parser.parse_args()
+    asyncio.run(replay(args.day, args.journal_dir, args.speed, args.db))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+"""
+SHARED STATE: Cross-worker state for running the webapp under several uvicorn workers
+- Pluggable backend: LocalState (one process, plain dicts) or SQLiteState (WAL file,
+  by default on /dev/shm so it lives in shared memory)
+- Namespaced key/value store for the levels cache, latest levels and signal summary
+- A lease elects exactly one feed owner; it runs the Dhan feed, the levels scheduler
+  and signal resolution, and another worker takes over if its lease expires
+- An event log relays the owner's WebSocket broadcasts (and followers' new signals)
+  to every worker, so each worker only serves its own connections
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from integrations.telemetry import QUEUE_DEPTH, SQLITE_COMMIT
+from webapp.encoding import dumps
+
+
+Event = Tuple[int, str, str, str]  # (id, channel, symbol, payload)
+
+DEFAULT_SHM_DIR = Path("/dev/shm")
+DEFAULT_STATE_FILE = "nifty_webapp_state.db"
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LocalState:
+    """Single-process backend: everything stays in this worker"""
+
+    shared = False
+
+    def __init__(self):
+        self.worker_id = worker_id()
+        self._kv: Dict[Tuple[str, str], Any] = {}
+
+    # ------------------------------------------------------------------ key/value
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        return self._kv.get((namespace, key), default)
+
+    def put(self, namespace: str, key: str, value: Any):
+        self._kv[(namespace, key)] = value
+
+    def items(self, namespace: str) -> Dict[str, Any]:
+        return {k: v for (ns, k), v in self._kv.items() if ns == namespace}
+
+    # ------------------------------------------------------------------ lease / events
+
+    def acquire_lease(self, name: str, ttl: float) -> bool:
+        return True
+
+    def release_lease(self, name: str):
+        pass
+
+    def lease_owner(self, name: str) -> Optional[str]:
+        return self.worker_id
+
+    def exchange(self, outgoing: List[Tuple[str, str, str]]) -> List[Event]:
+        return []
+
+    def close(self):
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {'backend': 'local', 'worker': self.worker_id}
+
+
+class SQLiteState:
+    """
+    Multi-process backend on one SQLite file (WAL).
+
+    Every method is blocking; the coordinator calls lease and event methods
+    from a worker thread. Values are stored as JSON.
+
+    Args:
+        path: Database file shared by all workers
+        retention_seconds: How long relayed events are kept before pruning
+    """
+
+    shared = True
+
+    def __init__(self, path: str, retention_seconds: float = 60.0):
+        self.path = str(path)
+        self.worker_id = worker_id()
+        self.retention_seconds = retention_seconds
+
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS kv (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            );
+            CREATE TABLE IF NOT EXISTS leases (
+                name TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                channel TEXT NOT NULL,
+                symbol TEXT NOT NULL,
+                origin TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+        """)
+        # Only events published after this worker started are relayed to it
+        row = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()
+        self._cursor = row[0]
+        self._last_prune = 0.0
+
+        self.published = 0
+        self.received = 0
+
+    # ------------------------------------------------------------------ key/value
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM kv WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def put(self, namespace: str, key: str, value: Any):
+        payload = dumps(value).decode()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO kv (namespace, key, value, updated_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, payload, time.time()),
+            )
+
+    def items(self, namespace: str) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._conn.execute("SELECT key, value FROM kv WHERE namespace = ?", (namespace,)).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    # ------------------------------------------------------------------ lease
+
+    def acquire_lease(self, name: str, ttl: float) -> bool:
+        """Take or renew ``name``; succeeds if free, expired, or already ours"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("""
+                INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                WHERE leases.owner = excluded.owner OR leases.expires_at < ?
+            """, (name, self.worker_id, now + ttl, now))
+            row = self._conn.execute("SELECT owner FROM leases WHERE name = ?", (name,)).fetchone()
+        return row is not None and row[0] == self.worker_id
+
+    def release_lease(self, name: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, self.worker_id))
+
+    def lease_owner(self, name: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT owner FROM leases WHERE name = ? AND expires_at >= ?", (name, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    # ------------------------------------------------------------------ events
+
+    def exchange(self, outgoing: List[Tuple[str, str, str]]) -> List[Event]:
+        """
+        Append this worker's events and read everyone else's since the last call.
+
+        Args:
+            outgoing: (channel, symbol, payload) tuples to publish
+
+        Returns:
+            Events from other workers, oldest first
+        """
+        now = time.time()
+        with self._lock:
+            if outgoing:
+                with SQLITE_COMMIT.time(db="shared_state"):
+                    self._conn.execute("BEGIN")
+                    self._conn.executemany(
+                        "INSERT INTO events (channel, symbol, origin, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+                        [(channel, symbol, self.worker_id, payload, now) for channel, symbol, payload in outgoing],
+                    )
+                    self._conn.execute("COMMIT")
+                self.published += len(outgoing)
+
+            rows = self._conn.execute(
+                "SELECT id, channel, symbol, origin, payload FROM events WHERE id > ? ORDER BY id",
+                (self._cursor,),
+            ).fetchall()
+            if rows:
+                self._cursor = rows[-1][0]
+
+            if now - self._last_prune > self.retention_seconds:
+                self._conn.execute("DELETE FROM events WHERE created_at < ?", (now - self.retention_seconds,))
+                self._last_prune = now
+
+        events = [(eid, channel, symbol, payload) for eid, channel, symbol, origin, payload in rows
+                  if origin != self.worker_id]
+        self.received += len(events)
+        return events
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'backend': 'sqlite',
+            'path': self.path,
+            'worker': self.worker_id,
+            'published': self.published,
+            'received': self.received,
+            'cursor': self._cursor,
+        }
+
+
+def create_state(backend: Optional[str] = None, path: Optional[str] = None):
+    """
+    Build the backend named by ``backend`` or $WEBAPP_STATE ('local' / 'sqlite').
+
+    Multi-worker deployments must use 'sqlite'; the file defaults to
+    /dev/shm when available (override with $WEBAPP_STATE_PATH).
+    """
+    backend = (backend or os.getenv("WEBAPP_STATE", "local")).lower()
+    if backend == "local":
+        return LocalState()
+    if backend == "sqlite":
+        if path is None:
+            path = os.getenv("WEBAPP_STATE_PATH")
+        if path is None:
+            base = DEFAULT_SHM_DIR if DEFAULT_SHM_DIR.is_dir() else Path("data")
+            path = str(base / DEFAULT_STATE_FILE)
+        return SQLiteState(path)
+    raise ValueError(f"Unknown WEBAPP_STATE backend: {backend}")
+
+
+class WorkerCoordinator:
+    """
+    Feed-owner election and event relay for one worker.
+
+    Args:
+        state: LocalState or SQLiteState
+        lease_name: Lease that designates the feed owner
+        lease_ttl: Seconds a lease stays valid without renewal
+        renew_interval: Seconds between lease renewals / takeover attempts
+        poll_interval: Seconds between event exchanges (relay latency bound)
+    """
+
+    def __init__(
+        self,
+        state,
+        lease_name: str = "feed",
+        lease_ttl: float = 15.0,
+        renew_interval: float = 5.0,
+        poll_interval: float = 0.05,
+    ):
+        self.state = state
+        self.lease_name = lease_name
+        self.lease_ttl = lease_ttl
+        self.renew_interval = renew_interval
+        self.poll_interval = poll_interval
+
+        self.is_owner = False
+        self.on_elected: Optional[Callable[[], Awaitable[None]]] = None
+        self.on_demoted: Optional[Callable[[], Awaitable[None]]] = None
+
+        self._handlers: Dict[str, Callable[[str, str], Any]] = {}
+        self._outgoing: Deque[Tuple[str, str, str]] = deque()
+        self._puts: Dict[Tuple[str, str], Any] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._executor = None
+        self.elections = 0
+        QUEUE_DEPTH.set_function(lambda: len(self._outgoing), queue="shared_state_outgoing")
+
+    def on(self, channel: str, handler: Callable[[str, str], Any]):
+        """Register ``handler(symbol, payload)`` for events on ``channel`` from other workers"""
+        self._handlers[channel] = handler
+
+    def publish(self, channel: str, symbol: str, payload: str):
+        """Queue an event for the other workers (no-op with a local backend)"""
+        if self.state.shared:
+            self._outgoing.append((channel, symbol, payload))
+
+    def put(self, namespace: str, key: str, value: Any):
+        """
+        Update a state entry from the event loop without blocking it
+
+        The local backend is a dict and is written directly; a shared backend
+        is written by the exchange thread on its next poll, keeping only the
+        latest value per key.
+        """
+        if self.state.shared:
+            self._puts[(namespace, key)] = value
+        else:
+            self.state.put(namespace, key, value)
+
+    # ------------------------------------------------------------------ lifecycle
+
+    async def start(self):
+        if not self.state.shared:
+            await self._set_owner(True)
+            return
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shared-state")
+        await self._renew()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"✓ Shared state ({self.state.path}) | worker {self.state.worker_id} | "
+                    f"{'feed owner' if self.is_owner else 'follower'}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self.state.shared:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor, self._flush_final)
+            self._executor.shutdown(wait=False)
+        self.is_owner = False
+
+    def _flush_final(self):
+        self._sync(self._drain(), self._drain_puts())
+        if self.is_owner:
+            # Hand over straight away instead of waiting for the lease to expire
+            self.state.release_lease(self.lease_name)
+
+    def _drain(self) -> List[Tuple[str, str, str]]:
+        outgoing = list(self._outgoing)
+        self._outgoing.clear()
+        return outgoing
+
+    def _drain_puts(self) -> Dict[Tuple[str, str], Any]:
+        puts, self._puts = self._puts, {}
+        return puts
+
+    def _sync(self, outgoing: List[Tuple[str, str, str]], puts: Dict[Tuple[str, str], Any]) -> List[Event]:
+        """Exchange thread: write pending puts, then relay events"""
+        for (namespace, key), value in puts.items():
+            self.state.put(namespace, key, value)
+        return self.state.exchange(outgoing)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_renew = time.monotonic() + self.renew_interval
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            puts = self._drain_puts()
+            try:
+                events = await loop.run_in_executor(self._executor, self._sync, self._drain(), puts)
+            except sqlite3.Error as e:
+                logger.warning(f"Shared state exchange failed: {e}")
+                for entry, value in puts.items():
+                    self._puts.setdefault(entry, value)  # retried unless a newer value arrived
+                events = []
+            for _, channel, symbol, payload in events:
+                handler = self._handlers.get(channel)
+                if handler is None:
+                    continue
+                try:
+                    result = handler(symbol, payload)
+                    if asyncio.iscoroutine(result):
+                        await result
+                except Exception as e:
+                    logger.error(f"Shared state handler for '{channel}' failed: {e}")
+            if time.monotonic() >= next_renew:
+                next_renew = time.monotonic() + self.renew_interval
+                await self._renew()
+
+    async def _renew(self):
+        loop = asyncio.get_running_loop()
+        try:
+            owner = await loop.run_in_executor(
+                self._executor, self.state.acquire_lease, self.lease_name, self.lease_ttl
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Feed lease renewal failed: {e}")
+            owner = False
+        await self._set_owner(owner)
+
+    async def _set_owner(self, owner: bool):
+        if owner == self.is_owner:
+            return
+        self.is_owner = owner
+        if owner:
+            self.elections += 1
+            logger.info(f"✓ Worker {self.state.worker_id} elected feed owner")
+            if self.on_elected is not None:
+                await self.on_elected()
+        else:
+            logger.warning(f"Worker {self.state.worker_id} lost the feed lease")
+            if self.on_demoted is not None:
+                await self.on_demoted()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.state.stats(),
+            'is_owner': self.is_owner,
+            'elections': self.elections,
+            'outgoing': len(self._outgoing),
+            'pending_puts': len(self._puts),
+        }
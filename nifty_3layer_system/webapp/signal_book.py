@@ -0,0 +1,272 @@
+"""
+SIGNAL BOOK: Price-indexed store of active signals for per-tick target/SL checks
+- Any number of concurrent signals per symbol (strategies, instruments)
+- Per symbol, four sorted trigger arrays: BUY/SELL x target/stoploss
+- A tick resolves only the triggers its price crossed, found by binary search
+- Bulk loading of pending signals from level_signals
+"""
+
+import math
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+from integrations.storage import get_store
+
+
+@dataclass
+class ActiveSignal:
+    """Signal waiting for its target or stoploss"""
+    id: int
+    symbol: str
+    direction: str  # BUY / SELL
+    entry: float
+    target: float
+    stoploss: float
+    logged_at: object = None
+    strategy: str = "levels"
+
+
+class _TriggerArray:
+    """Trigger prices kept sorted, with the owning signal id alongside each price"""
+
+    __slots__ = ("prices", "ids")
+
+    def __init__(self):
+        self.prices: List[float] = []
+        self.ids: List[int] = []
+
+    def __len__(self):
+        return len(self.prices)
+
+    def add(self, price: float, signal_id: int):
+        idx = bisect_right(self.prices, price)
+        self.prices.insert(idx, price)
+        self.ids.insert(idx, signal_id)
+
+    def extend(self, pairs: Iterable[Tuple[float, int]]):
+        merged = sorted(list(zip(self.prices, self.ids)) + list(pairs))
+        self.prices = [p for p, _ in merged]
+        self.ids = [i for _, i in merged]
+
+    def remove(self, price: float, signal_id: int):
+        idx = bisect_left(self.prices, price)
+        while idx < len(self.prices) and self.prices[idx] == price:
+            if self.ids[idx] == signal_id:
+                del self.prices[idx]
+                del self.ids[idx]
+                return
+            idx += 1
+
+    def pop_at_or_below(self, price: float) -> List[int]:
+        """Remove and return ids whose trigger price <= price (price moved up through them)"""
+        k = bisect_right(self.prices, price)
+        if k == 0:
+            return []
+        fired = self.ids[:k]
+        del self.prices[:k]
+        del self.ids[:k]
+        return fired
+
+    def pop_at_or_above(self, price: float) -> List[int]:
+        """Remove and return ids whose trigger price >= price (price moved down through them)"""
+        k = bisect_left(self.prices, price)
+        if k == len(self.prices):
+            return []
+        fired = self.ids[k:]
+        del self.prices[k:]
+        del self.ids[k:]
+        return fired
+
+
+class _SymbolBook:
+    """Trigger arrays for one symbol"""
+
+    __slots__ = ("buy_targets", "buy_stops", "sell_targets", "sell_stops")
+
+    def __init__(self):
+        self.buy_targets = _TriggerArray()   # fire when price >= level
+        self.buy_stops = _TriggerArray()     # fire when price <= level
+        self.sell_targets = _TriggerArray()  # fire when price <= level
+        self.sell_stops = _TriggerArray()    # fire when price >= level
+
+    def arrays_for(self, direction: str) -> Tuple[_TriggerArray, _TriggerArray]:
+        if direction == "BUY":
+            return self.buy_targets, self.buy_stops
+        return self.sell_targets, self.sell_stops
+
+
+class SignalBook:
+    """
+    Active signals indexed by trigger price.
+
+    Every trigger left in the book is on the far side of the last seen price
+    (anything already crossed has fired and been removed), so a tick only
+    touches the slice between the previous price and the new one. Targets are
+    resolved before stoplosses, matching the original per-symbol check.
+
+    Mutations take a lock because signals are added from FastAPI's worker
+    threads while ticks are resolved on the event loop.
+    """
+
+    def __init__(self):
+        self._books: Dict[str, _SymbolBook] = {}
+        self._signals: Dict[int, ActiveSignal] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._signals)
+
+    def __contains__(self, signal_id: int) -> bool:
+        return signal_id in self._signals
+
+    def get(self, signal_id: int) -> Optional[ActiveSignal]:
+        return self._signals.get(signal_id)
+
+    def symbols(self) -> List[str]:
+        return sorted({s.symbol for s in self._signals.values()})
+
+    def signals_for(self, symbol: str) -> List[ActiveSignal]:
+        return [s for s in self._signals.values() if s.symbol == symbol]
+
+    def clear(self):
+        with self._lock:
+            self._books.clear()
+            self._signals.clear()
+
+    # ------------------------------------------------------------------ mutate
+
+    @staticmethod
+    def _is_valid(signal: ActiveSignal) -> bool:
+        # NaN levels would break the sort order the bisects rely on
+        levels = (signal.entry, signal.target, signal.stoploss)
+        return (
+            signal.direction in ("BUY", "SELL")
+            and all(level is not None and math.isfinite(level) for level in levels)
+        )
+
+    def add(self, signal: ActiveSignal) -> bool:
+        """Add a single signal; returns False if it has no usable levels"""
+        if not self._is_valid(signal):
+            return False
+        with self._lock:
+            self._discard(signal.id)
+            book = self._books.setdefault(signal.symbol, _SymbolBook())
+            targets, stops = book.arrays_for(signal.direction)
+            targets.add(signal.target, signal.id)
+            stops.add(signal.stoploss, signal.id)
+            self._signals[signal.id] = signal
+        return True
+
+    def add_many(self, signals: Iterable[ActiveSignal]) -> int:
+        """Bulk add: each trigger array is sorted once instead of per insert"""
+        pending: Dict[Tuple[str, str, str], List[Tuple[float, int]]] = {}
+        added = 0
+        with self._lock:
+            for signal in signals:
+                if not self._is_valid(signal) or signal.id in self._signals:
+                    continue
+                self._signals[signal.id] = signal
+                pending.setdefault((signal.symbol, signal.direction, "target"), []).append((signal.target, signal.id))
+                pending.setdefault((signal.symbol, signal.direction, "stop"), []).append((signal.stoploss, signal.id))
+                added += 1
+
+            for (symbol, direction, kind), pairs in pending.items():
+                book = self._books.setdefault(symbol, _SymbolBook())
+                targets, stops = book.arrays_for(direction)
+                (targets if kind == "target" else stops).extend(pairs)
+        return added
+
+    def remove(self, signal_id: int) -> Optional[ActiveSignal]:
+        with self._lock:
+            return self._discard(signal_id)
+
+    def _discard(self, signal_id: int) -> Optional[ActiveSignal]:
+        signal = self._signals.pop(signal_id, None)
+        if signal is None:
+            return None
+        book = self._books.get(signal.symbol)
+        if book is not None:
+            targets, stops = book.arrays_for(signal.direction)
+            targets.remove(signal.target, signal.id)
+            stops.remove(signal.stoploss, signal.id)
+        return signal
+
+    # ------------------------------------------------------------------ ticks
+
+    def on_price(self, symbol: str, price: float) -> List[Tuple[ActiveSignal, str, float]]:
+        """
+        Resolve every trigger crossed by the move to ``price``.
+
+        Returns:
+            List of (signal, outcome, pnl_points), outcome is 'TARGET' or 'SL'
+        """
+        book = self._books.get(symbol)
+        if book is None:
+            return []
+
+        hits: List[Tuple[ActiveSignal, str, float]] = []
+        with self._lock:
+            # Targets first: a signal whose target and SL both fired keeps the target
+            for signal_id in book.buy_targets.pop_at_or_below(price):
+                signal = self._signals.pop(signal_id)
+                book.buy_stops.remove(signal.stoploss, signal_id)
+                hits.append((signal, "TARGET", signal.target - signal.entry))
+            for signal_id in book.sell_targets.pop_at_or_above(price):
+                signal = self._signals.pop(signal_id)
+                book.sell_stops.remove(signal.stoploss, signal_id)
+                hits.append((signal, "TARGET", signal.entry - signal.target))
+
+            for signal_id in book.buy_stops.pop_at_or_above(price):
+                signal = self._signals.pop(signal_id)
+                book.buy_targets.remove(signal.target, signal_id)
+                hits.append((signal, "SL", signal.stoploss - signal.entry))
+            for signal_id in book.sell_stops.pop_at_or_below(price):
+                signal = self._signals.pop(signal_id)
+                book.sell_targets.remove(signal.target, signal_id)
+                hits.append((signal, "SL", signal.entry - signal.stoploss))
+
+        return hits
+
+    # ------------------------------------------------------------------ loading
+
+    def load_pending(self, db_path: str = "data/trading_metrics.db", days: int = 1,
+                     day: Optional[date] = None) -> int:
+        """
+        Bulk-load signals with no outcome yet from level_signals
+
+        Returns:
+            Number of signals added
+        """
+        added = self.add_many(pending_signals(db_path, days, day))
+        logger.info(f"✓ Loaded {added} pending signals into signal book")
+        return added
+
+
+def pending_signals(db_path: str = "data/trading_metrics.db", days: int = 1,
+                    day: Optional[date] = None) -> List[ActiveSignal]:
+    """
+    Signals with no outcome yet, oldest first
+
+    Args:
+        days: Window ending today (ignored when ``day`` is given)
+        day: Only signals logged on this session day
+    """
+    # Bare timestamp comparison (not date(timestamp)) so idx_level_signals_outcome_time applies
+    if day is None:
+        window, params = "timestamp >= date('now', ?)", (f"-{days} day",)
+    else:
+        window, params = "timestamp >= ? AND timestamp < ?", (str(day), str(day + timedelta(days=1)))
+    rows = get_store(db_path).query(f"""
+        SELECT id, COALESCE(symbol, 'NIFTY'), direction,
+               entry_price, target_price, sl_price, timestamp
+        FROM level_signals
+        WHERE outcome IS NULL
+        AND {window}
+        ORDER BY timestamp
+    """, params)
+    return [ActiveSignal(*row) for row in rows]
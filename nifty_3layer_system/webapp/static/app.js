@@ -60,6 +60,11 @@ const LEVEL_VALIDITY_MS = 15 * 60 * 1000; // 15 minutes cadence from start
 let candleCache = {};
 let levelsCache = {};
 let cacheTimestamp = {};
+
+// Incremental candles: server cursor + ETag per symbol, and which symbol the chart shows
+let candleCursor = {};
+let candleEtag = {};
+let chartSymbol = null;
 let resizeObserver = null;
 
 // Safe helpers to guard lightweight-charts calls
@@ -651,6 +656,99 @@ function updateLevelsCard(levels) {
   }
 }
 
+// Server candles are UTC epoch seconds; the chart runs on IST wall-clock time
+function toChartBar(c) {
+  const IST_OFFSET = 19800; // 5.5 hours in seconds
+  if (!c || ![c.time, c.open, c.high, c.low, c.close].every((v) => Number.isFinite(Number(v)))) {
+    return null;
+  }
+  return {
+    time: Number(c.time) + IST_OFFSET,
+    open: Number(c.open),
+    high: Number(c.high),
+    low: Number(c.low),
+    close: Number(c.close),
+  };
+}
+
+// Candles arrive columnar ({time: [...], open: [...], ...}); zip them back into bars
+function barsFromColumns(columns) {
+  if (!columns) return [];
+  if (Array.isArray(columns)) return columns;
+  const times = columns.time || [];
+  return times.map((time, i) => ({
+    time,
+    open: columns.open[i],
+    high: columns.high[i],
+    low: columns.low[i],
+    close: columns.close[i],
+    volume: columns.volume ? columns.volume[i] : 0,
+  }));
+}
+
+// Apply new/updated bars (from /api/candles?since= or a 'bar' push) to the chart
+function applyBarDeltas(symbol, bars, cursor) {
+  if (!candleSeries || !isChartReady || chartSymbol !== symbol) return;
+  const sorted = barsFromColumns(bars).map(toChartBar).filter(Boolean).sort((a, b) => a.time - b.time);
+  for (const bar of sorted) {
+    if (lastCandle && bar.time < lastCandle.time) continue; // older than the chart's live bar
+    const opened = !lastCandle || bar.time > lastCandle.time;
+    if (safeUpdate(candleSeries, bar)) {
+      lastCandle = bar;
+      currentCandleBuffer = bar;
+      if (opened && chart && chart.timeScale) {
+        console.log(`🕐 New candle @ ${new Date(bar.time * 1000).toLocaleTimeString()}: ${bar.close.toFixed(2)}`);
+        chart.timeScale().scrollToRealTime();
+      }
+    }
+  }
+  if (cursor != null) candleCursor[symbol] = cursor;
+}
+
+// Fetch only bars at/after the cursor; 304 when nothing changed
+async function loadCandleDelta(symbol) {
+  const headers = candleEtag[symbol] ? { 'If-None-Match': candleEtag[symbol] } : {};
+  const res = await fetch(
+    `/api/candles?symbol=${symbol}&interval=5&days=5&since=${candleCursor[symbol]}`,
+    { headers }
+  );
+  if (res.status === 304) return 0;
+  if (!res.ok) throw new Error(`Candles API failed: ${res.status}`);
+  candleEtag[symbol] = res.headers.get('ETag');
+  const data = await res.json();
+  const bars = barsFromColumns(data.candles);
+  applyBarDeltas(symbol, bars, data.cursor);
+  return bars.length;
+}
+
+// Apply levels from /api/levels or a server push (sent right after each bar close)
+function applyLevels(symbol, levelsData) {
+  if (!levelsData) return;
+  levelsCache[symbol] = levelsData;
+
+  // Attach latest candle time for overlays if missing
+  if (!levelsData.last_candle_time && lastCandle) {
+    levelsData.last_candle_time = lastCandle.time;
+  }
+
+  if (levelsData.entry && isChartReady && candleSeries) {
+    levelsData.entry = Number(levelsData.entry);
+    levelsData.exit_target = Number(levelsData.exit_target);
+    levelsData.stoploss = Number(levelsData.stoploss);
+    if ([levelsData.entry, levelsData.exit_target, levelsData.stoploss].every(Number.isFinite)) {
+      setPriceLines(levelsData);
+    }
+  }
+  if (levelsData.direction) {
+    updateLevelsCard(levelsData);
+    if (levelsData.position_status === 'HOLD') {
+      setStatus(`HOLD existing position - ${levelsData.hold_reason || 'structure unchanged'}`);
+    } else {
+      setStatus(`✓ ${levelsData.direction} signal generated - Entry: ${Number(levelsData.entry).toFixed(2)}`);
+    }
+  }
+}
+
 function connectStream(symbol) {
   if (ws) {
     ws.close();
@@ -676,6 +774,23 @@ function connectStream(symbol) {
         showOutcomeToast(data.outcome, data.direction, data.price);
         return;
       }
+
+      // Bar deltas from the server: a new bar opened or the live bar changed
+      if (data.type === 'bar') {
+        if (data.symbol === activeSymbol && data.interval === 5) {
+          applyBarDeltas(symbol, data.bars || [], data.cursor);
+        }
+        return;
+      }
+
+      // Levels recomputed by the server at the bar close
+      if (data.type === 'levels') {
+        if (data.symbol === activeSymbol) {
+          console.log(`📐 Levels pushed for bar close ${data.bar_close || ''}`);
+          applyLevels(symbol, data);
+        }
+        return;
+      }
       
       const ltp = Number(data.ltp);
       if (!Number.isFinite(ltp)) {
@@ -718,53 +833,7 @@ function connectStream(symbol) {
           timeZone: 'Asia/Kolkata'
         });
       }
-
-      // Get current timestamp in seconds (convert to IST to match historical candles)
-      const IST_OFFSET = 19800; // 5.5 hours in seconds
-      const currentTime = Math.floor(Date.now() / 1000) + IST_OFFSET;
-      const lastCandleTime = lastCandle.time;
-      
-      // Calculate candle interval (5 minutes = 300 seconds)
-      const candleInterval = 300;
-      const currentCandleTime = Math.floor(currentTime / candleInterval) * candleInterval;
-      
-      // Check if this tick belongs to the current candle or starts a new one
-      if (currentCandleTime === lastCandleTime) {
-        // Update existing candle (same 5-min period)
-        const updatedCandle = {
-          time: lastCandle.time,
-          open: lastCandle.open,
-          high: Math.max(lastCandle.high, latestPrice),
-          low: Math.min(lastCandle.low, latestPrice),
-          close: latestPrice
-        };
-        
-        if (safeUpdate(candleSeries, updatedCandle)) {
-          lastCandle = updatedCandle;
-          currentCandleBuffer = updatedCandle;
-        }
-      } else if (currentCandleTime > lastCandleTime) {
-        // New candle (new 5-min period)
-        const newCandle = {
-          time: currentCandleTime,
-          open: latestPrice,
-          high: latestPrice,
-          low: latestPrice,
-          close: latestPrice
-        };
-
-        if (safeUpdate(candleSeries, newCandle)) {
-          lastCandle = newCandle;
-          currentCandleBuffer = newCandle;
-          const candleTime = new Date(currentCandleTime * 1000).toLocaleTimeString();
-          console.log(`🕐 New candle @ ${candleTime}: ${latestPrice.toFixed(2)}`);
-          
-          // Scroll to latest candle
-          if (chart && chart.timeScale) {
-            chart.timeScale().scrollToRealTime();
-          }
-        }
-      }
+      // Candles are driven by server bar pushes ('bar' messages), not the client clock
     } catch (err) {
       console.error('WebSocket message error:', err);
     }
@@ -798,6 +867,21 @@ async function loadData(symbol, forceRefresh = false) {
     return;
   }
   
+  // Chart already shows this symbol: only fetch what changed since the cursor
+  if (!forceRefresh && !isInitialLoad && chartSymbol === symbol && candleCursor[symbol] != null) {
+    try {
+      const changed = await loadCandleDelta(symbol);
+      cacheTimestamp[cacheKey] = now;
+      setStatus(`🟢 LIVE | ${symbol} | ${changed ? `${changed} bar(s) updated` : 'up to date'}`);
+    } catch (error) {
+      console.error('Candle delta failed:', error);
+      setStatus(`✗ ${error.message}`);
+    } finally {
+      isUpdating = false;
+    }
+    return;
+  }
+  
   setStatus(`Loading ${symbol}...`);
   
   try {
@@ -822,22 +906,15 @@ async function loadData(symbol, forceRefresh = false) {
     if (!candlesRes.ok) throw new Error(`Candles API failed: ${candlesRes.status}`);
     
     const candlesData = await candlesRes.json();
-    let candles = Array.isArray(candlesData) ? candlesData : (candlesData.candles || []);
+    let candles = Array.isArray(candlesData) ? candlesData : barsFromColumns(candlesData.candles);
+    candleCursor[symbol] = candlesData.cursor;
+    candleEtag[symbol] = null;
     
     if (candles.length === 0) throw new Error('No candles received');
 
     // Drop any candles with null/invalid OHLC to avoid lightweight-charts errors
     // Also convert UTC timestamps to IST (+5:30 = +19800 seconds)
-    const IST_OFFSET = 19800; // 5.5 hours in seconds
-    const sanitized = candles.filter((c) =>
-      c && [c.time, c.open, c.high, c.low, c.close].every((v) => Number.isFinite(Number(v)))
-    ).map((c) => ({
-      time: Number(c.time) + IST_OFFSET,  // Convert UTC to IST
-      open: Number(c.open),
-      high: Number(c.high),
-      low: Number(c.low),
-      close: Number(c.close),
-    }));
+    const sanitized = candles.map(toChartBar).filter(Boolean);
 
     if (sanitized.length === 0) throw new Error('All candles invalid after sanitization');
     candles = sanitized;
@@ -872,6 +949,7 @@ async function loadData(symbol, forceRefresh = false) {
         chart.timeScale().fitContent();
       }
       isChartReady = true;
+      chartSymbol = symbol;
     }
 
     // Update price display
@@ -906,30 +984,7 @@ async function loadData(symbol, forceRefresh = false) {
         try {
           const levelsRes = await fetch(`/api/levels?symbol=${symbol}&interval=5&days=5`);
           if (levelsRes.ok) {
-            const levelsData = await levelsRes.json();
-            levelsCache[symbol] = levelsData;
-
-            // Attach latest candle time for overlays if missing
-            if (!levelsData.last_candle_time && lastCandle) {
-              levelsData.last_candle_time = lastCandle.time;
-            }
-
-            if (levelsData && levelsData.entry && isChartReady && candleSeries) {
-              levelsData.entry = Number(levelsData.entry);
-              levelsData.exit_target = Number(levelsData.exit_target);
-              levelsData.stoploss = Number(levelsData.stoploss);
-              if ([levelsData.entry, levelsData.exit_target, levelsData.stoploss].every(Number.isFinite)) {
-              setPriceLines(levelsData);
-              }
-            }
-            if (levelsData && levelsData.direction) {
-              updateLevelsCard(levelsData);
-              if (levelsData.position_status === 'HOLD') {
-                setStatus(`HOLD existing position - ${levelsData.hold_reason || 'structure unchanged'}`);
-              } else {
-                setStatus(`✓ ${levelsData.direction} signal generated - Entry: ${levelsData.entry.toFixed(2)}`);
-              }
-            }
+            applyLevels(symbol, await levelsRes.json());
           }
         } catch (e) {
           console.error('Levels load failed:', e);